@@ -5,6 +5,40 @@ import plotly.express as px
 import plotly.graph_objects as go
 from keboola_streamlit import KeboolaStreamlit
 
+from src.compute import (
+    STOCKOUT_HORIZON_DAYS,
+    Versioned,
+    campaign_analysis,
+    customer_analysis,
+    digital_analysis,
+    facility_analysis,
+    inventory_analysis,
+    memoized,
+    price_box_stats,
+    product_analysis,
+    recorded_attribution,
+    sales_analysis,
+)
+from src.attribution import TouchpointIndex, model_attribution
+from src.cube import build_sales_cube, slice_cube
+from src.customer_store import open_customer_store, orders_customer_metrics
+from src.date_index import date_slice, overlapping
+from src.downsample import aggregate_buckets, bucket_days, downsample_line
+from src.event_store import open_event_store
+from src.facility import build_facility_inventory
+from src.figure_cache import FigureCache
+from src.funnel import session_funnel
+from src.inventory import COVER_WINDOW, inventory_engine
+from src.keys import semi_join
+from src.navigation import PREFETCH, Prefetcher, navigation_mode
+from src.perf import timed
+from src.registry import TAB_DEPENDENCIES, TableRegistry
+from src.render import px_render_mode, scatter_trace
+from src.sketch import approximation_note, quantile_mode, sketches_by, use_sketch
+from src.table_page import page_count, page_slice, search_and_sort
+from src.traffic import build_traffic_rollups, pick_resolution, traffic_series
+from src.view_cache import ViewCache
+
 st.set_page_config(page_title="E-commerce Report", layout="wide")
 keboola = KeboolaStreamlit(st.secrets["kbc_url"], st.secrets["kbc_token"])
 
@@ -52,6 +86,38 @@ STATUS_COLORS = {
     'Refunded': '#e27c03'
 }
 
+# Attribution models of the Campaign tab; 'recorded' uses ORDER_CAMPAIGN_ATTRIBUTION as is
+ATTRIBUTION_MODEL_LABELS = {
+    'recorded': 'Recorded contribution',
+    'first_touch': 'First touch',
+    'last_touch': 'Last touch',
+    'linear': 'Linear',
+    'time_decay': 'Time decay'
+}
+
+FUNNEL_UNIT_LABELS = {
+    'SESSION_ID': 'Sessions',
+    'CUSTOMER_ID': 'Customers'
+}
+
+TRAFFIC_RESOLUTION_LABELS = {
+    'day': 'Daily',
+    'week': 'Weekly',
+    'month': 'Monthly'
+}
+
+# Most points (line charts) or x positions (stacked charts) each Sales chart sends to the
+# browser; longer ranges are downsampled unless full resolution is switched on
+CHART_POINT_BUDGETS = {
+    'daily_orders': 500,
+    'status_time': 200,
+    'revenue_by_type': 300,
+    'daily_sales': 500
+}
+
+# Rows per page of paginated tables
+PAGE_SIZES = [25, 50, 100, 250]
+
 st.markdown("""
 <style>
     .metric-container {
@@ -95,41 +161,77 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Load all data files
-campaign = pd.read_csv("/data/in/tables/CAMPAIGN.csv")
-campaign_event = pd.read_csv("/data/in/tables/CAMPAIGN_EVENT.csv")
-
-channel = pd.read_csv("/data/in/tables/CHANNEL.csv")
-
-content_page = pd.read_csv("/data/in/tables/CONTENT_PAGE.csv")
-custom_attribute = pd.read_csv("/data/in/tables/CUSTOM_ATTRIBUTE.csv")
-customer = pd.read_csv("/data/in/tables/CUSTOMER.csv")
-digital_event = pd.read_csv("/data/in/tables/DIGITAL_EVENT.csv")
-digital_site = pd.read_csv("/data/in/tables/DIGITAL_SITE.csv")
-
-facility = pd.read_csv("/data/in/tables/FACILITY.csv")
-inventory = pd.read_csv("/data/in/tables/INVENTORY.csv")
-
-## ORDERS, SALES
-order_campaign_attribution = pd.read_csv("/data/in/tables/ORDER_CAMPAIGN_ATTRIBUTION.csv")
-order_event = pd.read_csv("/data/in/tables/ORDER_EVENT.csv")
-order_fact = pd.read_csv("/data/in/tables/ORDER_FACT.csv")
-order_fulfillment = pd.read_csv("/data/in/tables/ORDER_FULFILLMENT.csv")
-order_fulfillment_line = pd.read_csv("/data/in/tables/ORDER_FULFILLMENT_LINE.csv")
-order_line = pd.read_csv("/data/in/tables/ORDER_LINE.csv")
-order_status_history = pd.read_csv("/data/in/tables/ORDER_STATUS_HISTORY.csv")
-
-page_performance = pd.read_csv("/data/in/tables/PAGE_PERFORMANCE.csv")
-
-product = pd.read_csv("/data/in/tables/PRODUCT.csv")
-product_variant = pd.read_csv("/data/in/tables/PRODUCT_VARIANT.csv")
-
-sales_plan = pd.read_csv("/data/in/tables/SALES_PLAN.csv")
+@st.cache_resource
+def get_table_registry():
+    """Process-wide table registry, shared by all sessions"""
+    return TableRegistry()
+
+@st.cache_resource
+def get_view_cache():
+    """Filtered views shared by all sessions (see src/view_cache.py)"""
+    return ViewCache()
+
+@st.cache_resource
+def get_figure_cache():
+    """Finished chart figures shared by all sessions (see src/figure_cache.py)"""
+    return FigureCache()
+
+@st.cache_resource
+def get_prefetcher():
+    """Background warm-up of the sections not on screen (see src/navigation.py)"""
+    return Prefetcher()
+
+@st.cache_resource(max_entries=1)
+def get_event_store(version):
+    """Date-partitioned DIGITAL_EVENT store for a version of the source file"""
+    return open_event_store()
+
+@st.cache_resource(max_entries=1)
+def get_customer_store(version):
+    """Per-customer order aggregates for a version of ORDER_FACT (see src/customer_store.py)"""
+    return open_customer_store(registry)
+
+# Tables are loaded lazily: each section asks the registry for what it reads
+# (see TAB_DEPENDENCIES in src/registry.py)
+registry = get_table_registry()
+
+# Pick up rows the pipeline appended since the tables were loaded
+registry.refresh()
+
+def get_sales_cube():
+    """Daily sales cube, built once per loaded ORDER_FACT"""
+    return registry.derived("sales_cube", lambda: build_sales_cube(registry.get("ORDER_FACT")))
+
+def get_traffic_rollups():
+    """Daily, weekly and monthly traffic rollups, built once per loaded PAGE_PERFORMANCE"""
+    return registry.derived("traffic_rollups", lambda: build_traffic_rollups(registry.get("PAGE_PERFORMANCE")))
+
+def get_variant_inventory():
+    """Velocity and cover of every variant, built once per loaded data"""
+    return registry.derived("variant_inventory", lambda: inventory_engine(
+        registry.get("PRODUCT_VARIANT"), registry.get("ORDER_LINE"), registry.get("ORDER_FACT")))
+
+def get_facility_inventory():
+    """Sparse variant x facility stock matrix, built once per loaded data"""
+    return registry.derived("facility_inventory", lambda: build_facility_inventory(
+        registry.get("INVENTORY"), registry.get("PRODUCT"), registry.get("FACILITY")))
+
+# Per-load work of each section that can be done before it is opened:
+# the section's TAB_DEPENDENCIES entry and its warm-up (see src/navigation.py)
+SECTION_PREFETCH = {
+    "Sales Analysis": ("Sales", get_sales_cube),
+    "Product Analysis": ("Product", lambda: (registry.get("ORDER_LINE"), registry.get("PRODUCT_VARIANT"))),
+    "Digital Analysis": ("Digital", get_traffic_rollups),
+    "Inventory Analysis": ("Inventory", lambda: (get_variant_inventory(), get_facility_inventory())),
+    "Campaign Analysis": ("Campaign", lambda: (registry.get("CAMPAIGN"), registry.get("ORDER_CAMPAIGN_ATTRIBUTION"))),
+}
 
-############### NOT USING ###############
-company = pd.read_csv("/data/in/tables/COMPANY.csv") 
-person = pd.read_csv("/data/in/tables/PERSON.csv") 
-############### NOT USING ###############
+with timed('Load'):
+    channel = registry.get("CHANNEL")
+    customer = registry.get("CUSTOMER")
+    order_fact = registry.get("ORDER_FACT")
+    product = registry.get("PRODUCT")
+    sales_plan = registry.get("SALES_PLAN")
 
 
 # Create sidebar filters
@@ -145,7 +247,7 @@ with st.sidebar:
     )
 
     # Date range filter
-    min_date = order_fact['ORDER_DATE'].min()
+    min_date = order_fact['ORDER_DATE'].min().date()
     today = pd.Timestamp.today()
     
     current_year_start = pd.Timestamp(today.year, 1, 1)
@@ -187,73 +289,71 @@ sorted_dates = sorted(date_range)
 start_date = pd.Timestamp(sorted_dates[0])
 end_date = pd.Timestamp(sorted_dates[1])
 
-# Filter orders by date range (using vectorized operations)
-order_fact['ORDER_DATE'] = pd.to_datetime(order_fact['ORDER_DATE'])
-date_mask = (order_fact['ORDER_DATE'] >= start_date) & (order_fact['ORDER_DATE'] <= end_date)
-order_fact = order_fact[date_mask]
-
-# Convert sales plan dates to datetime
-sales_plan['PLAN_START_DATE'] = pd.to_datetime(sales_plan['PLAN_START_DATE'])
-sales_plan['PLAN_END_DATE'] = pd.to_datetime(sales_plan['PLAN_END_DATE'])
-
-sales_plan = sales_plan[
-    ((sales_plan['PLAN_START_DATE'] <= end_date) & 
-        (sales_plan['PLAN_END_DATE'] >= start_date))
-]
-
-# Filter by channel
-if selected_channel != 'All':
-    channel_ids = channel[channel['CHANNEL_NAME'] == selected_channel]['CHANNEL_ID'].values
-    order_fact = order_fact[order_fact['CHANNEL_ID'].isin(channel_ids)]
-
-# Filter by payment method
-if selected_payment_method != 'All':
-    order_fact = order_fact[order_fact['PAYMENT_METHOD'] == selected_payment_method]
-
-# Filter by order status
-if selected_order_status != 'All':
-    order_fact = order_fact[order_fact['ORDER_STATUS'] == selected_order_status]
-
-# Get relevant order IDs (once)
-order_ids = order_fact['ORDER_ID'].values
-
-# Filter order lines using the order IDs
-order_line = order_line[order_line['ORDER_ID'].isin(order_ids)]
-
-# Filter by product category
-if selected_category != 'All':
-    # Get product IDs for the selected category
-    category_product_ids = product[product['CATEGORY'] == selected_category]['PRODUCT_ID'].values
-    
-    # Filter order lines by these product IDs
-    order_line = order_line[order_line['PRODUCT_ID'].isin(category_product_ids)]
-    
-    # Filter products
-    product = product[product['CATEGORY'] == selected_category]
-    
-    # Filter inventory
-    inventory = inventory[inventory['PRODUCT_ID'].isin(category_product_ids)]
-# Get relevant customer IDs
-customer_ids = order_fact['CUSTOMER_ID'].unique()
-
-# Filter customer data
-customer = customer[customer['CUSTOMER_ID'].isin(customer_ids)]
-
-# Filter digital events by date
-digital_event['EVENT_DATE'] = pd.to_datetime(digital_event['EVENT_DATE'])
-digital_date_mask = (digital_event['EVENT_DATE'] >= start_date) & (digital_event['EVENT_DATE'] <= end_date)
-digital_event = digital_event[digital_date_mask]
-
-# Filter page performance by date
-page_performance['DATE'] = pd.to_datetime(page_performance['DATE'])
-page_date_mask = (page_performance['DATE'] >= start_date) & (page_performance['DATE'] <= end_date)
-page_performance = page_performance[page_date_mask]
+# Filtered views are shared by every session with the same filters, keyed by
+# the normalized filter values and the version of the tables they come from
+filters = (start_date, end_date, selected_category, selected_channel, selected_payment_method, selected_order_status)
+view_cache = get_view_cache()
+
+def cached_view(name, tables, build):
+    """Filtered view for the current filters, built on a cache miss"""
+    return view_cache.get((name, filters, registry.version(tables)), build)
+
+# Finished figures are cached the same way, per chart, so a repeated view skips
+# building the figure and whatever its builder computes (downsampling, layout).
+# The tab's memoized aggregations still run before it, or are fingerprinted and
+# served from the view cache
+figure_cache = get_figure_cache()
+
+def cached_figure(chart_id, tab, build, *controls):
+    """Figure of a chart for the current filters and controls, built on a cache miss"""
+    tables = sorted(set(TAB_DEPENDENCIES['Filters']) | set(TAB_DEPENDENCIES[tab]))
+    return figure_cache.figure(chart_id, (filters, controls, registry.version(tables)), build)
+
+def filter_tables():
+    """Apply the sidebar filters to the order, plan, product and customer tables"""
+    # Filter orders by date range (tables are sorted by date at ingest, see src/schema.py)
+    filtered_orders = date_slice(order_fact, 'ORDER_DATE', start_date, end_date)
+
+    # Keep sales plans that overlap the selected date range
+    filtered_plan = overlapping(sales_plan, 'PLAN_START_DATE', 'PLAN_END_DATE', start_date, end_date)
+
+    # Filter by channel
+    channel_ids = None
+    if selected_channel != 'All':
+        channel_ids = channel[channel['CHANNEL_NAME'] == selected_channel]['CHANNEL_ID'].values
+        filtered_orders = filtered_orders[filtered_orders['CHANNEL_ID'].isin(channel_ids)]
+
+    # Filter by payment method
+    if selected_payment_method != 'All':
+        filtered_orders = filtered_orders[filtered_orders['PAYMENT_METHOD'] == selected_payment_method]
+
+    # Filter by order status
+    if selected_order_status != 'All':
+        filtered_orders = filtered_orders[filtered_orders['ORDER_STATUS'] == selected_order_status]
+
+    # Filter by product category
+    filtered_products = product
+    if selected_category != 'All':
+        filtered_products = product[product['CATEGORY'] == selected_category]
+
+    # Filter customer data to the customers with orders
+    filtered_customers = semi_join(customer, filtered_orders, 'CUSTOMER_ID')
+
+    return {
+        'order_fact': filtered_orders,
+        'sales_plan': filtered_plan,
+        'product': filtered_products,
+        'customer': filtered_customers,
+        'channel_ids': channel_ids
+    }
 
-# Filter campaigns that overlap with the selected date range
-campaign['START_DATE'] = pd.to_datetime(campaign['START_DATE'])
-campaign['END_DATE'] = pd.to_datetime(campaign['END_DATE'])
-campaign_mask = (campaign['START_DATE'] <= end_date) & (campaign['END_DATE'] >= start_date)
-campaign = campaign[campaign_mask]
+with timed('Filters'):
+    views = cached_view('filters', ['CHANNEL', 'CUSTOMER', 'ORDER_FACT', 'PRODUCT', 'SALES_PLAN'], filter_tables)
+order_fact = views['order_fact']
+sales_plan = views['sales_plan']
+product = views['product']
+customer = views['customer']
+channel_ids = views['channel_ids']
 
 
 # Helper function to create metric containers
@@ -268,1420 +368,1515 @@ def create_metric_container(title, value, color=PRIMARY_COLOR):
 
 # Create tabs
 tab_names = ["Overview", "Sales Analysis", "Product Analysis", "Customer Analysis", "Digital Analysis", "Inventory Analysis", "Campaign Analysis"]
-tabs = st.tabs(tab_names)
+if navigation_mode() == "tabs":
+    # Every section runs on every rerun, each in its own tab
+    sections = dict(zip(tab_names, st.tabs(tab_names)))
+else:
+    # Only the selected section runs; the others are computed when they are selected
+    selected_section = st.segmented_control(
+        'Section', tab_names, default=tab_names[0], key='section', label_visibility='collapsed'
+    ) or tab_names[0]
+    sections = {selected_section: st.container()}
 
 
 
 # Overview tab
-with tabs[0]:
-    st.markdown(
-    """
-    <div style="display: flex; justify-content: flex-start; align-items: center; margin-bottom: 20px; margin-top: 20px;">
-        <img src="https://assets-global.website-files.com/5e21dc6f4c5acf29c35bb32c/5e21e66410e34945f7f25add_Keboola_logo.svg" alt="Keboola Logo" style="height: 40px;">
-    </div>
-    """,
-    unsafe_allow_html=True
-)
-    st.markdown("""
-    Ecommerce Starter is a **demo project** featuring a fictional eCommerce company designed to showcase how businesses can effortlessly leverage the Keboola platform, including Streamlit dashboards and AI integrations. Discover unified insights into business performance and unlock a path to advanced capabilities such as dynamic pricing, demand forecasting, personalization, and more—all enabled by a single data platform.
-    """)
-with tabs[1]:
-    # Calculate key metrics
-    total_revenue = order_fact['TOTAL_AMOUNT'].sum()
-    total_orders = len(order_fact)
-    total_customers = len(customer)
-    avg_order_value = total_revenue / total_orders if total_orders > 0 else 0
-    
-    # Create key metrics
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.markdown(create_metric_container("Total Customers", f"{total_customers:,.0f}"), unsafe_allow_html=True)
-    with col2:
-        st.markdown(create_metric_container("Total Orders", f"{total_orders:,.0f}"), unsafe_allow_html=True)
-    with col3:
-        st.markdown(create_metric_container("Total Revenue", f"${total_revenue:,.0f}"), unsafe_allow_html=True)
-    with col4:
-        st.markdown(create_metric_container("Avg Order Value", f"${avg_order_value:,.2f}"), unsafe_allow_html=True)
-    
-    # Create time series with daily orders
-    daily_orders = order_fact.groupby(pd.Grouper(key='ORDER_DATE', freq='D')).agg({
-        'ORDER_ID': 'count',
-        'TOTAL_AMOUNT': 'sum'
-    }).reset_index()
-    daily_orders.rename(columns={'ORDER_ID': 'NEW_ORDERS'}, inplace=True)
-
-    # Plot daily orders and revenue
-    fig1 = go.Figure()
-    # Add bar chart for order count
-    fig1.add_trace(go.Bar(
-        x=daily_orders['ORDER_DATE'],
-        y=daily_orders['NEW_ORDERS'],
-        name='Number of Orders',
-        marker_color='rgba(128, 128, 128, 0.3)',  # Grey with 70% transparency
-        hovertemplate='Date: %{x|%Y-%m-%d}<br>Number of Orders: %{y}<extra></extra>'
-    ))
-    
-    # Add line chart for revenue on secondary y-axis
-    fig1.add_trace(go.Scatter(
-        x=daily_orders['ORDER_DATE'],
-        y=daily_orders['TOTAL_AMOUNT'],
-        name='Revenue',
-        mode='lines',
-        line=dict(color='#1E88E5', width=2),
-        yaxis='y2',
-        hovertemplate='Date: %{x|%Y-%m-%d}<br>Revenue: $%{y:,.2f}<extra></extra>'
-    ))
-    
-    # Update layout for dual y-axis
-    fig1.update_layout(
-        title='Daily Order Count and Revenue',
-        xaxis=dict(title='Date'),
-        yaxis=dict(
-            title='Number of Orders',
-            side='left'
-        ),
-        yaxis2=dict(
-            title='Revenue ($)',
-            side='right',
-            overlaying='y',
-            showgrid=False
-        ),
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1
-        ),
-        hovermode='x unified'
+if 'Overview' in sections:
+    with sections['Overview'], timed('Overview'):
+        st.markdown(
+        """
+        <div style="display: flex; justify-content: flex-start; align-items: center; margin-bottom: 20px; margin-top: 20px;">
+            <img src="https://assets-global.website-files.com/5e21dc6f4c5acf29c35bb32c/5e21e66410e34945f7f25add_Keboola_logo.svg" alt="Keboola Logo" style="height: 40px;">
+        </div>
+        """,
+        unsafe_allow_html=True
     )
+        st.markdown("""
+        Ecommerce Starter is a **demo project** featuring a fictional eCommerce company designed to showcase how businesses can effortlessly leverage the Keboola platform, including Streamlit dashboards and AI integrations. Discover unified insights into business performance and unlock a path to advanced capabilities such as dynamic pricing, demand forecasting, personalization, and more—all enabled by a single data platform.
+        """)
+if 'Sales Analysis' in sections:
+    with sections['Sales Analysis'], timed('Sales'):
+        # Sales metrics and charts are answered from the pre-aggregated daily cube
+        sales_cube = cached_view('sales_cube', ['ORDER_FACT'], lambda: slice_cube(
+            get_sales_cube(),
+            start_date,
+            end_date,
+            channel_ids=channel_ids,
+            payment_method=None if selected_payment_method == 'All' else selected_payment_method,
+            order_status=None if selected_order_status == 'All' else selected_order_status
+        ))
 
-    st.plotly_chart(fig1, use_container_width=True)
-    # Group orders by date and status
-    status_time = order_fact.groupby([pd.Grouper(key='ORDER_DATE', freq='D'), 'ORDER_STATUS']).size().reset_index(name='COUNT')
-    # Create stacked bar chart for status over time (alternative view)
-    fig_status_stacked = px.bar(
-        status_time,
-        x='ORDER_DATE',
-        y='COUNT',
-        color='ORDER_STATUS',
-        title='Order Status Over Time',
-        color_discrete_map=STATUS_COLORS,
-        labels={
-            'ORDER_DATE': 'Date',
-            'COUNT': 'Number of Orders',
-            'ORDER_STATUS': 'Order Status'
-        },
-        barmode='stack'  # Stack bars by date
-    )
-    
-    # Customize appearance
-    fig_status_stacked.update_layout(
-        xaxis_title='Date',
-        yaxis_title='Number of Orders',
-        hovermode='x unified',
-        legend=dict(
-            orientation="h",
-            yanchor="top",
-            y=-0.2,
-            xanchor="center",
-            x=0.5,
-            traceorder='reversed'
+        sales = memoized(view_cache, sales_analysis, sales_cube, sales_plan, start_date, end_date)
+
+        # Key metrics
+        total_revenue = sales['total_revenue']
+        total_orders = sales['total_orders']
+        total_customers = len(customer)
+        avg_order_value = sales['avg_order_value']
+    
+        # Create key metrics
+        col1, col2, col3, col4 = st.columns(4)
+    
+        with col1:
+            st.markdown(create_metric_container("Total Customers", f"{total_customers:,.0f}"), unsafe_allow_html=True)
+        with col2:
+            st.markdown(create_metric_container("Total Orders", f"{total_orders:,.0f}"), unsafe_allow_html=True)
+        with col3:
+            st.markdown(create_metric_container("Total Revenue", f"${total_revenue:,.0f}"), unsafe_allow_html=True)
+        with col4:
+            st.markdown(create_metric_container("Avg Order Value", f"${avg_order_value:,.2f}"), unsafe_allow_html=True)
+    
+        full_resolution = st.toggle(
+            'Full resolution charts',
+            help='Plot every day. Otherwise long ranges show order counts summed over multi-day buckets '
+                 'and revenue lines reduced to their most telling points.'
         )
-    )
-
-    # Customize hover template to show date once at top
-    fig_status_stacked.update_traces(
-        hovertemplate=
-        "Order Status: %{data.name}<br>" +
-        "Number of Orders: %{y:,}<extra></extra>"
-    )
-    
-    # Display chart
-    st.plotly_chart(fig_status_stacked, use_container_width=True)
-
-    # Revenue by order type and time trend
-    type_revenue_time = order_fact.groupby(['ORDER_TYPE', pd.Grouper(key='ORDER_DATE', freq='D')])['TOTAL_AMOUNT'].sum().reset_index()
-    
-    # Create an area chart for revenue trends
-    pivot_revenue = type_revenue_time.pivot_table(
-        index='ORDER_DATE', 
-        columns='ORDER_TYPE', 
-        values='TOTAL_AMOUNT',
-        aggfunc='sum'
-    ).fillna(0).reset_index()
-    
-    melted_revenue = pd.melt(
-        pivot_revenue, 
-        id_vars=['ORDER_DATE'], 
-        var_name='ORDER_TYPE', 
-        value_name='TOTAL_AMOUNT'
-    )
-    
-    fig3b = px.area(
-        melted_revenue,
-        x='ORDER_DATE',
-        y='TOTAL_AMOUNT',
-        color='ORDER_TYPE',
-        title='Revenue by Order Type',
-        color_discrete_sequence=px.colors.qualitative.Prism,
-        labels={
-            'ORDER_DATE': 'Date',
-            'TOTAL_AMOUNT': 'Revenue',
-            'ORDER_TYPE': 'Order Type'
-        }
-    )
+        budgets = {chart: None if full_resolution else budget for chart, budget in CHART_POINT_BUDGETS.items()}
+        if any(bucket_days(sales['daily_orders']['ORDER_DATE'], budget) > 1 for budget in budgets.values()):
+            st.caption("Long range: bars and areas are summed over multi-day buckets dated by their first day, "
+                       "and lines keep the points that preserve their shape.")
+
+        # Plot daily orders and revenue
+        def daily_orders_figure():
+            daily_orders = sales['daily_orders']
+            order_buckets = aggregate_buckets(daily_orders, 'ORDER_DATE', ['NEW_ORDERS'], budget=budgets['daily_orders'])
+            revenue_line = downsample_line(daily_orders, 'ORDER_DATE', 'TOTAL_AMOUNT', budgets['daily_orders'])
+            fig1 = go.Figure()
+            # Add bar chart for order count
+            fig1.add_trace(go.Bar(
+                x=order_buckets['ORDER_DATE'],
+                y=order_buckets['NEW_ORDERS'],
+                name='Number of Orders',
+                marker_color='rgba(128, 128, 128, 0.3)',  # Grey with 70% transparency
+                hovertemplate='Date: %{x|%Y-%m-%d}<br>Number of Orders: %{y}<extra></extra>'
+            ))
+    
+            # Add line chart for revenue on secondary y-axis
+            fig1.add_trace(scatter_trace(
+                x=revenue_line['ORDER_DATE'],
+                y=revenue_line['TOTAL_AMOUNT'],
+                name='Revenue',
+                mode='lines',
+                line=dict(color='#1E88E5', width=2),
+                yaxis='y2',
+                hovertemplate='Date: %{x|%Y-%m-%d}<br>Revenue: $%{y:,.2f}<extra></extra>'
+            ))
+    
+            # Update layout for dual y-axis
+            fig1.update_layout(
+                title='Daily Order Count and Revenue',
+                xaxis=dict(title='Date'),
+                yaxis=dict(
+                    title='Number of Orders',
+                    side='left'
+                ),
+                yaxis2=dict(
+                    title='Revenue ($)',
+                    side='right',
+                    overlaying='y',
+                    showgrid=False
+                ),
+                legend=dict(
+                    orientation="h",
+                    yanchor="bottom",
+                    y=1.02,
+                    xanchor="right",
+                    x=1
+                ),
+                hovermode='x unified'
+            )
+            return fig1
+
+        fig1 = cached_figure('daily_orders', 'Sales', daily_orders_figure, full_resolution)
+        st.plotly_chart(fig1, use_container_width=True)
+        # Create stacked bar chart for status over time (alternative view)
+        def status_over_time_figure():
+            fig_status_stacked = px.bar(
+                aggregate_buckets(sales['status_time'], 'ORDER_DATE', ['COUNT'], 'ORDER_STATUS', budgets['status_time']),
+                x='ORDER_DATE',
+                y='COUNT',
+                color='ORDER_STATUS',
+                title='Order Status Over Time',
+                color_discrete_map=STATUS_COLORS,
+                labels={
+                    'ORDER_DATE': 'Date',
+                    'COUNT': 'Number of Orders',
+                    'ORDER_STATUS': 'Order Status'
+                },
+                barmode='stack'  # Stack bars by date
+            )
     
-    fig3b.update_layout(
-        xaxis_title='',
-        yaxis_title='Revenue',
-        hovermode='x unified',
-        legend=dict(
-            orientation="h",
-            yanchor="top",
-            y=-0.2,
-            xanchor="center",
-            x=0.5,
-            traceorder='reversed'
-        ),
-        hoverlabel=dict(
-            namelength=-1  # Show full label names
-        )
-    )
+            # Customize appearance
+            fig_status_stacked.update_layout(
+                xaxis_title='Date',
+                yaxis_title='Number of Orders',
+                hovermode='x unified',
+                legend=dict(
+                    orientation="h",
+                    yanchor="top",
+                    y=-0.2,
+                    xanchor="center",
+                    x=0.5,
+                    traceorder='reversed'
+                )
+            )
+
+            # Customize hover template to show date once at top
+            fig_status_stacked.update_traces(
+                hovertemplate=
+                "Order Status: %{data.name}<br>" +
+                "Number of Orders: %{y:,}<extra></extra>"
+            )
+            return fig_status_stacked
+
+        # Display chart
+        fig_status_stacked = cached_figure('status_over_time', 'Sales', status_over_time_figure, full_resolution)
+        st.plotly_chart(fig_status_stacked, use_container_width=True)
+
+        # Create an area chart for revenue trends by order type
+        def revenue_by_type_figure():
+            fig3b = px.area(
+                aggregate_buckets(sales['revenue_by_type'], 'ORDER_DATE', ['TOTAL_AMOUNT'], 'ORDER_TYPE',
+                                  budgets['revenue_by_type']),
+                x='ORDER_DATE',
+                y='TOTAL_AMOUNT',
+                color='ORDER_TYPE',
+                title='Revenue by Order Type',
+                color_discrete_sequence=px.colors.qualitative.Prism,
+                labels={
+                    'ORDER_DATE': 'Date',
+                    'TOTAL_AMOUNT': 'Revenue',
+                    'ORDER_TYPE': 'Order Type'
+                }
+            )
     
-    # Customize hover template to show date once at the top
-    fig3b.update_traces(
-        hovertemplate=
-        "%{data.name}: $%{y:,.2f}<extra></extra>"
-    )
+            fig3b.update_layout(
+                xaxis_title='',
+                yaxis_title='Revenue',
+                hovermode='x unified',
+                legend=dict(
+                    orientation="h",
+                    yanchor="top",
+                    y=-0.2,
+                    xanchor="center",
+                    x=0.5,
+                    traceorder='reversed'
+                ),
+                hoverlabel=dict(
+                    namelength=-1  # Show full label names
+                )
+            )
     
-    st.plotly_chart(fig3b, use_container_width=True)
-    
-    # Create sales dashboard
-    # Add KPI metrics for sales performance
-
-    # Calculate daily actual sales (using efficient groupby)
-    daily_actual_sales = order_fact.groupby(pd.Grouper(key='ORDER_DATE', freq='D')).agg({
-        'TOTAL_AMOUNT': 'sum'
-    }).reset_index()
-
-    # Filter sales plan to relevant date range
-    sales_plan = sales_plan[
-        (sales_plan['PLAN_START_DATE'] >= start_date) & 
-        (sales_plan['PLAN_START_DATE'] <= end_date)
-    ]
-
-    # Create daily plan dataframe from sales_plan data
-    daily_plan = sales_plan[['PLAN_START_DATE', 'TARGET_REVENUE']].copy()
-    daily_plan.columns = ['ORDER_DATE', 'PLANNED_AMOUNT']
-
-    # Merge actual and planned sales
-    daily_sales = pd.merge(
-        daily_actual_sales,
-        daily_plan,
-        on='ORDER_DATE', 
-        how='outer'
-    ).fillna(0)
-
-    # Sort by date
-    daily_sales = daily_sales.sort_values('ORDER_DATE')
-
-    # Calculate achievement rate
-    daily_sales['ACHIEVEMENT_RATE'] = (daily_sales['TOTAL_AMOUNT'] / daily_sales['PLANNED_AMOUNT'] * 100).fillna(0)
-
-    col1, col2, col3 = st.columns(3)
-
-    total_actual = daily_sales['TOTAL_AMOUNT'].sum()
-    total_planned = daily_sales['PLANNED_AMOUNT'].sum()
-    overall_achievement = (total_actual / total_planned * 100) if total_planned > 0 else 0
-
-    with col1:
-        st.markdown(create_metric_container(
-            "Total Actual Sales",
-            f"${total_actual:,.2f}"
-        ), unsafe_allow_html=True)
-
-    with col2:
-        st.markdown(create_metric_container(
-            "Total Planned Sales",
-            f"${total_planned:,.2f}",
-            SECONDARY_COLOR
-        ), unsafe_allow_html=True)
-
-    with col3:
-        achievement_color = SUCCESS_COLOR if overall_achievement >= 100 else WARNING_COLOR if overall_achievement >= 80 else DANGER_COLOR
-        st.markdown(create_metric_container(
-            "Overall Achievement Rate",
-            f"{overall_achievement:.1f}%",
-            achievement_color
-        ), unsafe_allow_html=True)
-
-    # Create sales vs plan visualization - OPTIMIZED VERSION
-    sales_plan_fig = go.Figure()
-
-    # Add actual sales line
-    sales_plan_fig.add_trace(go.Scatter(
-        x=daily_sales['ORDER_DATE'],
-        y=daily_sales['TOTAL_AMOUNT'],
-        name='Actual Sales',
-        line=dict(color=PRIMARY_COLOR, width=2),
-        mode='lines'
-    ))
-
-    # Add planned sales line
-    sales_plan_fig.add_trace(go.Scatter(
-        x=daily_sales['ORDER_DATE'],
-        y=daily_sales['PLANNED_AMOUNT'],
-        name='Planned Sales',
-        line=dict(color=SECONDARY_COLOR, width=2, dash='dash'),
-        mode='lines'
-    ))
-
-    # Update layout for daily view
-    sales_plan_fig.update_layout(
-        title='Sales Performance vs Plan',
-        xaxis_title='Date',
-        yaxis_title='Amount ($)',
-        hovermode='x unified',
-        showlegend=True,
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1
-        )
-    )
+            # Customize hover template to show date once at the top
+            fig3b.update_traces(
+                hovertemplate=
+                "%{data.name}: $%{y:,.2f}<extra></extra>"
+            )
+            return fig3b
+
+        fig3b = cached_figure('revenue_by_type', 'Sales', revenue_by_type_figure, full_resolution)
+        st.plotly_chart(fig3b, use_container_width=True)
+    
+        # Sales performance against plan
+        daily_sales = sales['daily_sales']
+        total_actual = sales['total_actual']
+        total_planned = sales['total_planned']
+        overall_achievement = sales['overall_achievement']
+
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            st.markdown(create_metric_container(
+                "Total Actual Sales",
+                f"${total_actual:,.2f}"
+            ), unsafe_allow_html=True)
+
+        with col2:
+            st.markdown(create_metric_container(
+                "Total Planned Sales",
+                f"${total_planned:,.2f}",
+                SECONDARY_COLOR
+            ), unsafe_allow_html=True)
+
+        with col3:
+            achievement_color = SUCCESS_COLOR if overall_achievement >= 100 else WARNING_COLOR if overall_achievement >= 80 else DANGER_COLOR
+            st.markdown(create_metric_container(
+                "Overall Achievement Rate",
+                f"{overall_achievement:.1f}%",
+                achievement_color
+            ), unsafe_allow_html=True)
+
+        # Create sales vs plan visualization - OPTIMIZED VERSION
+        def sales_vs_plan_figure():
+            sales_plan_fig = go.Figure()
+
+            # Add actual sales line
+            actual_line = downsample_line(daily_sales, 'ORDER_DATE', 'TOTAL_AMOUNT', budgets['daily_sales'])
+            sales_plan_fig.add_trace(scatter_trace(
+                x=actual_line['ORDER_DATE'],
+                y=actual_line['TOTAL_AMOUNT'],
+                name='Actual Sales',
+                line=dict(color=PRIMARY_COLOR, width=2),
+                mode='lines'
+            ))
+
+            # Add planned sales line
+            planned_line = downsample_line(daily_sales, 'ORDER_DATE', 'PLANNED_AMOUNT', budgets['daily_sales'])
+            sales_plan_fig.add_trace(scatter_trace(
+                x=planned_line['ORDER_DATE'],
+                y=planned_line['PLANNED_AMOUNT'],
+                name='Planned Sales',
+                line=dict(color=SECONDARY_COLOR, width=2, dash='dash'),
+                mode='lines'
+            ))
+
+            # Update layout for daily view
+            sales_plan_fig.update_layout(
+                title='Sales Performance vs Plan',
+                xaxis_title='Date',
+                yaxis_title='Amount ($)',
+                hovermode='x unified',
+                showlegend=True,
+                legend=dict(
+                    orientation="h",
+                    yanchor="bottom",
+                    y=1.02,
+                    xanchor="right",
+                    x=1
+                )
+            )
+            return sales_plan_fig
 
-    # Display the updated sales vs plan chart
-    st.plotly_chart(sales_plan_fig, use_container_width=True)
+        # Display the updated sales vs plan chart
+        sales_plan_fig = cached_figure('sales_vs_plan', 'Sales', sales_vs_plan_figure, full_resolution)
+        st.plotly_chart(sales_plan_fig, use_container_width=True)
 
 # Product Analysis tab
-with tabs[2]:
-    # Merge relevant tables efficiently for product analysis
-    product_sales = (order_line.merge(order_fact[['ORDER_ID', 'ORDER_DATE', 'ORDER_STATUS']], on='ORDER_ID')
-                    .merge(product[['PRODUCT_ID', 'NAME', 'CATEGORY', 'BRAND', 'PRICE']], on='PRODUCT_ID')
-                    .merge(product_variant[['VARIANT_ID', 'PRODUCT_ID', 'VARIANT_NAME', 'INVENTORY_QTY']], on=['PRODUCT_ID', 'VARIANT_ID'], how='left'))
-    
-    # Calculate product metrics - correctly account for discounts
-    product_sales['REVENUE'] = product_sales['LINE_TOTAL']  # LINE_TOTAL already includes discounts
-    product_sales['PROFIT_MARGIN'] = ((product_sales['LINE_TOTAL'] - (product_sales['UNIT_PRICE'] * 0.6 * product_sales['QUANTITY'])) / product_sales['LINE_TOTAL']) * 100
-    
-    # Convert ORDER_DATE to datetime
-    product_sales['ORDER_DATE'] = pd.to_datetime(product_sales['ORDER_DATE'])
-    
-    # Extract year and month for time-based analysis
-    product_sales['YEAR'] = product_sales['ORDER_DATE'].dt.year
-    product_sales['MONTH'] = product_sales['ORDER_DATE'].dt.month
-    product_sales['MONTH_NAME'] = product_sales['ORDER_DATE'].dt.strftime('%b')
-    product_sales['YEAR_MONTH'] = product_sales['ORDER_DATE'].dt.strftime('%Y-%m')
-    
-    # Key metrics
-    total_products = len(product)
-    active_products = len(product[product['ACTIVE'] == True])
-    total_categories = product['CATEGORY'].nunique()
-    avg_price = product['PRICE'].mean()
-    total_variants = len(product_variant)
-    avg_inventory = product_variant['INVENTORY_QTY'].mean()
-    
-    # Display key metrics in two rows
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        st.markdown(create_metric_container(
-            "Total Products",
-            f"{total_products:,}"
-        ), unsafe_allow_html=True)
-    with col2:
-        st.markdown(create_metric_container(
-            "Active Products",
-            f"{active_products:,}",
-            SUCCESS_COLOR
-        ), unsafe_allow_html=True)
-    with col3:
-        st.markdown(create_metric_container(
-            "Categories",
-            f"{total_categories:,}",
-            SECONDARY_COLOR
-        ), unsafe_allow_html=True)
-    with col4:
-        st.markdown(create_metric_container(
-            "Avg Product Price",
-            f"${avg_price:.2f}"
-        ), unsafe_allow_html=True)
+if 'Product Analysis' in sections:
+    with sections['Product Analysis'], timed('Product'):
+        product_variant = registry.get("PRODUCT_VARIANT")
+
+        def filter_order_lines():
+            """Order lines of the filtered orders and selected category"""
+            order_line = registry.get("ORDER_LINE")
+
+            # Filter order lines using the order keys
+            order_line = semi_join(order_line, order_fact, 'ORDER_ID')
+
+            # Filter order lines by the selected category's products
+            if selected_category != 'All':
+                order_line = semi_join(order_line, product, 'PRODUCT_ID')
+            return order_line
+
+        order_line = cached_view('order_line', ['ORDER_FACT', 'ORDER_LINE', 'PRODUCT'], filter_order_lines)
+
+        products = memoized(view_cache, product_analysis, order_line, order_fact, product, product_variant)
+
+        # Key metrics
+        total_products = products['total_products']
+        active_products = products['active_products']
+        total_categories = products['total_categories']
+        avg_price = products['avg_price']
+    
+        # Display key metrics in two rows
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.markdown(create_metric_container(
+                "Total Products",
+                f"{total_products:,}"
+            ), unsafe_allow_html=True)
+        with col2:
+            st.markdown(create_metric_container(
+                "Active Products",
+                f"{active_products:,}",
+                SUCCESS_COLOR
+            ), unsafe_allow_html=True)
+        with col3:
+            st.markdown(create_metric_container(
+                "Categories",
+                f"{total_categories:,}",
+                SECONDARY_COLOR
+            ), unsafe_allow_html=True)
+        with col4:
+            st.markdown(create_metric_container(
+                "Avg Product Price",
+                f"${avg_price:.2f}"
+            ), unsafe_allow_html=True)
         
     
 
-    # Calculate product performance metrics
-    product_performance = product_sales.groupby(['PRODUCT_ID', 'NAME', 'CATEGORY', 'BRAND', 'PRICE']).agg({
-        'QUANTITY': 'sum',
-        'REVENUE': 'sum',
-        'ORDER_ID': 'nunique',
-        'PROFIT_MARGIN': 'mean'
-    }).reset_index()
-    
-    product_performance['AVG_ORDER_VALUE'] = product_performance['REVENUE'] / product_performance['ORDER_ID']
-    product_performance = product_performance.sort_values('REVENUE', ascending=False)
-    
-    # Top and Bottom Products
-        
-    # Top products by Revenue
-    top_products = product_performance.nlargest(10, 'REVENUE')
-    
-    fig_top = px.bar(
-        top_products,
-        x='REVENUE',
-        y='NAME',
-        color='CATEGORY',
-        title='Top 10 Products by Revenue',
-        orientation='h',
-        color_discrete_sequence=px.colors.qualitative.Prism,
-        text='REVENUE'
-    )
-    
-    fig_top.update_traces(
-        texttemplate='$%{text:,.0f}',
-        textposition='inside'
-    )
-    
-    fig_top.update_layout(
-        yaxis={'categoryorder': 'total ascending'},
-        xaxis_title='Revenue ($)',
-        yaxis_title='',
-        showlegend=True,
-        legend_title='Category'
-    )
-    
-    st.plotly_chart(fig_top, use_container_width=True)
+        product_performance = products['product_performance']
 
-    # Top products by Profit Margin
-    top_margin_products = product_performance.nlargest(10, 'PROFIT_MARGIN')
-    
-    fig_margin = px.bar(
-        top_margin_products,
-        x='PROFIT_MARGIN',
-        y='NAME',
-        color='CATEGORY',
-        title='Top 10 Products by Profit Margin (%)',
-        orientation='h',
-        color_discrete_sequence=px.colors.qualitative.Prism,
-        text='PROFIT_MARGIN'
-    )
-    
-    fig_margin.update_traces(
-        texttemplate='%{text:.0f}%',
-        textposition='outside'
-    )
-    
-    fig_margin.update_layout(
-        yaxis={'categoryorder': 'total ascending'},
-        xaxis_title='Profit Margin (%)',
-        yaxis_title='',
-        showlegend=True,
-        legend_title='Category'
-    )
-    
-    st.plotly_chart(fig_margin, use_container_width=True)
-
-    # Brand Performance
-    brand_performance = product_sales.groupby('BRAND').agg({
-        'REVENUE': 'sum',
-        'QUANTITY': 'sum',
-        'PRODUCT_ID': 'nunique'
-    }).reset_index().sort_values('REVENUE', ascending=False).head(10)
-    
-    fig_brand = px.bar(
-        brand_performance,
-        x='BRAND',
-        y='REVENUE',
-        title='Top 10 Brands by Revenue',
-        color='BRAND',
-        text='REVENUE',
-        color_discrete_sequence=px.colors.qualitative.Prism
-    )
-    
-    fig_brand.update_traces(
-        texttemplate='$%{text:,.0f}',
-        textposition='outside'
-    )
-    
-    fig_brand.update_layout(
-        xaxis_title='Brand',
-        yaxis_title='Revenue ($)',
-        xaxis={'categoryorder': 'total descending'},
-        showlegend=False
-    )
-    
-    st.plotly_chart(fig_brand, use_container_width=True)
-
-    # Product Sales Hierarchy (Sunburst)
-    #st.markdown("### Product Sales Hierarchy")
-    
-    # Prepare data for sunburst chart
-   #product_sales_hierarchy = product_sales.groupby(['CATEGORY', 'BRAND', 'NAME'])['REVENUE'].sum().reset_index()
-    
-    # Create sunburst chart
-   # fig_sunburst = px.sunburst(
-   #     product_sales_hierarchy,
-   #     path=['CATEGORY', 'BRAND', 'NAME'], 
-   #     values='REVENUE',
-   #     title='Product Revenue Distribution',
-   #     color_discrete_sequence=px.colors.qualitative.Prism
-    #)
-    
-   # fig_sunburst.update_layout(
-   #     height=600
-   # )
+        # Top and Bottom Products
+        
+        # Top products by Revenue
+        top_products = products['top_products']
+    
+        def top_products_figure():
+            fig_top = px.bar(
+                top_products,
+                x='REVENUE',
+                y='NAME',
+                color='CATEGORY',
+                title='Top 10 Products by Revenue',
+                orientation='h',
+                color_discrete_sequence=px.colors.qualitative.Prism,
+                text='REVENUE'
+            )
     
-   # fig_sunburst.update_traces(
-   #     textinfo='label+value+percent parent',
-   #     texttemplate='%{label}<br>$%{value:,.2f}<br>%{percentParent:.1%}'
-   # )
+            fig_top.update_traces(
+                texttemplate='$%{text:,.0f}',
+                textposition='inside'
+            )
     
-   # st.plotly_chart(fig_sunburst, use_container_width=True)
+            fig_top.update_layout(
+                yaxis={'categoryorder': 'total ascending'},
+                xaxis_title='Revenue ($)',
+                yaxis_title='',
+                showlegend=True,
+                legend_title='Category'
+            )
+            return fig_top
+
+        fig_top = cached_figure('top_products', 'Product', top_products_figure)
+        st.plotly_chart(fig_top, use_container_width=True)
+
+        # Top products by Profit Margin
+        top_margin_products = products['top_margin_products']
+    
+        def top_margin_products_figure():
+            fig_margin = px.bar(
+                top_margin_products,
+                x='PROFIT_MARGIN',
+                y='NAME',
+                color='CATEGORY',
+                title='Top 10 Products by Profit Margin (%)',
+                orientation='h',
+                color_discrete_sequence=px.colors.qualitative.Prism,
+                text='PROFIT_MARGIN'
+            )
     
-    # Product Performance Table
-    st.markdown("### Detailed Product Performance")
+            fig_margin.update_traces(
+                texttemplate='%{text:.0f}%',
+                textposition='outside'
+            )
     
-    # Format the table data
-    product_table = product_performance.copy()
-    product_table['REVENUE'] = product_table['REVENUE'].apply(lambda x: f"${x:,.2f}")
-    product_table['AVG_ORDER_VALUE'] = product_table['AVG_ORDER_VALUE'].apply(lambda x: f"${x:,.2f}")
-    product_table['PRICE'] = product_table['PRICE'].apply(lambda x: f"${x:,.2f}")
-    product_table['PROFIT_MARGIN'] = product_table['PROFIT_MARGIN'].apply(lambda x: f"{x:.1f}%")
+            fig_margin.update_layout(
+                yaxis={'categoryorder': 'total ascending'},
+                xaxis_title='Profit Margin (%)',
+                yaxis_title='',
+                showlegend=True,
+                legend_title='Category'
+            )
+            return fig_margin
+
+        fig_margin = cached_figure('top_margin_products', 'Product', top_margin_products_figure)
+        st.plotly_chart(fig_margin, use_container_width=True)
+
+        # Brand Performance
+        brand_performance = products['brand_performance']
+    
+        def brand_revenue_figure():
+            fig_brand = px.bar(
+                brand_performance,
+                x='BRAND',
+                y='REVENUE',
+                title='Top 10 Brands by Revenue',
+                color='BRAND',
+                text='REVENUE',
+                color_discrete_sequence=px.colors.qualitative.Prism
+            )
     
-    st.dataframe(
-        product_table,
-        column_config={
-            'NAME': 'Product Name',
-            'CATEGORY': 'Category',
-            'BRAND': 'Brand',
-            'PRICE': 'List Price',
-            'QUANTITY': 'Units Sold',
-            'REVENUE': 'Total Revenue',
-            'ORDER_ID': 'Number of Orders',
-            'AVG_ORDER_VALUE': 'Avg Order Value',
-            'PROFIT_MARGIN': 'Profit Margin'
-        },
-        hide_index=True,
-        use_container_width=True
-    )
+            fig_brand.update_traces(
+                texttemplate='$%{text:,.0f}',
+                textposition='outside'
+            )
     
-    # PRICING TAB
+            fig_brand.update_layout(
+                xaxis_title='Brand',
+                yaxis_title='Revenue ($)',
+                xaxis={'categoryorder': 'total descending'},
+                showlegend=False
+            )
+            return fig_brand
+
+        fig_brand = cached_figure('brand_revenue', 'Product', brand_revenue_figure)
+        st.plotly_chart(fig_brand, use_container_width=True)
+
+        # Product Sales Hierarchy (Sunburst)
+        #st.markdown("### Product Sales Hierarchy")
+    
+        # Prepare data for sunburst chart
+       #product_sales_hierarchy = product_sales.groupby(['CATEGORY', 'BRAND', 'NAME'])['REVENUE'].sum().reset_index()
+    
+        # Create sunburst chart
+       # fig_sunburst = px.sunburst(
+       #     product_sales_hierarchy,
+       #     path=['CATEGORY', 'BRAND', 'NAME'], 
+       #     values='REVENUE',
+       #     title='Product Revenue Distribution',
+       #     color_discrete_sequence=px.colors.qualitative.Prism
+        #)
+    
+       # fig_sunburst.update_layout(
+       #     height=600
+       # )
+    
+       # fig_sunburst.update_traces(
+       #     textinfo='label+value+percent parent',
+       #     texttemplate='%{label}<br>$%{value:,.2f}<br>%{percentParent:.1%}'
+       # )
+    
+       # st.plotly_chart(fig_sunburst, use_container_width=True)
+    
+        # Product Performance Table
+        st.markdown("### Detailed Product Performance")
+    
+        # Search, sort and page on the server so only one page of rows is sent
+        sort_columns = {
+            'Total Revenue': 'REVENUE',
+            'Units Sold': 'QUANTITY',
+            'Number of Orders': 'ORDER_ID',
+            'Avg Order Value': 'AVG_ORDER_VALUE',
+            'Profit Margin': 'PROFIT_MARGIN',
+            'List Price': 'PRICE',
+            'Product Name': 'NAME'
+        }
+        search_col, sort_col, order_col, size_col = st.columns([3, 2, 1, 1])
+        with search_col:
+            product_search = st.text_input('Search products', placeholder='Name, category or brand')
+        with sort_col:
+            product_sort = st.selectbox('Sort by', list(sort_columns))
+        with order_col:
+            product_order = st.selectbox('Order', ['Descending', 'Ascending'])
+        with size_col:
+            page_size = st.selectbox('Rows per page', PAGE_SIZES, index=1)
+
+        product_rows = memoized(view_cache, search_and_sort, product_performance, product_search,
+                                ['NAME', 'CATEGORY', 'BRAND'], sort_columns[product_sort],
+                                product_order == 'Ascending')
+        pages = page_count(len(product_rows), page_size)
+        page = st.number_input(f'Page (of {pages:,})', min_value=1, max_value=pages, value=1, step=1)
+        product_page, first_row = page_slice(product_rows, page, page_size)
+        st.caption(f"Showing {first_row + 1 if len(product_page) else 0:,}-{first_row + len(product_page):,} "
+                   f"of {len(product_rows):,} products")
 
-    st.markdown("### Product Pricing Analysis")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # Price Distribution by Category
-        fig_price = px.box(
-            product,
-            x='CATEGORY',
-            y='PRICE',
-            title='Price Distribution by Category',
-            color='CATEGORY',
-            color_discrete_sequence=px.colors.qualitative.Prism
-        )
-        
-        fig_price.update_layout(
-            xaxis_title='Category',
-            yaxis_title='Price ($)',
-            showlegend=False
+        st.dataframe(
+            product_page,
+            column_config={
+                'NAME': 'Product Name',
+                'CATEGORY': 'Category',
+                'BRAND': 'Brand',
+                'PRICE': st.column_config.NumberColumn('List Price', format="dollar"),
+                'QUANTITY': st.column_config.NumberColumn('Units Sold', format="%d"),
+                'REVENUE': st.column_config.NumberColumn('Total Revenue', format="dollar"),
+                'ORDER_ID': st.column_config.NumberColumn('Number of Orders', format="%d"),
+                'AVG_ORDER_VALUE': st.column_config.NumberColumn('Avg Order Value', format="dollar"),
+                'PROFIT_MARGIN': st.column_config.NumberColumn('Profit Margin', format="%.1f%%")
+            },
+            hide_index=True,
+            use_container_width=True
         )
-        
-        st.plotly_chart(fig_price, use_container_width=True)
     
-    with col2:
-        # Price vs Revenue Scatterplot
-        price_revenue = product_performance.head(100)  # Top 100 products
-        
-        fig_scatter = px.scatter(
-            price_revenue,
-            x='PRICE',
-            y='REVENUE',
-            size='QUANTITY',
-            color='CATEGORY',
-            hover_name='NAME',
-            title='Price vs. Revenue (Top 100 Products)',
-            color_discrete_sequence=px.colors.qualitative.Prism
-        )
+        # PRICING TAB
+
+        st.markdown("### Product Pricing Analysis")
+    
+        col1, col2 = st.columns(2)
+    
+        with col1:
+            # Price Distribution by Category
+            def price_distribution_figure():
+                if use_sketch(len(product)):
+                    # Quartiles from per-category price sketches instead of shipping every price
+                    price_sketches = registry.derived(
+                        "price_sketches", lambda: sketches_by(registry.get("PRODUCT"), 'CATEGORY', 'PRICE'))
+                    price_stats = price_box_stats(price_sketches, product['CATEGORY'].dropna().unique())
+                    colors = px.colors.qualitative.Prism
+                    fig_price = go.Figure([
+                        go.Box(
+                            x=[row.CATEGORY],
+                            q1=[row.q1],
+                            median=[row.median],
+                            q3=[row.q3],
+                            mean=[row.mean],
+                            lowerfence=[row.lowerfence],
+                            upperfence=[row.upperfence],
+                            name=row.CATEGORY,
+                            marker_color=colors[i % len(colors)]
+                        )
+                        for i, row in enumerate(price_stats.itertuples())
+                    ])
+                    # Sketched quartiles and fences are estimates; say so on the chart
+                    fig_price.update_layout(title=dict(text='Price Distribution by Category',
+                                                       subtitle=dict(text=approximation_note())))
+                else:
+                    fig_price = px.box(
+                        product,
+                        x='CATEGORY',
+                        y='PRICE',
+                        title='Price Distribution by Category',
+                        color='CATEGORY',
+                        color_discrete_sequence=px.colors.qualitative.Prism
+                    )
         
-        fig_scatter.update_layout(
-            xaxis_title='Price ($)',
-            yaxis_title='Revenue ($)',
-            showlegend=True
-        )
+                fig_price.update_layout(
+                    xaxis_title='Category',
+                    yaxis_title='Price ($)',
+                    showlegend=False
+                )
+                return fig_price
+
+            fig_price = cached_figure('price_distribution', 'Product', price_distribution_figure)
+            st.plotly_chart(fig_price, use_container_width=True)
+    
+        with col2:
+            # Price vs Revenue Scatterplot of every product sold, drawn with WebGL for large catalogs
+            def price_vs_revenue_figure():
+                fig_scatter = px.scatter(
+                    product_performance,
+                    x='PRICE',
+                    y='REVENUE',
+                    size='QUANTITY',
+                    color='CATEGORY',
+                    hover_name='NAME',
+                    title='Price vs. Revenue by Product',
+                    color_discrete_sequence=px.colors.qualitative.Prism,
+                    render_mode=px_render_mode(len(product_performance))
+                )
         
-        st.plotly_chart(fig_scatter, use_container_width=True)
+                fig_scatter.update_layout(
+                    xaxis_title='Price ($)',
+                    yaxis_title='Revenue ($)',
+                    showlegend=True
+                )
+                return fig_scatter
+
+            fig_scatter = cached_figure('price_vs_revenue', 'Product', price_vs_revenue_figure)
+            st.plotly_chart(fig_scatter, use_container_width=True)
 
 # Customer Analysis tab
-with tabs[3]:
-
-    customer_orders = order_fact.merge(customer, on='CUSTOMER_ID', how='left')
-   # Calculate customer metrics
-    customer_metrics = customer_orders.groupby('CUSTOMER_ID').agg({
-        'ORDER_ID': 'count',
-        'TOTAL_AMOUNT': 'sum',
-        'ORDER_DATE': ['min', 'max']
-    }).reset_index()
-    
-    customer_metrics.columns = ['CUSTOMER_ID', 'ORDER_COUNT', 'TOTAL_SPENT', 'FIRST_ORDER', 'LAST_ORDER']
-    
-    # Calculate days since last order and customer lifetime
-    current_date = pd.Timestamp.now()
-    customer_metrics['DAYS_SINCE_LAST_ORDER'] = (current_date - pd.to_datetime(customer_metrics['LAST_ORDER'])).dt.days
-    customer_metrics['CUSTOMER_LIFETIME_DAYS'] = (pd.to_datetime(customer_metrics['LAST_ORDER']) - pd.to_datetime(customer_metrics['FIRST_ORDER'])).dt.days
-    
-    # Calculate average order value
-    customer_metrics['AVG_ORDER_VALUE'] = customer_metrics['TOTAL_SPENT'] / customer_metrics['ORDER_COUNT']
-    
-    # Calculate RFM scores
-    r_labels = range(4, 0, -1)
-    f_labels = range(1, 5)
-    
-    # Calculate recency score (more recent = higher score)
-    r_quartiles = pd.qcut(customer_metrics['DAYS_SINCE_LAST_ORDER'], q=4, labels=r_labels)
-    
-    # For frequency and monetary, handle cases with fewer unique values
-    def get_quartile_labels(series, labels):
-        """Create quartile labels handling cases with duplicate values and skewed data"""
-        unique_values = series.unique()
-        n_unique = len(unique_values)
-        
-        if n_unique == 1:
-            # If only one unique value, return the lowest label for all
-            return pd.Series(labels[0], index=series.index)
-        elif n_unique < 4:
-            # For very few unique values, create bins based on unique values
-            bins = np.sort(unique_values)
-            # Use as many labels as we have intervals (len(bins) - 1)
-            return pd.cut(series, bins=bins, labels=labels[:len(bins)-1], include_lowest=True)
-        else:
-            try:
-                # Try to create quartiles with unique bin edges
-                percentiles = np.percentile(series.unique(), [0, 25, 50, 75, 100])
-                # Remove duplicate bin edges if any
-                percentiles = np.unique(percentiles)
-                if len(percentiles) < 2:
-                    # If we still can't create valid bins, return lowest label
-                    return pd.Series(labels[0], index=series.index)
-                # Adjust labels to match number of intervals
-                n_intervals = len(percentiles) - 1
-                return pd.cut(series, bins=percentiles, labels=labels[:n_intervals], include_lowest=True)
-            except Exception:
-                # Fallback: assign lowest label if all else fails
-                return pd.Series(labels[0], index=series.index)
-    
-    # Calculate frequency and monetary scores
-    f_quartiles = get_quartile_labels(customer_metrics['ORDER_COUNT'], f_labels)
-    m_quartiles = get_quartile_labels(customer_metrics['TOTAL_SPENT'], f_labels)
-    
-    # Assign scores
-    customer_metrics['R'] = r_quartiles
-    customer_metrics['F'] = f_quartiles
-    customer_metrics['M'] = m_quartiles
-    
-    # Fill any NaN values with the lowest score (1)
-    customer_metrics[['R', 'F', 'M']] = customer_metrics[['R', 'F', 'M']].fillna(1)
-    
-    # Calculate RFM Score and Segment
-    customer_metrics['RFM_SCORE'] = customer_metrics['R'].astype(str) + customer_metrics['F'].astype(str) + customer_metrics['M'].astype(str)
-    
-    def get_segment(rfm_score):
-        score = int(rfm_score[0]) + int(rfm_score[1]) + int(rfm_score[2])
-        if score >= 11:
-            return 'Champions'
-        elif score >= 9:
-            return 'Loyal Customers'
-        elif score >= 7:
-            return 'Potential Loyalists'
-        elif score >= 5:
-            return 'At Risk'
+if 'Customer Analysis' in sections:
+    with sections['Customer Analysis'], timed('Customer'):
+
+        # Per-customer totals of a date range come from the persistent aggregate store instead of the
+        # order history; the store keeps no other order dimensions, so further filters group the filtered orders
+        last_order_counts = None
+        if channel_ids is None and selected_payment_method == 'All' and selected_order_status == 'All':
+            customer_store = get_customer_store(registry.version(["ORDER_FACT"]))
+            customer_totals = cached_view('customer_totals', ['ORDER_FACT'],
+                                          lambda: customer_store.customer_metrics(start_date, end_date))
+            # Sketched recency quartiles are merged from the customers per last-order day (see src/rfm.py)
+            if quantile_mode() == "sketch":
+                last_order_counts = customer_store.last_order_counts(customer_totals)
         else:
-            return 'Lost Customers'
-    
-    customer_metrics['SEGMENT'] = customer_metrics['RFM_SCORE'].apply(get_segment)
-    
-    # Calculate customer type distribution
-    type_dist = customer_metrics.merge(
-        customer[['CUSTOMER_ID', 'CUSTOMER_TYPE']], 
-        on='CUSTOMER_ID'
-    )['CUSTOMER_TYPE'].value_counts().reset_index()
-    type_dist.columns = ['Type', 'Count']
-    
-    # Display key metrics
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        st.markdown(create_metric_container(
-            "Total Customers",
-            f"{len(customer_metrics):,}"
-        ), unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown(create_metric_container(
-            "Avg Customer Value",
-            f"${customer_metrics['TOTAL_SPENT'].mean():,.2f}",
-            SUCCESS_COLOR
-        ), unsafe_allow_html=True)
-    
-    with col3:
-        st.markdown(create_metric_container(
-            "Avg Orders per Customer",
-            f"{customer_metrics['ORDER_COUNT'].mean():.1f}",
-            SECONDARY_COLOR
-        ), unsafe_allow_html=True)
+            customer_totals = cached_view('customer_totals', ['ORDER_FACT'],
+                                          lambda: orders_customer_metrics(order_fact))
+
+        # Recency is counted in whole days so the memoized result stays valid all day
+        as_of = pd.Timestamp.now().normalize()
+        customers = memoized(view_cache, customer_analysis, customer_totals, customer, as_of, last_order_counts)
+        customer_metrics = customers['customer_metrics']
+    
+        # Display key metrics
+        col1, col2, col3 = st.columns(3)
+    
+        with col1:
+            st.markdown(create_metric_container(
+                "Total Customers",
+                f"{len(customer_metrics):,}"
+            ), unsafe_allow_html=True)
+    
+        with col2:
+            st.markdown(create_metric_container(
+                "Avg Customer Value",
+                f"${customer_metrics['TOTAL_SPENT'].mean():,.2f}",
+                SUCCESS_COLOR
+            ), unsafe_allow_html=True)
+    
+        with col3:
+            st.markdown(create_metric_container(
+                "Avg Orders per Customer",
+                f"{customer_metrics['ORDER_COUNT'].mean():.1f}",
+                SECONDARY_COLOR
+            ), unsafe_allow_html=True)
         
-  #  with col4:
-   #     st.markdown(create_metric_container(
-    #        "Most Common Type",
-     #       f"{type_dist.iloc[0]['Type']}",
-      #      PRIMARY_COLOR
-       # ), unsafe_allow_html=True)
+      #  with col4:
+       #     st.markdown(create_metric_container(
+        #        "Most Common Type",
+         #       f"{type_dist.iloc[0]['Type']}",
+          #      PRIMARY_COLOR
+           # ), unsafe_allow_html=True)
         
-    # Customer Segmentation Analysis
-    col1, col2 = st.columns(2)
-    with col1:
-        # Segment Distribution
-        segment_dist = customer_metrics['SEGMENT'].value_counts().reset_index()
-        segment_dist.columns = ['Segment', 'Count']
-        segment_dist['Percentage'] = (segment_dist['Count'] / len(customer_metrics) * 100).round(1)
+        # Customer Segmentation Analysis
+        col1, col2 = st.columns(2)
+        with col1:
+            # Segment Distribution
+            segment_dist = customers['segment_dist']
         
-        # Define color mapping for segments
-        segment_colors = {
-            'Champions': '#2E7D32',  # Dark green
-            'Loyal Customers': '#73af48',  # Green
-            'Potential Loyalists': '#edad07',  # Amber
-            'At Risk': '#e27c03',  # Orange
-            'Lost Customers': '#cc503e'  # Red
-        }
+            # Define color mapping for segments
+            segment_colors = {
+                'Champions': '#2E7D32',  # Dark green
+                'Loyal Customers': '#73af48',  # Green
+                'Potential Loyalists': '#edad07',  # Amber
+                'At Risk': '#e27c03',  # Orange
+                'Lost Customers': '#cc503e'  # Red
+            }
         
-        fig_segment = px.bar(
-            segment_dist,
-            x='Segment',
-            y='Count',
-            text=segment_dist['Percentage'].apply(lambda x: f'{x}%'),
-            title='Customer Segment Distribution',
-            color='Segment',
-            color_discrete_map=segment_colors,
-            hover_data={
-                'Count': True,
-                'Percentage': ':.1f',
-                'Segment': False
-            },
-            custom_data=['Count', 'Percentage']
-        )
+            def customer_segments_figure():
+                fig_segment = px.bar(
+                    segment_dist,
+                    x='Segment',
+                    y='Count',
+                    text=segment_dist['Percentage'].apply(lambda x: f'{x}%'),
+                    title='Customer Segment Distribution',
+                    color='Segment',
+                    color_discrete_map=segment_colors,
+                    hover_data={
+                        'Count': True,
+                        'Percentage': ':.1f',
+                        'Segment': False
+                    },
+                    custom_data=['Count', 'Percentage']
+                )
             
-        fig_segment.update_layout(
-            xaxis_title='',
-            yaxis_title='Number of Customers',
-            showlegend=False
-        )
-
-        fig_segment.update_traces(
-            hovertemplate='Count: %{customdata[0]}<br>Percentage: %{customdata[1]:.1f}%<extra></extra>'
-        )
+                fig_segment.update_layout(
+                    xaxis_title='',
+                    yaxis_title='Number of Customers',
+                    showlegend=False
+                )
+
+                fig_segment.update_traces(
+                    hovertemplate='Count: %{customdata[0]}<br>Percentage: %{customdata[1]:.1f}%<extra></extra>'
+                )
+                return fig_segment
+
+            fig_segment = cached_figure('customer_segments', 'Customer', customer_segments_figure, as_of)
+            st.plotly_chart(fig_segment, use_container_width=True)
+        with col2:
+            # Average metrics by segment
+            segment_metrics = customers['segment_metrics']
+    
+            def segment_metrics_figure():
+                fig_metrics = go.Figure()
         
-        st.plotly_chart(fig_segment, use_container_width=True)
-    with col2:
-        # Average metrics by segment
-        segment_metrics = customer_metrics.groupby('SEGMENT').agg({
-            'TOTAL_SPENT': 'mean',
-            'ORDER_COUNT': 'mean',
-            'AVG_ORDER_VALUE': 'mean'
-    }).reset_index()
-    
-        fig_metrics = go.Figure()
-        
-        # Add bars for each metric
-        fig_metrics.add_trace(go.Bar(
-            name='Avg Total Spent',
-            x=segment_metrics['SEGMENT'],
-            y=segment_metrics['TOTAL_SPENT'],
-            marker_color='#1f6796',  # Darker blue
-            hovertemplate='$%{y:,.2f}<extra></extra>'
-        ))
+                # Add bars for each metric
+                fig_metrics.add_trace(go.Bar(
+                    name='Avg Total Spent',
+                    x=segment_metrics['SEGMENT'],
+                    y=segment_metrics['TOTAL_SPENT'],
+                    marker_color='#1f6796',  # Darker blue
+                    hovertemplate='$%{y:,.2f}<extra></extra>'
+                ))
         
-        fig_metrics.add_trace(go.Bar(
-            name='Avg Order Value',
-            x=segment_metrics['SEGMENT'],
-            y=segment_metrics['AVG_ORDER_VALUE'],
-            marker_color='#38a5a5',  # Lighter blue
-            hovertemplate='$%{y:,.2f}<extra></extra>'
-        ))
-        fig_metrics.update_layout(
-            title='Average Metrics by Segment',
-            barmode='group',
-            yaxis_title='Amount ($)',
-            showlegend=True,
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
+                fig_metrics.add_trace(go.Bar(
+                    name='Avg Order Value',
+                    x=segment_metrics['SEGMENT'],
+                    y=segment_metrics['AVG_ORDER_VALUE'],
+                    marker_color='#38a5a5',  # Lighter blue
+                    hovertemplate='$%{y:,.2f}<extra></extra>'
+                ))
+                fig_metrics.update_layout(
+                    title='Average Metrics by Segment',
+                    barmode='group',
+                    yaxis_title='Amount ($)',
+                    showlegend=True,
+                    legend=dict(
+                        orientation="h",
+                        yanchor="bottom",
+                        y=1.02,
+                        xanchor="right",
+                        x=1
+                    )
+                )
+                return fig_metrics
+
+            fig_metrics = cached_figure('segment_metrics', 'Customer', segment_metrics_figure, as_of)
+            st.plotly_chart(fig_metrics, use_container_width=True)
+        # Order Frequency Distribution
+        def order_frequency_figure():
+            fig_frequency = px.histogram(
+                customer_metrics,
+                x='ORDER_COUNT',
+                title='Order Frequency Distribution',
+                color_discrete_sequence=[px.colors.qualitative.Prism[0]], # Using first Prism color
+                labels={'ORDER_COUNT': 'Number of Orders'},
+                text_auto='.0f',  # Format numbers without k suffix
+                hover_data=None  # Disable hover
             )
-        )
-        
-        st.plotly_chart(fig_metrics, use_container_width=True)
-    # Order Frequency Distribution
-    fig_frequency = px.histogram(
-        customer_metrics,
-        x='ORDER_COUNT',
-        title='Order Frequency Distribution',
-        color_discrete_sequence=[px.colors.qualitative.Prism[0]], # Using first Prism color
-        labels={'ORDER_COUNT': 'Number of Orders'},
-        text_auto='.0f',  # Format numbers without k suffix
-        hover_data=None  # Disable hover
-    )
-    
-    fig_frequency.update_layout(
-        xaxis_title='Number of Orders',
-        yaxis_title='Number of Customers',
-        showlegend=False,
-        bargap=0.1,
-        margin=dict(t=50),  # Add top margin to prevent text cutoff
-        hovermode=False  # Disable hover mode
-    )
-    
-    fig_frequency.update_traces(
-        textposition='outside',  # Place numbers above bars
-        textangle=0,  # Ensure text is horizontal
-        hoverinfo='skip'  # Disable hover info
-    )
     
-    st.plotly_chart(fig_frequency, use_container_width=True)
-    # Top Customers Table
-    st.markdown("### Top Customers")
-    
-    top_customers = customer_metrics.nlargest(10, 'TOTAL_SPENT')
-    top_customers = top_customers.merge(customer[['CUSTOMER_ID', 'NAME', 'PRIMARY_EMAIL']], on='CUSTOMER_ID')
-    
-    st.dataframe(
-        top_customers[[
-            'NAME', 'PRIMARY_EMAIL', 'TOTAL_SPENT', 'ORDER_COUNT',
-            'AVG_ORDER_VALUE', 'SEGMENT', 'LAST_ORDER'
-        ]],
-        column_config={
-            'NAME': 'Customer Name',
-            'PRIMARY_EMAIL': 'Email',
-            'TOTAL_SPENT': st.column_config.NumberColumn('Total Spent', format="$%.2f"),
-            'ORDER_COUNT': 'Number of Orders',
-            'AVG_ORDER_VALUE': st.column_config.NumberColumn('Avg Order Value', format="$%.2f"),
-            'SEGMENT': 'Segment',
-            'LAST_ORDER': 'Last Order Date'
-        },
-        hide_index=True,
-        use_container_width=True
-    )
-
-    # Average metrics by customer type
-    type_metrics = customer_metrics.merge(
-        customer[['CUSTOMER_ID', 'CUSTOMER_TYPE']], 
-        on='CUSTOMER_ID'
-    ).groupby('CUSTOMER_TYPE').agg({
-        'TOTAL_SPENT': 'mean',
-        'ORDER_COUNT': 'mean',
-        'AVG_ORDER_VALUE': 'mean'
-    }).reset_index()
-    
-    fig_type_metrics = go.Figure()
-    
-    fig_type_metrics.add_trace(go.Bar(
-        name='Avg Total Spent',
-        x=type_metrics['CUSTOMER_TYPE'],
-        y=type_metrics['TOTAL_SPENT'],
-        marker_color='#1f6796',
-        hovertemplate='$%{y:.2f}<extra></extra>'
-    ))
-    
-    fig_type_metrics.add_trace(go.Bar(
-        name='Avg Order Value',
-        x=type_metrics['CUSTOMER_TYPE'],
-        y=type_metrics['AVG_ORDER_VALUE'],
-        marker_color='#38a5a5',
-        hovertemplate='$%{y:.2f}<extra></extra>'
-    ))
-    
-    fig_type_metrics.update_layout(
-        title='Average Metrics by Customer Type',
-        barmode='group',
-        yaxis_title='Amount ($)',
-        showlegend=True,
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1
-        )
-    )
+            fig_frequency.update_layout(
+                xaxis_title='Number of Orders',
+                yaxis_title='Number of Customers',
+                showlegend=False,
+                bargap=0.1,
+                margin=dict(t=50),  # Add top margin to prevent text cutoff
+                hovermode=False  # Disable hover mode
+            )
     
-    st.plotly_chart(fig_type_metrics, use_container_width=True)
+            fig_frequency.update_traces(
+                textposition='outside',  # Place numbers above bars
+                textangle=0,  # Ensure text is horizontal
+                hoverinfo='skip'  # Disable hover info
+            )
+            return fig_frequency
 
-# Digital Analysis tab
-with tabs[4]:
-    # Calculate key metrics
-    total_events = len(digital_event)
-
-    total_visitors = page_performance['UNIQUE_VISITORS'].sum()
-    avg_conversion = page_performance['CONVERSION_RATE'].mean() * 100
-    avg_bounce = page_performance['BOUNCE_RATE'].mean() * 100
-    
-    # Display key metrics
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        st.markdown(create_metric_container(
-            "Total Events",
-            f"{total_events:,}"
-        ), unsafe_allow_html=True)
-    with col2:
-        st.markdown(create_metric_container(
-            "Total Visitors",
-            f"{total_visitors:,}",
-            SUCCESS_COLOR
-        ), unsafe_allow_html=True)
-    with col3:
-        st.markdown(create_metric_container(
-            "Avg Conversion Rate",
-            f"{avg_conversion:.1f}%",
-            SECONDARY_COLOR
-        ), unsafe_allow_html=True)
-    with col4:
-        st.markdown(create_metric_container(
-            "Avg Bounce Rate",
-            f"{avg_bounce:.1f}%",
-            WARNING_COLOR if avg_bounce > 50 else SUCCESS_COLOR
-        ), unsafe_allow_html=True)
-    
-    # Event Analysis Section
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # Event Type Distribution
-        event_counts = digital_event['EVENT_TYPE'].value_counts().reset_index()
-        event_counts.columns = ['EVENT_TYPE', 'COUNT']
-        
-        # Create color map using Prism colors
-        event_types = event_counts['EVENT_TYPE'].unique()
-        color_map = dict(zip(event_types, px.colors.qualitative.Prism[:len(event_types)]))
-        
-        fig_events = px.bar(
-            event_counts,
-            x='EVENT_TYPE',
-            y='COUNT',
-            title='Digital Event Distribution',
-            color='EVENT_TYPE',
-            color_discrete_map=color_map,
-            text='COUNT'
-        )
-        
-        fig_events.update_traces(
-            texttemplate='%{text:,}',
-            textposition='outside'
-        )
-        
-        fig_events.update_layout(
-            xaxis_title='Event Type',
-            yaxis_title='Number of Events',
-            showlegend=False
-        )
-        
-        st.plotly_chart(fig_events, use_container_width=True)
+        fig_frequency = cached_figure('order_frequency', 'Customer', order_frequency_figure, as_of)
+        st.plotly_chart(fig_frequency, use_container_width=True)
+        # Top Customers Table
+        st.markdown("### Top Customers")
     
-    with col2:
-        # Device Type Distribution
-        device_counts = digital_event['DEVICE_TYPE'].value_counts().reset_index()
-        device_counts.columns = ['DEVICE_TYPE', 'COUNT']
-        device_counts['PERCENTAGE'] = (device_counts['COUNT'] / device_counts['COUNT'].sum() * 100).round(1)
-        
-        # Create color map using Prism colors
-        device_types = device_counts['DEVICE_TYPE'].unique()
-        color_map = dict(zip(device_types, px.colors.qualitative.Prism[:len(device_types)]))
-        
-        fig_devices = px.pie(
-            device_counts,
-            values='COUNT', 
-            names='DEVICE_TYPE',
-            title='Device Type Distribution',
-            color='DEVICE_TYPE',
-            hover_data=['PERCENTAGE'],
-            color_discrete_map=color_map
-        )
-        
-        fig_devices.update_traces(
-            textinfo='percent+label',
-            textposition='inside'
-        )
-        st.plotly_chart(fig_devices, use_container_width=True)
-    
-    # Traffic Analysis Section
-    st.markdown("### Traffic Analysis")
-    
-    # Prepare monthly data
-    page_performance['DATE'] = pd.to_datetime(page_performance['DATE'])
-    monthly_traffic = page_performance.groupby(pd.Grouper(key='DATE', freq='W')).agg({
-        'VIEWS': 'sum',
-        'UNIQUE_VISITORS': 'sum',
-        'BOUNCE_RATE': 'mean',
-        'CONVERSION_RATE': 'mean'
-    }).reset_index()
-    
-    # Traffic Trends
-    fig_traffic = go.Figure()
-    
-    fig_traffic.add_trace(go.Scatter(
-        x=monthly_traffic['DATE'],
-        y=monthly_traffic['VIEWS'],
-        name='Total Views',
-        mode='lines+markers',
-        line=dict(color=PRIMARY_COLOR, width=2)
-    ))
-    
-    fig_traffic.add_trace(go.Scatter(
-        x=monthly_traffic['DATE'],
-        y=monthly_traffic['UNIQUE_VISITORS'],
-        name='Unique Visitors',
-        mode='lines+markers',
-        line=dict(color=SECONDARY_COLOR, width=2)
-    ))
-    
-    fig_traffic.update_layout(
-        title='Weekly Website Traffic',
-        xaxis_title='Week',
-        yaxis_title='Count',
-        hovermode='x unified',
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1
-        )
-    )
+        top_customers = customers['top_customers']
     
-    st.plotly_chart(fig_traffic, use_container_width=True)
-    
-    # Conversion and Bounce Rate Trends
-    fig_rates = go.Figure()
-    
-    fig_rates.add_trace(go.Scatter(
-        x=monthly_traffic['DATE'],
-        y=monthly_traffic['CONVERSION_RATE'] * 100,
-        name='Conversion Rate',
-        mode='lines+markers',
-        line=dict(color=SUCCESS_COLOR, width=2)
-    ))
-    
-    fig_rates.add_trace(go.Scatter(
-        x=monthly_traffic['DATE'],
-        y=monthly_traffic['BOUNCE_RATE'] * 100,
-        name='Bounce Rate',
-        mode='lines+markers',
-        line=dict(color=DANGER_COLOR, width=2)
-    ))
-    
-    fig_rates.update_layout(
-        title='Conversion and Bounce Rate Trends',
-        xaxis_title='Week',
-        yaxis_title='Rate (%)',
-        hovermode='x unified',
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1
+        st.dataframe(
+            top_customers[[
+                'NAME', 'PRIMARY_EMAIL', 'TOTAL_SPENT', 'ORDER_COUNT',
+                'AVG_ORDER_VALUE', 'SEGMENT', 'LAST_ORDER'
+            ]],
+            column_config={
+                'NAME': 'Customer Name',
+                'PRIMARY_EMAIL': 'Email',
+                'TOTAL_SPENT': st.column_config.NumberColumn('Total Spent', format="$%.2f"),
+                'ORDER_COUNT': 'Number of Orders',
+                'AVG_ORDER_VALUE': st.column_config.NumberColumn('Avg Order Value', format="$%.2f"),
+                'SEGMENT': 'Segment',
+                'LAST_ORDER': 'Last Order Date'
+            },
+            hide_index=True,
+            use_container_width=True
         )
-    )
-    
-    st.plotly_chart(fig_rates, use_container_width=True)
-    funnel_events = ['PAGE_VIEW', 'PRODUCT_VIEW', 'ADD_TO_CART', 'CHECKOUT_START', 'CHECKOUT_COMPLETE']
-    funnel_counts = digital_event[digital_event['EVENT_TYPE'].isin(funnel_events)]['EVENT_TYPE'].value_counts()
-    funnel_data = pd.DataFrame({
-        'EVENT_TYPE': funnel_events,
-        'COUNT': [funnel_counts.get(event, 0) for event in funnel_events]
-    })
-    
-    fig_funnel = go.Figure(go.Funnel(
-        y=funnel_data['EVENT_TYPE'],
-        x=funnel_data['COUNT'],
-        textinfo="value+percent initial",
-        texttemplate="%{value:.2s}<br>(%{percentInitial})"
-    ))
-    
-    fig_funnel.update_layout(
-        title='Customer Journey Funnel',
-        showlegend=False
-    )
-    
-    st.plotly_chart(fig_funnel, use_container_width=True)
 
-# Inventory Analysis tab
-with tabs[5]:
-
-    # Function to categorize inventory levels
-    def get_inventory_status(qty):
-        if qty <= 5:
-            return "Critical (0-5)"
-        elif qty <= 20:
-            return "Low (6-20)"
-        elif qty <= 50:
-            return "Medium (21-50)"
-        else:
-            return "High (50+)"
-    
-    # Add inventory status to product variant data
-    product_variant['INVENTORY_STATUS'] = product_variant['INVENTORY_QTY'].apply(get_inventory_status)
-    
-    # Merge with product data for category information
-    inventory_analysis = product_variant.merge(product[['PRODUCT_ID', 'CATEGORY', 'BRAND', 'NAME']], on='PRODUCT_ID')
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # Inventory Status Distribution
-        inventory_status_count = inventory_analysis.groupby('INVENTORY_STATUS').size().reset_index(name='COUNT')
-        
-        # Custom order for the status
-        status_order = ["Critical (0-5)", "Low (6-20)", "Medium (21-50)", "High (50+)"]
-        inventory_status_count['INVENTORY_STATUS'] = pd.Categorical(
-            inventory_status_count['INVENTORY_STATUS'], 
-            categories=status_order, 
-            ordered=True
-        )
-        inventory_status_count = inventory_status_count.sort_values('INVENTORY_STATUS')
-        
-        # Define colors for each status
-        status_colors = {
-            "Critical (0-5)": DANGER_COLOR,
-            "Low (6-20)": WARNING_COLOR,
-            "Medium (21-50)": SECONDARY_COLOR,
-            "High (50+)": SUCCESS_COLOR
-        }
-        
-        # Extract the colors in the correct order
-        color_sequence = [status_colors[status] for status in inventory_status_count['INVENTORY_STATUS']]
-        
-        fig_status = px.pie(
-            inventory_status_count,
-            values='COUNT',
-            names='INVENTORY_STATUS',
-            title='Inventory Status Distribution',
-            color='INVENTORY_STATUS',
-            color_discrete_map=status_colors
+        # Average metrics by customer type
+        type_metrics = customers['type_metrics']
+    
+        def customer_type_metrics_figure():
+            fig_type_metrics = go.Figure()
+    
+            fig_type_metrics.add_trace(go.Bar(
+                name='Avg Total Spent',
+                x=type_metrics['CUSTOMER_TYPE'],
+                y=type_metrics['TOTAL_SPENT'],
+                marker_color='#1f6796',
+                hovertemplate='$%{y:.2f}<extra></extra>'
+            ))
+    
+            fig_type_metrics.add_trace(go.Bar(
+                name='Avg Order Value',
+                x=type_metrics['CUSTOMER_TYPE'],
+                y=type_metrics['AVG_ORDER_VALUE'],
+                marker_color='#38a5a5',
+                hovertemplate='$%{y:.2f}<extra></extra>'
+            ))
+    
+            fig_type_metrics.update_layout(
+                title='Average Metrics by Customer Type',
+                barmode='group',
+                yaxis_title='Amount ($)',
+                showlegend=True,
+                legend=dict(
+                    orientation="h",
+                    yanchor="bottom",
+                    y=1.02,
+                    xanchor="right",
+                    x=1
+                )
+            )
+            return fig_type_metrics
+
+        fig_type_metrics = cached_figure('customer_type_metrics', 'Customer', customer_type_metrics_figure, as_of)
+        st.plotly_chart(fig_type_metrics, use_container_width=True)
+
+# Digital Analysis tab
+if 'Digital Analysis' in sections:
+    with sections['Digital Analysis'], timed('Digital'):
+        # Traffic is read from rollups built once per loaded PAGE_PERFORMANCE (see src/traffic.py),
+        # at a resolution that suits the length of the date range
+        traffic_rollups = get_traffic_rollups()
+        traffic_resolution = pick_resolution(start_date, end_date)
+        traffic = memoized(view_cache, traffic_series, traffic_rollups, traffic_resolution, start_date, end_date)
+
+        # Digital events are counted straight from the partitions overlapping the date range
+        events_version = registry.version(["DIGITAL_EVENT"])
+        event_store = get_event_store(events_version)
+        digital = memoized(
+            view_cache,
+            digital_analysis,
+            traffic,
+            event_store.value_counts('EVENT_TYPE', start_date, end_date),
+            event_store.value_counts('DEVICE_TYPE', start_date, end_date)
         )
+
+        # Calculate key metrics
+        total_events = event_store.count(start_date, end_date)
+        total_visitors = digital['total_visitors']
+        avg_conversion = digital['avg_conversion']
+        avg_bounce = digital['avg_bounce']
+    
+        # Display key metrics
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.markdown(create_metric_container(
+                "Total Events",
+                f"{total_events:,}"
+            ), unsafe_allow_html=True)
+        with col2:
+            st.markdown(create_metric_container(
+                "Total Visitors",
+                f"{total_visitors:,}",
+                SUCCESS_COLOR
+            ), unsafe_allow_html=True)
+        with col3:
+            st.markdown(create_metric_container(
+                "Avg Conversion Rate",
+                f"{avg_conversion:.1f}%",
+                SECONDARY_COLOR
+            ), unsafe_allow_html=True)
+        with col4:
+            st.markdown(create_metric_container(
+                "Avg Bounce Rate",
+                f"{avg_bounce:.1f}%",
+                WARNING_COLOR if avg_bounce > 50 else SUCCESS_COLOR
+            ), unsafe_allow_html=True)
+    
+        # Event Analysis Section
+        col1, col2 = st.columns(2)
+    
+        with col1:
+            # Event Type Distribution
+            event_counts = digital['event_counts']
         
-        fig_status.update_traces(textposition='inside', textinfo='percent+label')
-        st.plotly_chart(fig_status, use_container_width=True)
-    
-    with col2:
-        # Inventory by Category
-        inventory_by_category = inventory_analysis.groupby('CATEGORY')['INVENTORY_QTY'].agg(['sum', 'mean']).reset_index()
-        inventory_by_category.columns = ['CATEGORY', 'TOTAL_INVENTORY', 'AVG_INVENTORY']
-        
-        # Get unique categories and assign Prism colors
-        categories = inventory_by_category['CATEGORY'].unique()
-        color_map = dict(zip(categories, px.colors.qualitative.Prism[:len(categories)]))
+            def digital_events_figure():
+                # Create color map using Prism colors
+                event_types = event_counts['EVENT_TYPE'].unique()
+                color_map = dict(zip(event_types, px.colors.qualitative.Prism[:len(event_types)]))
         
-        fig_inv_cat = px.bar(
-            inventory_by_category,
-            x='CATEGORY',
-            y='TOTAL_INVENTORY',
-            title='Total Inventory by Category',
-            color='CATEGORY',
-            text='TOTAL_INVENTORY',
-            color_discrete_map=color_map
-        )
+                fig_events = px.bar(
+                    event_counts,
+                    x='EVENT_TYPE',
+                    y='COUNT',
+                    title='Digital Event Distribution',
+                    color='EVENT_TYPE',
+                    color_discrete_map=color_map,
+                    text='COUNT'
+                )
         
-        fig_inv_cat.update_traces(
-            texttemplate='%{text:,}',
-            textposition='outside'
-        )
-        fig_inv_cat.update_layout(
-            xaxis_title='Category',
-            yaxis_title='Total Inventory Quantity',
-            showlegend=False
-        )
+                fig_events.update_traces(
+                    texttemplate='%{text:,}',
+                    textposition='outside'
+                )
         
-        st.plotly_chart(fig_inv_cat, use_container_width=True)
-    
-    # Out of Stock and Critical Inventory Products
-    st.markdown("### Critical Inventory Products")
-    
-    critical_inventory = inventory_analysis[inventory_analysis['INVENTORY_STATUS'] == "Critical (0-5)"].sort_values('INVENTORY_QTY')
-    
-    if len(critical_inventory) > 0:
-        # Find sales velocity for critical inventory products
-        product_velocity = product_sales.groupby('PRODUCT_ID')['QUANTITY'].sum().reset_index()
-        product_velocity.columns = ['PRODUCT_ID', 'TOTAL_SOLD']
+                fig_events.update_layout(
+                    xaxis_title='Event Type',
+                    yaxis_title='Number of Events',
+                    showlegend=False
+                )
+                return fig_events
+
+            fig_events = cached_figure('digital_events', 'Digital', digital_events_figure, events_version)
+            st.plotly_chart(fig_events, use_container_width=True)
+    
+        with col2:
+            # Device Type Distribution
+            device_counts = digital['device_counts']
         
-        # Merge with critical inventory
-        critical_inventory = critical_inventory.merge(product_velocity, on='PRODUCT_ID', how='left')
-        critical_inventory['TOTAL_SOLD'] = critical_inventory['TOTAL_SOLD'].fillna(0)
+            def device_types_figure():
+                # Create color map using Prism colors
+                device_types = device_counts['DEVICE_TYPE'].unique()
+                color_map = dict(zip(device_types, px.colors.qualitative.Prism[:len(device_types)]))
         
-        # Format for display
-        critical_table = critical_inventory[['NAME', 'VARIANT_NAME', 'CATEGORY', 'BRAND', 'INVENTORY_QTY', 'TOTAL_SOLD']].copy()
+                fig_devices = px.pie(
+                    device_counts,
+                    values='COUNT', 
+                    names='DEVICE_TYPE',
+                    title='Device Type Distribution',
+                    color='DEVICE_TYPE',
+                    hover_data=['PERCENTAGE'],
+                    color_discrete_map=color_map
+                )
         
+                fig_devices.update_traces(
+                    textinfo='percent+label',
+                    textposition='inside'
+                )
+                return fig_devices
+
+            fig_devices = cached_figure('device_types', 'Digital', device_types_figure, events_version)
+            st.plotly_chart(fig_devices, use_container_width=True)
+    
+        # Traffic Analysis Section
+        st.markdown("### Traffic Analysis")
+    
+        # Traffic Trends
+        def traffic_figure():
+            fig_traffic = go.Figure()
+    
+            fig_traffic.add_trace(scatter_trace(
+                x=traffic['DATE'],
+                y=traffic['VIEWS'],
+                name='Total Views',
+                mode='lines+markers',
+                line=dict(color=PRIMARY_COLOR, width=2)
+            ))
+    
+            fig_traffic.add_trace(scatter_trace(
+                x=traffic['DATE'],
+                y=traffic['UNIQUE_VISITORS'],
+                name='Unique Visitors',
+                mode='lines+markers',
+                line=dict(color=SECONDARY_COLOR, width=2)
+            ))
+    
+            fig_traffic.update_layout(
+                title=f'{TRAFFIC_RESOLUTION_LABELS[traffic_resolution]} Website Traffic',
+                xaxis_title=traffic_resolution.capitalize(),
+                yaxis_title='Count',
+                hovermode='x unified',
+                legend=dict(
+                    orientation="h",
+                    yanchor="bottom",
+                    y=1.02,
+                    xanchor="right",
+                    x=1
+                )
+            )
+            return fig_traffic
+
+        fig_traffic = cached_figure('traffic', 'Digital', traffic_figure)
+        st.plotly_chart(fig_traffic, use_container_width=True)
+    
+        # Conversion and Bounce Rate Trends
+        def traffic_rates_figure():
+            fig_rates = go.Figure()
+    
+            fig_rates.add_trace(scatter_trace(
+                x=traffic['DATE'],
+                y=traffic['CONVERSION_RATE'] * 100,
+                name='Conversion Rate',
+                mode='lines+markers',
+                line=dict(color=SUCCESS_COLOR, width=2)
+            ))
+    
+            fig_rates.add_trace(scatter_trace(
+                x=traffic['DATE'],
+                y=traffic['BOUNCE_RATE'] * 100,
+                name='Bounce Rate',
+                mode='lines+markers',
+                line=dict(color=DANGER_COLOR, width=2)
+            ))
+    
+            fig_rates.update_layout(
+                title='Conversion and Bounce Rate Trends',
+                xaxis_title=traffic_resolution.capitalize(),
+                yaxis_title='Rate (%)',
+                hovermode='x unified',
+                legend=dict(
+                    orientation="h",
+                    yanchor="bottom",
+                    y=1.02,
+                    xanchor="right",
+                    x=1
+                )
+            )
+            return fig_rates
+
+        fig_rates = cached_figure('traffic_rates', 'Digital', traffic_rates_figure)
+        st.plotly_chart(fig_rates, use_container_width=True)
+        # Sessions (or customers) that went through the steps in order, from the event store
+        funnel_unit = st.selectbox('Funnel counts', list(FUNNEL_UNIT_LABELS), format_func=FUNNEL_UNIT_LABELS.get)
+        funnel_data = memoized(view_cache, session_funnel, Versioned(event_store, events_version),
+                               start_date, end_date, funnel_unit)
+
+        def journey_funnel_figure():
+            fig_funnel = go.Figure(go.Funnel(
+                y=funnel_data['EVENT_TYPE'],
+                x=funnel_data['COUNT'],
+                textinfo="value+percent initial",
+                texttemplate="%{value:.2s}<br>(%{percentInitial})"
+            ))
+    
+            fig_funnel.update_layout(
+                title='Customer Journey Funnel',
+                showlegend=False
+            )
+            return fig_funnel
+
+        fig_funnel = cached_figure('journey_funnel', 'Digital', journey_funnel_figure, events_version, funnel_unit)
+        st.plotly_chart(fig_funnel, use_container_width=True)
+
         st.dataframe(
-            critical_table,
+            funnel_data[['EVENT_TYPE', 'COUNT', 'DROP_OFF', 'MEDIAN_SECONDS']],
             column_config={
-                'NAME': 'Product Name',
-                'VARIANT_NAME': 'Variant Name',
-                'CATEGORY': 'Category',
-                'BRAND': 'Brand',
-                'INVENTORY_QTY': 'Current Stock',
-                'TOTAL_SOLD': 'Total Units Sold'
+                'EVENT_TYPE': 'Step',
+                'COUNT': st.column_config.NumberColumn(FUNNEL_UNIT_LABELS[funnel_unit], format="%d"),
+                'DROP_OFF': st.column_config.NumberColumn('Drop-off from Previous Step', format="%.1f%%"),
+                'MEDIAN_SECONDS': st.column_config.NumberColumn('Median Seconds from Previous Step', format="%.0f")
             },
             hide_index=True,
             use_container_width=True
         )
-    else:
-        st.info("No products with critical inventory levels found.")
+
+# Inventory Analysis tab
+if 'Inventory Analysis' in sections:
+    with sections['Inventory Analysis'], timed('Inventory'):
+
+        # Velocity and cover of every variant, built once per loaded data (see src/inventory.py)
+        variant_inventory = get_variant_inventory()
+        inventory = memoized(view_cache, inventory_analysis, variant_inventory, product)
     
-# Campaign Analysis tab
-with tabs[6]:
-    # Merge campaign data with attribution and order data
-    campaign_performance = (order_campaign_attribution.merge(
-        campaign[['CAMPAIGN_ID', 'CAMPAIGN_NAME', 'CAMPAIGN_TYPE', 'OBJECTIVE', 'BUDGET', 'TARGET_SEGMENT', 'START_DATE', 'END_DATE']], 
-        on='CAMPAIGN_ID'
-    ).merge(
-        order_fact[['ORDER_ID', 'TOTAL_AMOUNT']], 
-        on='ORDER_ID'
-    ))
-    # Calculate attributed revenue
-    campaign_performance['ATTRIBUTED_REVENUE'] = campaign_performance['TOTAL_AMOUNT'] * campaign_performance['CONTRIBUTION_PERCENT']
-
-    # Calculate key metrics
-    total_campaigns = len(campaign)
-    active_campaigns = len(campaign[campaign['END_DATE'] >= pd.Timestamp.now()])
-    
-    # Convert budget from currency string to numeric
-    campaign['BUDGET'] = campaign['BUDGET'].str.replace('$', '').str.replace(',', '').astype(float)
-    total_budget = campaign['BUDGET'].sum()
-    avg_campaign_budget = total_budget / total_campaigns if total_campaigns > 0 else 0
-
-    # Display key metrics
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        st.markdown(create_metric_container(
-            "Total Campaigns",
-            f"{total_campaigns:,}"
-        ), unsafe_allow_html=True)
-    with col2:
-        st.markdown(create_metric_container(
-            "Active Campaigns",
-            f"{active_campaigns:,}",
-            SUCCESS_COLOR
-        ), unsafe_allow_html=True)
-    with col3:
-        st.markdown(create_metric_container(
-            "Total Budget",
-            f"${total_budget:,.2f}",
-            SECONDARY_COLOR
-        ), unsafe_allow_html=True)
-    with col4:
-        st.markdown(create_metric_container(
-            "Avg Campaign Budget",
-            f"${avg_campaign_budget:,.2f}"
-        ), unsafe_allow_html=True)
-
-    # Campaign Type Analysis
-    ""
-    st.markdown("#### Campaign Performance by Type")
-    
-    # Calculate performance metrics by campaign type
-    type_performance = campaign.groupby('CAMPAIGN_TYPE').agg({
-        'CAMPAIGN_ID': 'count',
-        'BUDGET': 'sum'
-    }).reset_index()
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # Budget by Campaign Type
-        # Create a color map to ensure consistent colors across both charts
-        campaign_types = type_performance['CAMPAIGN_TYPE'].unique()
-        # Use a different color palette from plotly express
-        custom_colors = px.colors.qualitative.Prism[:len(campaign_types)]
-        color_map = dict(zip(campaign_types, custom_colors))
-
-        # Budget by Campaign Type
-        fig_budget = px.pie(
-            type_performance,
-            values='BUDGET', 
-            names='CAMPAIGN_TYPE',
-            title='Budget Allocation by Campaign Type',
-            color='CAMPAIGN_TYPE',
-            color_discrete_map=color_map
-        )
+        col1, col2 = st.columns(2)
+    
+        with col1:
+            # Inventory Status Distribution
+            inventory_status_count = inventory['inventory_status_count']
         
-        fig_budget.update_traces(
-            textposition='inside',
-            textinfo='percent'
-        )
+            def inventory_status_figure():
+                # Define colors for each status
+                status_colors = {
+                    "Critical (0-5)": DANGER_COLOR,
+                    "Low (6-20)": WARNING_COLOR,
+                    "Medium (21-50)": SECONDARY_COLOR,
+                    "High (50+)": SUCCESS_COLOR
+                }
         
-        st.plotly_chart(fig_budget, use_container_width=True)
-    
-    with col2:
-        # Campaign Count by Type
-        fig_count = px.bar(
-            type_performance,
-            x='CAMPAIGN_TYPE',
-            y='CAMPAIGN_ID',
-            title='Number of Campaigns by Type',
-            color='CAMPAIGN_TYPE',
-            labels={'CAMPAIGN_ID': 'Number of Campaigns'},
-            color_discrete_map=color_map
-        )
+                # Extract the colors in the correct order
+                color_sequence = [status_colors[status] for status in inventory_status_count['INVENTORY_STATUS']]
         
-        fig_count.update_layout(
-            xaxis_title='Campaign Type',
-            yaxis_title='Number of Campaigns',
-            showlegend=False
-        )
+                fig_status = px.pie(
+                    inventory_status_count,
+                    values='COUNT',
+                    names='INVENTORY_STATUS',
+                    title='Inventory Status Distribution',
+                    color='INVENTORY_STATUS',
+                    color_discrete_map=status_colors
+                )
         
-        st.plotly_chart(fig_count, use_container_width=True)
-
-    # Campaign Objectives Analysis
-    st.markdown("### Campaign Objectives")
-    
-    objective_counts = campaign.groupby('OBJECTIVE').agg({
-        'CAMPAIGN_ID': 'count',
-        'BUDGET': 'sum'
-    }).reset_index()
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # Create a color map to ensure consistent colors across both charts
-        objectives = objective_counts['OBJECTIVE'].unique()
-        custom_colors = px.colors.qualitative.Prism[:len(objectives)]
-        color_map = dict(zip(objectives, custom_colors))
-
-        # Number of Campaigns by Objective
-        fig_objectives = px.bar(
-            objective_counts,
-            x='OBJECTIVE',
-            y='CAMPAIGN_ID',
-            title='Number of Campaigns by Objective',
-            color='OBJECTIVE',
-            labels={'CAMPAIGN_ID': 'Number of Campaigns'},
-            color_discrete_map=color_map
-        )
-        
-        fig_objectives.update_layout(
-            xaxis_title='Objective',
-            yaxis_title='Number of Campaigns',
-            showlegend=False,
-            xaxis={'tickangle': 45}
-        )
-        
-        st.plotly_chart(fig_objectives, use_container_width=True)
-    
-    with col2:
-        # Budget by Target Segment
-        fig_objective_budget = px.pie(
-            objective_counts,
-            values='BUDGET',
-            names='OBJECTIVE',
-            title='Budget Allocation by Objective',
-            color='OBJECTIVE',
-            color_discrete_map=color_map
-        )
+                fig_status.update_traces(textposition='inside', textinfo='percent+label')
+                return fig_status
+
+            fig_status = cached_figure('inventory_status', 'Inventory', inventory_status_figure)
+            st.plotly_chart(fig_status, use_container_width=True)
+    
+        with col2:
+            # Inventory by Category
+            inventory_by_category = inventory['inventory_by_category']
         
-        fig_objective_budget.update_traces(
-            textposition='inside',
-            textinfo='percent'
-        )
+            def inventory_by_category_figure():
+                # Get unique categories and assign Prism colors
+                categories = inventory_by_category['CATEGORY'].unique()
+                color_map = dict(zip(categories, px.colors.qualitative.Prism[:len(categories)]))
         
-        st.plotly_chart(fig_objective_budget, use_container_width=True)
-
-    # Target Segment Analysis
-    st.markdown("### Target Segment Analysis")
-    
-    segment_analysis = campaign.groupby('TARGET_SEGMENT').agg({
-        'CAMPAIGN_ID': 'count',
-        'BUDGET': 'sum'
-    }).reset_index()
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # Create a color map to ensure consistent colors across both charts
-        segments = segment_analysis['TARGET_SEGMENT'].unique()
-        custom_colors = px.colors.qualitative.Prism[:len(segments)]
-        color_map = dict(zip(segments, custom_colors))
-
-        # Campaigns by Target Segment
-        fig_segments = px.bar(
-            segment_analysis,
-            x='TARGET_SEGMENT',
-            y='CAMPAIGN_ID',
-            title='Number of Campaigns by Target Segment',
-            color='TARGET_SEGMENT',
-            labels={'CAMPAIGN_ID': 'Number of Campaigns'},
-            color_discrete_map=color_map
-        )
+                fig_inv_cat = px.bar(
+                    inventory_by_category,
+                    x='CATEGORY',
+                    y='TOTAL_INVENTORY',
+                    title='Total Inventory by Category',
+                    color='CATEGORY',
+                    text='TOTAL_INVENTORY',
+                    color_discrete_map=color_map
+                )
         
-        fig_segments.update_layout(
-            xaxis_title='Target Segment',
-            yaxis_title='Number of Campaigns',
-            showlegend=False,
-            xaxis={'tickangle': 45}
+                fig_inv_cat.update_traces(
+                    texttemplate='%{text:,}',
+                    textposition='outside'
+                )
+                fig_inv_cat.update_layout(
+                    xaxis_title='Category',
+                    yaxis_title='Total Inventory Quantity',
+                    showlegend=False
+                )
+                return fig_inv_cat
+
+            fig_inv_cat = cached_figure('inventory_by_category', 'Inventory', inventory_by_category_figure)
+            st.plotly_chart(fig_inv_cat, use_container_width=True)
+    
+        # Out of Stock and Critical Inventory Products
+        st.markdown("### Critical Inventory Products")
+    
+        inventory_columns = {
+            'NAME': 'Product Name',
+            'VARIANT_NAME': 'Variant Name',
+            'CATEGORY': 'Category',
+            'BRAND': 'Brand',
+            'INVENTORY_QTY': 'Current Stock',
+            f'UNITS_{COVER_WINDOW}D': st.column_config.NumberColumn(f'Units Sold ({COVER_WINDOW}d)', format="%d"),
+            f'VELOCITY_{COVER_WINDOW}D': st.column_config.NumberColumn('Units / Day', format="%.2f"),
+            'DAYS_OF_COVER': st.column_config.NumberColumn('Days of Cover', format="%.0f"),
+            'STOCKOUT_DATE': st.column_config.DateColumn('Projected Stock-out')
+        }
+        critical_table = inventory['critical_table']
+    
+        if len(critical_table) > 0:
+            st.dataframe(
+                critical_table,
+                column_config=inventory_columns,
+                hide_index=True,
+                use_container_width=True
+            )
+        else:
+            st.info("No products with critical inventory levels found.")
+
+        # Variants whose stock runs out soon at their recent sales velocity
+        st.markdown("### Projected Stock-outs")
+        st.caption(f"Variants with at most {STOCKOUT_HORIZON_DAYS} days of cover at their last-{COVER_WINDOW}-day "
+                   f"sales velocity, as of the latest order")
+
+        stockout_table = inventory['stockout_table']
+
+        if len(stockout_table) > 0:
+            st.dataframe(
+                stockout_table,
+                column_config=inventory_columns,
+                hide_index=True,
+                use_container_width=True
+            )
+        else:
+            st.info(f"No variants are projected to run out within {STOCKOUT_HORIZON_DAYS} days.")
+
+        # Stock across facilities, from the sparse variant x facility matrix (see src/facility.py)
+        st.markdown("### Inventory by Facility")
+
+        facility_inventory = get_facility_inventory()
+        facilities = memoized(view_cache, facility_analysis,
+                              Versioned(facility_inventory, registry.version(["INVENTORY", "PRODUCT", "FACILITY"])),
+                              None if selected_category == 'All' else (selected_category,))
+
+        if len(facilities['stock_by_facility']) == 0:
+            st.info("No facility inventory found.")
+        else:
+            col1, col2 = st.columns(2)
+
+            with col1:
+                def stock_by_facility_figure():
+                    fig_facility = px.bar(
+                        facilities['stock_by_facility'],
+                        x='FACILITY_NAME',
+                        y='TOTAL_QTY',
+                        title='Stock by Facility',
+                        color='FACILITY_TYPE',
+                        text='TOTAL_QTY',
+                        hover_data={'VARIANTS_STOCKED': True, 'SHARE': ':.1%'},
+                        color_discrete_sequence=px.colors.qualitative.Prism
+                    )
+                    fig_facility.update_traces(
+                        texttemplate='%{text:,}',
+                        textposition='outside'
+                    )
+                    fig_facility.update_layout(
+                        xaxis_title='Facility',
+                        yaxis_title='Units in Stock',
+                        legend_title='Facility Type'
+                    )
+                    return fig_facility
+
+                fig_facility = cached_figure('stock_by_facility', 'Inventory', stock_by_facility_figure)
+                st.plotly_chart(fig_facility, use_container_width=True)
+
+            with col2:
+                st.markdown("#### Most Unevenly Stocked Variants")
+                st.dataframe(
+                    facilities['imbalanced_variants'][[
+                        'NAME', 'VARIANT_ID', 'TOTAL_QTY', 'FACILITIES_STOCKED', 'IMBALANCE',
+                        'FULLEST_FACILITY', 'MAX_QTY', 'EMPTIEST_FACILITY', 'MIN_QTY'
+                    ]],
+                    column_config={
+                        'NAME': 'Product Name',
+                        'VARIANT_ID': 'Variant',
+                        'TOTAL_QTY': st.column_config.NumberColumn('Total Stock', format="%d"),
+                        'FACILITIES_STOCKED': 'Facilities Stocked',
+                        'IMBALANCE': st.column_config.NumberColumn(
+                            'Imbalance', format="%.2f", help='Coefficient of variation of stock across facilities'),
+                        'FULLEST_FACILITY': 'Fullest Facility',
+                        'MAX_QTY': st.column_config.NumberColumn('Max Stock', format="%d"),
+                        'EMPTIEST_FACILITY': 'Emptiest Facility',
+                        'MIN_QTY': st.column_config.NumberColumn('Min Stock', format="%d")
+                    },
+                    hide_index=True,
+                    use_container_width=True
+                )
+
+            facility_critical = facilities['facility_critical']
+            facility_names = facilities['stock_by_facility']['FACILITY_NAME'].tolist()
+            selected_facility = st.selectbox('Critical stock in facility', facility_names)
+            facility_critical = facility_critical[facility_critical['FACILITY_NAME'] == selected_facility]
+
+            if len(facility_critical) > 0:
+                st.dataframe(
+                    facility_critical[['NAME', 'VARIANT_ID', 'CATEGORY', 'QUANTITY']],
+                    column_config={
+                        'NAME': 'Product Name',
+                        'VARIANT_ID': 'Variant',
+                        'CATEGORY': 'Category',
+                        'QUANTITY': st.column_config.NumberColumn('Stock in Facility', format="%d")
+                    },
+                    hide_index=True,
+                    use_container_width=True
+                )
+            else:
+                st.info(f"No variants with critical stock in {selected_facility}.")
+    
+# Campaign Analysis tab
+if 'Campaign Analysis' in sections:
+    with sections['Campaign Analysis'], timed('Campaign'):
+        campaign = registry.get("CAMPAIGN")
+        order_campaign_attribution = registry.get("ORDER_CAMPAIGN_ATTRIBUTION")
+
+        attribution_model = st.selectbox('Attribution model', list(ATTRIBUTION_MODEL_LABELS),
+                                         format_func=ATTRIBUTION_MODEL_LABELS.get)
+        if attribution_model == 'recorded':
+            attribution = memoized(view_cache, recorded_attribution, order_campaign_attribution, order_fact)
+        else:
+            # Touchpoints are sorted once per loaded CAMPAIGN_EVENT (see src/attribution.py)
+            touchpoints = registry.derived("touchpoints", lambda: TouchpointIndex(registry.get("CAMPAIGN_EVENT")))
+            attribution = memoized(view_cache, model_attribution,
+                                   Versioned(touchpoints, registry.version(["CAMPAIGN_EVENT"])),
+                                   order_fact, attribution_model)
+
+        # Campaigns ending after today count as active
+        campaigns = memoized(
+            view_cache,
+            campaign_analysis,
+            campaign,
+            attribution,
+            start_date,
+            end_date,
+            pd.Timestamp.now().normalize()
         )
+
+        # Calculate key metrics
+        total_campaigns = campaigns['total_campaigns']
+        active_campaigns = campaigns['active_campaigns']
+        total_budget = campaigns['total_budget']
+        avg_campaign_budget = campaigns['avg_campaign_budget']
+
+        # Display key metrics
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.markdown(create_metric_container(
+                "Total Campaigns",
+                f"{total_campaigns:,}"
+            ), unsafe_allow_html=True)
+        with col2:
+            st.markdown(create_metric_container(
+                "Active Campaigns",
+                f"{active_campaigns:,}",
+                SUCCESS_COLOR
+            ), unsafe_allow_html=True)
+        with col3:
+            st.markdown(create_metric_container(
+                "Total Budget",
+                f"${total_budget:,.2f}",
+                SECONDARY_COLOR
+            ), unsafe_allow_html=True)
+        with col4:
+            st.markdown(create_metric_container(
+                "Avg Campaign Budget",
+                f"${avg_campaign_budget:,.2f}"
+            ), unsafe_allow_html=True)
+
+        # Campaign Type Analysis
+        ""
+        st.markdown("#### Campaign Performance by Type")
+    
+        # Calculate performance metrics by campaign type
+        type_performance = campaigns['type_performance']
+    
+        col1, col2 = st.columns(2)
+    
+        with col1:
+            # Budget by Campaign Type
+            # Create a color map to ensure consistent colors across both charts
+            campaign_types = type_performance['CAMPAIGN_TYPE'].unique()
+            # Use a different color palette from plotly express
+            custom_colors = px.colors.qualitative.Prism[:len(campaign_types)]
+            color_map = dict(zip(campaign_types, custom_colors))
+
+            # Budget by Campaign Type
+            def campaign_type_budget_figure():
+                fig_budget = px.pie(
+                    type_performance,
+                    values='BUDGET', 
+                    names='CAMPAIGN_TYPE',
+                    title='Budget Allocation by Campaign Type',
+                    color='CAMPAIGN_TYPE',
+                    color_discrete_map=color_map
+                )
         
-        st.plotly_chart(fig_segments, use_container_width=True)
-    
-    with col2:
-        # Budget by Target Segment
-        fig_segment_budget = px.pie(
-            segment_analysis,
-            values='BUDGET',
-            names='TARGET_SEGMENT',
-            title='Budget Allocation by Target Segment',
-            color='TARGET_SEGMENT',
-            color_discrete_map=color_map
-        )
+                fig_budget.update_traces(
+                    textposition='inside',
+                    textinfo='percent'
+                )
+                return fig_budget
+
+            fig_budget = cached_figure('campaign_type_budget', 'Campaign', campaign_type_budget_figure)
+            st.plotly_chart(fig_budget, use_container_width=True)
+    
+        with col2:
+            # Campaign Count by Type
+            def campaign_type_count_figure():
+                fig_count = px.bar(
+                    type_performance,
+                    x='CAMPAIGN_TYPE',
+                    y='CAMPAIGN_ID',
+                    title='Number of Campaigns by Type',
+                    color='CAMPAIGN_TYPE',
+                    labels={'CAMPAIGN_ID': 'Number of Campaigns'},
+                    color_discrete_map=color_map
+                )
         
-        fig_segment_budget.update_traces(
-            textposition='inside',
-            textinfo='percent'
-        )
+                fig_count.update_layout(
+                    xaxis_title='Campaign Type',
+                    yaxis_title='Number of Campaigns',
+                    showlegend=False
+                )
+                return fig_count
+
+            fig_count = cached_figure('campaign_type_count', 'Campaign', campaign_type_count_figure)
+            st.plotly_chart(fig_count, use_container_width=True)
+
+        # Campaign Objectives Analysis
+        st.markdown("### Campaign Objectives")
+    
+        objective_counts = campaigns['objective_counts']
+    
+        col1, col2 = st.columns(2)
+    
+        with col1:
+            # Create a color map to ensure consistent colors across both charts
+            objectives = objective_counts['OBJECTIVE'].unique()
+            custom_colors = px.colors.qualitative.Prism[:len(objectives)]
+            color_map = dict(zip(objectives, custom_colors))
+
+            # Number of Campaigns by Objective
+            def objective_count_figure():
+                fig_objectives = px.bar(
+                    objective_counts,
+                    x='OBJECTIVE',
+                    y='CAMPAIGN_ID',
+                    title='Number of Campaigns by Objective',
+                    color='OBJECTIVE',
+                    labels={'CAMPAIGN_ID': 'Number of Campaigns'},
+                    color_discrete_map=color_map
+                )
         
-        st.plotly_chart(fig_segment_budget, use_container_width=True)
-
-    # Campaign Attribution Analysis
-    if len(campaign_performance) > 0:
+                fig_objectives.update_layout(
+                    xaxis_title='Objective',
+                    yaxis_title='Number of Campaigns',
+                    showlegend=False,
+                    xaxis={'tickangle': 45}
+                )
+                return fig_objectives
+
+            fig_objectives = cached_figure('objective_count', 'Campaign', objective_count_figure)
+            st.plotly_chart(fig_objectives, use_container_width=True)
+    
+        with col2:
+            # Budget by Target Segment
+            def objective_budget_figure():
+                fig_objective_budget = px.pie(
+                    objective_counts,
+                    values='BUDGET',
+                    names='OBJECTIVE',
+                    title='Budget Allocation by Objective',
+                    color='OBJECTIVE',
+                    color_discrete_map=color_map
+                )
         
-        # Calculate attribution metrics
-        attribution_metrics = campaign_performance.groupby(
-            ['CAMPAIGN_ID', 'CAMPAIGN_NAME', 'CAMPAIGN_TYPE']
-        ).agg({
-            'ATTRIBUTED_REVENUE': 'sum',
-            'ORDER_ID': 'nunique',
-            'CONTRIBUTION_PERCENT': 'mean'
-        }).reset_index()
+                fig_objective_budget.update_traces(
+                    textposition='inside',
+                    textinfo='percent'
+                )
+                return fig_objective_budget
+
+            fig_objective_budget = cached_figure('objective_budget', 'Campaign', objective_budget_figure)
+            st.plotly_chart(fig_objective_budget, use_container_width=True)
+
+        # Target Segment Analysis
+        st.markdown("### Target Segment Analysis")
+    
+        segment_analysis = campaigns['segment_analysis']
+    
+        col1, col2 = st.columns(2)
+    
+        with col1:
+            # Create a color map to ensure consistent colors across both charts
+            segments = segment_analysis['TARGET_SEGMENT'].unique()
+            custom_colors = px.colors.qualitative.Prism[:len(segments)]
+            color_map = dict(zip(segments, custom_colors))
+
+            # Campaigns by Target Segment
+            def target_segment_count_figure():
+                fig_segments = px.bar(
+                    segment_analysis,
+                    x='TARGET_SEGMENT',
+                    y='CAMPAIGN_ID',
+                    title='Number of Campaigns by Target Segment',
+                    color='TARGET_SEGMENT',
+                    labels={'CAMPAIGN_ID': 'Number of Campaigns'},
+                    color_discrete_map=color_map
+                )
         
-        # Sort by attributed revenue
-        top_attribution = attribution_metrics.nlargest(10, 'ATTRIBUTED_REVENUE')
+                fig_segments.update_layout(
+                    xaxis_title='Target Segment',
+                    yaxis_title='Number of Campaigns',
+                    showlegend=False,
+                    xaxis={'tickangle': 45}
+                )
+                return fig_segments
+
+            fig_segments = cached_figure('target_segment_count', 'Campaign', target_segment_count_figure)
+            st.plotly_chart(fig_segments, use_container_width=True)
+    
+        with col2:
+            # Budget by Target Segment
+            def target_segment_budget_figure():
+                fig_segment_budget = px.pie(
+                    segment_analysis,
+                    values='BUDGET',
+                    names='TARGET_SEGMENT',
+                    title='Budget Allocation by Target Segment',
+                    color='TARGET_SEGMENT',
+                    color_discrete_map=color_map
+                )
         
-        fig_attribution = px.bar(
-            top_attribution,
-            x='CAMPAIGN_NAME',
-            y='ATTRIBUTED_REVENUE',
-            color='CAMPAIGN_TYPE',
-            title='Top 10 Campaigns by Attributed Revenue',
-            text=top_attribution['ATTRIBUTED_REVENUE'].apply(lambda x: f'${x:,.2f}'),
-            color_discrete_map=color_map
-        )
+                fig_segment_budget.update_traces(
+                    textposition='inside',
+                    textinfo='percent'
+                )
+                return fig_segment_budget
+
+            fig_segment_budget = cached_figure('target_segment_budget', 'Campaign', target_segment_budget_figure)
+            st.plotly_chart(fig_segment_budget, use_container_width=True)
+
+        # Campaign Attribution Analysis
+        top_attribution = campaigns['top_attribution']
+        if top_attribution is not None:
         
-        fig_attribution.update_layout(
-            xaxis_title='Campaign Name',
-            yaxis_title='Attributed Revenue ($)',
-            xaxis={'tickangle': 45},
-            showlegend=True
-        )
+            def top_attributed_campaigns_figure():
+                fig_attribution = px.bar(
+                    top_attribution,
+                    x='CAMPAIGN_NAME',
+                    y='ATTRIBUTED_REVENUE',
+                    color='CAMPAIGN_TYPE',
+                    title='Top 10 Campaigns by Attributed Revenue',
+                    text=top_attribution['ATTRIBUTED_REVENUE'].apply(lambda x: f'${x:,.2f}'),
+                    color_discrete_map=color_map
+                )
         
-        st.plotly_chart(fig_attribution, use_container_width=True)
\ No newline at end of file
+                fig_attribution.update_layout(
+                    xaxis_title='Campaign Name',
+                    yaxis_title='Attributed Revenue ($)',
+                    xaxis={'tickangle': 45},
+                    showlegend=True
+                )
+                return fig_attribution
+
+            fig_attribution = cached_figure('top_attributed_campaigns', 'Campaign', top_attributed_campaigns_figure, attribution_model)
+            st.plotly_chart(fig_attribution, use_container_width=True)
+
+# Load the tables and build the indexes of the sections not on screen, so that
+# opening one later only runs its filtered analyses
+if PREFETCH:
+    prefetcher = get_prefetcher()
+    for label, (dependencies, warm) in SECTION_PREFETCH.items():
+        if label not in sections:
+            prefetcher.submit((label, registry.version(sorted(TAB_DEPENDENCIES[dependencies]))), warm)
@@ -0,0 +1,138 @@
+"""Check the attribution models against a per-order Python reference and time them.
+
+Attributes the orders of an existing tables directory (and a small synthetic
+sample) with every model of src/attribution.py and with a plain loop over
+each order's touchpoints, and requires the same revenue, orders and credit
+per campaign. Then times index building and every model on --touchpoints
+synthetic touchpoints and --orders orders. Exits with status 1 on any
+mismatch.
+
+Usage:
+    python benchmarks/bench_attribution.py [--touchpoints 20000000] [--orders 2000000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.attribution import (ATTRIBUTION_MODELS, HALF_LIFE_DAYS, LOOKBACK_DAYS,  # noqa: E402
+                             TouchpointIndex, model_attribution)
+from src.registry import TableRegistry  # noqa: E402
+from src.snapshot import TABLES_DIR  # noqa: E402
+
+
+def reference(campaign_event, order_fact, model):
+    """Per-campaign attribution computed order by order."""
+    events = campaign_event.dropna(subset=['EVENT_DATE', 'CUSTOMER_ID', 'CAMPAIGN_ID'])
+    events = events.sort_values(['CUSTOMER_ID', 'EVENT_DATE'], kind='stable')
+    by_customer = {customer: group for customer, group in events.groupby('CUSTOMER_ID', observed=True, sort=False)}
+    revenue, credit, orders = {}, {}, {}
+    for order in order_fact.dropna(subset=['ORDER_DATE']).itertuples():
+        touches = by_customer.get(order.CUSTOMER_ID)
+        if touches is None:
+            continue
+        window = touches[(touches['EVENT_DATE'] <= order.ORDER_DATE)
+                         & (touches['EVENT_DATE'] >= order.ORDER_DATE - pd.Timedelta(days=LOOKBACK_DAYS))]
+        if len(window) == 0:
+            continue
+        if model == "first_touch":
+            weights = np.eye(len(window))[0]
+        elif model == "last_touch":
+            weights = np.eye(len(window))[-1]
+        elif model == "linear":
+            weights = np.full(len(window), 1 / len(window))
+        else:
+            age = (order.ORDER_DATE - window['EVENT_DATE']).dt.total_seconds().to_numpy() / 86_400
+            weights = np.exp2(-age / HALF_LIFE_DAYS)
+            weights /= weights.sum()
+        for campaign, weight in zip(window['CAMPAIGN_ID'], weights):
+            if weight == 0:
+                continue
+            revenue[campaign] = revenue.get(campaign, 0) + order.TOTAL_AMOUNT * weight
+            credit[campaign] = credit.get(campaign, 0) + weight
+            orders.setdefault(campaign, set()).add(order.Index)
+    campaigns = sorted(revenue, key=str)
+    return pd.DataFrame({
+        'CAMPAIGN_ID': campaigns,
+        'ATTRIBUTED_REVENUE': [revenue[c] for c in campaigns],
+        'ORDER_ID': [len(orders[c]) for c in campaigns],
+        'CONTRIBUTION_PERCENT': [credit[c] / len(orders[c]) for c in campaigns],
+    })
+
+
+def synthetic(rng, touchpoints, orders, customers):
+    """Touchpoints and orders of random customers over one year.
+
+    Customers carry CUSTOMER_KEY codes as the registry adds them, with
+    CUSTOMER_ID as a categorical over the same codes to keep memory low.
+    """
+    start = pd.Timestamp("2025-01-01")
+    customer_ids = pd.Index(np.char.add("C", np.arange(customers).astype(str)))
+    event_customers = rng.integers(0, customers, touchpoints).astype(np.int32)
+    order_customers = rng.integers(0, customers, orders).astype(np.int32)
+    campaign_event = pd.DataFrame({
+        'CAMPAIGN_ID': pd.Categorical.from_codes(rng.integers(0, 200, touchpoints),
+                                                 np.sort(np.char.add("CMP", np.arange(200).astype(str)))),
+        'CUSTOMER_ID': pd.Categorical.from_codes(event_customers, customer_ids),
+        'CUSTOMER_KEY': event_customers,
+        'EVENT_DATE': start + pd.to_timedelta(rng.integers(0, 365 * 86_400, touchpoints), unit='s'),
+    })
+    order_fact = pd.DataFrame({
+        'ORDER_ID': np.arange(orders),
+        'CUSTOMER_ID': pd.Categorical.from_codes(order_customers, customer_ids),
+        'CUSTOMER_KEY': order_customers,
+        'ORDER_DATE': start + pd.to_timedelta(rng.integers(0, 365 * 86_400, orders), unit='s'),
+        'TOTAL_AMOUNT': np.round(rng.gamma(2.0, 60.0, orders), 2),
+    })
+    return campaign_event, order_fact
+
+
+def same(result, expected):
+    if list(result['CAMPAIGN_ID']) != list(expected['CAMPAIGN_ID']):
+        return False
+    return all(np.allclose(result[column], expected[column])
+               for column in ('ATTRIBUTED_REVENUE', 'ORDER_ID', 'CONTRIBUTION_PERCENT'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tables-dir", default=TABLES_DIR)
+    parser.add_argument("--touchpoints", type=int, default=20_000_000)
+    parser.add_argument("--orders", type=int, default=2_000_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
+
+    registry = TableRegistry(args.tables_dir)
+    cases = {
+        "tables": (registry.get("CAMPAIGN_EVENT"), registry.get("ORDER_FACT")),
+        "synthetic": synthetic(rng, 5_000, 2_000, 100),
+    }
+    failures = 0
+    for name, (campaign_event, order_fact) in cases.items():
+        touchpoints = TouchpointIndex(campaign_event)
+        for model in ATTRIBUTION_MODELS:
+            if not same(model_attribution(touchpoints, order_fact, model),
+                         reference(campaign_event, order_fact, model)):
+                failures += 1
+                print(f"MISMATCH for {model} on {name}")
+    print(f"Checked {len(ATTRIBUTION_MODELS)} models on {len(cases)} data sets, {failures} mismatches")
+
+    campaign_event, order_fact = synthetic(rng, args.touchpoints, args.orders, args.orders // 2)
+    started = time.perf_counter()
+    touchpoints = TouchpointIndex(campaign_event)
+    print(f"\nIndex of {args.touchpoints:,} touchpoints: {time.perf_counter() - started:.2f}s")
+    for model in ATTRIBUTION_MODELS:
+        started = time.perf_counter()
+        model_attribution(touchpoints, order_fact, model)
+        print(f"  {model:12} {args.orders:,} orders: {time.perf_counter() - started:.2f}s")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Time every tab's compute function outside Streamlit, cold and memoized.
+
+Runs the functions of src/compute.py over the full date range of an existing
+tables directory, once directly and twice through memoized() with a fresh
+ViewCache: the first memoized call fingerprints the inputs and builds, the
+second is answered from the cache.
+
+Usage:
+    python benchmarks/bench_compute.py [--tables-dir /data/in/tables]
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.compute import (  # noqa: E402
+    campaign_analysis,
+    customer_analysis,
+    digital_analysis,
+    inventory_analysis,
+    memoized,
+    product_analysis,
+    recorded_attribution,
+    sales_analysis,
+)
+from src.cube import build_sales_cube, slice_cube  # noqa: E402
+from src.customer_store import open_customer_store  # noqa: E402
+from src.event_store import open_event_store  # noqa: E402
+from src.inventory import inventory_engine  # noqa: E402
+from src.registry import TableRegistry  # noqa: E402
+from src.snapshot import TABLES_DIR  # noqa: E402
+from src.traffic import build_traffic_rollups, pick_resolution, traffic_series  # noqa: E402
+from src.view_cache import ViewCache  # noqa: E402
+
+
+def seconds(function, *args):
+    """Wall time of one call and its result."""
+    started = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - started, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tables-dir", default=TABLES_DIR)
+    args = parser.parse_args()
+
+    registry = TableRegistry(args.tables_dir)
+    order_fact = registry.get("ORDER_FACT")
+    start_date = order_fact['ORDER_DATE'].min().normalize()
+    end_date = order_fact['ORDER_DATE'].max().normalize()
+    as_of = pd.Timestamp.now().normalize()
+    store = open_event_store(tables_dir=args.tables_dir)
+    variant_inventory = inventory_engine(registry.get("PRODUCT_VARIANT"), registry.get("ORDER_LINE"), order_fact)
+
+    calls = {
+        "Sales": (sales_analysis, slice_cube(build_sales_cube(order_fact), start_date, end_date),
+                  registry.get("SALES_PLAN"), start_date, end_date),
+        "Product": (product_analysis, registry.get("ORDER_LINE"), order_fact, registry.get("PRODUCT"),
+                    registry.get("PRODUCT_VARIANT")),
+        "Customer": (customer_analysis, open_customer_store(registry).customer_metrics(start_date, end_date),
+                     registry.get("CUSTOMER"), as_of),
+        "Digital": (digital_analysis,
+                    traffic_series(build_traffic_rollups(registry.get("PAGE_PERFORMANCE")),
+                                   pick_resolution(start_date, end_date), start_date, end_date),
+                    store.value_counts("EVENT_TYPE", start_date, end_date),
+                    store.value_counts("DEVICE_TYPE", start_date, end_date)),
+        "Inventory": (inventory_analysis, variant_inventory, registry.get("PRODUCT")),
+        "Campaign": (campaign_analysis, registry.get("CAMPAIGN"),
+                     recorded_attribution(registry.get("ORDER_CAMPAIGN_ATTRIBUTION"), order_fact),
+                     start_date, end_date, as_of),
+    }
+
+    cache = ViewCache()
+    report = {}
+    for tab, (function, *inputs) in calls.items():
+        direct, _ = seconds(function, *inputs)
+        first, _ = seconds(memoized, cache, function, *inputs)
+        second, _ = seconds(memoized, cache, function, *inputs)
+        report[tab] = {"direct": direct, "memoized (miss)": first, "memoized (hit)": second}
+
+    print(f"{len(order_fact):,} orders, {start_date.date()} to {end_date.date()}")
+    print("\nCompute (ms)")
+    print((pd.DataFrame(report).T * 1000).to_string(float_format=lambda x: f"{x:.2f}"))
+    print(f"\nCache: {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
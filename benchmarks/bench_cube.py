@@ -0,0 +1,81 @@
+"""Time the Sales tab's figures from the sales cube against a scan of the raw orders.
+
+Answers the order count, revenue and daily series for every combination of
+channel, payment method and order status (plus "All") over several date
+ranges both ways. tests/test_cube.py checks that the two agree.
+
+Usage:
+    python benchmarks/bench_cube.py [--tables-dir /data/in/tables]
+"""
+import argparse
+import itertools
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.cube import build_sales_cube, slice_cube  # noqa: E402
+from src.registry import TableRegistry  # noqa: E402
+from src.snapshot import TABLES_DIR  # noqa: E402
+
+
+def raw_sales(order_fact, start_date, end_date, channel_ids, payment_method, order_status):
+    """The Sales tab's original filter and aggregation over raw orders."""
+    orders = order_fact[(order_fact['ORDER_DATE'] >= start_date) & (order_fact['ORDER_DATE'] <= end_date)]
+    if channel_ids is not None:
+        orders = orders[orders['CHANNEL_ID'].isin(channel_ids)]
+    if payment_method is not None:
+        orders = orders[orders['PAYMENT_METHOD'] == payment_method]
+    if order_status is not None:
+        orders = orders[orders['ORDER_STATUS'] == order_status]
+    daily = orders.groupby(pd.Grouper(key='ORDER_DATE', freq='D'))['TOTAL_AMOUNT'].agg(['count', 'sum'])
+    return len(orders), orders['TOTAL_AMOUNT'].sum(), daily
+
+
+def cube_sales(cube, start_date, end_date, channel_ids, payment_method, order_status):
+    """The same figures answered from the cube."""
+    view = slice_cube(cube, start_date, end_date, channel_ids, payment_method, order_status)
+    daily = view.groupby(pd.Grouper(key='ORDER_DATE', freq='D'))[['ORDER_COUNT', 'TOTAL_AMOUNT']].sum()
+    daily.columns = ['count', 'sum']
+    return int(view['ORDER_COUNT'].sum()), view['TOTAL_AMOUNT'].sum(), daily
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tables-dir", default=TABLES_DIR)
+    args = parser.parse_args()
+
+    order_fact = TableRegistry(args.tables_dir).get("ORDER_FACT")
+    started = time.perf_counter()
+    cube = build_sales_cube(order_fact)
+    print(f"Cube build: {time.perf_counter() - started:.3f}s, {len(order_fact):,} orders -> {len(cube):,} cells")
+
+    last = order_fact['ORDER_DATE'].max().normalize()
+    ranges = [(last - pd.DateOffset(years=1), last), (last - pd.Timedelta(days=30), last),
+              (order_fact['ORDER_DATE'].min().normalize(), last)]
+    channels = [None] + [[channel_id] for channel_id in order_fact['CHANNEL_ID'].dropna().unique()]
+    payments = [None] + list(order_fact['PAYMENT_METHOD'].dropna().unique())
+    statuses = [None] + list(order_fact['ORDER_STATUS'].dropna().unique())
+
+    raw_seconds = cube_seconds = 0.0
+    timed = 0
+    for (start_date, end_date), channel_ids, payment_method, order_status in itertools.product(
+            ranges, channels, payments, statuses):
+        filters = (start_date, end_date, channel_ids, payment_method, order_status)
+        started = time.perf_counter()
+        raw_sales(order_fact, *filters)
+        raw_seconds += time.perf_counter() - started
+        started = time.perf_counter()
+        cube_sales(cube, *filters)
+        cube_seconds += time.perf_counter() - started
+        timed += 1
+
+    print(f"{timed} filter combinations: raw scans {raw_seconds:.3f}s, cube slices {cube_seconds:.3f}s "
+          f"({raw_seconds / cube_seconds:,.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Benchmark boolean-mask date filters against sorted searchsorted slices.
+
+Builds a synthetic order table (default 10M rows) sorted by date and an
+interval table shaped like CAMPAIGN / SALES_PLAN, then times both approaches
+for several range widths.
+
+Usage:
+    python benchmarks/bench_date_index.py [--rows 10000000] [--intervals 100000]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.date_index import date_slice, overlapping  # noqa: E402
+
+
+def timed(fn, repeat=5):
+    """Median milliseconds of `repeat` calls."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--intervals", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    first = pd.Timestamp("2015-01-01")
+    last = pd.Timestamp("2025-01-01")
+    span = int((last - first).total_seconds())
+
+    orders = pd.DataFrame({
+        "ORDER_DATE": first + pd.to_timedelta(np.sort(rng.integers(0, span, args.rows)), unit="s"),
+        "TOTAL_AMOUNT": rng.random(args.rows) * 100,
+    })
+    starts = first + pd.to_timedelta(np.sort(rng.integers(0, span, args.intervals)), unit="s")
+    intervals = pd.DataFrame({
+        "START_DATE": starts,
+        "END_DATE": starts + pd.to_timedelta(rng.integers(1, 90, args.intervals), unit="D"),
+    })
+
+    print(f"{args.rows:,} orders, {args.intervals:,} intervals")
+    for days in (7, 30, 365):
+        end_date = last - pd.Timedelta(days=30)
+        start_date = end_date - pd.Timedelta(days=days)
+
+        mask_ms = timed(lambda: orders[(orders["ORDER_DATE"] >= start_date) & (orders["ORDER_DATE"] <= end_date)])
+        slice_ms = timed(lambda: date_slice(orders, "ORDER_DATE", start_date, end_date))
+        overlap_mask_ms = timed(lambda: intervals[(intervals["START_DATE"] <= end_date)
+                                                  & (intervals["END_DATE"] >= start_date)])
+        overlap_ms = timed(lambda: overlapping(intervals, "START_DATE", "END_DATE", start_date, end_date))
+        print(f"{days:>4}-day range | orders: mask {mask_ms:8.2f} ms, slice {slice_ms:6.3f} ms "
+              f"| intervals: mask {overlap_mask_ms:6.2f} ms, index {overlap_ms:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
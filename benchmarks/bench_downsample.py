@@ -0,0 +1,109 @@
+"""Check the chart downsampling and measure the figure payload it saves.
+
+Compares lttb with a point-by-point Python LTTB on random series, checks that
+downsample_line keeps the first and last day within the point budget and
+that aggregate_buckets keeps every series' total. Then builds the Sales tab
+line and stacked bar figures for --days days at full resolution and with the
+Dashboard's point budgets, and reports points, JSON size and serialization
+time of each. Exits with status 1 on any mismatch.
+
+Usage:
+    python benchmarks/bench_downsample.py [--days 3650] [--budget 500]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.downsample import aggregate_buckets, downsample_line, lttb  # noqa: E402
+
+STATUSES = ['Pending', 'Processing', 'Shipped', 'Delivered', 'Cancelled']
+
+
+def reference(x, y, budget):
+    """Textbook LTTB, one point at a time."""
+    n = len(x)
+    if budget >= n or budget < 3:
+        return list(range(n))
+    every = (n - 2) / (budget - 2)
+    kept, previous = [0], 0
+    for bucket in range(budget - 2):
+        lo, hi = int(bucket * every) + 1, int((bucket + 1) * every) + 1
+        next_lo, next_hi = hi, min(int((bucket + 2) * every) + 1, n - 1)
+        if bucket == budget - 3:
+            next_x, next_y = x[n - 1], y[n - 1]
+        else:
+            next_x = sum(x[next_lo:next_hi]) / (next_hi - next_lo)
+            next_y = sum(y[next_lo:next_hi]) / (next_hi - next_lo)
+        best, best_area = lo, -1.0
+        for j in range(lo, hi):
+            area = abs((x[previous] - next_x) * (y[j] - y[previous]) - (x[previous] - x[j]) * (next_y - y[previous]))
+            if area > best_area:
+                best, best_area = j, area
+        kept.append(best)
+        previous = best
+    return kept + [n - 1]
+
+
+def figure_payload(figure):
+    """Points plotted, JSON bytes and seconds to serialize a figure."""
+    started = time.perf_counter()
+    payload = figure.to_json()
+    seconds = time.perf_counter() - started
+    return sum(len(trace.x) for trace in figure.data), len(payload), seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=3650)
+    parser.add_argument("--budget", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
+
+    failures = 0
+    for n, budget in [(10, 5), (1000, 100), (2500, 333), (5000, 4999)]:
+        x = np.sort(rng.uniform(0, 1000, n))
+        y = np.cumsum(rng.normal(0, 1, n))
+        if list(lttb(x, y, budget)) != reference(list(x), list(y), budget):
+            failures += 1
+            print(f"MISMATCH for lttb of {n} points into {budget}")
+
+    dates = pd.date_range("2016-01-01", periods=args.days, freq="D")
+    daily = pd.DataFrame({'ORDER_DATE': dates, 'TOTAL_AMOUNT': rng.gamma(2.0, 5000.0, args.days)})
+    line = downsample_line(daily, 'ORDER_DATE', 'TOTAL_AMOUNT', args.budget)
+    if len(line) > min(args.budget, args.days) or not line.index[[0, -1]].equals(daily.index[[0, -1]]):
+        failures += 1
+        print("MISMATCH: downsampled line exceeds the budget or drops its first or last day")
+    status_time = pd.DataFrame({
+        'ORDER_DATE': np.repeat(dates, len(STATUSES)),
+        'ORDER_STATUS': np.tile(STATUSES, args.days),
+        'COUNT': rng.poisson(40, args.days * len(STATUSES)),
+    })
+    buckets = aggregate_buckets(status_time, 'ORDER_DATE', ['COUNT'], 'ORDER_STATUS', args.budget)
+    if not (buckets.groupby('ORDER_STATUS')['COUNT'].sum() == status_time.groupby('ORDER_STATUS')['COUNT'].sum()).all():
+        failures += 1
+        print("MISMATCH in bucket totals")
+    print(f"Checked lttb, the downsampled line and bucket totals, {failures} mismatches\n")
+
+    for label, budget in [("full", None), (f"budget {args.budget}", args.budget)]:
+        line = downsample_line(daily, 'ORDER_DATE', 'TOTAL_AMOUNT', budget)
+        line_figure = go.Figure(go.Scatter(x=line['ORDER_DATE'], y=line['TOTAL_AMOUNT'], mode='lines'))
+        bars = aggregate_buckets(status_time, 'ORDER_DATE', ['COUNT'], 'ORDER_STATUS', budget)
+        bar_figure = px.bar(bars, x='ORDER_DATE', y='COUNT', color='ORDER_STATUS', barmode='stack')
+        for name, figure in [("line", line_figure), ("stacked bars", bar_figure)]:
+            points, size, seconds = figure_payload(figure)
+            print(f"{args.days:,} days, {label:11} {name:12}: {points:6,} points, {size / 1024:7.1f} KiB, "
+                  f"to_json {seconds * 1000:6.1f} ms")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
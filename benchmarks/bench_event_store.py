@@ -0,0 +1,56 @@
+"""Compare DIGITAL_EVENT date-range counts: full-table mask vs partitioned store.
+
+Usage:
+    python benchmarks/bench_event_store.py [--tables-dir /data/in/tables] [--granularity month]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.event_store import open_event_store  # noqa: E402
+from src.snapshot import TABLES_DIR, load_table  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tables-dir", default=TABLES_DIR)
+    parser.add_argument("--granularity", default="month", choices=["day", "month"])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        started = time.perf_counter()
+        store = open_event_store(tables_dir=args.tables_dir, snapshot_dir=snapshot_dir, granularity=args.granularity)
+        print(f"Store build: {time.perf_counter() - started:.3f}s, {len(store.partitions)} partitions")
+
+        started = time.perf_counter()
+        events = load_table("DIGITAL_EVENT", args.tables_dir, snapshot_dir)
+        print(f"Full table load: {time.perf_counter() - started:.3f}s, "
+              f"{events.memory_usage(deep=True).sum() / 1e6:,.1f} MB resident")
+
+        last = store.date_range()[1].normalize()
+        for days in (7, 30, 365, 3650):
+            start_date = last - pd.Timedelta(days=days)
+            started = time.perf_counter()
+            mask = (events["EVENT_DATE"] >= start_date) & (events["EVENT_DATE"] <= last)
+            events.loc[mask, "EVENT_TYPE"].value_counts()
+            events.loc[mask, "DEVICE_TYPE"].value_counts()
+            mask_seconds = time.perf_counter() - started
+
+            started = time.perf_counter()
+            store.value_counts("EVENT_TYPE", start_date, last)
+            store.value_counts("DEVICE_TYPE", start_date, last)
+            store_seconds = time.perf_counter() - started
+
+            slices = store.slices(start_date, last)
+            print(f"Last {days:>4} days: mask {mask_seconds * 1000:8.2f} ms | store {store_seconds * 1000:8.2f} ms "
+                  f"({len(slices)} partitions, {sum(hi - lo for _, lo, hi in slices):,} rows touched)")
+
+
+if __name__ == "__main__":
+    main()
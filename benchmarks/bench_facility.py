@@ -0,0 +1,72 @@
+"""Time the facility inventory matrix: one build, then category filter changes.
+
+Builds synthetic INVENTORY rows for --variants variants spread over
+--facilities facilities, times build_facility_inventory once and then
+facility_analysis for every category and for all of them, which is what a
+change of the sidebar category filter recomputes.
+
+Usage:
+    python benchmarks/bench_facility.py [--variants 1000000] [--facilities 50]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.compute import facility_analysis  # noqa: E402
+from src.facility import build_facility_inventory  # noqa: E402
+
+CATEGORIES = ['Electronics', 'Clothing', 'Home & Garden', 'Sports', 'Books', 'Beauty', 'Toys']
+
+
+def synthetic(rng, variants, facilities):
+    """INVENTORY, PRODUCT and FACILITY frames with every variant stocked in 1-5 facilities."""
+    products = max(1, variants // 3)
+    product = pd.DataFrame({
+        'PRODUCT_ID': [f"P{i}" for i in range(products)],
+        'NAME': [f"Product {i}" for i in range(products)],
+        'CATEGORY': pd.Categorical(rng.choice(CATEGORIES, products)),
+    })
+    facility = pd.DataFrame({
+        'FACILITY_ID': [f"F{i}" for i in range(facilities)],
+        'FACILITY_NAME': [f"Facility {i}" for i in range(facilities)],
+        'FACILITY_TYPE': pd.Categorical(rng.choice(['WAREHOUSE', 'STORE'], facilities)),
+    })
+    stocked = rng.integers(1, 6, variants)
+    variant = np.repeat(np.arange(variants), stocked)
+    inventory = pd.DataFrame({
+        'PRODUCT_ID': product['PRODUCT_ID'].to_numpy()[variant % products],
+        'VARIANT_ID': np.char.add("V", variant.astype(str)),
+        'FACILITY_ID': facility['FACILITY_ID'].to_numpy()[rng.integers(0, facilities, len(variant))],
+        'QUANTITY': rng.integers(0, 120, len(variant)).astype(np.int32),
+    })
+    return inventory, product, facility
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--variants", type=int, default=1_000_000)
+    parser.add_argument("--facilities", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    inventory, product, facility = synthetic(np.random.default_rng(args.seed), args.variants, args.facilities)
+
+    started = time.perf_counter()
+    facility_inventory = build_facility_inventory(inventory, product, facility)
+    build = time.perf_counter() - started
+    print(f"{len(inventory):,} INVENTORY rows, {facility_inventory.matrix.shape[0]:,} variants x "
+          f"{args.facilities} facilities: build {build:.2f}s")
+
+    for categories in [None] + [(category,) for category in CATEGORIES]:
+        started = time.perf_counter()
+        facility_analysis(facility_inventory, categories)
+        print(f"  {categories[0] if categories else 'All':14} {(time.perf_counter() - started) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Check the figure cache and measure what a hit saves over rebuilding a chart.
+
+Builds a few Dashboard-like figures from synthetic data (a customer order
+histogram, a stacked status bar chart and a dual-axis line chart), and for
+each one times building it, the cache miss that builds and stores it, and
+the hit that rehydrates it. A rehydrated figure must hold the same JSON
+as the one built (key order aside). Then replays --lookups random filter
+selections drawn with skewed popularity against a cache with a small
+budget and reports its hit rate, evictions and size, which must stay
+within the budget. Exits with status 1 on any mismatch.
+
+Usage:
+    python benchmarks/bench_figure_cache.py [--customers 200000] [--days 1095] [--lookups 1000]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.figure_cache import FigureCache  # noqa: E402
+
+STATUSES = ['Pending', 'Processing', 'Shipped', 'Delivered', 'Cancelled']
+
+
+def chart_builders(rng, customers, days):
+    """Build functions of the benchmark charts by chart id."""
+    dates = pd.date_range("2022-01-01", periods=days, freq="D")
+    customer_metrics = pd.DataFrame({'ORDER_COUNT': rng.geometric(0.3, customers)})
+    status_time = pd.DataFrame({
+        'ORDER_DATE': np.repeat(dates, len(STATUSES)),
+        'ORDER_STATUS': np.tile(STATUSES, days),
+        'COUNT': rng.poisson(40, days * len(STATUSES)),
+    })
+    daily = pd.DataFrame({
+        'ORDER_DATE': dates,
+        'NEW_ORDERS': rng.poisson(200, days),
+        'TOTAL_AMOUNT': rng.gamma(2.0, 5000.0, days),
+    })
+
+    def order_frequency():
+        fig = px.histogram(customer_metrics, x='ORDER_COUNT', title='Order Frequency Distribution',
+                           text_auto='.0f')
+        fig.update_layout(bargap=0.1, hovermode=False)
+        return fig
+
+    def status_over_time():
+        fig = px.bar(status_time, x='ORDER_DATE', y='COUNT', color='ORDER_STATUS', barmode='stack')
+        fig.update_traces(hovertemplate="Order Status: %{data.name}<br>Number of Orders: %{y:,}<extra></extra>")
+        return fig
+
+    def daily_orders():
+        fig = go.Figure()
+        fig.add_trace(go.Bar(x=daily['ORDER_DATE'], y=daily['NEW_ORDERS'], name='Number of Orders'))
+        fig.add_trace(go.Scatter(x=daily['ORDER_DATE'], y=daily['TOTAL_AMOUNT'], name='Revenue', yaxis='y2'))
+        fig.update_layout(yaxis2=dict(overlaying='y', side='right'), hovermode='x unified')
+        return fig
+
+    return {'order_frequency': order_frequency, 'status_over_time': status_over_time, 'daily_orders': daily_orders}
+
+
+def timed(function):
+    started = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--customers", type=int, default=200_000)
+    parser.add_argument("--days", type=int, default=1095)
+    parser.add_argument("--lookups", type=int, default=1000)
+    parser.add_argument("--budget-mb", type=float, default=2.0, help="Budget of the replayed cache")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
+
+    builders = chart_builders(rng, args.customers, args.days)
+    cache = FigureCache()
+    failures = 0
+    print(f"{'chart':17} {'build':>9} {'miss':>9} {'hit':>9} {'JSON':>10}")
+    for chart_id, build in builders.items():
+        built, build_seconds = timed(build)
+        _, miss_seconds = timed(lambda: cache.figure(chart_id, "key", build))
+        hit, hit_seconds = timed(lambda: cache.figure(chart_id, "key", build))
+        payload = built.to_json()
+        if json.loads(hit.to_json()) != json.loads(payload):
+            failures += 1
+            print(f"MISMATCH in rehydrated {chart_id}")
+        print(f"{chart_id:17} {build_seconds * 1000:7.1f}ms {miss_seconds * 1000:7.1f}ms "
+              f"{hit_seconds * 1000:7.1f}ms {len(payload) / 1024:8.1f}KiB")
+
+    # Filter selections are far from uniform: a few views (the default one first) get most lookups
+    budget = int(args.budget_mb * (1 << 20))
+    cache = FigureCache(budget)
+    selections = rng.zipf(1.5, args.lookups) % 200
+    charts = list(builders)
+    started = time.perf_counter()
+    for selection in selections:
+        chart_id = charts[rng.integers(len(charts))]
+        cache.figure(chart_id, int(selection), builders[chart_id])
+    seconds = time.perf_counter() - started
+    stats = cache.stats()
+    if stats["bytes"] > budget:
+        failures += 1
+        print(f"MISMATCH: cache holds {stats['bytes']:,} bytes over its budget of {budget:,}")
+    print(f"\n{args.lookups:,} lookups in {seconds:.1f}s with a {args.budget_mb:g} MiB budget: "
+          f"hit rate {stats['hit_rate']:.1%}, {stats['evictions']:,} evictions, "
+          f"{stats['entries']} entries, {stats['bytes'] / (1 << 20):.2f} MiB")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Check the ordered funnel against a per-journey Python reference and time it.
+
+Computes the session and customer funnels of an existing tables directory
+from its event store, and of a small synthetic sample, both with
+src/funnel.py and by walking every journey's events one by one, and
+requires the same counts and median step times. Then times the funnel on
+--events synthetic events in --sessions sessions, against the previous
+value_counts of EVENT_TYPE. Exits with status 1 on any mismatch.
+
+Usage:
+    python benchmarks/bench_funnel.py [--events 50000000] [--sessions 12000000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.event_store import open_event_store  # noqa: E402
+from src.funnel import FUNNEL_STEPS, FUNNEL_UNITS, funnel_events, ordered_funnel  # noqa: E402
+from src.snapshot import TABLES_DIR  # noqa: E402
+
+
+def reference(journeys, step_numbers, times, steps):
+    """Funnel counts and median step times from a loop over each journey's events."""
+    counts = np.zeros(len(steps), dtype=np.int64)
+    elapsed = [[] for _ in steps]
+    order = np.argsort(journeys, kind='stable')
+    bounds = np.flatnonzero(np.diff(journeys[order])) + 1
+    for rows in np.split(order, bounds):
+        step, reached_at = 0, None
+        for row in rows:
+            if step < len(steps) and step_numbers[row] == step:
+                if reached_at is not None:
+                    elapsed[step].append((times[row] - reached_at) / 1e9)
+                counts[step] += 1
+                reached_at = times[row]
+                step += 1
+    medians = [float(np.median(values)) if values else np.nan for values in elapsed]
+    return counts, medians
+
+
+def synthetic(rng, events, sessions):
+    """Events of random sessions in time order, with step numbers including non-step events (-1 is never stored).
+
+    Sessions are random 63-bit codes, like the label hashes of the event store.
+    """
+    times = np.sort(rng.integers(0, 365 * 86_400, events)).astype(np.int64) * 1_000_000_000
+    journeys = rng.integers(0, 1 << 63, sessions, dtype=np.int64)[rng.integers(0, sessions, events)]
+    # Earlier steps are more frequent, as in a real funnel
+    step_numbers = rng.choice(len(FUNNEL_STEPS), events, p=[0.35, 0.27, 0.18, 0.12, 0.08]).astype(np.int8)
+    return journeys, step_numbers, times
+
+
+def same(result, counts, medians):
+    return (np.array_equal(result['COUNT'].to_numpy(), counts)
+            and np.allclose(result['MEDIAN_SECONDS'].to_numpy(dtype=np.float64), medians, equal_nan=True))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tables-dir", default=TABLES_DIR)
+    parser.add_argument("--events", type=int, default=50_000_000)
+    parser.add_argument("--sessions", type=int, default=12_000_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        store = open_event_store(tables_dir=args.tables_dir, snapshot_dir=snapshot_dir)
+        cases = {f"tables by {by}": funnel_events(store, FUNNEL_STEPS, by) for by in FUNNEL_UNITS}
+        cases["synthetic"] = synthetic(rng, 20_000, 3_000)
+        for name, events in cases.items():
+            if not same(ordered_funnel(*events), *reference(*events, FUNNEL_STEPS)):
+                failures += 1
+                print(f"MISMATCH on {name}")
+        print(f"Checked {len(cases)} funnels, {failures} mismatches")
+
+    journeys, step_numbers, times = synthetic(rng, args.events, args.sessions)
+    started = time.perf_counter()
+    np.bincount(step_numbers, minlength=len(FUNNEL_STEPS))
+    counted = time.perf_counter() - started
+    started = time.perf_counter()
+    funnel = ordered_funnel(journeys, step_numbers, times)
+    ordered = time.perf_counter() - started
+    print(f"\n{args.events:,} events in {args.sessions:,} sessions: event type counts {counted:.2f}s, "
+          f"ordered funnel {ordered:.2f}s")
+    print(funnel.to_string(index=False))
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
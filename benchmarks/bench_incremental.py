@@ -0,0 +1,118 @@
+"""Time incremental ingest of appended rows against full rebuilds.
+
+Copies ORDER_FACT and DIGITAL_EVENT to a scratch directory, holding back the
+newest rows, then appends them in batches the way the pipeline does. After
+each batch the snapshot, the customer aggregate store and the event store are
+updated incrementally and, separately, rebuilt from scratch; both must hold
+the same data. Exits with status 1 on any mismatch.
+
+Usage:
+    python benchmarks/bench_incremental.py [--batches 5] [--tables-dir /data/in/tables]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.customer_store import open_customer_store  # noqa: E402
+from src.event_store import open_event_store  # noqa: E402
+from src.funnel import FUNNEL_UNITS, session_funnel  # noqa: E402
+from src.registry import TableRegistry  # noqa: E402
+from src.schema import SORT_KEYS  # noqa: E402
+from src.snapshot import LOAD_STATS, TABLES_DIR, csv_path, load_table  # noqa: E402
+
+
+def split_history(path, sort_key, batches):
+    """Header plus the CSV's rows ordered by date, split into history and appended batches."""
+    with open(path, "rb") as f:
+        header = f.readline()
+        rows = f.read().splitlines(keepends=True)
+    dates = pd.to_datetime(pd.read_csv(path, usecols=[sort_key])[sort_key])
+    rows = [rows[i] for i in np.argsort(dates.to_numpy(), kind="stable")]
+    history = len(rows) * 3 // 4
+    return header, rows[:history], np.array_split(np.array(rows[history:], dtype=object), batches)
+
+
+def same_customer_store(store, rebuilt):
+    """Whether an incrementally updated customer store matches a rebuilt one (up to float rounding)."""
+    try:
+        pd.testing.assert_frame_equal(store.partials, rebuilt.partials, check_categorical=False)
+        pd.testing.assert_frame_equal(store.totals, rebuilt.totals)
+    except AssertionError:
+        return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batches", type=int, default=5)
+    parser.add_argument("--tables-dir", default=TABLES_DIR)
+    args = parser.parse_args()
+
+    failures = 0
+    scratch = tempfile.mkdtemp()
+    try:
+        tables_dir = os.path.join(scratch, "tables")
+        os.makedirs(tables_dir)
+        for table in ("ORDER_FACT", "DIGITAL_EVENT"):
+            header, history, batches = split_history(csv_path(table, args.tables_dir), SORT_KEYS[table],
+                                                     args.batches)
+            path = csv_path(table, tables_dir)
+            with open(path, "wb") as f:
+                f.write(header + b"".join(history))
+            incremental_dir = os.path.join(scratch, f"{table}.incremental")
+            if table == "DIGITAL_EVENT":
+                open_event_store(tables_dir=tables_dir, snapshot_dir=incremental_dir)
+            else:
+                open_customer_store(TableRegistry(tables_dir, incremental_dir))
+
+            print(f"{table}: {len(history):,} rows of history, {args.batches} appended batches")
+            for i, batch in enumerate(batches):
+                with open(path, "ab") as f:
+                    f.write(b"".join(batch))
+                full_dir = os.path.join(scratch, f"{table}.full{i}")
+                if table == "DIGITAL_EVENT":
+                    started = time.perf_counter()
+                    store = open_event_store(tables_dir=tables_dir, snapshot_dir=incremental_dir)
+                    incremental = time.perf_counter() - started
+                    started = time.perf_counter()
+                    rebuilt = open_event_store(tables_dir=tables_dir, snapshot_dir=full_dir)
+                    full = time.perf_counter() - started
+                    same = store.count() == rebuilt.count() and all(
+                        store.value_counts(column).sort_index().equals(rebuilt.value_counts(column).sort_index())
+                        for column in store.dictionaries) and all(
+                        session_funnel(store, by=by).equals(session_funnel(rebuilt, by=by)) for by in FUNNEL_UNITS)
+                    how = f"generation {store.manifest.get('generation')}"
+                else:
+                    started = time.perf_counter()
+                    df = load_table(table, tables_dir, incremental_dir)
+                    incremental = time.perf_counter() - started
+                    how = LOAD_STATS[table]["source"]
+                    started = time.perf_counter()
+                    rebuilt = load_table(table, tables_dir, full_dir)
+                    full = time.perf_counter() - started
+                    same = df.equals(rebuilt)
+                    started = time.perf_counter()
+                    customers = open_customer_store(TableRegistry(tables_dir, incremental_dir))
+                    incremental += time.perf_counter() - started
+                    started = time.perf_counter()
+                    rebuilt_customers = open_customer_store(TableRegistry(tables_dir, full_dir))
+                    full += time.perf_counter() - started
+                    same = same and same_customer_store(customers, rebuilt_customers)
+                failures += not same
+                print(f"  batch {i + 1}: +{len(batch):,} rows | incremental {incremental:.3f}s ({how}), "
+                      f"full rebuild {full:.3f}s | {'ok' if same else 'MISMATCH'}")
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Measure the rerun time saved by parsing dates and currencies at ingest.
+
+"Before" replays the dashboard's old per-rerun work on raw CSV columns:
+pd.to_datetime on every date column, then the date filters, plus the BUDGET
+string cleanup. "After" runs the same filters on the typed columns produced by
+src/schema.py.
+
+Usage:
+    python benchmarks/bench_ingest.py [--tables-dir /data/in/tables] [--repeat 5]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.schema import DATETIME, TABLE_SCHEMAS, parse_currency, read_csv, usecols  # noqa: E402
+from src.snapshot import TABLES_DIR, csv_path  # noqa: E402
+
+# Date column filtered on each rerun, per table
+DATE_FILTERS = {
+    "ORDER_FACT": "ORDER_DATE",
+    "DIGITAL_EVENT": "EVENT_DATE",
+    "PAGE_PERFORMANCE": "DATE",
+}
+
+
+def rerun(tables, start_date, end_date, parse):
+    """One pass of the dashboard's date filtering over all time-keyed tables."""
+    for table, column in DATE_FILTERS.items():
+        df = tables[table]
+        dates = pd.to_datetime(df[column]) if parse else df[column]
+        df[(dates >= start_date) & (dates <= end_date)]
+
+    campaign = tables["CAMPAIGN"]
+    starts = pd.to_datetime(campaign["START_DATE"]) if parse else campaign["START_DATE"]
+    ends = pd.to_datetime(campaign["END_DATE"]) if parse else campaign["END_DATE"]
+    campaign = campaign[(starts <= end_date) & (ends >= start_date)]
+    if parse:
+        parse_currency(campaign["BUDGET"])
+
+    sales_plan = tables["SALES_PLAN"]
+    plan_starts = pd.to_datetime(sales_plan["PLAN_START_DATE"]) if parse else sales_plan["PLAN_START_DATE"]
+    plan_ends = pd.to_datetime(sales_plan["PLAN_END_DATE"]) if parse else sales_plan["PLAN_END_DATE"]
+    sales_plan[(plan_starts <= end_date) & (plan_ends >= start_date)]
+
+
+def timed(tables, start_date, end_date, parse, repeat):
+    """Median seconds of `repeat` reruns."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rerun(tables, start_date, end_date, parse)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tables-dir", default=TABLES_DIR)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    names = list(DATE_FILTERS) + ["CAMPAIGN", "SALES_PLAN"]
+    raw = {table: pd.read_csv(csv_path(table, args.tables_dir), usecols=usecols(table)) for table in names}
+    typed = {table: read_csv(csv_path(table, args.tables_dir), table) for table in names}
+
+    end_date = typed["ORDER_FACT"]["ORDER_DATE"].max().normalize()
+    start_date = end_date - pd.DateOffset(years=1)
+    before = timed(raw, start_date, end_date, True, args.repeat)
+    after = timed(typed, start_date, end_date, False, args.repeat)
+
+    date_columns = sum(dtype == DATETIME for table in names for dtype in TABLE_SCHEMAS[table].values())
+    print(f"Tables: {', '.join(names)} ({date_columns} date columns)")
+    print(f"Per-rerun filter path, parse on every rerun: {before * 1000:,.1f} ms")
+    print(f"Per-rerun filter path, parsed at ingest:     {after * 1000:,.1f} ms")
+    print(f"Saved per rerun: {(before - after) * 1000:,.1f} ms ({before / after:,.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
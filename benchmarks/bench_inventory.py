@@ -0,0 +1,102 @@
+"""Check the inventory engine against a pandas reference and time it on millions of variants.
+
+Computes rolling 7/30/90-day units, days of cover, stock-out dates and stock
+status per variant of an existing tables directory with src/inventory.py
+and with a straightforward merge/groupby/apply implementation, and requires
+identical results. Then times the engine on --variants synthetic variants
+with --lines order lines. Exits with status 1 on any mismatch.
+
+Usage:
+    python benchmarks/bench_inventory.py [--tables-dir /data/in/tables] [--variants 2000000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.inventory import COVER_WINDOW, VELOCITY_WINDOWS, inventory_engine  # noqa: E402
+from src.keys import DimensionKeys  # noqa: E402
+from src.registry import TableRegistry  # noqa: E402
+from src.snapshot import TABLES_DIR  # noqa: E402
+
+
+def status(qty):
+    if qty <= 5:
+        return "Critical (0-5)"
+    elif qty <= 20:
+        return "Low (6-20)"
+    elif qty <= 50:
+        return "Medium (21-50)"
+    return "High (50+)"
+
+
+def reference(product_variant, order_line, order_fact, as_of):
+    """Per-variant units, cover and status computed with merges, groupbys and apply."""
+    lines = order_line.merge(order_fact[['ORDER_ID', 'ORDER_DATE']], on='ORDER_ID')
+    lines['AGE'] = (as_of - lines['ORDER_DATE'].dt.floor('D')).dt.days
+    result = product_variant.copy()
+    result['INVENTORY_STATUS'] = result['INVENTORY_QTY'].apply(status)
+    for window in VELOCITY_WINDOWS:
+        recent = lines[(lines['AGE'] >= 0) & (lines['AGE'] < window)]
+        units = recent.groupby('VARIANT_ID')['QUANTITY'].sum()
+        result[f'UNITS_{window}D'] = result['VARIANT_ID'].map(units).fillna(0).astype(float)
+    velocity = result[f'UNITS_{COVER_WINDOW}D'] / COVER_WINDOW
+    result['DAYS_OF_COVER'] = (result['INVENTORY_QTY'].clip(lower=0) / velocity).where(velocity > 0)
+    return result
+
+
+def synthetic(rng, variants, lines, as_of):
+    """Variants with random stock and order lines over the last 120 days, with keys as the registry adds them."""
+    product_variant = pd.DataFrame({
+        'VARIANT_ID': np.arange(variants).astype(str),
+        'INVENTORY_QTY': rng.integers(0, 200, variants).astype(np.int32),
+    })
+    order_fact = pd.DataFrame({
+        'ORDER_ID': np.arange(lines // 2).astype(str),
+        'ORDER_DATE': as_of - pd.to_timedelta(rng.integers(0, 120, lines // 2), unit='D'),
+    })
+    order_line = pd.DataFrame({
+        'ORDER_ID': order_fact['ORDER_ID'].to_numpy()[rng.integers(0, len(order_fact), lines)],
+        'VARIANT_ID': product_variant['VARIANT_ID'].to_numpy()[rng.integers(0, variants, lines)],
+        'QUANTITY': rng.integers(1, 5, lines).astype(np.int32),
+    })
+    keys = DimensionKeys()
+    return keys.add_keys(product_variant), keys.add_keys(order_line), keys.add_keys(order_fact)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tables-dir", default=TABLES_DIR)
+    parser.add_argument("--variants", type=int, default=2_000_000)
+    parser.add_argument("--lines", type=int, default=10_000_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    registry = TableRegistry(args.tables_dir)
+    product_variant = registry.get("PRODUCT_VARIANT")
+    order_line = registry.get("ORDER_LINE")
+    order_fact = registry.get("ORDER_FACT")
+    as_of = order_fact['ORDER_DATE'].max().floor('D')
+    engine = inventory_engine(product_variant, order_line, order_fact, as_of)
+    expected = reference(product_variant, order_line, order_fact, as_of)
+    columns = [f'UNITS_{window}D' for window in VELOCITY_WINDOWS] + ['DAYS_OF_COVER']
+    same = engine[columns].equals(expected[columns]) and np.array_equal(
+        engine['INVENTORY_STATUS'].astype(str).to_numpy(), expected['INVENTORY_STATUS'].to_numpy())
+    print(f"{len(product_variant):,} variants as of {as_of.date()}: {'ok' if same else 'MISMATCH'}")
+
+    as_of = pd.Timestamp.now().normalize()
+    product_variant, order_line, order_fact = synthetic(np.random.default_rng(args.seed), args.variants,
+                                                        args.lines, as_of)
+    started = time.perf_counter()
+    inventory_engine(product_variant, order_line, order_fact, as_of)
+    print(f"Engine: {time.perf_counter() - started:.2f}s for {args.variants:,} variants, {args.lines:,} lines")
+    sys.exit(0 if same else 1)
+
+
+if __name__ == "__main__":
+    main()
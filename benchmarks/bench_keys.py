@@ -0,0 +1,102 @@
+"""Check the key-based star joins against the hash merges they replace and time both.
+
+Builds product_sales, customer_orders and campaign_performance for several
+date ranges both with `DataFrame.merge` on the ID strings and with
+src/keys.py's `join` on the int32 surrogate keys. The frames must be equal
+(apart from the extra key columns). Exits with status 1 on any mismatch.
+
+Usage:
+    python benchmarks/bench_keys.py [--tables-dir /data/in/tables]
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.date_index import date_slice  # noqa: E402
+from src.keys import KEY_COLUMNS, join, semi_join  # noqa: E402
+from src.registry import TableRegistry  # noqa: E402
+from src.snapshot import TABLES_DIR  # noqa: E402
+
+
+def merged(tables):
+    """The original merge chains over the ID strings."""
+    order_line, order_fact = tables["ORDER_LINE"], tables["ORDER_FACT"]
+    product, product_variant = tables["PRODUCT"], tables["PRODUCT_VARIANT"]
+    order_line = order_line[order_line['ORDER_ID'].isin(order_fact['ORDER_ID'].values)]
+    product_sales = (order_line.merge(order_fact[['ORDER_ID', 'ORDER_DATE', 'ORDER_STATUS']], on='ORDER_ID')
+                     .merge(product[['PRODUCT_ID', 'NAME', 'CATEGORY', 'BRAND', 'PRICE']], on='PRODUCT_ID')
+                     .merge(product_variant[['VARIANT_ID', 'PRODUCT_ID', 'VARIANT_NAME', 'INVENTORY_QTY']],
+                            on=['PRODUCT_ID', 'VARIANT_ID'], how='left'))
+    customer = tables["CUSTOMER"][['CUSTOMER_ID', 'NAME', 'PRIMARY_EMAIL', 'CUSTOMER_TYPE']]
+    customer_orders = order_fact.merge(customer, on='CUSTOMER_ID', how='left')
+    campaign_performance = (tables["ORDER_CAMPAIGN_ATTRIBUTION"].merge(
+        tables["CAMPAIGN"][['CAMPAIGN_ID', 'CAMPAIGN_NAME', 'CAMPAIGN_TYPE', 'BUDGET']], on='CAMPAIGN_ID'
+    ).merge(order_fact[['ORDER_ID', 'TOTAL_AMOUNT']], on='ORDER_ID'))
+    return product_sales, customer_orders, campaign_performance
+
+
+def keyed(tables):
+    """The same frames joined on the surrogate keys."""
+    order_line, order_fact = tables["ORDER_LINE"], tables["ORDER_FACT"]
+    order_line = semi_join(order_line, order_fact, 'ORDER_ID')
+    product_sales = join(order_line, order_fact, 'ORDER_ID', ['ORDER_DATE', 'ORDER_STATUS'])
+    product_sales = join(product_sales, tables["PRODUCT"], 'PRODUCT_ID', ['NAME', 'CATEGORY', 'BRAND', 'PRICE'])
+    product_sales = join(product_sales, tables["PRODUCT_VARIANT"], ['VARIANT_ID', 'PRODUCT_ID'],
+                         ['VARIANT_NAME', 'INVENTORY_QTY'], how='left')
+    customer_orders = join(order_fact, tables["CUSTOMER"], 'CUSTOMER_ID', ['NAME', 'PRIMARY_EMAIL', 'CUSTOMER_TYPE'],
+                           how='left')
+    campaign_performance = join(tables["ORDER_CAMPAIGN_ATTRIBUTION"], tables["CAMPAIGN"], 'CAMPAIGN_ID',
+                                ['CAMPAIGN_NAME', 'CAMPAIGN_TYPE', 'BUDGET'])
+    campaign_performance = join(campaign_performance, order_fact, 'ORDER_ID', ['TOTAL_AMOUNT'])
+    return product_sales, customer_orders, campaign_performance
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tables-dir", default=TABLES_DIR)
+    args = parser.parse_args()
+
+    registry = TableRegistry(args.tables_dir)
+    names = ["ORDER_LINE", "ORDER_FACT", "PRODUCT", "PRODUCT_VARIANT", "CUSTOMER", "CAMPAIGN",
+             "ORDER_CAMPAIGN_ATTRIBUTION"]
+    tables = {name: registry.get(name) for name in names}
+    print(f"Encoded IDs: {registry.keys.sizes()}")
+
+    order_fact = tables["ORDER_FACT"]
+    last = order_fact['ORDER_DATE'].max().normalize()
+    ranges = [(order_fact['ORDER_DATE'].min().normalize(), last), (last - pd.DateOffset(years=1), last),
+              (last - pd.Timedelta(days=30), last)]
+    key_columns = list(KEY_COLUMNS.values())
+
+    merge_seconds = key_seconds = 0.0
+    failures = 0
+    for start_date, end_date in ranges:
+        view = {**tables, "ORDER_FACT": date_slice(order_fact, 'ORDER_DATE', start_date, end_date)}
+        started = time.perf_counter()
+        expected = merged(view)
+        merge_seconds += time.perf_counter() - started
+        started = time.perf_counter()
+        answered = keyed(view)
+        key_seconds += time.perf_counter() - started
+
+        for name, left, right in zip(["product_sales", "customer_orders", "campaign_performance"], expected, answered):
+            left = left.drop(columns=[column for column in key_columns if column in left.columns])
+            right = right.drop(columns=[column for column in key_columns if column in right.columns])
+            try:
+                pd.testing.assert_frame_equal(left.reset_index(drop=True), right)
+            except AssertionError as error:
+                failures += 1
+                print(f"MISMATCH in {name} for {start_date.date()}..{end_date.date()}: {error}")
+
+    print(f"Checked {len(ranges) * 3} joins, {failures} mismatches")
+    print(f"Merges {merge_seconds:.3f}s, key joins {key_seconds:.3f}s ({merge_seconds / key_seconds:,.1f}x)")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Compare eager loading of every input table with lazy per-section loading.
+
+Usage:
+    python benchmarks/bench_registry.py [--tables-dir /data/in/tables] [--tab Sales]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.registry import TAB_DEPENDENCIES, TableRegistry  # noqa: E402
+from src.snapshot import TABLES_DIR, load_table  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tables-dir", default=TABLES_DIR)
+    parser.add_argument("--tab", default="Sales", choices=sorted(TAB_DEPENDENCIES))
+    args = parser.parse_args()
+
+    tables = sorted(f[:-4] for f in os.listdir(args.tables_dir) if f.endswith(".csv"))
+    # Warm the snapshots so both sides measure steady-state loads
+    for table in tables:
+        load_table(table, args.tables_dir)
+
+    started = time.perf_counter()
+    eager = {table: load_table(table, args.tables_dir) for table in tables}
+    eager_seconds = time.perf_counter() - started
+    eager_bytes = sum(int(df.memory_usage(deep=True).sum()) for df in eager.values())
+
+    registry = TableRegistry(args.tables_dir)
+    started = time.perf_counter()
+    for section in ("Filters", args.tab):
+        registry.tables_for(section)
+    lazy_seconds = time.perf_counter() - started
+    lazy_bytes = sum(registry.memory_usage().values())
+
+    print(f"Eager: {len(eager)} tables, {eager_seconds:.3f}s, {eager_bytes / 1e6:,.1f} MB")
+    print(f"Lazy ({args.tab}): {len(registry.loaded())} tables {registry.loaded()}, "
+          f"{lazy_seconds:.3f}s, {lazy_bytes / 1e6:,.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Check the WebGL rendering policy and build full-catalog price/revenue scatters.
+
+Checks that traces of up to WEBGL_THRESHOLD points stay SVG in "auto" mode
+and larger ones switch to Scattergl, for go traces and plotly express
+alike. Then builds the Product tab's Price vs. Revenue scatter for catalogs
+of growing size with the policy's render mode and reports the trace type,
+build time and JSON size; the browser then draws one WebGL canvas per trace
+instead of one SVG element per product. Exits with status 1 on any mismatch.
+
+Usage:
+    python benchmarks/bench_render.py [--products 1000 10000 100000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.render import WEBGL_THRESHOLD, px_render_mode, scatter_trace  # noqa: E402
+
+CATEGORIES = ['Electronics', 'Clothing', 'Home', 'Sports', 'Beauty', 'Toys', 'Books']
+
+
+def product_performance(rng, products):
+    """Synthetic product rows with the columns of the Product tab's performance table."""
+    return pd.DataFrame({
+        'NAME': [f'Product {i}' for i in range(products)],
+        'CATEGORY': rng.choice(CATEGORIES, products),
+        'PRICE': rng.gamma(2.0, 60.0, products).round(2),
+        'QUANTITY': rng.poisson(30, products),
+        'REVENUE': rng.gamma(1.5, 4000.0, products).round(2),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, nargs="+", default=[1000, 10_000, 100_000])
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
+
+    failures = 0
+    for points in (10, WEBGL_THRESHOLD, WEBGL_THRESHOLD + 1):
+        expected = "scattergl" if points > WEBGL_THRESHOLD else "scatter"
+        trace = scatter_trace(np.arange(points), np.arange(points), render="auto", mode='lines')
+        frame = pd.DataFrame({'x': np.arange(points), 'y': np.arange(points)})
+        figure = px.scatter(frame, x='x', y='y', render_mode=px_render_mode(points, "auto"))
+        if trace.type != expected or figure.data[0].type != expected:
+            failures += 1
+            print(f"MISMATCH: {points} points drawn as {trace.type} / {figure.data[0].type}, expected {expected}")
+    print(f"Checked the render policy around {WEBGL_THRESHOLD} points, {failures} mismatches\n")
+
+    for products in args.products:
+        rows = product_performance(rng, products)
+        started = time.perf_counter()
+        figure = px.scatter(rows, x='PRICE', y='REVENUE', size='QUANTITY', color='CATEGORY', hover_name='NAME',
+                            render_mode=px_render_mode(len(rows)))
+        built = time.perf_counter() - started
+        payload = figure.to_json()
+        print(f"{products:8,} products: {figure.data[0].type:9} x {len(figure.data)} traces, "
+              f"built in {built * 1000:6.1f} ms, {len(payload) / 1024:8.1f} KiB")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
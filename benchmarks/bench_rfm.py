@@ -0,0 +1,122 @@
+"""Check the vectorized RFM engine against the original pandas segmentation and time it.
+
+Draws synthetic per-customer recency, order counts and spend (including
+heavily tied and few-distinct-value samples), segments them with both the
+original qcut/cut + string-score implementation and src/rfm.py, and requires
+identical R/F/M scores, segments and segment counts. Then times the engine
+on --customers customers. Exits with status 1 on any mismatch.
+
+Usage:
+    python benchmarks/bench_rfm.py [--customers 10000000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.rfm import rfm_scores, segment_counts, segments  # noqa: E402
+
+
+def quartile_labels(series, labels):
+    """The Customer tab's original frequency/monetary binning."""
+    unique_values = series.unique()
+    n_unique = len(unique_values)
+    if n_unique == 1:
+        return pd.Series(labels[0], index=series.index)
+    elif n_unique < 4:
+        bins = np.sort(unique_values)
+        return pd.cut(series, bins=bins, labels=labels[:len(bins)-1], include_lowest=True)
+    percentiles = np.unique(np.percentile(series.unique(), [0, 25, 50, 75, 100]))
+    return pd.cut(series, bins=percentiles, labels=labels[:len(percentiles) - 1], include_lowest=True)
+
+
+def segment_name(rfm_score):
+    score = int(rfm_score[0]) + int(rfm_score[1]) + int(rfm_score[2])
+    if score >= 11:
+        return 'Champions'
+    elif score >= 9:
+        return 'Loyal Customers'
+    elif score >= 7:
+        return 'Potential Loyalists'
+    elif score >= 5:
+        return 'At Risk'
+    return 'Lost Customers'
+
+
+def original(metrics):
+    """R, F, M, segment and segment counts as the tab computed them before."""
+    metrics = metrics.copy()
+    metrics['R'] = pd.qcut(metrics['DAYS_SINCE_LAST_ORDER'], q=4, labels=range(4, 0, -1))
+    metrics['F'] = quartile_labels(metrics['ORDER_COUNT'], range(1, 5))
+    metrics['M'] = quartile_labels(metrics['TOTAL_SPENT'], range(1, 5))
+    metrics[['R', 'F', 'M']] = metrics[['R', 'F', 'M']].fillna(1)
+    score = metrics['R'].astype(str) + metrics['F'].astype(str) + metrics['M'].astype(str)
+    metrics['SEGMENT'] = score.apply(segment_name)
+    counts = metrics['SEGMENT'].value_counts().reset_index()
+    counts.columns = ['Segment', 'Count']
+    return metrics, counts
+
+
+def sample(rng, customers, distinct_counts=None):
+    """Synthetic per-customer metrics; distinct_counts limits the distinct order counts."""
+    order_count = rng.geometric(0.35, customers)
+    if distinct_counts is not None:
+        order_count = rng.integers(1, distinct_counts + 1, customers)
+    return pd.DataFrame({
+        'DAYS_SINCE_LAST_ORDER': rng.integers(0, 1100, customers),
+        'ORDER_COUNT': order_count,
+        'TOTAL_SPENT': np.round(order_count * rng.gamma(2.0, 60.0, customers), 2),
+    })
+
+
+def engine(metrics):
+    r, f, m = rfm_scores(metrics['DAYS_SINCE_LAST_ORDER'].to_numpy(),
+                         metrics['ORDER_COUNT'].to_numpy(), metrics['TOTAL_SPENT'].to_numpy())
+    segment = segments(r, f, m)
+    return r, f, m, segment, segment_counts(segment)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--customers", type=int, default=10_000_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
+
+    cases = {f"{n:,} customers": sample(rng, n) for n in (7, 100, 5_000, 200_000)}
+    cases.update({f"{n} distinct order counts": sample(rng, 1_000, n) for n in (1, 2, 3)})
+    missing = sample(rng, 1_000)
+    missing.loc[::7, 'DAYS_SINCE_LAST_ORDER'] = np.nan
+    cases["missing recency"] = missing
+    failures = 0
+    for name, metrics in cases.items():
+        expected, expected_counts = original(metrics)
+        r, f, m, segment, counts = engine(metrics)
+        same = (np.array_equal(expected['R'].astype(int), r) and np.array_equal(expected['F'].astype(int), f)
+                and np.array_equal(expected['M'].astype(int), m)
+                and np.array_equal(expected['SEGMENT'].to_numpy(dtype=object), np.asarray(segment, dtype=object))
+                and expected_counts.equals(counts))
+        if not same:
+            failures += 1
+            print(f"MISMATCH for {name}")
+    print(f"Checked {len(cases)} samples, {failures} mismatches")
+
+    metrics = sample(rng, args.customers)
+    started = time.perf_counter()
+    original(metrics.head(1_000_000))
+    original_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    engine(metrics)
+    engine_seconds = time.perf_counter() - started
+    print(f"Original: {original_seconds:.2f}s for 1,000,000 customers")
+    print(f"Engine:   {engine_seconds:.2f}s for {args.customers:,} customers")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Report per-table memory and value_counts time with and without the schemas.
+
+"Before" is a plain pd.read_csv of the whole file; "after" reads it through
+src/schema.py (usecols, categorical and downcast dtypes).
+
+Usage:
+    python benchmarks/bench_schema.py [--tables-dir /data/in/tables]
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.schema import CATEGORY, TABLE_SCHEMAS, read_csv  # noqa: E402
+from src.snapshot import TABLES_DIR, csv_path  # noqa: E402
+
+
+def value_counts_seconds(df, columns):
+    """Time value_counts over the given columns."""
+    started = time.perf_counter()
+    for column in columns:
+        df[column].value_counts()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tables-dir", default=TABLES_DIR)
+    args = parser.parse_args()
+
+    rows = []
+    for table, schema in sorted(TABLE_SCHEMAS.items()):
+        path = csv_path(table, args.tables_dir)
+        before = pd.read_csv(path)
+        after = read_csv(path, table)
+        categorical = [column for column, dtype in schema.items() if dtype == CATEGORY]
+        before_mb = before.memory_usage(deep=True).sum() / 1e6
+        after_mb = after.memory_usage(deep=True).sum() / 1e6
+        rows.append({
+            "TABLE": table,
+            "ROWS": len(after),
+            "COLS_BEFORE": before.shape[1],
+            "COLS_AFTER": after.shape[1],
+            "MB_BEFORE": before_mb,
+            "MB_AFTER": after_mb,
+            "REDUCTION": before_mb / after_mb if after_mb else float("nan"),
+            "VC_S_BEFORE": value_counts_seconds(before, categorical),
+            "VC_S_AFTER": value_counts_seconds(after, categorical),
+        })
+
+    report = pd.DataFrame(rows)
+    pd.set_option("display.width", 200)
+    print(report.to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+    print(f"\nTotal {report['MB_BEFORE'].sum():,.1f} MB -> {report['MB_AFTER'].sum():,.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
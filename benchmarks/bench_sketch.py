@@ -0,0 +1,114 @@
+"""Check quantile sketches against exact quantiles and time them.
+
+Draws synthetic prices, spend and recency, sketches them per partition and
+merges the partial sketches, and requires:
+
+- the merged sketch to equal a sketch of all values at once,
+- every estimated quantile to be within the relative accuracy of the order
+  statistic the bound refers to (see src/sketch.py).
+
+Then times exact percentiles against sketching on --values values, reports
+how many customers sketched recency quartiles score differently, and times
+the recency sketch merged from per-day partitions against sketching every
+customer (the two must be equal).
+Exits with status 1 on any violation.
+
+Usage:
+    python benchmarks/bench_sketch.py [--values 10000000] [--partitions 16]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.rfm import last_order_counts, recency_sketch, rfm_scores  # noqa: E402
+from src.sketch import DEFAULT_RELATIVE_ACCURACY, QuantileSketch, merge_sketches  # noqa: E402
+
+QS = np.array([0, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 1])
+
+
+def samples(rng, size):
+    """Synthetic measures with different shapes, including zeros, ties and negatives."""
+    return {
+        "price": np.round(rng.lognormal(3.5, 1.0, size), 2),
+        "spend": np.round(rng.gamma(2.0, 60.0, size), 2),
+        "recency": rng.integers(0, 1100, size).astype(np.float64),
+        "margin": rng.normal(0, 25, size),
+    }
+
+
+def within_bound(sketch, values):
+    """Whether every estimate is within the relative accuracy of its order statistic."""
+    ordered = np.sort(values)
+    expected = ordered[np.floor(QS * (len(values) - 1)).astype(int)]
+    error = np.abs(sketch.quantiles(QS) - expected)
+    return bool(np.all(error <= DEFAULT_RELATIVE_ACCURACY * np.abs(expected) + 1e-9))
+
+
+def same_sketch(a, b):
+    return (a.count == b.count and a.zero_count == b.zero_count and a.min == b.min and a.max == b.max
+            and np.array_equal(a.quantiles(QS), b.quantiles(QS)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--values", type=int, default=10_000_000)
+    parser.add_argument("--partitions", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
+
+    failures = 0
+    for size in (1, 10, 1_000, 200_000):
+        for name, values in samples(rng, size).items():
+            partials = [QuantileSketch().add(part) for part in np.array_split(values, args.partitions)]
+            merged = merge_sketches(partials)
+            if not same_sketch(merged, QuantileSketch().add(values)) or not within_bound(merged, values):
+                failures += 1
+                print(f"VIOLATION for {name} ({size:,} values)")
+    print(f"Checked 16 samples at relative accuracy {DEFAULT_RELATIVE_ACCURACY}, {failures} violations")
+
+    print(f"\n{args.values:,} values, {args.partitions} partitions (s)")
+    for name, values in samples(rng, args.values).items():
+        started = time.perf_counter()
+        np.percentile(values, QS * 100)
+        exact = time.perf_counter() - started
+        started = time.perf_counter()
+        partials = [QuantileSketch().add(part) for part in np.array_split(values, args.partitions)]
+        sketched = time.perf_counter() - started
+        started = time.perf_counter()
+        merge_sketches(partials).quantiles(QS)
+        merged = time.perf_counter() - started
+        print(f"  {name:8} exact {exact:.3f} | sketch partitions {sketched:.3f} | merge + query {merged:.4f}")
+
+    measures = samples(rng, min(args.values, 2_000_000))
+    order_count = rng.geometric(0.35, len(measures["spend"]))
+    exact = rfm_scores(measures["recency"], order_count, measures["spend"], mode="exact")
+    sketched = rfm_scores(measures["recency"], order_count, measures["spend"], mode="sketch")
+    print(f"  R scores changed by sketched quartiles: {np.mean(exact[0] != sketched[0]):.4%} of customers")
+
+    # Recency sketched from every customer, or merged from the customers per last-order day
+    as_of = pd.Timestamp("2025-01-01")
+    last_order = pd.Series(as_of - pd.to_timedelta(measures["recency"], unit="D"))
+    counts = last_order_counts(last_order)
+    started = time.perf_counter()
+    from_customers = QuantileSketch.from_values(measures["recency"])
+    per_customer = time.perf_counter() - started
+    started = time.perf_counter()
+    from_days = recency_sketch(counts, as_of)
+    per_day = time.perf_counter() - started
+    if not same_sketch(from_days, from_customers):
+        failures += 1
+        print("VIOLATION: recency sketch merged per day differs from the per-customer one")
+    print(f"  recency sketch from {len(last_order):,} customers {per_customer:.4f}s, "
+          f"merged from {len(counts):,} last-order days {per_day:.4f}s")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Report cold and warm load times for every input table.
+
+Cold = parse the CSV and write the Parquet snapshot (first sight of a file).
+Warm = serve the load from a valid snapshot.
+
+Usage:
+    python benchmarks/bench_snapshot.py [--tables-dir /data/in/tables]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.snapshot import LOAD_STATS, TABLES_DIR, load_table  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tables-dir", default=TABLES_DIR)
+    args = parser.parse_args()
+
+    tables = sorted(f[:-4] for f in os.listdir(args.tables_dir) if f.endswith(".csv"))
+    rows = []
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        for table in tables:
+            started = time.perf_counter()
+            pd.read_csv(os.path.join(args.tables_dir, f"{table}.csv"))
+            csv_seconds = time.perf_counter() - started
+
+            load_table(table, args.tables_dir, snapshot_dir)
+            cold = LOAD_STATS[table]
+            load_table(table, args.tables_dir, snapshot_dir)
+            warm = LOAD_STATS[table]
+            rows.append({
+                "TABLE": table,
+                "ROWS": warm["rows"],
+                "CSV_S": csv_seconds,
+                "COLD_S": cold["seconds"],
+                "WARM_S": warm["seconds"],
+                "WARM_SOURCE": warm["source"],
+                "SPEEDUP": csv_seconds / warm["seconds"] if warm["seconds"] else float("nan"),
+            })
+
+    report = pd.DataFrame(rows)
+    pd.set_option("display.width", 200)
+    print(report.to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+    print(f"\nTotal CSV {report['CSV_S'].sum():.3f}s, cold {report['COLD_S'].sum():.3f}s, warm {report['WARM_S'].sum():.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Time the Detailed Product Performance table: formatting every row against one page.
+
+Builds a synthetic product_performance frame with --products rows, then times
+the original per-row string formatting of the whole frame against the
+server-side search/sort plus page slice of src/table_page.py, and compares
+the Arrow payload sizes that st.dataframe would send.
+
+Usage:
+    python benchmarks/bench_table_page.py [--products 500000] [--page-size 50]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.table_page import page_slice, search_and_sort  # noqa: E402
+
+
+def product_performance(rng, products):
+    """Synthetic per-product metrics shaped like product_analysis()['product_performance']."""
+    quantity = rng.integers(1, 500, products)
+    orders = np.maximum(1, quantity // 2)
+    revenue = np.round(quantity * rng.gamma(2.0, 25.0, products), 2)
+    return pd.DataFrame({
+        'PRODUCT_ID': [f"P{i:07d}" for i in range(products)],
+        'NAME': [f"Product {i}" for i in range(products)],
+        'CATEGORY': pd.Categorical(rng.choice(['Books', 'Toys', 'Beauty', 'Sports'], products)),
+        'BRAND': pd.Categorical(rng.choice([f"Brand {i}" for i in range(200)], products)),
+        'PRICE': np.round(rng.gamma(2.0, 25.0, products), 2),
+        'QUANTITY': quantity,
+        'REVENUE': revenue,
+        'ORDER_ID': orders,
+        'PROFIT_MARGIN': rng.normal(40, 5, products),
+        'AVG_ORDER_VALUE': revenue / orders,
+    }).sort_values('REVENUE', ascending=False)
+
+
+def formatted(df):
+    """The table as the tab formatted it before."""
+    table = df.copy()
+    table['REVENUE'] = table['REVENUE'].apply(lambda x: f"${x:,.2f}")
+    table['AVG_ORDER_VALUE'] = table['AVG_ORDER_VALUE'].apply(lambda x: f"${x:,.2f}")
+    table['PRICE'] = table['PRICE'].apply(lambda x: f"${x:,.2f}")
+    table['PROFIT_MARGIN'] = table['PROFIT_MARGIN'].apply(lambda x: f"{x:.1f}%")
+    return table
+
+
+def payload(df):
+    """Bytes of the Arrow IPC stream of a frame."""
+    sink = pa.BufferOutputStream()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=500_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    df = product_performance(np.random.default_rng(args.seed), args.products)
+
+    started = time.perf_counter()
+    table = formatted(df)
+    original = time.perf_counter() - started
+    print(f"Formatted table:   {original:.3f}s, {payload(table) / 1e6:,.1f} MB payload")
+
+    for search, sort_by in (("", 'REVENUE'), ("", 'NAME'), ("brand 1", 'PROFIT_MARGIN')):
+        started = time.perf_counter()
+        rows = search_and_sort(df, search, ['NAME', 'CATEGORY', 'BRAND'], sort_by, False)
+        page, _ = page_slice(rows, 2, args.page_size)
+        elapsed = time.perf_counter() - started
+        print(f"Page ({search or 'no search'!r}, by {sort_by}): {elapsed:.3f}s, {len(rows):,} matching rows, "
+              f"{payload(page) / 1e3:,.1f} kB payload")
+
+
+if __name__ == "__main__":
+    main()
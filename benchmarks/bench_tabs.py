@@ -0,0 +1,177 @@
+"""Time table loading, filtering and every dashboard tab separately.
+
+Generates a synthetic data set at the requested scale factor (or uses an
+existing tables directory), then:
+
+1. times the cold (CSV -> snapshot) and warm (snapshot) load of every table
+   the dashboard reads, and
+2. runs Dashboard.py headless through Streamlit's AppTest for a few sidebar
+   filter scenarios, reporting the median time of each section recorded by
+   src/perf.py (Load, Filters and one entry per tab). The dashboard runs in
+   "tabs" navigation mode so that every tab runs on each rerun (see
+   src/navigation.py). The first run of the process is reported separately
+   as "cold".
+
+Results can be saved as JSON and compared against a saved baseline; the
+script exits with status 1 if any section got slower than the tolerance.
+
+The report goes to stdout; Streamlit's own warnings go to stderr.
+
+Usage:
+    python benchmarks/bench_tabs.py --scale 10 [--reruns 3] [--save sf10.json]
+    python benchmarks/bench_tabs.py --scale 10 --compare sf10.json [--tolerance 0.25]
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generate_data import write_tables  # noqa: E402
+
+# Sidebar selections applied on top of the default "Current Year / All" view
+SCENARIOS = {
+    "default": {},
+    "full history": {"Date Filter Type": "Custom"},
+    "category": {"Date Filter Type": "Year to Date", "Product Category": "Electronics"},
+    "channel+payment": {"Date Filter Type": "Year to Date", "Sales Channel": "Web Store",
+                        "Payment Method": "PayPal"},
+}
+
+# Differences below this many seconds are noise and never count as regressions
+MIN_REGRESSION_SECONDS = 0.005
+
+
+def time_loads(tables_dir, snapshot_dir):
+    """Cold and warm load seconds of every table the dashboard reads."""
+    from src.event_store import open_event_store
+    from src.registry import TAB_DEPENDENCIES
+    from src.snapshot import LOAD_STATS, load_table
+
+    tables = sorted({table for dependencies in TAB_DEPENDENCIES.values() for table in dependencies})
+    loads = {}
+    for table in tables:
+        load_table(table, tables_dir, snapshot_dir)
+        cold = LOAD_STATS[table]["seconds"]
+        load_table(table, tables_dir, snapshot_dir)
+        loads[table] = {"rows": LOAD_STATS[table]["rows"], "cold": cold, "warm": LOAD_STATS[table]["seconds"]}
+
+    started = time.perf_counter()
+    store = open_event_store(tables_dir=tables_dir, snapshot_dir=snapshot_dir)
+    cold = time.perf_counter() - started
+    started = time.perf_counter()
+    open_event_store(tables_dir=tables_dir, snapshot_dir=snapshot_dir)
+    loads["DIGITAL_EVENT (store)"] = {"rows": store.count(), "cold": cold, "warm": time.perf_counter() - started}
+    return loads
+
+
+def section_times(total):
+    """Seconds per section recorded by src/perf.py since the last reset, plus the run total."""
+    from src.perf import TIMINGS
+
+    return {**{section: sum(seconds) for section, seconds in TIMINGS.items()}, "Total": total}
+
+
+def run_dashboard(selections, reruns):
+    """Section timings of the first run of each session and of `reruns` reruns with the selections."""
+    from streamlit.testing.v1 import AppTest
+    from src.perf import reset
+
+    first_runs, runs = [], []
+    for _ in range(reruns):
+        app = AppTest.from_file(os.path.join(ROOT, "Dashboard.py"), default_timeout=3600)
+        app.secrets["kbc_url"] = "https://connection.keboola.com"
+        app.secrets["kbc_token"] = "benchmark"
+        for selection in (None, selections):
+            if selection:
+                for label, value in selection.items():
+                    next(widget for widget in app.selectbox if widget.label == label).set_value(value)
+            reset()
+            started = time.perf_counter()
+            app.run()
+            total = time.perf_counter() - started
+            if app.exception:
+                raise RuntimeError(f"Dashboard raised: {app.exception[0].message}")
+            (first_runs if selection is None else runs).append(section_times(total))
+    return first_runs, runs
+
+
+def compare(results, baseline, tolerance):
+    """Sections slower than the baseline by more than the tolerance."""
+    regressions = []
+    for scenario, sections in results["sections"].items():
+        for section, seconds in sections.items():
+            before = baseline.get("sections", {}).get(scenario, {}).get(section)
+            if before is None:
+                continue
+            if seconds > before * (1 + tolerance) and seconds - before > MIN_REGRESSION_SECONDS:
+                regressions.append(f"{scenario} / {section}: {before * 1000:.1f} ms -> {seconds * 1000:.1f} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=1.0, help="Scale factor of the generated data")
+    parser.add_argument("--tables-dir", help="Use existing CSVs instead of generating data")
+    parser.add_argument("--reruns", type=int, default=3)
+    parser.add_argument("--save", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON written by --save")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown per section (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp()
+    try:
+        tables_dir = args.tables_dir
+        if tables_dir is None:
+            tables_dir = os.path.join(scratch, "tables")
+            started = time.perf_counter()
+            written = write_tables(tables_dir, args.scale)
+            print(f"Generated scale {args.scale:g}: {sum(written.values()):,} rows "
+                  f"in {time.perf_counter() - started:.1f}s")
+        # Set before src is imported: the snapshot and navigation modules read them at import
+        os.environ["ECOMMERCE_TABLES_DIR"] = tables_dir
+        os.environ["ECOMMERCE_SNAPSHOT_DIR"] = os.path.join(scratch, "snapshots")
+        # Run every section on each rerun (as tabs), so that each one gets timed
+        os.environ["ECOMMERCE_NAVIGATION"] = "tabs"
+
+        loads = time_loads(tables_dir, os.environ["ECOMMERCE_SNAPSHOT_DIR"])
+        report = pd.DataFrame(loads).T
+        print("\nLoad (seconds)")
+        print(report.to_string(float_format=lambda x: f"{x:.4f}"))
+
+        sections, cold = {}, None
+        for scenario, selections in SCENARIOS.items():
+            first_runs, runs = run_dashboard(selections, args.reruns)
+            # The very first run of the process loads tables and builds the shared caches
+            cold = cold or first_runs[0]
+            sections[scenario] = {section: statistics.median(run.get(section, 0.0) for run in runs)
+                                  for section in runs[0]}
+        report = pd.DataFrame({"cold": cold, **sections}) * 1000
+        print("\nDashboard sections (median ms per rerun)")
+        print(report.to_string(float_format=lambda x: f"{x:.1f}"))
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    results = {"scale": args.scale, "loads": loads, "sections": sections}
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
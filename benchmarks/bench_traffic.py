@@ -0,0 +1,115 @@
+"""Check the traffic rollups against resampling raw rows and time both.
+
+For random date ranges of an existing tables directory and of synthetic
+PAGE_PERFORMANCE rows, compares traffic_series at every resolution with the
+raw rows of the range resampled per bucket, with rates weighted by views
+(bounce) and visitors (conversion), and requires the same series. Then times
+one Traffic Analysis rerun per resolution: raw resample vs rollup series.
+Exits with status 1 on any mismatch.
+
+Usage:
+    python benchmarks/bench_traffic.py [--pages 5000] [--days 1095]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.date_index import date_slice  # noqa: E402
+from src.registry import TableRegistry  # noqa: E402
+from src.snapshot import TABLES_DIR  # noqa: E402
+from src.traffic import TRAFFIC_RESOLUTIONS, build_traffic_rollups, traffic_series  # noqa: E402
+
+
+def reference(page_performance, resolution, start_date, end_date):
+    """Raw rows of the range resampled to a resolution, with weighted rates."""
+    rows = date_slice(page_performance, 'DATE', start_date, end_date)
+    rows = rows.assign(
+        BOUNCES=rows['BOUNCE_RATE'].astype(np.float64) * rows['VIEWS'],
+        BOUNCE_BASE=rows['VIEWS'].where(rows['BOUNCE_RATE'].notna(), 0),
+        CONVERSIONS=rows['CONVERSION_RATE'].astype(np.float64) * rows['UNIQUE_VISITORS'],
+        CONVERSION_BASE=rows['UNIQUE_VISITORS'].where(rows['CONVERSION_RATE'].notna(), 0),
+    )
+    grouped = rows.groupby(pd.Grouper(key='DATE', freq=TRAFFIC_RESOLUTIONS[resolution]))
+    traffic = grouped[['VIEWS', 'UNIQUE_VISITORS', 'BOUNCES', 'BOUNCE_BASE', 'CONVERSIONS', 'CONVERSION_BASE']].sum()
+    if resolution == "day":
+        # The daily rollup has no rows for days without data
+        traffic = traffic[grouped.size() > 0]
+    traffic['BOUNCE_RATE'] = traffic['BOUNCES'] / traffic['BOUNCE_BASE'].where(traffic['BOUNCE_BASE'] > 0)
+    traffic['CONVERSION_RATE'] = traffic['CONVERSIONS'] / traffic['CONVERSION_BASE'].where(traffic['CONVERSION_BASE'] > 0)
+    return traffic.reset_index()
+
+
+def synthetic(rng, pages, days):
+    """One row per page and day, with a few missing rates."""
+    dates = pd.date_range("2023-01-01", periods=days, freq="D")
+    n = pages * days
+    views = rng.integers(0, 500, n).astype(np.int32)
+    bounce_rate = rng.uniform(0.1, 0.8, n).astype(np.float32)
+    bounce_rate[rng.random(n) < 0.01] = np.nan
+    return pd.DataFrame({
+        'DATE': np.repeat(dates, pages),
+        'VIEWS': views,
+        'UNIQUE_VISITORS': (views * rng.uniform(0.3, 0.9, n)).astype(np.int32),
+        'BOUNCE_RATE': bounce_rate,
+        'CONVERSION_RATE': rng.uniform(0.0, 0.1, n).astype(np.float32),
+    })
+
+
+def same(result, expected):
+    if list(result['DATE']) != list(expected['DATE']):
+        return False
+    return all(np.allclose(result[column], expected[column], equal_nan=True)
+               for column in ('VIEWS', 'UNIQUE_VISITORS', 'BOUNCE_RATE', 'CONVERSION_RATE'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tables-dir", default=TABLES_DIR)
+    parser.add_argument("--pages", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=1095)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
+
+    cases = {
+        "tables": TableRegistry(args.tables_dir).get("PAGE_PERFORMANCE"),
+        "synthetic": synthetic(rng, 20, 800),
+    }
+    failures = checks = 0
+    for name, page_performance in cases.items():
+        rollups = build_traffic_rollups(page_performance)
+        first, last = page_performance['DATE'].min(), page_performance['DATE'].max()
+        for _ in range(20):
+            start, end = sorted(first + pd.Timedelta(days=int(day)) for day in rng.integers(0, (last - first).days + 1, 2))
+            for resolution in TRAFFIC_RESOLUTIONS:
+                checks += 1
+                if not same(traffic_series(rollups, resolution, start, end),
+                            reference(page_performance, resolution, start, end)):
+                    failures += 1
+                    print(f"MISMATCH on {name} at {resolution} for {start.date()}..{end.date()}")
+    print(f"Checked {checks} series, {failures} mismatches")
+
+    page_performance = synthetic(rng, args.pages, args.days)
+    started = time.perf_counter()
+    rollups = build_traffic_rollups(page_performance)
+    print(f"\n{len(page_performance):,} PAGE_PERFORMANCE rows: rollups built in {time.perf_counter() - started:.2f}s")
+    start, end = page_performance['DATE'].min() + pd.Timedelta(days=3), page_performance['DATE'].max()
+    for resolution in TRAFFIC_RESOLUTIONS:
+        started = time.perf_counter()
+        reference(page_performance, resolution, start, end)
+        raw = time.perf_counter() - started
+        started = time.perf_counter()
+        traffic_series(rollups, resolution, start, end)
+        rolled = time.perf_counter() - started
+        print(f"  {resolution:5}  raw resample {raw * 1000:8.1f} ms | rollup {rolled * 1000:6.1f} ms")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Replay analyst sessions against the shared filtered-view cache.
+
+Each simulated rerun picks a filter combination, most of them the default
+"Current Year / All" preset, and cuts ORDER_FACT and CUSTOMER to it either
+directly or through a ViewCache. Reports time per rerun and the cache's
+hit/miss/eviction counters for a few memory budgets.
+
+Usage:
+    python benchmarks/bench_view_cache.py [--reruns 500] [--tables-dir /data/in/tables]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.date_index import date_slice  # noqa: E402
+from src.registry import TableRegistry  # noqa: E402
+from src.snapshot import TABLES_DIR  # noqa: E402
+from src.view_cache import ViewCache  # noqa: E402
+
+
+def filter_orders(order_fact, customer, start_date, end_date, payment_method, order_status):
+    """The dashboard's order and customer filters."""
+    orders = date_slice(order_fact, 'ORDER_DATE', start_date, end_date)
+    if payment_method != 'All':
+        orders = orders[orders['PAYMENT_METHOD'] == payment_method]
+    if order_status != 'All':
+        orders = orders[orders['ORDER_STATUS'] == order_status]
+    customers = customer[customer['CUSTOMER_ID'].isin(orders['CUSTOMER_ID'].unique())]
+    return {'order_fact': orders, 'customer': customers}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reruns", type=int, default=500)
+    parser.add_argument("--tables-dir", default=TABLES_DIR)
+    args = parser.parse_args()
+
+    registry = TableRegistry(args.tables_dir)
+    order_fact = registry.get("ORDER_FACT")
+    customer = registry.get("CUSTOMER")
+    version = registry.version(["ORDER_FACT", "CUSTOMER"])
+
+    last = order_fact['ORDER_DATE'].max().normalize()
+    ranges = [(pd.Timestamp(last.year, 1, 1), last), (last - pd.DateOffset(years=1), last),
+              (last - pd.Timedelta(days=90), last)]
+    payments = ['All'] + [str(value) for value in order_fact['PAYMENT_METHOD'].dropna().unique()]
+    statuses = ['All'] + [str(value) for value in order_fact['ORDER_STATUS'].dropna().unique()]
+
+    # 70% of reruns use the default preset, the rest a random combination
+    rng = np.random.default_rng(0)
+    workload = []
+    for _ in range(args.reruns):
+        if rng.random() < 0.7:
+            workload.append((*ranges[0], 'All', 'All'))
+        else:
+            start_date, end_date = ranges[rng.integers(len(ranges))]
+            workload.append((start_date, end_date, payments[rng.integers(len(payments))],
+                             statuses[rng.integers(len(statuses))]))
+
+    started = time.perf_counter()
+    for filters in workload:
+        filter_orders(order_fact, customer, *filters)
+    direct = time.perf_counter() - started
+    print(f"{args.reruns} reruns, {len(order_fact):,} orders")
+    print(f"direct    {direct / args.reruns * 1000:8.3f} ms/rerun")
+
+    full_size = sum(int(df.memory_usage(deep=True).sum()) for df in (order_fact, customer))
+    for budget in (full_size // 4, full_size * 4):
+        cache = ViewCache(max_bytes=budget)
+        started = time.perf_counter()
+        for filters in workload:
+            cache.get(('filters', filters, version), lambda: filter_orders(order_fact, customer, *filters))
+        cached = time.perf_counter() - started
+        stats = cache.stats()
+        print(f"cached    {cached / args.reruns * 1000:8.3f} ms/rerun | budget {budget / 2**20:7.1f} MiB, "
+              f"hits {stats['hits']}, misses {stats['misses']}, evictions {stats['evictions']}, "
+              f"{stats['entries']} entries, {stats['bytes'] / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,395 @@
+"""Generate a consistent synthetic copy of the e-commerce input tables.
+
+Writes every input table of the Keboola project as CSV, with valid foreign
+keys between them (orders reference customers and channels, order lines
+reference orders and product variants, events reference sessions, pages and
+customers, ...). Scale factor 1 is roughly the size of the demo data; fact
+and entity tables grow linearly with the scale factor while small lookup
+tables (channels, facilities, sites) stay fixed. Order and event tables are
+generated and written in chunks, so memory use does not grow with the scale
+factor and 100x / 1000x data sets can be written on a laptop.
+
+Usage:
+    python benchmarks/generate_data.py --scale 10 --out /tmp/tables
+"""
+import argparse
+import os
+import time
+from typing import Dict, Iterator
+
+import numpy as np
+import pandas as pd
+
+# Row counts at scale factor 1 (roughly the size of the demo project)
+BASE_ROWS = {
+    "CUSTOMER": 2_000,
+    "PRODUCT": 200,
+    "ORDER_FACT": 20_000,
+    "DIGITAL_EVENT": 100_000,
+    "CAMPAIGN": 40,
+    "CAMPAIGN_EVENT": 20_000,
+    "CONTENT_PAGE": 50,
+}
+
+# Rows of the driving table generated per chunk
+CHUNK_ROWS = 1_000_000
+
+CATEGORIES = ["Electronics", "Clothing", "Home & Garden", "Sports", "Beauty", "Toys", "Books"]
+BRANDS = ["Acme", "Globex", "Initech", "Umbrella", "Stark", "Wayne", "Wonka", "Hooli", "Vandelay", "Soylent"]
+CHANNELS = [("CH1", "Web Store", "ONLINE"), ("CH2", "Mobile App", "ONLINE"),
+            ("CH3", "Marketplace", "ONLINE"), ("CH4", "Retail Store", "OFFLINE")]
+ORDER_STATUSES = ["Delivered", "Shipped", "Processing", "Completed", "Cancelled", "Refunded"]
+PAYMENT_METHODS = ["Credit Card", "PayPal", "Bank Transfer", "Apple Pay", "Gift Card"]
+ORDER_TYPES = ["Standard", "Express", "Subscription", "Pre-order"]
+CUSTOMER_TYPES = ["B2C", "B2B"]
+EVENT_TYPES = ["PAGE_VIEW", "PRODUCT_VIEW", "ADD_TO_CART", "CHECKOUT_START", "CHECKOUT_COMPLETE", "SEARCH", "LOGIN"]
+DEVICE_TYPES = ["Desktop", "Mobile", "Tablet"]
+CAMPAIGN_TYPES = ["Email", "Social", "Search", "Display", "Affiliate"]
+OBJECTIVES = ["Awareness", "Acquisition", "Retention", "Reactivation", "Upsell"]
+TARGET_SEGMENTS = ["New Customers", "Loyal Customers", "At Risk", "High Value", "All Customers"]
+CAMPAIGN_EVENT_TYPES = ["IMPRESSION", "CLICK", "OPEN"]
+
+Tables = Dict[str, pd.DataFrame]
+
+
+def make_ids(prefix, n, offset=0):
+    """Identifiers prefix{offset + 1} .. prefix{offset + n}."""
+    return np.char.add(prefix, np.arange(offset + 1, offset + n + 1).astype(str))
+
+
+def random_dates(rng, n, start, end, with_time=False):
+    """N uniformly random dates between start and end, formatted like the Keboola exports."""
+    span = int((end - start).total_seconds())
+    offsets = rng.integers(0, span, n)
+    values = start + pd.to_timedelta(offsets, unit="s")
+    fmt = "%Y-%m-%d %H:%M:%S" if with_time else "%Y-%m-%d"
+    return pd.DatetimeIndex(values).strftime(fmt)
+
+
+def chunks(n, chunk_rows):
+    """(offset, size) pairs covering n rows."""
+    for offset in range(0, n, chunk_rows):
+        yield offset, min(chunk_rows, n - offset)
+
+
+def generate_dimensions(rng, rows, start, end) -> Tables:
+    """Customers, products, channels, facilities, campaigns, pages and plans."""
+    tables = {}
+    tables["CHANNEL"] = pd.DataFrame(CHANNELS, columns=["CHANNEL_ID", "CHANNEL_NAME", "CHANNEL_TYPE"])
+
+    n_companies = max(rows["CUSTOMER"] // 20, 1)
+    tables["COMPANY"] = pd.DataFrame({
+        "COMPANY_ID": make_ids("CO", n_companies),
+        "COMPANY_NAME": np.char.add("Company ", np.arange(1, n_companies + 1).astype(str)),
+        "INDUSTRY": rng.choice(["Retail", "Tech", "Finance", "Health"], n_companies),
+    })
+
+    n_customers = rows["CUSTOMER"]
+    customer_ids = make_ids("C", n_customers)
+    customer_type = rng.choice(CUSTOMER_TYPES, n_customers, p=[0.85, 0.15])
+    tables["CUSTOMER"] = pd.DataFrame({
+        "CUSTOMER_ID": customer_ids,
+        "NAME": np.char.add("Customer ", np.arange(1, n_customers + 1).astype(str)),
+        "PRIMARY_EMAIL": np.char.add(np.char.lower(customer_ids), "@example.com"),
+        "CUSTOMER_TYPE": customer_type,
+        "COMPANY_ID": np.where(customer_type == "B2B", rng.choice(tables["COMPANY"]["COMPANY_ID"], n_customers), ""),
+        "CREATED_AT": random_dates(rng, n_customers, start - pd.DateOffset(years=1), start),
+    })
+    tables["PERSON"] = pd.DataFrame({
+        "PERSON_ID": make_ids("PE", n_customers),
+        "CUSTOMER_ID": customer_ids,
+        "FIRST_NAME": rng.choice(["Ann", "Bob", "Cleo", "Dan", "Eva", "Finn"], n_customers),
+        "LAST_NAME": rng.choice(["Novak", "Smith", "Garcia", "Kim", "Muller"], n_customers),
+    })
+    tables["CUSTOM_ATTRIBUTE"] = pd.DataFrame({
+        "ATTRIBUTE_ID": make_ids("CA", n_customers),
+        "CUSTOMER_ID": customer_ids,
+        "ATTRIBUTE_NAME": "PREFERRED_LANGUAGE",
+        "ATTRIBUTE_VALUE": rng.choice(["en", "cs", "de"], n_customers),
+    })
+
+    n_products = rows["PRODUCT"]
+    product_ids = make_ids("P", n_products)
+    tables["PRODUCT"] = pd.DataFrame({
+        "PRODUCT_ID": product_ids,
+        "NAME": np.char.add("Product ", np.arange(1, n_products + 1).astype(str)),
+        "CATEGORY": rng.choice(CATEGORIES, n_products),
+        "BRAND": rng.choice(BRANDS, n_products),
+        "PRICE": np.round(rng.lognormal(3.5, 0.8, n_products), 2),
+        "ACTIVE": rng.random(n_products) < 0.9,
+    })
+
+    variants_per_product = rng.integers(1, 5, n_products)
+    variant_product = np.repeat(np.arange(n_products), variants_per_product)
+    n_variants = len(variant_product)
+    tables["PRODUCT_VARIANT"] = pd.DataFrame({
+        "VARIANT_ID": make_ids("V", n_variants),
+        "PRODUCT_ID": product_ids[variant_product],
+        "VARIANT_NAME": rng.choice(["Small", "Medium", "Large", "Red", "Blue", "Standard"], n_variants),
+        "SKU": np.char.add("SKU-", np.arange(1, n_variants + 1).astype(str)),
+        "INVENTORY_QTY": rng.integers(0, 120, n_variants),
+    })
+
+    tables["FACILITY"] = pd.DataFrame({
+        "FACILITY_ID": make_ids("F", 5),
+        "FACILITY_NAME": ["Prague DC", "Berlin DC", "Vienna Store", "Warsaw DC", "Brno Store"],
+        "FACILITY_TYPE": ["WAREHOUSE", "WAREHOUSE", "STORE", "WAREHOUSE", "STORE"],
+        "CITY": ["Prague", "Berlin", "Vienna", "Warsaw", "Brno"],
+    })
+    stocked = rng.random((n_variants, 5)) < 0.6
+    inv_variant, inv_facility = np.nonzero(stocked)
+    tables["INVENTORY"] = pd.DataFrame({
+        "INVENTORY_ID": make_ids("I", len(inv_variant)),
+        "PRODUCT_ID": product_ids[variant_product[inv_variant]],
+        "VARIANT_ID": tables["PRODUCT_VARIANT"]["VARIANT_ID"].to_numpy()[inv_variant],
+        "FACILITY_ID": tables["FACILITY"]["FACILITY_ID"].to_numpy()[inv_facility],
+        "QUANTITY": rng.integers(0, 60, len(inv_variant)),
+    })
+
+    n_campaigns = rows["CAMPAIGN"]
+    campaign_start = pd.DatetimeIndex(random_dates(rng, n_campaigns, start, end))
+    campaign_end = campaign_start + pd.to_timedelta(rng.integers(7, 90, n_campaigns), unit="D")
+    budgets = rng.integers(1_000, 100_000, n_campaigns)
+    tables["CAMPAIGN"] = pd.DataFrame({
+        "CAMPAIGN_ID": make_ids("CMP", n_campaigns),
+        "CAMPAIGN_NAME": np.char.add("Campaign ", np.arange(1, n_campaigns + 1).astype(str)),
+        "CAMPAIGN_TYPE": rng.choice(CAMPAIGN_TYPES, n_campaigns),
+        "OBJECTIVE": rng.choice(OBJECTIVES, n_campaigns),
+        "BUDGET": [f"${b:,}" for b in budgets],
+        "TARGET_SEGMENT": rng.choice(TARGET_SEGMENTS, n_campaigns),
+        "START_DATE": campaign_start.strftime("%Y-%m-%d"),
+        "END_DATE": campaign_end.strftime("%Y-%m-%d"),
+    })
+
+    tables["DIGITAL_SITE"] = pd.DataFrame({
+        "SITE_ID": ["S1", "S2"],
+        "SITE_NAME": ["Main Store", "Outlet"],
+        "DOMAIN": ["shop.example.com", "outlet.example.com"],
+    })
+    n_pages = rows["CONTENT_PAGE"]
+    page_ids = make_ids("PG", n_pages)
+    tables["CONTENT_PAGE"] = pd.DataFrame({
+        "PAGE_ID": page_ids,
+        "SITE_ID": rng.choice(tables["DIGITAL_SITE"]["SITE_ID"], n_pages),
+        "URL": np.char.add("/page/", np.arange(1, n_pages + 1).astype(str)),
+        "PAGE_TYPE": rng.choice(["HOME", "CATEGORY", "PRODUCT", "CHECKOUT"], n_pages),
+    })
+
+    days = pd.date_range(start, end, freq="D")
+    page_day_page = np.tile(np.arange(n_pages), len(days))
+    views = rng.integers(10, 500, len(page_day_page))
+    tables["PAGE_PERFORMANCE"] = pd.DataFrame({
+        "PAGE_ID": page_ids[page_day_page],
+        "DATE": np.repeat(days.strftime("%Y-%m-%d"), n_pages),
+        "VIEWS": views,
+        "UNIQUE_VISITORS": (views * rng.uniform(0.5, 0.9, len(views))).astype(int),
+        "BOUNCE_RATE": np.round(rng.uniform(0.2, 0.7, len(views)), 3),
+        "CONVERSION_RATE": np.round(rng.uniform(0.005, 0.08, len(views)), 3),
+        "AVG_TIME_ON_PAGE": np.round(rng.uniform(10, 300, len(views)), 1),
+    })
+
+    tables["SALES_PLAN"] = pd.DataFrame({
+        "PLAN_ID": make_ids("SP", len(days)),
+        "PLAN_START_DATE": days.strftime("%Y-%m-%d"),
+        "PLAN_END_DATE": days.strftime("%Y-%m-%d"),
+        "TARGET_REVENUE": np.round(rng.normal(1.0, 0.1, len(days)) * rows["ORDER_FACT"] / len(days) * 150, 2),
+    })
+    return tables
+
+
+def generate_orders(rng, dims: Tables, n_orders, start, end, chunk_rows=CHUNK_ROWS) -> Iterator[Tables]:
+    """Orders and their lines, events, fulfillments and attributions, chunk by chunk.
+
+    Each chunk covers a consecutive slice of the date range, so ORDER_DATE is
+    ascending across the whole file.
+    """
+    customer_ids = dims["CUSTOMER"]["CUSTOMER_ID"].to_numpy()
+    channel_ids = dims["CHANNEL"]["CHANNEL_ID"].to_numpy()
+    facility_ids = dims["FACILITY"]["FACILITY_ID"].to_numpy()
+    campaign_ids = dims["CAMPAIGN"]["CAMPAIGN_ID"].to_numpy()
+    variant_ids = dims["PRODUCT_VARIANT"]["VARIANT_ID"].to_numpy()
+    variant_product_ids = dims["PRODUCT_VARIANT"]["PRODUCT_ID"].to_numpy()
+    prices = dims["PRODUCT"].set_index("PRODUCT_ID")["PRICE"].reindex(variant_product_ids).to_numpy()
+    span = end - start
+    line_offset = fulfillment_offset = fulfillment_line_offset = attribution_offset = 0
+
+    for offset, n in chunks(n_orders, chunk_rows):
+        tables = {}
+        chunk_start = start + span * (offset / n_orders)
+        chunk_end = start + span * ((offset + n) / n_orders)
+        order_ids = make_ids("O", n, offset)
+        order_dates = np.sort(random_dates(rng, n, chunk_start, chunk_end))
+        lines_per_order = rng.integers(1, 5, n)
+        line_order = np.repeat(np.arange(n), lines_per_order)
+        n_lines = len(line_order)
+        line_variant = rng.integers(0, len(variant_ids), n_lines)
+        quantity = rng.integers(1, 4, n_lines)
+        unit_price = prices[line_variant]
+        discount = np.round(unit_price * quantity * rng.choice([0, 0, 0, 0.1, 0.2], n_lines), 2)
+        line_total = np.round(unit_price * quantity - discount, 2)
+        line_ids = make_ids("OL", n_lines, line_offset)
+        line_offset += n_lines
+        tables["ORDER_LINE"] = pd.DataFrame({
+            "ORDER_LINE_ID": line_ids,
+            "ORDER_ID": order_ids[line_order],
+            "PRODUCT_ID": variant_product_ids[line_variant],
+            "VARIANT_ID": variant_ids[line_variant],
+            "QUANTITY": quantity,
+            "UNIT_PRICE": unit_price,
+            "DISCOUNT_AMOUNT": discount,
+            "LINE_TOTAL": line_total,
+        })
+        order_status = rng.choice(ORDER_STATUSES, n, p=[0.45, 0.1, 0.05, 0.3, 0.06, 0.04])
+        tables["ORDER_FACT"] = pd.DataFrame({
+            "ORDER_ID": order_ids,
+            "CUSTOMER_ID": customer_ids[rng.zipf(1.6, n) % len(customer_ids)],
+            "CHANNEL_ID": rng.choice(channel_ids, n),
+            "ORDER_DATE": order_dates,
+            "ORDER_STATUS": order_status,
+            "PAYMENT_METHOD": rng.choice(PAYMENT_METHODS, n),
+            "ORDER_TYPE": rng.choice(ORDER_TYPES, n, p=[0.6, 0.2, 0.15, 0.05]),
+            "TOTAL_AMOUNT": np.round(np.bincount(line_order, weights=line_total, minlength=n), 2),
+        })
+        tables["ORDER_EVENT"] = pd.DataFrame({
+            "ORDER_EVENT_ID": make_ids("OE", n, offset),
+            "ORDER_ID": order_ids,
+            "EVENT_TYPE": "ORDER_PLACED",
+            "EVENT_DATE": order_dates,
+        })
+        tables["ORDER_STATUS_HISTORY"] = pd.DataFrame({
+            "STATUS_HISTORY_ID": make_ids("SH", n, offset),
+            "ORDER_ID": order_ids,
+            "STATUS": order_status,
+            "CHANGED_AT": order_dates,
+        })
+
+        shipped = np.isin(order_status, ["Delivered", "Shipped", "Completed"])
+        n_shipped = int(shipped.sum())
+        fulfillment_ids = make_ids("FU", n_shipped, fulfillment_offset)
+        fulfillment_offset += n_shipped
+        tables["ORDER_FULFILLMENT"] = pd.DataFrame({
+            "FULFILLMENT_ID": fulfillment_ids,
+            "ORDER_ID": order_ids[shipped],
+            "FACILITY_ID": rng.choice(facility_ids, n_shipped),
+            "SHIPPED_DATE": order_dates[shipped],
+            "CARRIER": rng.choice(["DHL", "UPS", "PPL"], n_shipped),
+        })
+        fulfillment_of_order = np.full(n, -1)
+        fulfillment_of_order[shipped] = np.arange(n_shipped)
+        shipped_lines = fulfillment_of_order[line_order] >= 0
+        n_shipped_lines = int(shipped_lines.sum())
+        tables["ORDER_FULFILLMENT_LINE"] = pd.DataFrame({
+            "FULFILLMENT_LINE_ID": make_ids("FL", n_shipped_lines, fulfillment_line_offset),
+            "FULFILLMENT_ID": fulfillment_ids[fulfillment_of_order[line_order][shipped_lines]],
+            "ORDER_LINE_ID": line_ids[shipped_lines],
+            "QUANTITY": quantity[shipped_lines],
+        })
+        fulfillment_line_offset += n_shipped_lines
+
+        attributed = rng.random(n) < 0.4
+        attribution_order = np.repeat(np.flatnonzero(attributed), 2)
+        tables["ORDER_CAMPAIGN_ATTRIBUTION"] = pd.DataFrame({
+            "ATTRIBUTION_ID": make_ids("AT", len(attribution_order), attribution_offset),
+            "ORDER_ID": order_ids[attribution_order],
+            "CAMPAIGN_ID": campaign_ids[rng.integers(0, len(campaign_ids), len(attribution_order))],
+            "CONTRIBUTION_PERCENT": np.tile([0.6, 0.4], int(attributed.sum())),
+        })
+        attribution_offset += len(attribution_order)
+        yield tables
+
+
+def generate_campaign_events(rng, dims: Tables, n_touches, chunk_rows=CHUNK_ROWS) -> Iterator[Tables]:
+    """Campaign impressions, clicks and opens inside each campaign's flight dates."""
+    campaign = dims["CAMPAIGN"]
+    campaign_ids = campaign["CAMPAIGN_ID"].to_numpy()
+    campaign_start = pd.DatetimeIndex(campaign["START_DATE"])
+    flight_days = (pd.DatetimeIndex(campaign["END_DATE"]) - campaign_start).days.to_numpy()
+    customer_ids = dims["CUSTOMER"]["CUSTOMER_ID"].to_numpy()
+    for offset, n in chunks(n_touches, chunk_rows):
+        touch_campaign = rng.integers(0, len(campaign_ids), n)
+        touch_offset = rng.random(n) * flight_days[touch_campaign]
+        touch_date = campaign_start[touch_campaign] + pd.to_timedelta(touch_offset, unit="D")
+        yield {"CAMPAIGN_EVENT": pd.DataFrame({
+            "CAMPAIGN_EVENT_ID": make_ids("CE", n, offset),
+            "CAMPAIGN_ID": campaign_ids[touch_campaign],
+            "CUSTOMER_ID": customer_ids[rng.integers(0, len(customer_ids), n)],
+            "EVENT_TYPE": rng.choice(CAMPAIGN_EVENT_TYPES, n),
+            "EVENT_DATE": pd.DatetimeIndex(touch_date).strftime("%Y-%m-%d %H:%M:%S"),
+        })}
+
+
+def generate_digital_events(rng, dims: Tables, n_events, start, end, chunk_rows=CHUNK_ROWS) -> Iterator[Tables]:
+    """Web events in sessions that walk down the purchase funnel.
+
+    Sessions never span chunks: each chunk draws its own sessions, about four
+    events each.
+    """
+    customer_ids = dims["CUSTOMER"]["CUSTOMER_ID"].to_numpy()
+    site_ids = dims["DIGITAL_SITE"]["SITE_ID"].to_numpy()
+    page_ids = dims["CONTENT_PAGE"]["PAGE_ID"].to_numpy()
+    session_offset = 0
+    for offset, n in chunks(n_events, chunk_rows):
+        steps = rng.choice(len(EVENT_TYPES), n, p=[0.35, 0.25, 0.15, 0.08, 0.05, 0.08, 0.04])
+        n_sessions = max(n // 4, 1)
+        session = np.sort(rng.integers(0, n_sessions, n))
+        session_start = pd.DatetimeIndex(random_dates(rng, n_sessions, start, end, with_time=True))
+        event_time = session_start[session] + pd.to_timedelta(steps * 60 + rng.integers(0, 60, n), unit="s")
+        yield {"DIGITAL_EVENT": pd.DataFrame({
+            "EVENT_ID": make_ids("E", n, offset),
+            "SESSION_ID": np.char.add("SE", (session + session_offset).astype(str)),
+            "CUSTOMER_ID": customer_ids[rng.integers(0, len(customer_ids), n_sessions)][session],
+            "SITE_ID": rng.choice(site_ids, n),
+            "PAGE_ID": rng.choice(page_ids, n),
+            "EVENT_TYPE": np.asarray(EVENT_TYPES)[steps],
+            "DEVICE_TYPE": rng.choice(DEVICE_TYPES, n_sessions, p=[0.5, 0.4, 0.1])[session],
+            "EVENT_DATE": pd.DatetimeIndex(event_time).strftime("%Y-%m-%d %H:%M:%S"),
+        })}
+        session_offset += n_sessions
+
+
+def write_tables(out_dir, scale=1.0, seed=42, start=None, end=None, chunk_rows=CHUNK_ROWS) -> Dict[str, int]:
+    """Generate every table and write it as CSV named like the Keboola input mapping.
+
+    Returns the number of rows written per table.
+    """
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp(end) if end is not None else pd.Timestamp.today().normalize()
+    start = pd.Timestamp(start) if start is not None else end - pd.DateOffset(years=3)
+    rows = {name: max(int(count * scale), 1) for name, count in BASE_ROWS.items()}
+    os.makedirs(out_dir, exist_ok=True)
+    written: Dict[str, int] = {}
+
+    def write(tables: Tables) -> None:
+        for name, frame in tables.items():
+            path = os.path.join(out_dir, f"{name}.csv")
+            frame.to_csv(path, index=False, mode="a" if name in written else "w", header=name not in written)
+            written[name] = written.get(name, 0) + len(frame)
+
+    dims = generate_dimensions(rng, rows, start, end)
+    write(dims)
+    for tables in generate_orders(rng, dims, rows["ORDER_FACT"], start, end, chunk_rows):
+        write(tables)
+    for tables in generate_campaign_events(rng, dims, rows["CAMPAIGN_EVENT"], chunk_rows):
+        write(tables)
+    for tables in generate_digital_events(rng, dims, rows["DIGITAL_EVENT"], start, end, chunk_rows):
+        write(tables)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=1.0, help="Scale factor (1, 10, 100, 1000, ...)")
+    # No default: the app reads its input from /data/in/tables, which a benchmark must never overwrite
+    parser.add_argument("--out", required=True, help="Output directory for the CSV files")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    written = write_tables(args.out, args.scale, args.seed, chunk_rows=args.chunk_rows)
+    print(f"Wrote {len(written)} tables ({sum(written.values()):,} rows) to {args.out} "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
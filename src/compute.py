@@ -0,0 +1,384 @@
+"""Headless computations behind the dashboard tabs.
+
+Each function takes the filtered tables of one tab and returns the frames and
+figures that tab renders, as a dict. Nothing here imports Streamlit, so the
+functions can be profiled, benchmarked and run outside a session.
+`memoized` caches a call under the content fingerprints of its arguments, so
+sessions with the same filtered inputs share one result. Stores and indexes
+built from the tables are passed as `Versioned` arguments, keyed by the
+version of their source tables instead.
+
+Returned frames are shared between sessions and must not be modified in
+place.
+"""
+import hashlib
+import threading
+import weakref
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.date_index import date_slice, overlapping
+from src.facility import FacilityInventory
+from src.inventory import COVER_WINDOW, INVENTORY_STATUS_ORDER
+from src.keys import join
+from src.rfm import recency_sketch, rfm_scores, segment_counts, segments
+from src.sketch import QuantileSketch, box_stats
+from src.traffic import TRAFFIC_SUMS, with_rates
+from src.view_cache import ViewCache
+
+# Fingerprints of live frames by object id; an entry is dropped with its frame
+_fingerprints: Dict[int, str] = {}
+_fingerprints_lock = threading.Lock()
+
+
+# Variants projected to run out within this many days are listed as upcoming stock-outs
+STOCKOUT_HORIZON_DAYS = 30
+
+
+def frame_fingerprint(df) -> str:
+    """Content hash of a DataFrame or Series, computed once per object."""
+    key = id(df)
+    fingerprint = _fingerprints.get(key)
+    if fingerprint is not None:
+        return fingerprint
+    digest = hashlib.sha1()
+    if isinstance(df, pd.DataFrame):
+        digest.update(repr(("frame", list(df.columns), df.dtypes.tolist())).encode())
+    else:
+        digest.update(repr(("series", df.name, df.dtype)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    fingerprint = digest.hexdigest()
+    with _fingerprints_lock:
+        _fingerprints[key] = fingerprint
+    weakref.finalize(df, _fingerprints.pop, key, None)
+    return fingerprint
+
+
+class Versioned:
+    """A `memoized` argument keyed by a version token (e.g. TableRegistry.version) instead of its content.
+
+    For stores and indexes, which have no content fingerprint; the cache key
+    holds only the version, so it does not keep the object alive.
+    """
+
+    def __init__(self, value: Any, version: Hashable):
+        self.value = value
+        self.version = version
+
+
+def fingerprint(value: Any) -> Hashable:
+    """Hashable stand-in for a function argument; other objects stand for themselves."""
+    if isinstance(value, Versioned):
+        return "versioned", fingerprint(value.version)
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return frame_fingerprint(value)
+    if isinstance(value, np.ndarray):
+        return hashlib.sha1(value.tobytes()).hexdigest(), value.dtype.str, value.shape
+    if isinstance(value, (list, tuple)):
+        return tuple(fingerprint(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, fingerprint(item)) for key, item in value.items()))
+    return value
+
+
+def memoized(cache: ViewCache, function: Callable, *args, **kwargs) -> Any:
+    """Call `function`, or return its cached result for arguments with the same content."""
+    key = ("compute", function.__module__, function.__qualname__, fingerprint(args), fingerprint(kwargs))
+    args = [arg.value if isinstance(arg, Versioned) else arg for arg in args]
+    kwargs = {name: arg.value if isinstance(arg, Versioned) else arg for name, arg in kwargs.items()}
+    return cache.get(key, lambda: function(*args, **kwargs))
+
+
+def sales_analysis(sales_cube: pd.DataFrame, sales_plan: pd.DataFrame, start_date, end_date) -> Dict[str, Any]:
+    """Totals, daily series and plan comparison of the Sales tab from a sliced sales cube."""
+    total_revenue = sales_cube['TOTAL_AMOUNT'].sum()
+    total_orders = int(sales_cube['ORDER_COUNT'].sum())
+
+    daily_orders = sales_cube.groupby(pd.Grouper(key='ORDER_DATE', freq='D')).agg({
+        'ORDER_COUNT': 'sum',
+        'TOTAL_AMOUNT': 'sum'
+    }).reset_index().rename(columns={'ORDER_COUNT': 'NEW_ORDERS'})
+
+    status_time = sales_cube.groupby([pd.Grouper(key='ORDER_DATE', freq='D'), 'ORDER_STATUS'],
+                                     observed=True)['ORDER_COUNT'].sum().reset_index(name='COUNT')
+
+    # Revenue by order type over time, with zero-filled days so the areas stack
+    type_revenue_time = sales_cube.groupby(['ORDER_TYPE', pd.Grouper(key='ORDER_DATE', freq='D')],
+                                           observed=True)['TOTAL_AMOUNT'].sum().reset_index()
+    pivot_revenue = type_revenue_time.pivot_table(
+        index='ORDER_DATE',
+        columns='ORDER_TYPE',
+        values='TOTAL_AMOUNT',
+        aggfunc='sum',
+        observed=True
+    ).fillna(0).reset_index()
+    revenue_by_type = pd.melt(
+        pivot_revenue,
+        id_vars=['ORDER_DATE'],
+        var_name='ORDER_TYPE',
+        value_name='TOTAL_AMOUNT'
+    )
+
+    # Daily actual sales against the plans starting in the range
+    daily_actual_sales = sales_cube.groupby(pd.Grouper(key='ORDER_DATE', freq='D')).agg({
+        'TOTAL_AMOUNT': 'sum'
+    }).reset_index()
+    sales_plan = date_slice(sales_plan, 'PLAN_START_DATE', start_date, end_date)
+    daily_plan = sales_plan[['PLAN_START_DATE', 'TARGET_REVENUE']].copy()
+    daily_plan.columns = ['ORDER_DATE', 'PLANNED_AMOUNT']
+    daily_sales = pd.merge(
+        daily_actual_sales,
+        daily_plan,
+        on='ORDER_DATE',
+        how='outer'
+    ).fillna(0).sort_values('ORDER_DATE')
+    daily_sales['ACHIEVEMENT_RATE'] = (daily_sales['TOTAL_AMOUNT'] / daily_sales['PLANNED_AMOUNT'] * 100).fillna(0)
+
+    total_actual = daily_sales['TOTAL_AMOUNT'].sum()
+    total_planned = daily_sales['PLANNED_AMOUNT'].sum()
+    return {
+        'total_revenue': total_revenue,
+        'total_orders': total_orders,
+        'avg_order_value': total_revenue / total_orders if total_orders > 0 else 0,
+        'daily_orders': daily_orders,
+        'status_time': status_time,
+        'revenue_by_type': revenue_by_type,
+        'daily_sales': daily_sales,
+        'total_actual': total_actual,
+        'total_planned': total_planned,
+        'overall_achievement': (total_actual / total_planned * 100) if total_planned > 0 else 0,
+    }
+
+
+def product_analysis(order_line: pd.DataFrame, order_fact: pd.DataFrame, product: pd.DataFrame,
+                     product_variant: pd.DataFrame) -> Dict[str, Any]:
+    """Product, brand and pricing metrics of the Product tab."""
+    # Star join on the surrogate keys (see src/keys.py)
+    product_sales = join(order_line, order_fact, 'ORDER_ID', ['ORDER_DATE', 'ORDER_STATUS'])
+    product_sales = join(product_sales, product, 'PRODUCT_ID', ['NAME', 'CATEGORY', 'BRAND', 'PRICE'])
+    product_sales = join(product_sales, product_variant, ['VARIANT_ID', 'PRODUCT_ID'], ['VARIANT_NAME', 'INVENTORY_QTY'],
+                         how='left')
+
+    # LINE_TOTAL already includes discounts
+    product_sales['REVENUE'] = product_sales['LINE_TOTAL']
+    product_sales['PROFIT_MARGIN'] = ((product_sales['LINE_TOTAL'] - (product_sales['UNIT_PRICE'] * 0.6 * product_sales['QUANTITY'])) / product_sales['LINE_TOTAL']) * 100
+
+    product_performance = product_sales.groupby(['PRODUCT_ID', 'NAME', 'CATEGORY', 'BRAND', 'PRICE'], observed=True).agg({
+        'QUANTITY': 'sum',
+        'REVENUE': 'sum',
+        'ORDER_ID': 'nunique',
+        'PROFIT_MARGIN': 'mean'
+    }).reset_index()
+    product_performance['AVG_ORDER_VALUE'] = product_performance['REVENUE'] / product_performance['ORDER_ID']
+    product_performance = product_performance.sort_values('REVENUE', ascending=False)
+
+    brand_performance = product_sales.groupby('BRAND', observed=True).agg({
+        'REVENUE': 'sum',
+        'QUANTITY': 'sum',
+        'PRODUCT_ID': 'nunique'
+    }).reset_index().sort_values('REVENUE', ascending=False).head(10)
+
+    return {
+        'total_products': len(product),
+        'active_products': len(product[product['ACTIVE'] == True]),
+        'total_categories': product['CATEGORY'].nunique(),
+        'avg_price': product['PRICE'].mean(),
+        'product_performance': product_performance,
+        'top_products': product_performance.nlargest(10, 'REVENUE'),
+        'top_margin_products': product_performance.nlargest(10, 'PROFIT_MARGIN'),
+        'brand_performance': brand_performance,
+    }
+
+
+def price_box_stats(price_sketches: Dict[str, QuantileSketch], categories) -> pd.DataFrame:
+    """Box-plot statistics of PRICE per category, from the per-category sketches (see src/sketch.py)."""
+    return pd.DataFrame([dict(box_stats(price_sketches[category]), CATEGORY=category)
+                         for category in categories if category in price_sketches],
+                        columns=['CATEGORY', 'q1', 'median', 'q3', 'mean', 'lowerfence', 'upperfence'])
+
+
+def customer_analysis(customer_metrics: pd.DataFrame, customer: pd.DataFrame, as_of: pd.Timestamp,
+                      last_order_counts: Optional[pd.Series] = None) -> Dict[str, Any]:
+    """Per-customer metrics, RFM segments and customer type metrics of the Customer tab.
+
+    Takes the ORDER_COUNT, TOTAL_SPENT, FIRST_ORDER and LAST_ORDER of each
+    customer (see src/customer_store.py). Recency is measured in whole days
+    up to `as_of`. `last_order_counts`, the customers per last-order day
+    (see src/rfm.py), lets sketched recency quartiles be merged from those
+    days instead of sketching every customer.
+    """
+    customer_metrics = customer_metrics[['CUSTOMER_ID', 'ORDER_COUNT', 'TOTAL_SPENT', 'FIRST_ORDER', 'LAST_ORDER']].copy()
+
+    # Days since last order, customer lifetime and average order value
+    customer_metrics['DAYS_SINCE_LAST_ORDER'] = (as_of - customer_metrics['LAST_ORDER']).dt.days
+    customer_metrics['CUSTOMER_LIFETIME_DAYS'] = (customer_metrics['LAST_ORDER'] - customer_metrics['FIRST_ORDER']).dt.days
+    customer_metrics['AVG_ORDER_VALUE'] = customer_metrics['TOTAL_SPENT'] / customer_metrics['ORDER_COUNT']
+
+    # RFM scores and segments (see src/rfm.py)
+    sketch = None
+    if last_order_counts is not None and as_of == as_of.normalize():
+        sketch = recency_sketch(last_order_counts, as_of)
+    r, f, m = rfm_scores(
+        customer_metrics['DAYS_SINCE_LAST_ORDER'].to_numpy(),
+        customer_metrics['ORDER_COUNT'].to_numpy(),
+        customer_metrics['TOTAL_SPENT'].to_numpy(),
+        sketch=sketch
+    )
+    customer_metrics['R'] = r
+    customer_metrics['F'] = f
+    customer_metrics['M'] = m
+    customer_metrics['SEGMENT'] = segments(r, f, m)
+
+    segment_dist = segment_counts(customer_metrics['SEGMENT'].array)
+    segment_dist['Percentage'] = (segment_dist['Count'] / len(customer_metrics) * 100).round(1)
+
+    segment_metrics = customer_metrics.groupby('SEGMENT', observed=True).agg({
+        'TOTAL_SPENT': 'mean',
+        'ORDER_COUNT': 'mean',
+        'AVG_ORDER_VALUE': 'mean'
+    }).reset_index()
+
+    top_customers = customer_metrics.nlargest(10, 'TOTAL_SPENT')
+    top_customers = top_customers.merge(customer[['CUSTOMER_ID', 'NAME', 'PRIMARY_EMAIL']], on='CUSTOMER_ID')
+
+    type_metrics = customer_metrics.merge(
+        customer[['CUSTOMER_ID', 'CUSTOMER_TYPE']],
+        on='CUSTOMER_ID'
+    ).groupby('CUSTOMER_TYPE', observed=True).agg({
+        'TOTAL_SPENT': 'mean',
+        'ORDER_COUNT': 'mean',
+        'AVG_ORDER_VALUE': 'mean'
+    }).reset_index()
+
+    return {
+        'customer_metrics': customer_metrics,
+        'segment_dist': segment_dist,
+        'segment_metrics': segment_metrics,
+        'top_customers': top_customers,
+        'type_metrics': type_metrics,
+    }
+
+
+def digital_analysis(traffic: pd.DataFrame, event_type_counts: pd.Series, device_type_counts: pd.Series) -> Dict[str, Any]:
+    """Traffic metrics and event and device distributions of the Digital tab.
+
+    `traffic` is a series of src/traffic.py over the date range, so totals
+    and weighted rates come from its rate numerators and denominators. Event
+    counts come from the DIGITAL_EVENT store (see src/event_store.py); the
+    funnel is computed separately by src/funnel.py.
+    """
+    event_counts = event_type_counts.reset_index()
+    event_counts.columns = ['EVENT_TYPE', 'COUNT']
+
+    device_counts = device_type_counts.reset_index()
+    device_counts.columns = ['DEVICE_TYPE', 'COUNT']
+    device_counts['PERCENTAGE'] = (device_counts['COUNT'] / device_counts['COUNT'].sum() * 100).round(1)
+
+    # The whole range as one bucket
+    totals = with_rates(traffic[TRAFFIC_SUMS].sum().to_frame().T).iloc[0]
+    return {
+        'total_visitors': int(totals['UNIQUE_VISITORS']),
+        'avg_conversion': totals['CONVERSION_RATE'] * 100,
+        'avg_bounce': totals['BOUNCE_RATE'] * 100,
+        'event_counts': event_counts,
+        'device_counts': device_counts,
+    }
+
+
+def inventory_analysis(variant_inventory: pd.DataFrame, product: pd.DataFrame) -> Dict[str, Any]:
+    """Stock level distribution, stock by category, critical variants and projected stock-outs of the Inventory tab.
+
+    `variant_inventory` is the per-variant frame of src/inventory.py.
+    """
+    inventory = join(variant_inventory, product, 'PRODUCT_ID', ['CATEGORY', 'BRAND', 'NAME'])
+
+    # INVENTORY_STATUS is an ordered categorical, so groups come out in status order
+    inventory_status_count = inventory.groupby('INVENTORY_STATUS', observed=True).size().reset_index(name='COUNT')
+
+    inventory_by_category = inventory.groupby('CATEGORY', observed=True)['INVENTORY_QTY'].agg(['sum', 'mean']).reset_index()
+    inventory_by_category.columns = ['CATEGORY', 'TOTAL_INVENTORY', 'AVG_INVENTORY']
+
+    columns = ['NAME', 'VARIANT_NAME', 'CATEGORY', 'BRAND', 'INVENTORY_QTY', f'UNITS_{COVER_WINDOW}D',
+               f'VELOCITY_{COVER_WINDOW}D', 'DAYS_OF_COVER', 'STOCKOUT_DATE']
+    critical_inventory = inventory[inventory['INVENTORY_STATUS'] == INVENTORY_STATUS_ORDER[0]]
+    critical_table = critical_inventory.sort_values('INVENTORY_QTY', kind='stable')[columns]
+    stockout_table = inventory[inventory['DAYS_OF_COVER'] <= STOCKOUT_HORIZON_DAYS].sort_values(
+        'DAYS_OF_COVER', kind='stable')[columns]
+
+    return {
+        'inventory_status_count': inventory_status_count,
+        'inventory_by_category': inventory_by_category,
+        'critical_table': critical_table,
+        'stockout_table': stockout_table,
+    }
+
+
+def facility_analysis(facility_inventory: FacilityInventory, categories: Optional[Tuple] = None) -> Dict[str, Any]:
+    """Stock by facility, the most unevenly spread variants and critical stock per facility.
+
+    `categories` limits everything to variants of those product categories
+    (None for all); see src/facility.py.
+    """
+    imbalance = facility_inventory.select(facility_inventory.variant_spread, categories)
+    return {
+        'stock_by_facility': facility_inventory.stock_by_facility(categories),
+        'imbalanced_variants': imbalance[imbalance['TOTAL_QTY'] > 0].nlargest(20, 'IMBALANCE'),
+        'facility_critical': facility_inventory.select(facility_inventory.critical, categories),
+    }
+
+
+def recorded_attribution(order_campaign_attribution: pd.DataFrame, order_fact: pd.DataFrame) -> pd.DataFrame:
+    """Attributed revenue, orders and mean contribution per campaign from the recorded CONTRIBUTION_PERCENT.
+
+    Same columns as src/attribution.py's model_attribution, so either can
+    feed campaign_analysis.
+    """
+    performance = join(order_campaign_attribution, order_fact, 'ORDER_ID', ['TOTAL_AMOUNT'])
+    performance['ATTRIBUTED_REVENUE'] = performance['TOTAL_AMOUNT'] * performance['CONTRIBUTION_PERCENT']
+    return performance.groupby('CAMPAIGN_ID', observed=True).agg({
+        'ATTRIBUTED_REVENUE': 'sum',
+        'ORDER_ID': 'nunique',
+        'CONTRIBUTION_PERCENT': 'mean'
+    }).reset_index()
+
+
+def campaign_analysis(campaign: pd.DataFrame, attribution: pd.DataFrame, start_date, end_date,
+                      as_of: pd.Timestamp) -> Dict[str, Any]:
+    """Budget breakdowns and attributed revenue of the campaigns overlapping the date range.
+
+    `attribution` holds per-campaign results of recorded_attribution or of
+    an attribution model. Campaigns ending after the day `as_of` count as
+    active.
+    """
+    campaign = overlapping(campaign, 'START_DATE', 'END_DATE', start_date, end_date)
+
+    total_campaigns = len(campaign)
+    # BUDGET is converted from "$1,234" strings to floats at ingest
+    total_budget = campaign['BUDGET'].sum()
+
+    def count_and_budget(column):
+        return campaign.groupby(column, observed=True).agg({
+            'CAMPAIGN_ID': 'count',
+            'BUDGET': 'sum'
+        }).reset_index()
+
+    top_attribution = None
+    attribution_metrics = join(attribution, campaign, 'CAMPAIGN_ID', ['CAMPAIGN_NAME', 'CAMPAIGN_TYPE'])
+    attribution_metrics = attribution_metrics.dropna(subset=['CAMPAIGN_NAME', 'CAMPAIGN_TYPE'])
+    if len(attribution_metrics) > 0:
+        attribution_metrics = attribution_metrics[['CAMPAIGN_ID', 'CAMPAIGN_NAME', 'CAMPAIGN_TYPE', 'ATTRIBUTED_REVENUE',
+                                                   'ORDER_ID', 'CONTRIBUTION_PERCENT']]
+        top_attribution = attribution_metrics.nlargest(10, 'ATTRIBUTED_REVENUE')
+
+    return {
+        'total_campaigns': total_campaigns,
+        'active_campaigns': len(campaign[campaign['END_DATE'] > as_of]),
+        'total_budget': total_budget,
+        'avg_campaign_budget': total_budget / total_campaigns if total_campaigns > 0 else 0,
+        'type_performance': count_and_budget('CAMPAIGN_TYPE'),
+        'objective_counts': count_and_budget('OBJECTIVE'),
+        'segment_analysis': count_and_budget('TARGET_SEGMENT'),
+        'top_attribution': top_attribution,
+    }
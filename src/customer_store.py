@@ -0,0 +1,188 @@
+"""Persistent per-customer order aggregates.
+
+Two tables are kept next to the snapshots and updated together:
+
+- partials: ORDER_COUNT, TOTAL_SPENT, FIRST_ORDER and LAST_ORDER per day x
+  CUSTOMER_ID, sorted by day. Date range views of the Customer tab are a
+  date slice of these rows, grouped by customer.
+- totals: the same four measures per customer over all dated orders, which
+  answer views that select the whole history.
+
+Only the date range is kept as a dimension: every Customer view filters on
+it, while channel, payment method and order status filters are optional and
+would multiply the partials by their combinations. Views with those filters
+group the already filtered orders instead (see orders_customer_metrics).
+The store is built from the ORDER_FACT frame of the table registry.
+
+Rows appended to ORDER_FACT are aggregated on their own and folded in (counts
+and sums added, first/last order dates updated); only partials of the days the
+new rows fall on are regrouped, so no update rescans the order history. Like
+the sales cube, orders are bucketed by day (src/cube.py day_bucket, so the
+end of a range matches the raw filter), and orders without a date are left
+out because no date filter can select them.
+"""
+import os
+from typing import List, Optional
+
+import pandas as pd
+
+from src.cube import day_bucket
+from src.date_index import date_slice
+from src.registry import TableRegistry
+from src.rfm import last_order_counts
+from src.schema import combine, schema_version
+from src.snapshot import (SNAPSHOT_DIR, appended_fingerprint, appended_offset, csv_path, file_fingerprint,
+                          is_source_unchanged, read_manifest, read_tail, snapshot_paths, write_manifest)
+
+STORE_FORMAT_VERSION = 3
+TABLE = "ORDER_FACT"
+
+PARTIAL_KEYS = ["ORDER_DATE", "CUSTOMER_ID"]
+ORDER_COLUMNS = ["ORDER_ID", "CUSTOMER_ID", "ORDER_DATE", "TOTAL_AMOUNT"]
+METRIC_COLUMNS = ["CUSTOMER_ID", "ORDER_COUNT", "TOTAL_SPENT", "FIRST_ORDER", "LAST_ORDER"]
+
+
+def store_path(snapshot_dir: Optional[str] = None) -> str:
+    """Directory of the customer aggregate store."""
+    return os.path.join(snapshot_dir or SNAPSHOT_DIR, f"{TABLE}.customers")
+
+
+def aggregate_orders(orders: pd.DataFrame) -> pd.DataFrame:
+    """Partial aggregates of raw orders per day and customer."""
+    orders = orders[ORDER_COLUMNS]
+    orders = orders[orders['ORDER_DATE'].notna()]
+    orders = orders.assign(DAY=day_bucket(orders['ORDER_DATE']))
+    partials = orders.groupby(['DAY'] + PARTIAL_KEYS[1:], observed=True).agg(
+        ORDER_COUNT=('ORDER_ID', 'count'),
+        TOTAL_SPENT=('TOTAL_AMOUNT', 'sum'),
+        FIRST_ORDER=('ORDER_DATE', 'min'),
+        LAST_ORDER=('ORDER_DATE', 'max')
+    ).reset_index()
+    return partials.rename(columns={'DAY': 'ORDER_DATE'})
+
+
+def orders_customer_metrics(orders: pd.DataFrame) -> pd.DataFrame:
+    """ORDER_COUNT, TOTAL_SPENT, FIRST_ORDER and LAST_ORDER per customer of already filtered orders."""
+    return customer_totals(aggregate_orders(orders))
+
+
+def merge_aggregates(frames: List[pd.DataFrame], keys: List[str]) -> pd.DataFrame:
+    """Fold aggregates with the same keys: counts and sums add, first/last dates take min/max."""
+    frames = [frame for frame in frames if len(frame)] or frames[:1]
+    combined = combine(frames, TABLE) if len(frames) > 1 else frames[0]
+    return combined.groupby(keys, observed=True, dropna=False).agg({
+        'ORDER_COUNT': 'sum',
+        'TOTAL_SPENT': 'sum',
+        'FIRST_ORDER': 'min',
+        'LAST_ORDER': 'max'
+    }).reset_index()
+
+
+def customer_totals(partials: pd.DataFrame) -> pd.DataFrame:
+    """Per-customer measures of a set of partials, sorted by CUSTOMER_ID."""
+    return partials.groupby('CUSTOMER_ID').agg({
+        'ORDER_COUNT': 'sum',
+        'TOTAL_SPENT': 'sum',
+        'FIRST_ORDER': 'min',
+        'LAST_ORDER': 'max'
+    }).reset_index()
+
+
+class CustomerStore:
+    """Per-customer aggregates of ORDER_FACT, answered for any sidebar filter.
+
+    Frames returned are shared and must not be modified in place.
+    """
+
+    def __init__(self, partials: pd.DataFrame, totals: pd.DataFrame, manifest: dict):
+        self.partials = partials
+        self.totals = totals
+        self.manifest = manifest
+        self._last_order_counts: Optional[pd.Series] = None
+
+    def customer_metrics(self, start_date, end_date) -> pd.DataFrame:
+        """ORDER_COUNT, TOTAL_SPENT, FIRST_ORDER and LAST_ORDER per customer with orders in the date range."""
+        view = date_slice(self.partials, 'ORDER_DATE', start_date, end_date)
+        if len(view) == len(self.partials):
+            return self.totals
+        return customer_totals(view)
+
+    def last_order_counts(self, metrics: pd.DataFrame) -> pd.Series:
+        """Customers per last-order day of a customer_metrics result (see src/rfm.py recency_sketch).
+
+        Kept for the whole-history totals, so their recency sketch is merged
+        from the days without another pass over the customers.
+        """
+        if metrics is not self.totals:
+            return last_order_counts(metrics['LAST_ORDER'])
+        if self._last_order_counts is None:
+            self._last_order_counts = last_order_counts(self.totals['LAST_ORDER'])
+        return self._last_order_counts
+
+
+def write_store(root: str, partials: pd.DataFrame, totals: pd.DataFrame, manifest: dict) -> CustomerStore:
+    """Write both tables and then the manifest, each replaced atomically."""
+    os.makedirs(root, exist_ok=True)
+    for name, df in (("partials", partials), ("totals", totals)):
+        path = os.path.join(root, f"{name}.parquet")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    write_manifest(os.path.join(root, "manifest.json"), manifest)
+    return CustomerStore(partials, totals, manifest)
+
+
+def build_customer_store(root: str, registry: TableRegistry) -> CustomerStore:
+    """Aggregate the whole ORDER_FACT table of the registry into a new store."""
+    fingerprint = file_fingerprint(csv_path(TABLE, registry.tables_dir))
+    orders = registry.get(TABLE)
+    snapshot_dir = registry.snapshot_dir
+    # The snapshot records exactly which bytes of the source the loaded rows came from
+    snapshot_manifest = read_manifest(snapshot_paths(TABLE, snapshot_dir)[1]) or {}
+    partials = aggregate_orders(orders)
+    return write_store(root, partials, customer_totals(partials), {
+        "format": STORE_FORMAT_VERSION,
+        "schema": schema_version(TABLE),
+        "source": snapshot_manifest.get("source") or fingerprint,
+    })
+
+
+def append_customer_store(manifest: dict, root: str, source_path: str, offset: int) -> CustomerStore:
+    """Fold the orders appended to the source CSV since the store was written into it."""
+    fingerprint = appended_fingerprint(manifest["source"], source_path)
+    # Only parse up to the fingerprinted size so rows appended meanwhile are picked up next time
+    added = aggregate_orders(read_tail(source_path, TABLE, offset, fingerprint["size"]))
+    partials = pd.read_parquet(os.path.join(root, "partials.parquet"))
+    totals = pd.read_parquet(os.path.join(root, "totals.parquet"))
+    if len(added):
+        # Partials before the first appended day are untouched
+        first = partials['ORDER_DATE'].searchsorted(added['ORDER_DATE'].min(), side='left')
+        partials = combine([partials.iloc[:first], merge_aggregates([partials.iloc[first:], added], PARTIAL_KEYS)],
+                           TABLE)
+        totals = merge_aggregates([totals, customer_totals(added)], ['CUSTOMER_ID'])
+    return write_store(root, partials, totals, dict(manifest, source=fingerprint))
+
+
+def is_store_compatible(manifest: Optional[dict]) -> bool:
+    """Check that a store manifest was written with the current layout and ORDER_FACT schema."""
+    return bool(manifest) and manifest.get("format") == STORE_FORMAT_VERSION \
+        and manifest.get("schema") == schema_version(TABLE)
+
+
+def open_customer_store(registry: TableRegistry) -> CustomerStore:
+    """Open the store of the registry's snapshot directory, folding in orders
+    appended to the source CSV and rebuilding it when the source changed otherwise."""
+    root = store_path(registry.snapshot_dir)
+    source_path = csv_path(TABLE, registry.tables_dir)
+    manifest = read_manifest(os.path.join(root, "manifest.json"))
+    if is_store_compatible(manifest):
+        try:
+            if is_source_unchanged(manifest.get("source", {}), source_path):
+                return CustomerStore(pd.read_parquet(os.path.join(root, "partials.parquet")),
+                                     pd.read_parquet(os.path.join(root, "totals.parquet")), manifest)
+            offset = appended_offset(manifest.get("source", {}), source_path)
+            if offset is not None:
+                return append_customer_store(manifest, root, source_path, offset)
+        except Exception:
+            pass
+    return build_customer_store(root, registry)
@@ -0,0 +1,35 @@
+"""Binary-search date filters over tables sorted by their date column.
+
+Tables listed in SORT_KEYS (src/schema.py) are sorted once at ingest. A date
+range over the sort key is then two searchsorted calls and an iloc slice,
+which is O(log n) and returns a view instead of a filtered copy.
+"""
+import numpy as np
+import pandas as pd
+
+
+def _bound(value) -> np.datetime64:
+    """A date filter bound as a numpy datetime64."""
+    return pd.Timestamp(value).to_datetime64()
+
+
+def date_slice(df: pd.DataFrame, column: str, start_date, end_date) -> pd.DataFrame:
+    """Rows with start_date <= df[column] <= end_date, for df sorted by column."""
+    dates = df[column].to_numpy()
+    lo = int(np.searchsorted(dates, _bound(start_date), side="left"))
+    hi = int(np.searchsorted(dates, _bound(end_date), side="right"))
+    return df.iloc[lo:max(lo, hi)]
+
+
+def overlapping(df: pd.DataFrame, start_column: str, end_column: str, start_date, end_date) -> pd.DataFrame:
+    """Rows whose [start, end] interval overlaps [start_date, end_date], for df sorted by start_column.
+
+    The sorted starts act as the interval index: only the prefix of intervals
+    starting on or before end_date is compared against start_date. Unlike
+    pd.IntervalIndex this accepts missing and inverted intervals and treats
+    them exactly like the plain `start <= end_date & end >= start_date` mask.
+    """
+    starts = df[start_column].to_numpy()
+    candidates = int(np.searchsorted(starts, _bound(end_date), side="right"))
+    ends = df[end_column].to_numpy()[:candidates]
+    return df.iloc[:candidates][ends >= _bound(start_date)]
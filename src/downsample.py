@@ -0,0 +1,80 @@
+"""Downsampling of daily series before they are sent to Plotly.
+
+Line traces keep a budget of points chosen with Largest-Triangle-Three-
+Buckets (LTTB): the first and last point are kept and every bucket in
+between contributes the point that forms the largest triangle with the
+point kept before it and the average of the next bucket. Peaks and dips
+survive, unlike with plain striding or averaging.
+
+Stacked bars and areas need a common x across their series, so they are
+aggregated instead: days are grouped into equal-width buckets, summed per
+bucket and series, and labelled by the bucket's first day.
+
+A budget of None leaves the data at full resolution.
+"""
+import math
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+def lttb(x: np.ndarray, y: np.ndarray, budget: int) -> np.ndarray:
+    """Positions of the `budget` points LTTB keeps of a series sorted by x (all of them if fewer)."""
+    n = len(x)
+    if budget >= n or budget < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # budget - 2 buckets over the points between the first and the last
+    edges = np.linspace(1, n - 1, budget - 1).astype(np.int64)
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(x[:-1], edges[:-1]) / counts
+    mean_y = np.add.reduceat(y[:-1], edges[:-1]) / counts
+    # The last bucket looks ahead to the last point
+    next_x = np.append(mean_x[1:], x[-1])
+    next_y = np.append(mean_y[1:], y[-1])
+
+    kept = np.empty(budget, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(budget - 2):
+        lo, hi = edges[bucket], edges[bucket + 1]
+        # Twice the triangle area of (previous, candidate, next bucket average); the factor does not matter
+        area = np.abs((x[previous] - next_x[bucket]) * (y[lo:hi] - y[previous])
+                      - (x[previous] - x[lo:hi]) * (next_y[bucket] - y[previous]))
+        previous = lo + int(np.argmax(area))
+        kept[bucket + 1] = previous
+    return kept
+
+
+def downsample_line(df: pd.DataFrame, x: str, y: str, budget: Optional[int]) -> pd.DataFrame:
+    """Rows of a line series (sorted by a datetime `x`) that LTTB keeps for `budget` points."""
+    if budget is None or len(df) <= budget:
+        return df
+    days = (df[x] - df[x].iloc[0]).dt.total_seconds().to_numpy() / 86_400
+    return df.iloc[lttb(days, df[y].to_numpy(dtype=np.float64, na_value=0), budget)]
+
+
+def bucket_days(dates: pd.Series, budget: Optional[int]) -> int:
+    """Width in days of the buckets that fit the span of `dates` into `budget` x positions."""
+    if budget is None or len(dates) == 0:
+        return 1
+    span = (dates.max().floor('D') - dates.min().floor('D')).days + 1
+    return max(1, math.ceil(span / budget))
+
+
+def aggregate_buckets(df: pd.DataFrame, x: str, values: Sequence[str], by: Optional[str] = None,
+                      budget: Optional[int] = None) -> pd.DataFrame:
+    """Sums of `values` per equal-width date bucket (and `by` series), labelled by the bucket's first day.
+
+    Returns `df` itself when every day fits into `budget` x positions.
+    """
+    width = bucket_days(df[x], budget)
+    if width == 1:
+        return df
+    first = df[x].min().floor('D')
+    days = (df[x].dt.floor('D') - first).dt.days.to_numpy()
+    starts = first + pd.to_timedelta(days // width * width, unit='D')
+    keys = [starts.rename(x)] + ([df[by]] if by else [])
+    return df.groupby(keys, observed=True, sort=True)[list(values)].sum().reset_index()
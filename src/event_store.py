@@ -0,0 +1,339 @@
+"""Date-partitioned, memory-mapped column store for DIGITAL_EVENT.
+
+DIGITAL_EVENT is split into one directory per month (or day). Each partition
+holds one raw binary file per column: EVENT_DATE as int64 nanoseconds, sorted
+within the partition, and the label columns as int16 dictionary codes. The
+high-cardinality SESSION_ID and CUSTOMER_ID are stored as 63-bit hashes of
+their labels instead, so neither the manifest nor an opened store holds a
+per-session dictionary; equal labels get equal codes in every partition,
+which is all the funnel needs (see src/funnel.py). Queries for a date range
+only open the partitions that overlap it, as memory maps, and cut the two
+edge partitions with a binary search on the sorted dates. Fully covered
+partitions are counted whole, so no query builds a boolean mask over rows
+and resident memory does not grow with history.
+
+Rows appended to the source CSV are encoded with the existing dictionaries
+(and the same hash) and merged into the partitions they fall in; the other
+partitions are left untouched.
+"""
+import io
+import json
+import os
+import shutil
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.schema import read_csv_chunks, schema_version
+from src.snapshot import (SNAPSHOT_DIR, appended_fingerprint, appended_offset, csv_path, file_fingerprint,
+                          is_source_unchanged, read_manifest)
+
+STORE_FORMAT_VERSION = 3
+DATE_DTYPE = "int64"
+CODE_DTYPE = "int16"
+# Columns with too many distinct labels to keep a dictionary of, stored as label hashes
+HASHED_COLUMNS = ("SESSION_ID", "CUSTOMER_ID")
+HASH_DTYPE = "int64"
+
+# numpy datetime unit used to derive the partition key of each row
+GRANULARITY_UNITS = {"day": "datetime64[D]", "month": "datetime64[M]"}
+
+
+def code_dtype(column: str) -> str:
+    """Dtype of a label column's codes."""
+    return HASH_DTYPE if column in HASHED_COLUMNS else CODE_DTYPE
+
+
+def hash_labels(values: pd.Series) -> np.ndarray:
+    """Non-negative 63-bit hash of each label, -1 for missing values.
+
+    The hash does not depend on the process, so appended rows get the codes
+    of earlier ones. Two of a billion labels collide with a probability of
+    about 5%.
+    """
+    hashes = pd.util.hash_pandas_object(values, index=False).to_numpy() >> np.uint64(1)
+    codes = hashes.astype(HASH_DTYPE)
+    codes[values.isna().to_numpy()] = -1
+    return codes
+
+
+def store_path(table: str, snapshot_dir: Optional[str] = None) -> str:
+    """Directory of a table's partitioned store."""
+    return os.path.join(snapshot_dir or SNAPSHOT_DIR, f"{table}.store")
+
+
+class EventStore:
+    """Read side of a partitioned event store."""
+
+    def __init__(self, root: str, manifest: dict):
+        self.root = root
+        self.manifest = manifest
+        self.table = manifest["table"]
+        self.date_column = manifest["date_column"]
+        self.dictionaries: Dict[str, List[str]] = manifest["dictionaries"]
+        self.partitions: List[dict] = manifest["partitions"]
+        self._starts = np.array([p["min"] for p in self.partitions], dtype=DATE_DTYPE)
+        self._ends = np.array([p["max"] for p in self.partitions], dtype=DATE_DTYPE)
+        self._maps: Dict[Tuple[str, str], np.memmap] = {}
+        self._lock = threading.Lock()
+
+    def column(self, partition: dict, column: str) -> np.ndarray:
+        """Memory map of one column of one partition."""
+        key = (partition_dir(partition), column)
+        if key not in self._maps:
+            dtype = DATE_DTYPE if column == self.date_column else code_dtype(column)
+            path = os.path.join(self.root, partition_dir(partition), f"{column}.bin")
+            with self._lock:
+                self._maps.setdefault(key, np.memmap(path, dtype=dtype, mode="r", shape=(partition["rows"],)))
+        return self._maps[key]
+
+    def slices(self, start_date=None, end_date=None) -> List[Tuple[dict, int, int]]:
+        """(partition, first row, end row) for every partition overlapping the range (inclusive)."""
+        start = pd.Timestamp(start_date).value if start_date is not None else np.iinfo(DATE_DTYPE).min
+        end = pd.Timestamp(end_date).value if end_date is not None else np.iinfo(DATE_DTYPE).max
+        first = int(np.searchsorted(self._ends, start, side="left"))
+        last = int(np.searchsorted(self._starts, end, side="right"))
+        result = []
+        for partition in self.partitions[first:last]:
+            lo, hi = 0, partition["rows"]
+            if partition["min"] < start or partition["max"] > end:
+                dates = self.column(partition, self.date_column)
+                lo = int(np.searchsorted(dates, start, side="left"))
+                hi = int(np.searchsorted(dates, end, side="right"))
+            if hi > lo:
+                result.append((partition, lo, hi))
+        return result
+
+    def count(self, start_date=None, end_date=None) -> int:
+        """Number of events in the date range."""
+        return sum(hi - lo for _, lo, hi in self.slices(start_date, end_date))
+
+    def value_counts(self, column: str, start_date=None, end_date=None) -> pd.Series:
+        """Event counts per label of a dictionary-encoded column, largest first."""
+        if column not in self.dictionaries:
+            raise ValueError(f"{column} is stored as label hashes and has no labels to count")
+        labels = self.dictionaries[column]
+        # Shift codes by one so that missing values (-1) land in bin 0
+        counts = np.zeros(len(labels) + 1, dtype="int64")
+        for partition, lo, hi in self.slices(start_date, end_date):
+            codes = self.column(partition, column)[lo:hi]
+            counts += np.bincount(codes + 1, minlength=len(labels) + 1)
+        result = pd.Series(counts[1:], index=pd.Index(labels, name=column), name="count")
+        result = result[result > 0]
+        return result.sort_values(ascending=False, kind="stable")
+
+    def date_range(self) -> Tuple[Optional[pd.Timestamp], Optional[pd.Timestamp]]:
+        """First and last event timestamp in the store."""
+        if not self.partitions:
+            return None, None
+        return pd.Timestamp(int(self._starts.min())), pd.Timestamp(int(self._ends.max()))
+
+
+def encode(values: pd.Series, labels: List[str], index: Dict[str, int]) -> np.ndarray:
+    """Map a chunk's labels onto store-wide dictionary codes, growing the dictionary."""
+    categorical = pd.Categorical(values)
+    for label in categorical.categories:
+        if label not in index:
+            index[label] = len(labels)
+            labels.append(label)
+    mapping = np.array([index[label] for label in categorical.categories] + [-1], dtype=CODE_DTYPE)
+    # Categorical codes use -1 for missing values, which picks the trailing -1
+    return mapping[categorical.codes]
+
+
+def write_chunks(chunks: Iterator[pd.DataFrame], directory: str, date_column: str, columns: List[str],
+                 granularity: str, labels: Dict[str, List[str]], indexes: Dict[str, Dict[str, int]]) -> Dict[str, int]:
+    """Append encoded chunks to per-partition column files under `directory`.
+
+    Returns the number of rows written per partition key.
+    """
+    rows: Dict[str, int] = {}
+    for chunk in chunks:
+        chunk = chunk[chunk[date_column].notna()]
+        dates = chunk[date_column].to_numpy(dtype="datetime64[ns]")
+        keys = dates.astype(GRANULARITY_UNITS[granularity])
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        arrays = {date_column: dates.view(DATE_DTYPE)[order]}
+        for column in columns:
+            if column in HASHED_COLUMNS:
+                arrays[column] = hash_labels(chunk[column])[order]
+            else:
+                arrays[column] = encode(chunk[column], labels[column], indexes[column])[order]
+        unique_keys, bounds = np.unique(keys, return_index=True)
+        bounds = list(bounds) + [len(keys)]
+        for i, key in enumerate(unique_keys):
+            name = str(key)
+            os.makedirs(os.path.join(directory, name), exist_ok=True)
+            for column, values in arrays.items():
+                with open(os.path.join(directory, name, f"{column}.bin"), "ab") as f:
+                    f.write(values[bounds[i]:bounds[i + 1]].tobytes())
+            rows[name] = rows.get(name, 0) + int(bounds[i + 1] - bounds[i])
+    return rows
+
+
+def build_event_store(table: str, date_column: str, columns: List[str], root: str, source_path: str,
+                      granularity: str = "month", chunksize: int = 1_000_000) -> EventStore:
+    """Stream a CSV into a partitioned store at `root`, replacing any previous store.
+
+    Memory use is bounded by one chunk while streaming and by the largest
+    partition while sorting.
+    """
+    fingerprint = file_fingerprint(source_path)
+    tmp_root = f"{root}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_root, ignore_errors=True)
+    os.makedirs(tmp_root)
+
+    labels: Dict[str, List[str]] = {column: [] for column in columns if column not in HASHED_COLUMNS}
+    indexes: Dict[str, Dict[str, int]] = {column: {} for column in labels}
+    rows = write_chunks(read_csv_chunks(source_path, table, chunksize), tmp_root, date_column, columns,
+                        granularity, labels, indexes)
+
+    partitions = []
+    for name in sorted(rows):
+        partition = {"key": name, "rows": rows[name]}
+        sort_partition(tmp_root, partition, date_column, columns)
+        partitions.append(partition)
+
+    manifest = {
+        "format": STORE_FORMAT_VERSION,
+        "schema": schema_version(table),
+        "table": table,
+        "date_column": date_column,
+        "columns": columns,
+        "granularity": granularity,
+        "dictionaries": labels,
+        "partitions": partitions,
+        "watermark": max((p["max"] for p in partitions), default=None),
+        "source": fingerprint,
+    }
+    with open(os.path.join(tmp_root, "manifest.json"), "w") as f:
+        json.dump(manifest, f)
+
+    old_root = f"{root}.{os.getpid()}.old"
+    if os.path.exists(root):
+        os.replace(root, old_root)
+    os.replace(tmp_root, root)
+    shutil.rmtree(old_root, ignore_errors=True)
+    return EventStore(root, manifest)
+
+
+def append_event_store(manifest: dict, root: str, source_path: str, offset: int,
+                       chunksize: int = 1_000_000) -> EventStore:
+    """Add the rows appended to the source CSV since the store was written.
+
+    Only partitions that receive rows are rewritten, into new directories, so
+    memory maps of the previous manifest stay valid until they are dropped.
+    """
+    fingerprint = appended_fingerprint(manifest["source"], source_path)
+    table, date_column, columns = manifest["table"], manifest["date_column"], manifest["columns"]
+    generation = manifest.get("generation", 0) + 1
+    labels = {column: list(values) for column, values in manifest["dictionaries"].items()}
+    indexes = {column: {label: code for code, label in enumerate(values)} for column, values in labels.items()}
+
+    tail_root = os.path.join(root, f"append.{os.getpid()}.tmp")
+    shutil.rmtree(tail_root, ignore_errors=True)
+    os.makedirs(tail_root)
+    # Only parse up to the fingerprinted size so rows appended meanwhile are picked up next time
+    with open(source_path, "rb") as f:
+        header = f.readline()
+        f.seek(offset)
+        tail = io.BytesIO(header + f.read(fingerprint["size"] - offset))
+    rows = write_chunks(read_csv_chunks(tail, table, chunksize), tail_root, date_column, columns,
+                        manifest["granularity"], labels, indexes)
+
+    partitions = {partition["key"]: dict(partition) for partition in manifest["partitions"]}
+    replaced = []
+    for name, added in rows.items():
+        partition = partitions.get(name, {"key": name, "rows": 0})
+        directory = os.path.join(root, f"{name}.{generation}")
+        os.makedirs(directory)
+        for column in [date_column] + columns:
+            with open(os.path.join(directory, f"{column}.bin"), "wb") as target:
+                if partition["rows"]:
+                    with open(os.path.join(root, partition_dir(partition), f"{column}.bin"), "rb") as f:
+                        shutil.copyfileobj(f, target)
+                with open(os.path.join(tail_root, name, f"{column}.bin"), "rb") as f:
+                    shutil.copyfileobj(f, target)
+        if partition["rows"]:
+            replaced.append(partition_dir(partition))
+        partition = dict(partition, dir=f"{name}.{generation}", rows=partition["rows"] + added)
+        sort_partition(root, partition, date_column, columns)
+        partitions[name] = partition
+    shutil.rmtree(tail_root, ignore_errors=True)
+
+    ordered = [partitions[name] for name in sorted(partitions)]
+    manifest = dict(
+        manifest,
+        dictionaries=labels,
+        partitions=ordered,
+        generation=generation,
+        watermark=max((p["max"] for p in ordered), default=None),
+        source=fingerprint,
+    )
+    tmp_manifest = os.path.join(root, f"manifest.json.{os.getpid()}.tmp")
+    with open(tmp_manifest, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_manifest, os.path.join(root, "manifest.json"))
+    # Open memory maps keep the replaced files alive until they are closed
+    for directory in replaced:
+        shutil.rmtree(os.path.join(root, directory), ignore_errors=True)
+    return EventStore(root, manifest)
+
+
+def partition_dir(partition: dict) -> str:
+    """Directory of a partition, relative to the store root."""
+    return partition.get("dir", partition["key"])
+
+
+def sort_partition(root: str, partition: dict, date_column: str, columns: List[str]) -> None:
+    """Sort one partition's files by date and record its date bounds."""
+    directory = os.path.join(root, partition_dir(partition))
+    dates = np.fromfile(os.path.join(directory, f"{date_column}.bin"), dtype=DATE_DTYPE)
+    order = np.argsort(dates, kind="stable")
+    dates[order].tofile(os.path.join(directory, f"{date_column}.bin"))
+    for column in columns:
+        path = os.path.join(directory, f"{column}.bin")
+        np.fromfile(path, dtype=code_dtype(column))[order].tofile(path)
+    partition["min"] = int(dates[order[0]])
+    partition["max"] = int(dates[order[-1]])
+
+
+def is_store_compatible(manifest: Optional[dict], table: str, columns: List[str], granularity: str) -> bool:
+    """Check that a store manifest was written with the current schema and layout."""
+    if not manifest or manifest.get("format") != STORE_FORMAT_VERSION:
+        return False
+    if manifest.get("schema") != schema_version(table):
+        return False
+    return manifest.get("columns") == columns and manifest.get("granularity") == granularity
+
+
+def is_store_valid(manifest: Optional[dict], source_path: str, table: str, columns: List[str],
+                   granularity: str) -> bool:
+    """Check that a store manifest matches the source file, schema and layout."""
+    if not is_store_compatible(manifest, table, columns, granularity):
+        return False
+    return is_source_unchanged(manifest.get("source", {}), source_path)
+
+
+def open_event_store(table: str = "DIGITAL_EVENT", date_column: str = "EVENT_DATE",
+                     columns: Optional[List[str]] = None, tables_dir: Optional[str] = None,
+                     snapshot_dir: Optional[str] = None, granularity: str = "month") -> EventStore:
+    """Open the store for a table, updating it when rows were appended to the
+    source CSV and rebuilding it when the source changed otherwise."""
+    columns = columns or ["EVENT_TYPE", "DEVICE_TYPE", "SESSION_ID", "CUSTOMER_ID"]
+    root = store_path(table, snapshot_dir)
+    source_path = csv_path(table, tables_dir)
+    manifest = read_manifest(os.path.join(root, "manifest.json"))
+    if is_store_valid(manifest, source_path, table, columns, granularity):
+        return EventStore(root, manifest)
+    if is_store_compatible(manifest, table, columns, granularity):
+        offset = appended_offset(manifest.get("source", {}), source_path)
+        if offset is not None:
+            try:
+                return append_event_store(manifest, root, source_path, offset)
+            except Exception:
+                pass
+    return build_event_store(table, date_column, columns, root, source_path, granularity)
@@ -0,0 +1,160 @@
+"""Facility-level inventory on a sparse variant x facility stock matrix.
+
+INVENTORY holds one row per variant and facility that stocks it. It is
+loaded once into a CSR matrix (variants x facilities, duplicates summed),
+from which everything the Inventory tab shows is derived up front:
+
+- stock and stocked variants per category x facility, as a small dense
+  matrix from one sparse product with a category indicator matrix;
+- per-variant spread across facilities (coefficient of variation, fullest
+  and emptiest facility) from row sums over the stored entries;
+- the stored entries at or below the critical level.
+
+A category filter then only selects rows of these precomputed results, so
+changing it costs a few array lookups instead of a pass over INVENTORY.
+"""
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# Stock at or below this level in a facility is critical, as on the Inventory tab
+CRITICAL_QTY = 5
+
+
+def row_extreme(matrix: sparse.csr_matrix, reduce: np.ufunc):
+    """Column and value of the largest (np.maximum) or smallest (np.minimum) stored entry of each row.
+
+    Ties go to the lowest column; rows without entries get column -1 and NaN.
+    """
+    counts = np.diff(matrix.indptr)
+    stored = counts > 0
+    values = np.full(matrix.shape[0], np.nan)
+    columns = np.full(matrix.shape[0], -1, dtype=np.int64)
+    if not stored.any():
+        return columns, values
+    starts = matrix.indptr[:-1][stored]
+    values[stored] = reduce.reduceat(matrix.data, starts)
+    extreme = matrix.data == np.repeat(values, counts)
+    # Entries that are not the extreme get a column past the last, so the minimum picks the first tie
+    columns[stored] = np.minimum.reduceat(np.where(extreme, matrix.indices, matrix.shape[1]), starts)
+    return columns, values
+
+
+class FacilityInventory:
+    """Stock matrix and precomputed roll-ups of INVENTORY; see build_facility_inventory.
+
+    Frames returned are shared and must not be modified in place.
+    """
+
+    def __init__(self, matrix: sparse.csr_matrix, variants: pd.DataFrame, facilities: pd.DataFrame,
+                 categories: pd.Index):
+        self.matrix = matrix
+        self.variants = variants
+        self.facilities = facilities
+        self.categories = categories
+
+        # Category x facility roll-ups; the last row collects variants of unknown category
+        codes = variants['CATEGORY_CODE'].to_numpy()
+        indicator = sparse.csr_matrix((np.ones(len(codes)), (codes, np.arange(len(codes)))),
+                                      shape=(len(categories) + 1, len(codes)))
+        self.stock_by_category = (indicator @ matrix).toarray()
+        self.stocked_by_category = (indicator @ (matrix > 0).astype(np.float64)).toarray()
+
+        self.variant_spread = self._variant_spread()
+        self.critical = self._critical_entries()
+
+    def _variant_spread(self) -> pd.DataFrame:
+        """Per-variant stock spread across all facilities, a facility without stock counting as 0.
+
+        The fullest and emptiest facility are taken among those with an
+        INVENTORY row for the variant.
+        """
+        facilities = self.matrix.shape[1]
+        total = np.asarray(self.matrix.sum(axis=1)).ravel()
+        squares = np.asarray(self.matrix.multiply(self.matrix).sum(axis=1)).ravel()
+        mean = total / facilities
+        std = np.sqrt(np.maximum(squares / facilities - mean ** 2, 0))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            variation = np.where(mean > 0, std / mean, np.nan)
+        fullest, most = row_extreme(self.matrix, np.maximum)
+        emptiest, least = row_extreme(self.matrix, np.minimum)
+        names = np.append(self.facilities['FACILITY_NAME'].to_numpy(dtype=object), None)
+        return self.variants.assign(
+            TOTAL_QTY=total,
+            FACILITIES_STOCKED=np.diff((self.matrix > 0).indptr),
+            IMBALANCE=variation,
+            FULLEST_FACILITY=names[fullest],
+            MAX_QTY=most,
+            EMPTIEST_FACILITY=names[emptiest],
+            MIN_QTY=least,
+        )
+
+    def _critical_entries(self) -> pd.DataFrame:
+        """Stored variant/facility entries at or below CRITICAL_QTY, by facility and quantity."""
+        entries = self.matrix.tocoo()
+        critical = entries.data <= CRITICAL_QTY
+        rows, columns = entries.row[critical], entries.col[critical]
+        order = np.lexsort((entries.data[critical], columns))
+        facilities = self.facilities.iloc[columns[order]].reset_index(drop=True)
+        variants = self.variants.iloc[rows[order]].reset_index(drop=True)
+        return pd.concat([facilities[['FACILITY_NAME']], variants], axis=1).assign(
+            QUANTITY=entries.data[critical][order])
+
+    def category_codes(self, categories: Optional[Sequence] = None) -> np.ndarray:
+        """Roll-up rows of the given categories, or of every row (unknown category included) for None."""
+        if categories is None:
+            return np.arange(len(self.categories) + 1)
+        codes = self.categories.get_indexer(pd.Index(categories))
+        return codes[codes >= 0]
+
+    def stock_by_facility(self, categories: Optional[Sequence] = None) -> pd.DataFrame:
+        """Total stock, stocked variants and share of stock per facility."""
+        codes = self.category_codes(categories)
+        total = self.stock_by_category[codes].sum(axis=0)
+        stock = self.facilities.assign(
+            TOTAL_QTY=total,
+            VARIANTS_STOCKED=self.stocked_by_category[codes].sum(axis=0).astype(np.int64),
+        )
+        stock['SHARE'] = total / total.sum() if total.sum() > 0 else 0.0
+        return stock
+
+    def select(self, df: pd.DataFrame, categories: Optional[Sequence] = None) -> pd.DataFrame:
+        """Rows of a per-variant or per-entry frame belonging to the given categories."""
+        if categories is None:
+            return df
+        return df[np.isin(df['CATEGORY_CODE'].to_numpy(), self.category_codes(categories))]
+
+
+def build_facility_inventory(inventory: pd.DataFrame, product: pd.DataFrame,
+                             facility: pd.DataFrame) -> FacilityInventory:
+    """Build the stock matrix of INVENTORY with product names and categories and facility labels.
+
+    Facilities are the matrix columns in FACILITY order, followed by any IDs
+    only INVENTORY mentions.
+    """
+    inventory = inventory[inventory['VARIANT_ID'].notna() & inventory['FACILITY_ID'].notna()]
+    variant_codes, variant_ids = pd.factorize(inventory['VARIANT_ID'])
+    facility_ids = pd.Index(facility['FACILITY_ID']).append(pd.Index(inventory['FACILITY_ID'])).unique()
+    facility_codes = facility_ids.get_indexer(inventory['FACILITY_ID'])
+    matrix = sparse.csr_matrix(
+        (inventory['QUANTITY'].to_numpy(dtype=np.float64), (variant_codes, facility_codes)),
+        shape=(len(variant_ids), len(facility_ids)))
+    matrix.sum_duplicates()
+
+    facilities = pd.DataFrame({'FACILITY_ID': facility_ids}).merge(
+        facility[['FACILITY_ID', 'FACILITY_NAME', 'FACILITY_TYPE']], on='FACILITY_ID', how='left')
+    facilities['FACILITY_NAME'] = facilities['FACILITY_NAME'].fillna(facilities['FACILITY_ID'])
+
+    # The product of each variant is taken from its first INVENTORY row
+    first = np.unique(variant_codes, return_index=True)[1]
+    variants = pd.DataFrame({
+        'VARIANT_ID': variant_ids,
+        'PRODUCT_ID': inventory['PRODUCT_ID'].to_numpy()[first],
+    })
+    variants = variants.merge(product[['PRODUCT_ID', 'NAME', 'CATEGORY']], on='PRODUCT_ID', how='left')
+    categories = pd.Index(product['CATEGORY'].dropna().unique())
+    codes = categories.get_indexer(variants['CATEGORY'])
+    variants['CATEGORY_CODE'] = np.where(codes >= 0, codes, len(categories))
+    return FacilityInventory(matrix, variants, facilities, categories)
@@ -0,0 +1,46 @@
+"""Cache of finished Plotly figures, shared across Streamlit sessions.
+
+A figure is stored as its JSON, keyed by chart id and by the caller's key
+(the filter state and the versions of the tables it was drawn from). On a
+hit the JSON is rehydrated into a Figure without re-running plotly's
+validation, which skips the figure construction and any aggregation inside
+the chart's build function; aggregations the caller runs before asking for
+the figure are not skipped. Entries live in a ViewCache (see
+src/view_cache.py), so they are evicted least recently used first once
+their combined size exceeds the budget, and the cache reports hit rates.
+"""
+import json
+import os
+from typing import Callable, Dict, Hashable
+
+import plotly.graph_objects as go
+
+from src.view_cache import ViewCache
+
+DEFAULT_MAX_BYTES = int(os.environ.get("ECOMMERCE_FIGURE_CACHE_MB", "64")) << 20
+
+
+class FigureCache:
+    """Figure JSON per (chart id, key) in a size-bounded LRU cache.
+
+    Figures returned are fresh objects and may be modified by the caller.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self._cache = ViewCache(max_bytes)
+
+    def figure(self, chart_id: str, key: Hashable, build: Callable[[], go.Figure]) -> go.Figure:
+        """The figure of a chart for a key, built and stored on a miss."""
+        payload = self._cache.get(("figure", chart_id, key), lambda: build().to_json())
+        # The stored JSON came from a validated figure, so validating it again is wasted work
+        return go.Figure(json.loads(payload), _validate=False)
+
+    def clear(self) -> None:
+        """Drop every figure; counters are kept."""
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Hit, miss and eviction counters, hit rate and current size."""
+        stats = self._cache.stats()
+        lookups = stats["hits"] + stats["misses"]
+        return dict(stats, hit_rate=stats["hits"] / lookups if lookups else 0.0)
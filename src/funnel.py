@@ -0,0 +1,145 @@
+"""Ordered, session-aware conversion funnel over DIGITAL_EVENT.
+
+A journey (a session, or a customer) reaches a funnel step when it has an
+event of that step after the event that reached the previous step. The
+step events of the date range are read from the partitioned event store
+(see src/event_store.py) already in date order, so one stable sort by
+journey (see journey_order) puts every journey's events in time order. Each step is then found
+with vectorized group boundaries: among the step's events that come after
+the journey's previous step, the first one per journey. Journeys reaching
+each step, step-to-step drop-off and the median time between steps all come
+out of the same pass.
+"""
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.event_store import EventStore
+
+FUNNEL_STEPS = ("PAGE_VIEW", "PRODUCT_VIEW", "ADD_TO_CART", "CHECKOUT_START", "CHECKOUT_COMPLETE")
+
+# Columns of DIGITAL_EVENT a journey can be keyed on
+FUNNEL_UNITS = ("SESSION_ID", "CUSTOMER_ID")
+
+
+def funnel_events(store: EventStore, steps: Sequence[str], by: str, start_date=None, end_date=None):
+    """Journey code, step number and time (int64 ns) of the step events in the date range, in date order.
+
+    Events of other types and events without a journey are left out.
+    """
+    codes = {label: code for code, label in enumerate(store.dictionaries['EVENT_TYPE'])}
+    # Step of each event type code, shifted by one so that missing types (-1) map to -1 too
+    step_of_code = np.full(len(codes) + 1, -1, dtype=np.int8)
+    for step, label in enumerate(steps):
+        if label in codes:
+            step_of_code[codes[label] + 1] = step
+
+    journeys, step_numbers, times = [], [], []
+    for partition, lo, hi in store.slices(start_date, end_date):
+        step = step_of_code[store.column(partition, 'EVENT_TYPE')[lo:hi] + 1]
+        journey = store.column(partition, by)[lo:hi]
+        keep = (step >= 0) & (journey >= 0)
+        journeys.append(journey[keep])
+        step_numbers.append(step[keep])
+        times.append(store.column(partition, store.date_column)[lo:hi][keep])
+    if not journeys:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int8), np.empty(0, dtype=np.int64)
+    # Partitions cover disjoint, increasing date ranges, so the concatenation stays in date order
+    return np.concatenate(journeys), np.concatenate(step_numbers), np.concatenate(times)
+
+
+def journey_order(journeys: np.ndarray) -> np.ndarray:
+    """Rows sorted by journey, each journey's rows in ascending order.
+
+    Journeys are non-negative int64 codes: small dictionary codes, or the
+    63-bit label hashes of the event store. The row is packed into the low
+    32 bits of the sort key, next to the journey or, for hashes, next to its
+    high 31 bits, which makes keys unique so that a plain sort is stable and
+    faster than a stable argsort. Runs of rows whose different journeys share
+    the high bits are then re-sorted by (journey, row) on their own.
+    """
+    journeys = journeys.astype(np.int64, copy=False)
+    wide = len(journeys) > 0 and int(journeys.max()) >= 1 << 31
+    high = journeys >> 32 if wide else journeys
+    keys = np.sort((high << 32) | np.arange(len(journeys), dtype=np.int64))
+    order = keys & 0xFFFFFFFF
+    if not wide:
+        return order
+    high, journeys_sorted = keys >> 32, journeys[order]
+    clash = np.flatnonzero((high[1:] == high[:-1]) & (journeys_sorted[1:] != journeys_sorted[:-1])) + 1
+    if len(clash) == 0:
+        return order
+    starts = np.concatenate([[0], np.flatnonzero(high[1:] != high[:-1]) + 1])
+    ends = np.append(starts[1:], len(order))
+    runs = np.unique(np.searchsorted(starts, clash, side='right') - 1)
+    lengths = ends[runs] - starts[runs]
+    positions = np.arange(lengths.sum()) + np.repeat(starts[runs] - np.cumsum(lengths) + lengths, lengths)
+    rows = order[positions]
+    order[positions] = rows[np.lexsort((rows, journeys[rows], np.repeat(runs, lengths)))]
+    return order
+
+
+def first_per_journey(journeys: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """First of the ascending `rows` of every journey, for rows sorted by journey."""
+    first = np.ones(len(rows), dtype=bool)
+    first[1:] = journeys[rows[1:]] != journeys[rows[:-1]]
+    return rows[first]
+
+
+def ordered_funnel(journeys: np.ndarray, step_numbers: np.ndarray, times: np.ndarray,
+                   steps: Sequence[str] = FUNNEL_STEPS) -> pd.DataFrame:
+    """Journeys reaching each step in order, with drop-off and median time from the previous step.
+
+    `journeys`, `step_numbers` (positions in `steps`) and `times` describe
+    one event each and must be in time order; ties keep their order. Returns
+    one row per step: EVENT_TYPE, COUNT (journeys that reached it), CONVERSION
+    (percent of the first step), DROP_OFF (percent of the previous step's
+    journeys lost) and MEDIAN_SECONDS (from reaching the previous step).
+    """
+    # One sort: by journey, keeping time order within each journey
+    order = journey_order(journeys)
+    journeys, step_numbers = journeys[order], step_numbers[order]
+    starts = np.ones(len(journeys), dtype=bool)
+    starts[1:] = journeys[1:] != journeys[:-1]
+    group = np.cumsum(starts) - 1
+
+    # Row at which each journey reached the previous step; -1 if it did not
+    reached = np.full(int(starts.sum()), -1, dtype=np.int64)
+    counts, medians = [], []
+    for step in range(len(steps)):
+        rows = np.flatnonzero(step_numbers == step)
+        if step > 0:
+            previous = reached[group[rows]]
+            rows = rows[(previous >= 0) & (rows > previous)]
+        rows = first_per_journey(journeys, rows)
+        if step > 0:
+            # Times are only looked up for the rows reaching a step
+            elapsed = (times[order[rows]] - times[order[reached[group[rows]]]]) / 1e9
+            medians.append(float(np.median(elapsed)) if len(elapsed) else np.nan)
+        else:
+            medians.append(np.nan)
+        reached = np.full_like(reached, -1)
+        reached[group[rows]] = rows
+        counts.append(len(rows))
+
+    counts = np.array(counts, dtype=np.int64)
+    previous = np.concatenate([counts[:1], counts[:-1]])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        conversion = np.where(counts[0] > 0, counts / counts[0] * 100, np.nan)
+        drop_off = np.where(previous > 0, (1 - counts / previous) * 100, np.nan)
+    return pd.DataFrame({
+        'EVENT_TYPE': list(steps),
+        'COUNT': counts,
+        'CONVERSION': conversion,
+        'DROP_OFF': drop_off,
+        'MEDIAN_SECONDS': medians,
+    })
+
+
+def session_funnel(store: EventStore, start_date=None, end_date=None, by: str = "SESSION_ID",
+                   steps: Sequence[str] = FUNNEL_STEPS) -> pd.DataFrame:
+    """Ordered funnel of the sessions (or customers, `by`="CUSTOMER_ID") with events in the date range."""
+    if by not in FUNNEL_UNITS:
+        raise ValueError(f"Unknown funnel unit {by!r}, expected one of {FUNNEL_UNITS}")
+    return ordered_funnel(*funnel_events(store, steps, by, start_date, end_date), steps)
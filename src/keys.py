@@ -0,0 +1,126 @@
+"""Dense integer surrogate keys for the ID columns and key-based joins.
+
+At ingest every ORDER_ID, CUSTOMER_ID, PRODUCT_ID, VARIANT_ID and CAMPAIGN_ID
+column gets an int32 companion column (ORDER_KEY, ...) holding the ID's code
+in a process-wide, append-only dictionary. Codes never change once assigned,
+so a filtered view stays joinable with tables reloaded after it was cut.
+
+`join` and `semi_join` then answer the dashboard's star joins with array
+lookups: the right side's keys are scattered into a position array indexed by
+code and gathered with the left side's keys, instead of hashing the ID strings
+of both sides on every call. They return the same frames as the equivalent
+`DataFrame.merge` / `isin` and fall back to those when a frame has no key
+columns or the right side's keys are not unique.
+"""
+import threading
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+# ID columns encoded at ingest and the name of their key column
+KEY_COLUMNS: Dict[str, str] = {
+    "ORDER_ID": "ORDER_KEY",
+    "CUSTOMER_ID": "CUSTOMER_KEY",
+    "PRODUCT_ID": "PRODUCT_KEY",
+    "VARIANT_ID": "VARIANT_KEY",
+    "CAMPAIGN_ID": "CAMPAIGN_KEY",
+}
+
+
+class KeyDictionary:
+    """Append-only mapping of ID values to dense int32 codes."""
+
+    def __init__(self):
+        self._ids: Optional[pd.Index] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return 0 if self._ids is None else len(self._ids)
+
+    def encode(self, values: pd.Series) -> np.ndarray:
+        """Codes of the values, assigning new codes to IDs seen for the first time."""
+        with self._lock:
+            if self._ids is None:
+                self._ids = pd.Index(values.unique())
+            codes = self._ids.get_indexer(values)
+            missing = codes == -1
+            if missing.any():
+                self._ids = self._ids.append(pd.Index(values[missing].unique()))
+                codes[missing] = self._ids.get_indexer(values[missing])
+        return codes.astype(np.int32)
+
+
+class DimensionKeys:
+    """One KeyDictionary per ID column, shared by every table that references it."""
+
+    def __init__(self):
+        self._dictionaries = {column: KeyDictionary() for column in KEY_COLUMNS}
+
+    def add_keys(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Return the table with a key column next to each of its ID columns."""
+        keys = {KEY_COLUMNS[column]: self._dictionaries[column].encode(df[column])
+                for column in df.columns if column in KEY_COLUMNS}
+        return df.assign(**keys) if keys else df
+
+    def sizes(self) -> Dict[str, int]:
+        """Number of IDs encoded so far per ID column."""
+        return {column: len(dictionary) for column, dictionary in self._dictionaries.items()}
+
+
+def key_columns(on: Sequence[str]) -> Optional[List[str]]:
+    """Key columns of the given ID columns, or None if one has no key."""
+    keys = [KEY_COLUMNS.get(column) for column in on]
+    return None if None in keys else keys
+
+
+def positions(left_keys: np.ndarray, right_keys: np.ndarray) -> Optional[np.ndarray]:
+    """Row of the right side holding each left key (-1 if none), or None if right keys repeat."""
+    size = int(max(left_keys.max(initial=-1), right_keys.max(initial=-1))) + 1
+    if len(right_keys) and np.bincount(right_keys, minlength=size).max() > 1:
+        return None
+    rows = np.full(size, -1, dtype=np.int64)
+    rows[right_keys] = np.arange(len(right_keys))
+    return rows[left_keys]
+
+
+def join(left: pd.DataFrame, right: pd.DataFrame, on: Union[str, List[str]], columns: List[str],
+         how: str = "inner") -> pd.DataFrame:
+    """`left.merge(right[on + columns], on=on, how=how)` for how in ("inner", "left").
+
+    The first ID column is looked up by key; any further ones must also match.
+    """
+    on = [on] if isinstance(on, str) else list(on)
+    keys = key_columns(on)
+    if keys is None or not all(key in left.columns and key in right.columns for key in keys):
+        return left.merge(right[on + columns], on=on, how=how)
+    rows = positions(left[keys[0]].to_numpy(), right[keys[0]].to_numpy())
+    if rows is None:
+        return left.merge(right[on + columns], on=on, how=how)
+
+    matched = rows >= 0
+    for key in keys[1:]:
+        matched[matched] = right[key].to_numpy()[rows[matched]] == left[key].to_numpy()[matched]
+    if how == "inner":
+        joined = left[matched].reset_index(drop=True)
+        rows = rows[matched]
+    else:
+        joined = left.reset_index(drop=True)
+        rows = np.where(matched, rows, -1)
+    # take with allow_fill leaves the dtype alone unless a row is missing, like merge
+    return joined.assign(**{
+        column: pd.api.extensions.take(right[column].array, rows, allow_fill=True)
+        for column in columns
+    })
+
+
+def semi_join(left: pd.DataFrame, right: pd.DataFrame, on: str) -> pd.DataFrame:
+    """Rows of `left` whose ID appears in `right`, i.e. `left[left[on].isin(right[on])]`."""
+    key = KEY_COLUMNS.get(on)
+    if key is None or key not in left.columns or key not in right.columns:
+        return left[left[on].isin(right[on].values)]
+    left_keys = left[key].to_numpy()
+    right_keys = right[key].to_numpy()
+    present = np.zeros(int(max(left_keys.max(initial=-1), right_keys.max(initial=-1))) + 1, dtype=bool)
+    present[right_keys] = True
+    return left[present[left_keys]]
@@ -0,0 +1,74 @@
+"""Which dashboard sections run on a rerun, and background warm-up of the rest.
+
+With st.tabs every tab's body runs on every rerun, although only one tab is
+on screen. ECOMMERCE_NAVIGATION picks how Dashboard.py lays out its
+sections: "sections" (default) shows a section selector and runs only the
+selected section, so the others cost nothing until they are opened; "tabs"
+runs all of them in tabs as before (benchmarks/bench_tabs.py uses it to time
+every section on each run).
+
+A section opened for the first time still loads its tables and builds its
+per-load indexes. With ECOMMERCE_PREFETCH=1 the Prefetcher does that for
+the sections not on screen in a background thread, one at a time, after
+the selected section has been served.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional
+
+NAVIGATION_MODE = os.environ.get("ECOMMERCE_NAVIGATION", "sections")
+NAVIGATION_MODES = ("sections", "tabs")
+
+PREFETCH = os.environ.get("ECOMMERCE_PREFETCH", "0") == "1"
+
+
+def navigation_mode(mode: Optional[str] = None) -> str:
+    """The given navigation mode, or the configured one."""
+    mode = mode or NAVIGATION_MODE
+    if mode not in NAVIGATION_MODES:
+        raise ValueError(f"Unknown navigation mode {mode!r}, expected one of {NAVIGATION_MODES}")
+    return mode
+
+
+class Prefetcher:
+    """Runs warm-up functions in one background thread, each key once.
+
+    Warm-ups must only fill process-wide caches (the table registry and its
+    derived values); they run outside any Streamlit session. A failed
+    warm-up is recorded and not retried, and the section then builds what
+    it needs when it is opened.
+    """
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+        self._status: Dict[Hashable, str] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key: Hashable, warm: Callable[[], Any]) -> bool:
+        """Queue a warm-up unless one with the same key was queued before."""
+        with self._lock:
+            if key in self._status:
+                return False
+            self._status[key] = "queued"
+        self._executor.submit(self._run, key, warm)
+        return True
+
+    def _run(self, key: Hashable, warm: Callable[[], Any]) -> None:
+        """Run a warm-up in the background thread and record how it ended."""
+        self._set(key, "running")
+        try:
+            warm()
+        except Exception as error:
+            self._set(key, f"failed: {error!r}")
+        else:
+            self._set(key, "done")
+
+    def _set(self, key: Hashable, status: str) -> None:
+        with self._lock:
+            self._status[key] = status
+
+    def status(self) -> Dict[Hashable, str]:
+        """State of every warm-up queued so far."""
+        with self._lock:
+            return dict(self._status)
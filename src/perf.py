@@ -0,0 +1,28 @@
+"""Wall-clock timings of the dashboard's sections.
+
+Dashboard.py wraps loading, filtering and each tab in `timed`, so the
+benchmark harness (benchmarks/bench_tabs.py) can report where a rerun spends
+its time. Recording a timing costs two perf_counter calls.
+"""
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+# Seconds per run of each section, in the order the runs happened
+TIMINGS: Dict[str, List[float]] = defaultdict(list)
+
+
+@contextmanager
+def timed(section: str) -> Iterator[None]:
+    """Record how long the body of the block takes under `section`."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        TIMINGS[section].append(time.perf_counter() - started)
+
+
+def reset() -> None:
+    """Forget all recorded timings."""
+    TIMINGS.clear()
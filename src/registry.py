@@ -0,0 +1,165 @@
+"""Lazy table registry with per-tab dependency declarations.
+
+Each dashboard section declares the input tables and columns it reads. A table
+is loaded the first time a consumer asks for it, restricted to the union of the
+columns declared for it, and then kept for every later request until its
+source file changes (see TableRegistry.refresh).
+"""
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from src.keys import DimensionKeys
+from src.snapshot import load_table, source_version
+
+# Tables and columns read by each section of the dashboard
+TAB_DEPENDENCIES: Dict[str, Dict[str, List[str]]] = {
+    "Filters": {
+        "ORDER_FACT": ["ORDER_ID", "CUSTOMER_ID", "CHANNEL_ID", "ORDER_DATE", "ORDER_STATUS", "PAYMENT_METHOD"],
+        "PRODUCT": ["PRODUCT_ID", "CATEGORY"],
+        "CHANNEL": ["CHANNEL_ID", "CHANNEL_NAME"],
+        "CUSTOMER": ["CUSTOMER_ID"],
+        "SALES_PLAN": ["PLAN_START_DATE", "PLAN_END_DATE"],
+    },
+    "Sales": {
+        "ORDER_FACT": ["ORDER_ID", "ORDER_DATE", "ORDER_STATUS", "ORDER_TYPE", "TOTAL_AMOUNT"],
+        "CUSTOMER": ["CUSTOMER_ID"],
+        "SALES_PLAN": ["PLAN_START_DATE", "PLAN_END_DATE", "TARGET_REVENUE"],
+    },
+    "Product": {
+        "ORDER_LINE": ["ORDER_ID", "PRODUCT_ID", "VARIANT_ID", "QUANTITY", "UNIT_PRICE", "LINE_TOTAL"],
+        "ORDER_FACT": ["ORDER_ID", "ORDER_DATE", "ORDER_STATUS"],
+        "PRODUCT": ["PRODUCT_ID", "NAME", "CATEGORY", "BRAND", "PRICE", "ACTIVE"],
+        "PRODUCT_VARIANT": ["VARIANT_ID", "PRODUCT_ID", "VARIANT_NAME", "INVENTORY_QTY"],
+    },
+    "Customer": {
+        "ORDER_FACT": ["ORDER_ID", "CUSTOMER_ID", "ORDER_DATE", "TOTAL_AMOUNT"],
+        "CUSTOMER": ["CUSTOMER_ID", "NAME", "PRIMARY_EMAIL", "CUSTOMER_TYPE"],
+    },
+    # DIGITAL_EVENT is served by the partitioned store in src/event_store.py
+    "Digital": {
+        "PAGE_PERFORMANCE": ["DATE", "VIEWS", "UNIQUE_VISITORS", "BOUNCE_RATE", "CONVERSION_RATE"],
+    },
+    "Inventory": {
+        "PRODUCT_VARIANT": ["VARIANT_ID", "PRODUCT_ID", "VARIANT_NAME", "INVENTORY_QTY"],
+        "PRODUCT": ["PRODUCT_ID", "NAME", "CATEGORY", "BRAND"],
+        "ORDER_LINE": ["ORDER_ID", "VARIANT_ID", "QUANTITY"],
+        "ORDER_FACT": ["ORDER_ID", "ORDER_DATE"],
+        "INVENTORY": ["PRODUCT_ID", "VARIANT_ID", "FACILITY_ID", "QUANTITY"],
+        "FACILITY": ["FACILITY_ID", "FACILITY_NAME", "FACILITY_TYPE"],
+    },
+    "Campaign": {
+        "CAMPAIGN": ["CAMPAIGN_ID", "CAMPAIGN_NAME", "CAMPAIGN_TYPE", "OBJECTIVE", "BUDGET", "TARGET_SEGMENT",
+                     "START_DATE", "END_DATE"],
+        "ORDER_CAMPAIGN_ATTRIBUTION": ["ORDER_ID", "CAMPAIGN_ID", "CONTRIBUTION_PERCENT"],
+        "ORDER_FACT": ["ORDER_ID", "CUSTOMER_ID", "ORDER_DATE", "TOTAL_AMOUNT"],
+        "CAMPAIGN_EVENT": ["CAMPAIGN_ID", "CUSTOMER_ID", "EVENT_DATE"],
+    },
+}
+
+
+def required_columns(table: str) -> Optional[List[str]]:
+    """Union of the columns all sections declare for a table, in declaration order.
+
+    Returns None for tables no section declares, meaning all columns.
+    """
+    columns: List[str] = []
+    for tables in TAB_DEPENDENCIES.values():
+        for column in tables.get(table, []):
+            if column not in columns:
+                columns.append(column)
+    return columns or None
+
+
+class TableRegistry:
+    """Loads input tables on first request and keeps them for later consumers.
+
+    Frames handed out are shared between consumers (and Streamlit sessions) and
+    must not be modified in place. Their ID columns come with int32 key
+    columns from the registry's DimensionKeys (see src/keys.py).
+    """
+
+    def __init__(self, tables_dir: Optional[str] = None, snapshot_dir: Optional[str] = None):
+        self.tables_dir = tables_dir
+        self.snapshot_dir = snapshot_dir
+        self._tables: Dict[str, pd.DataFrame] = {}
+        self._derived: Dict[str, Tuple[int, Any]] = {}
+        self._generation = 0
+        self._versions: Dict[str, str] = {}
+        self.keys = DimensionKeys()
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, table: str) -> pd.DataFrame:
+        """Return a table, loading it on first use."""
+        if table in self._tables:
+            return self._tables[table]
+        with self._lock:
+            table_lock = self._locks.setdefault(table, threading.Lock())
+        with table_lock:
+            if table not in self._tables:
+                # Taken before loading, so a file replaced mid-load gets a newer version later
+                self._versions[table] = source_version(table, self.tables_dir)
+                self._tables[table] = self._load(table)
+        return self._tables[table]
+
+    def _load(self, table: str) -> pd.DataFrame:
+        """Load a table restricted to its declared columns and add its key columns."""
+        return self.keys.add_keys(load_table(table, self.tables_dir, self.snapshot_dir,
+                                             columns=required_columns(table)))
+
+    def derived(self, name: str, build: Callable[[], Any]) -> Any:
+        """Return a value computed from the loaded tables, building it on first use.
+
+        Derived values (aggregates, indexes) live as long as the tables they
+        were built from and are rebuilt after a refresh reloaded any table.
+        """
+        generation, value = self._derived.get(name, (None, None))
+        if generation == self._generation:
+            return value
+        with self._lock:
+            build_lock = self._locks.setdefault(f"derived:{name}", threading.Lock())
+        with build_lock:
+            generation, value = self._derived.get(name, (None, None))
+            if generation != self._generation:
+                # A refresh during the build leaves the value marked stale
+                generation = self._generation
+                value = build()
+                self._derived[name] = (generation, value)
+        return value
+
+    def refresh(self) -> List[str]:
+        """Reload the loaded tables whose source file changed, returning their names.
+
+        Appended rows are picked up incrementally by load_table.
+        """
+        changed = [table for table in list(self._tables)
+                   if source_version(table, self.tables_dir) != self._versions.get(table)]
+        for table in changed:
+            with self._locks[table]:
+                self._versions[table] = source_version(table, self.tables_dir)
+                self._tables[table] = self._load(table)
+        if changed:
+            with self._lock:
+                self._generation += 1
+        return changed
+
+    def version(self, tables: Sequence[str]) -> Tuple[str, ...]:
+        """Version tokens of the source files the given tables were (or will be) loaded from.
+
+        Used in cache keys of values derived from those tables.
+        """
+        return tuple(self._versions.get(table) or source_version(table, self.tables_dir) for table in tables)
+
+    def tables_for(self, tab: str) -> Dict[str, pd.DataFrame]:
+        """Load every table a section declares, restricted to its columns."""
+        return {table: self.get(table)[columns] for table, columns in TAB_DEPENDENCIES[tab].items()}
+
+    def loaded(self) -> List[str]:
+        """Names of the tables loaded so far."""
+        return sorted(self._tables)
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Deep memory usage in bytes of each loaded table."""
+        return {table: int(df.memory_usage(deep=True).sum()) for table, df in self._tables.items()}
@@ -0,0 +1,48 @@
+"""When scatter and line traces are drawn with WebGL instead of SVG.
+
+SVG traces put one DOM element per point in the page, which gets slow past
+a few thousand points; Scattergl draws them on a WebGL canvas and stays
+responsive with hundreds of thousands. WebGL contexts are limited per page,
+though, so small traces stay SVG.
+
+ECOMMERCE_RENDER_MODE picks the renderer: "svg" or "webgl" always, "auto"
+(default) WebGL for traces of more than WEBGL_THRESHOLD points.
+"""
+import os
+from typing import Optional
+
+import plotly.graph_objects as go
+
+RENDER_MODE = os.environ.get("ECOMMERCE_RENDER_MODE", "auto")
+RENDER_MODES = ("auto", "svg", "webgl")
+
+# Traces up to this many points stay SVG in "auto" mode (plotly express uses the same limit)
+WEBGL_THRESHOLD = 1000
+
+
+def render_mode(mode: Optional[str] = None) -> str:
+    """The given render mode, or the configured one."""
+    mode = mode or RENDER_MODE
+    if mode not in RENDER_MODES:
+        raise ValueError(f"Unknown render mode {mode!r}, expected one of {RENDER_MODES}")
+    return mode
+
+
+def use_webgl(points: int, mode: Optional[str] = None) -> bool:
+    """Whether a trace of `points` points is drawn with WebGL."""
+    mode = render_mode(mode)
+    return mode == "webgl" or (mode == "auto" and points > WEBGL_THRESHOLD)
+
+
+def px_render_mode(points: int, mode: Optional[str] = None) -> str:
+    """`render_mode` argument of plotly express for a chart of `points` points."""
+    return "webgl" if use_webgl(points, mode) else "svg"
+
+
+def scatter_trace(x, y, render: Optional[str] = None, **kwargs):
+    """A go.Scatter, or a go.Scattergl when the trace is large enough for WebGL.
+
+    `render` overrides the configured render mode; other arguments go to the trace.
+    """
+    trace = go.Scattergl if use_webgl(len(x), render) else go.Scatter
+    return trace(x=x, y=y, **kwargs)
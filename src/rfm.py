@@ -0,0 +1,207 @@
+"""Vectorized RFM scoring and segmentation of customers.
+
+Works on numpy arrays end to end: recency, frequency and monetary scores are
+uint8 arrays, quantile edges are computed once per measure, and segments are a
+categorical looked up from the summed score. The binning reproduces the
+dashboard's original pandas rules:
+
+- R: quartiles of the days since the last order (`pd.qcut`), most recent = 4.
+- F and M: quartiles of the distinct values, or one bin per distinct value
+  when there are fewer than four, scored from 1 upwards (`pd.cut`).
+- Missing values score 1.
+
+R quartile edges over large inputs can come from merged quantile sketches
+(see src/sketch.py) instead, within the sketch's relative error bound. The
+recency sketch is merged from one partition per day of the customers' last
+orders (see recency_sketch), so it is built from the days, not the
+customers. F and M edges are always exact.
+"""
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.sketch import QuantileSketch, quantile_mode, use_sketch
+
+QUARTILES = np.array([0, 25, 50, 75, 100])
+
+# Integral measures spanning fewer values than this are counted instead of sorted
+MAX_COUNTING_RANGE = 1 << 22
+
+# Segment of every possible R + F + M total (3..12), in alphabetical order so
+# that grouping by the categorical orders segments like grouping by their names
+SEGMENTS = ['At Risk', 'Champions', 'Lost Customers', 'Loyal Customers', 'Potential Loyalists']
+SEGMENT_BY_SCORE = np.array([
+    2, 2, 2, 2, 2,  # 0-4: Lost Customers
+    0, 0,           # 5-6: At Risk
+    4, 4,           # 7-8: Potential Loyalists
+    3, 3,           # 9-10: Loyal Customers
+    1, 1,           # 11-12: Champions
+], dtype=np.int8)
+
+
+def integer_counts(values: np.ndarray) -> Optional[Tuple[float, np.ndarray]]:
+    """Lowest value and occurrences of each integer from it, for integral values with a small range.
+
+    Returns None for other values, which are then sorted or hashed instead.
+    """
+    if len(values) == 0:
+        return None
+    integer = values.dtype.kind in 'iu'
+    # A non-integral value among the first few rules most float measures out cheaply
+    if not integer and not np.array_equal(values[:1000], np.floor(values[:1000])):
+        return None
+    low, high = values.min(), values.max()
+    if high - low >= MAX_COUNTING_RANGE:
+        return None
+    if integer:
+        return low, np.bincount(values - low)
+    shifted = values - low
+    offsets = shifted.astype(np.int64)
+    if not np.array_equal(offsets, shifted):
+        return None
+    return low, np.bincount(offsets)
+
+
+def quartile_edges(values: np.ndarray) -> np.ndarray:
+    """`np.percentile(values, [0, 25, 50, 75, 100])`, by counting for small integer ranges."""
+    counts = integer_counts(values)
+    if counts is None:
+        return np.percentile(values, QUARTILES)
+    low, occurrences = counts
+    cumulative = np.cumsum(occurrences)
+    # Linear interpolation between the order statistics around each position, as numpy does
+    position = (len(values) - 1) * QUARTILES / 100
+    below = np.floor(position)
+    fraction = position - below
+    lower = np.searchsorted(cumulative, below, side='right') + low
+    upper = np.searchsorted(cumulative, np.minimum(below + 1, len(values) - 1), side='right') + low
+    step = upper - lower
+    return np.where(fraction >= 0.5, upper - step * (1 - fraction), lower + step * fraction)
+
+
+def distinct(values: np.ndarray) -> np.ndarray:
+    """Distinct values, by counting for small integer ranges."""
+    counts = integer_counts(values)
+    if counts is None:
+        return pd.unique(values)
+    low, occurrences = counts
+    return np.flatnonzero(occurrences) + low
+
+
+def bin_scores(values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """1-based bin of each value for right-closed bins whose first bin includes the lowest edge.
+
+    The edges must span the values, as edges taken from the values' own
+    minimum and maximum do; missing values fall in the first bin.
+    """
+    # 1 + number of inner edges below each value, i.e. searchsorted(edges, values) clipped at 1
+    bins = np.ones(len(values), dtype=np.uint8)
+    for edge in edges[1:-1]:
+        np.add(bins, values > edge, out=bins)
+    return bins
+
+
+def without_missing(values: np.ndarray) -> np.ndarray:
+    """The values that are not NaN, without copying when there are none."""
+    if values.dtype.kind in 'iub':
+        return values
+    missing = np.isnan(values)
+    return values[~missing] if missing.any() else values
+
+
+def value_sketch(values: np.ndarray, mode: Optional[str] = None,
+                 sketch: Optional[QuantileSketch] = None) -> Optional[QuantileSketch]:
+    """Sketch of the values if their quantiles are to be estimated, else None.
+
+    `sketch` is a sketch of the same values built beforehand, returned
+    instead of sketching the values again. In "auto" mode integral measures
+    with a small range are still counted, which is exact and about as fast.
+    """
+    if not use_sketch(len(values), mode):
+        return None
+    if quantile_mode(mode) == "auto" and integer_counts(values) is not None:
+        return None
+    return sketch if sketch is not None else QuantileSketch.from_values(values)
+
+
+def last_order_counts(last_order: pd.Series) -> pd.Series:
+    """Customers per day their LAST_ORDER rounds up to, in date order."""
+    return last_order.dt.ceil('D').value_counts(sort=False).sort_index()
+
+
+def recency_sketch(last_order_counts: pd.Series, as_of: pd.Timestamp) -> QuantileSketch:
+    """Sketch of the whole days since the last order up to a midnight `as_of`, merged per last-order day.
+
+    All customers whose last order rounds up to the same day (see
+    last_order_counts) are the same number of days before `as_of`, so each
+    day is a partition whose sketch is one value counted once per customer.
+    """
+    days = (as_of - last_order_counts.index).days
+    return QuantileSketch().add(np.asarray(days, dtype=np.float64), last_order_counts.to_numpy())
+
+
+def recency_scores(days_since_last_order: np.ndarray, mode: Optional[str] = None,
+                   sketch: Optional[QuantileSketch] = None) -> np.ndarray:
+    """R score: 4 for the most recent quartile of customers down to 1 for the least recent.
+
+    `sketch` is a recency sketch of the same customers (see recency_sketch)
+    used when quartiles are to be estimated.
+    """
+    days = np.asarray(days_since_last_order)
+    valid = without_missing(days)
+    if len(valid) == 0:
+        return np.ones(len(days), dtype=np.uint8)
+    # Quartiles over all customers; repeated edges are collapsed instead of raising
+    sketch = value_sketch(valid, mode, sketch)
+    edges = np.unique(quartile_edges(valid) if sketch is None else sketch.quantiles(QUARTILES / 100))
+    if len(edges) < 2:
+        return np.ones(len(days), dtype=np.uint8)
+    scores = 5 - bin_scores(days, edges)
+    if len(valid) < len(days):
+        scores[np.isnan(days)] = 1
+    return scores
+
+
+def quartile_scores(values: np.ndarray) -> np.ndarray:
+    """F or M score: 1 for the lowest quartile of the distinct values up to 4."""
+    values = np.asarray(values)
+    # Quartiles of the distinct values are not rank quantiles, so no sketch
+    # applies; hashing or counting plus a selection already avoids a full sort
+    unique = distinct(without_missing(values))
+    if len(unique) < 2:
+        return np.ones(len(values), dtype=np.uint8)
+    if len(unique) < 4:
+        edges = np.sort(unique)
+    else:
+        edges = np.unique(np.percentile(unique, QUARTILES))
+    return bin_scores(values, edges)
+
+
+def rfm_scores(days_since_last_order: np.ndarray, order_count: np.ndarray, total_spent: np.ndarray,
+               mode: Optional[str] = None,
+               sketch: Optional[QuantileSketch] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """R, F and M scores (uint8, 1-4) of each customer; `mode` is a quantile mode of src/sketch.py
+    and `sketch` an optional recency sketch of the customers."""
+    return (recency_scores(days_since_last_order, mode, sketch), quartile_scores(order_count),
+            quartile_scores(total_spent))
+
+
+def segments(r: np.ndarray, f: np.ndarray, m: np.ndarray) -> pd.Categorical:
+    """Segment of each customer from the sum of its scores."""
+    total = r.astype(np.int16) + f + m
+    return pd.Categorical.from_codes(SEGMENT_BY_SCORE[total], categories=SEGMENTS, validate=False)
+
+
+def segment_counts(segment: pd.Categorical) -> pd.DataFrame:
+    """Customers per segment, largest first (ties in order of first appearance), like value_counts()."""
+    codes = np.asarray(segment.codes)
+    counts = np.bincount(codes, minlength=len(SEGMENTS))
+    # First appearance only matters between segments with the same count
+    first = [np.argmax(codes == code) if np.count_nonzero(counts == count) > 1 else 0
+             for code, count in enumerate(counts)]
+    order = [code for code in np.lexsort((first, -counts)) if counts[code] > 0]
+    return pd.DataFrame({
+        'Segment': [SEGMENTS[code] for code in order],
+        'Count': counts[order],
+    })
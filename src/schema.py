@@ -0,0 +1,228 @@
+"""Column schemas for the input tables the dashboard reads.
+
+Each schema maps the columns to read (the `usecols` of the table) to their
+dtype. Low-cardinality labels are loaded as categoricals and counts are
+downcast, which keeps the tables small and makes groupby/isin/value_counts on
+those columns work on integer codes. Date columns and currency strings such as
+"$1,234" are parsed here, once per snapshot, so the dashboard only ever sees
+datetime64 and float columns.
+"""
+import hashlib
+import json
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+
+CATEGORY = "category"
+STRING = "str"
+DATETIME = "datetime"
+CURRENCY = "currency"
+
+# Dtypes read as text from the CSV and converted afterwards
+TEXT_DTYPES = (STRING, CATEGORY, DATETIME, CURRENCY)
+
+TABLE_SCHEMAS: Dict[str, Dict[str, str]] = {
+    "CAMPAIGN": {
+        "CAMPAIGN_ID": STRING,
+        "CAMPAIGN_NAME": STRING,
+        "CAMPAIGN_TYPE": CATEGORY,
+        "OBJECTIVE": CATEGORY,
+        "BUDGET": CURRENCY,
+        "TARGET_SEGMENT": CATEGORY,
+        "START_DATE": DATETIME,
+        "END_DATE": DATETIME,
+    },
+    "CAMPAIGN_EVENT": {
+        "CAMPAIGN_ID": STRING,
+        "CUSTOMER_ID": STRING,
+        "EVENT_TYPE": CATEGORY,
+        "EVENT_DATE": DATETIME,
+    },
+    "CHANNEL": {
+        "CHANNEL_ID": STRING,
+        "CHANNEL_NAME": STRING,
+    },
+    "CUSTOMER": {
+        "CUSTOMER_ID": STRING,
+        "NAME": STRING,
+        "PRIMARY_EMAIL": STRING,
+        "CUSTOMER_TYPE": CATEGORY,
+    },
+    "DIGITAL_EVENT": {
+        "EVENT_DATE": DATETIME,
+        "EVENT_TYPE": CATEGORY,
+        "DEVICE_TYPE": CATEGORY,
+        "SESSION_ID": STRING,
+        "CUSTOMER_ID": STRING,
+    },
+    "FACILITY": {
+        "FACILITY_ID": STRING,
+        "FACILITY_NAME": STRING,
+        "FACILITY_TYPE": CATEGORY,
+    },
+    "INVENTORY": {
+        "PRODUCT_ID": STRING,
+        "VARIANT_ID": STRING,
+        "FACILITY_ID": STRING,
+        "QUANTITY": "int32",
+    },
+    "ORDER_CAMPAIGN_ATTRIBUTION": {
+        "ORDER_ID": STRING,
+        "CAMPAIGN_ID": STRING,
+        "CONTRIBUTION_PERCENT": "float64",
+    },
+    "ORDER_FACT": {
+        "ORDER_ID": STRING,
+        "CUSTOMER_ID": STRING,
+        "CHANNEL_ID": CATEGORY,
+        "ORDER_DATE": DATETIME,
+        "ORDER_STATUS": CATEGORY,
+        "PAYMENT_METHOD": CATEGORY,
+        "ORDER_TYPE": CATEGORY,
+        "TOTAL_AMOUNT": "float64",
+    },
+    "ORDER_LINE": {
+        "ORDER_ID": STRING,
+        "PRODUCT_ID": STRING,
+        "VARIANT_ID": STRING,
+        "QUANTITY": "int32",
+        "UNIT_PRICE": "float64",
+        "LINE_TOTAL": "float64",
+    },
+    "PAGE_PERFORMANCE": {
+        "DATE": DATETIME,
+        "VIEWS": "int32",
+        "UNIQUE_VISITORS": "int32",
+        "BOUNCE_RATE": "float32",
+        "CONVERSION_RATE": "float32",
+    },
+    "PRODUCT": {
+        "PRODUCT_ID": STRING,
+        "NAME": STRING,
+        "CATEGORY": CATEGORY,
+        "BRAND": CATEGORY,
+        "PRICE": "float64",
+        "ACTIVE": "bool",
+    },
+    "PRODUCT_VARIANT": {
+        "VARIANT_ID": STRING,
+        "PRODUCT_ID": STRING,
+        "VARIANT_NAME": STRING,
+        "INVENTORY_QTY": "int32",
+    },
+    "SALES_PLAN": {
+        "PLAN_START_DATE": DATETIME,
+        "PLAN_END_DATE": DATETIME,
+        "TARGET_REVENUE": "float64",
+    },
+}
+
+# Time-keyed tables are stored sorted by this column so that date ranges can
+# be answered with binary search (see src/date_index.py)
+SORT_KEYS: Dict[str, str] = {
+    "CAMPAIGN": "START_DATE",
+    "DIGITAL_EVENT": "EVENT_DATE",
+    "ORDER_FACT": "ORDER_DATE",
+    "PAGE_PERFORMANCE": "DATE",
+    "SALES_PLAN": "PLAN_START_DATE",
+}
+
+
+def usecols(table: str) -> Optional[List[str]]:
+    """Columns to read for a table, or None to read all columns."""
+    schema = TABLE_SCHEMAS.get(table)
+    return list(schema) if schema else None
+
+
+def schema_version(table: str) -> Optional[str]:
+    """Short hash of a table's schema, stored with its snapshot."""
+    schema = TABLE_SCHEMAS.get(table)
+    if schema is None:
+        return None
+    definition = {"columns": schema, "sort_key": SORT_KEYS.get(table)}
+    return hashlib.sha1(json.dumps(definition, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def read_csv(path, table: str) -> pd.DataFrame:
+    """Read an input CSV (a path or file-like object) with the table's schema applied."""
+    schema = TABLE_SCHEMAS.get(table)
+    if schema is None:
+        return pd.read_csv(path)
+    df = pd.read_csv(path, usecols=list(schema), dtype=text_dtypes(schema))
+    df = downcast(clean(df, schema), schema)[list(schema)]
+    if table in SORT_KEYS:
+        df = df.sort_values(SORT_KEYS[table], kind="stable", ignore_index=True)
+    return df
+
+
+def read_csv_chunks(path, table: str, chunksize: int) -> Iterator[pd.DataFrame]:
+    """Read an input CSV in chunks of `chunksize` rows with the schema applied.
+
+    Categorical columns are encoded per chunk, so categories differ between
+    chunks.
+    """
+    schema = TABLE_SCHEMAS[table]
+    with pd.read_csv(path, usecols=list(schema), dtype=text_dtypes(schema), chunksize=chunksize) as reader:
+        for chunk in reader:
+            yield downcast(clean(chunk, schema), schema)[list(schema)]
+
+
+def combine(frames: List[pd.DataFrame], table: str) -> pd.DataFrame:
+    """Concatenate frames of one table read separately (snapshot parts, appended rows).
+
+    Categorical columns get the union of the frames' categories instead of
+    falling back to strings, and time-keyed tables are re-sorted if the later
+    frames reach back before the earlier ones.
+    """
+    frames = [df for df in frames if len(df)] or frames[:1]
+    if len(frames) == 1:
+        return frames[0]
+    combined = pd.concat(frames, ignore_index=True)
+    for column, dtype in TABLE_SCHEMAS.get(table, {}).items():
+        if dtype == CATEGORY and column in combined:
+            categories = pd.api.types.union_categoricals(
+                [df[column].astype(CATEGORY) for df in frames], sort_categories=True).categories
+            combined[column] = pd.Categorical(combined[column], categories=categories)
+    sort_key = SORT_KEYS.get(table)
+    if sort_key in combined and not combined[sort_key].is_monotonic_increasing:
+        combined = combined.sort_values(sort_key, kind="stable", ignore_index=True)
+    return combined
+
+
+def text_dtypes(schema: Dict[str, str]) -> Dict[str, str]:
+    """read_csv dtypes for the columns that are read as text."""
+    return {column: STRING if dtype in (DATETIME, CURRENCY) else dtype
+            for column, dtype in schema.items() if dtype in TEXT_DTYPES}
+
+
+def parse_currency(series: pd.Series) -> pd.Series:
+    """Convert currency strings such as "$1,234.50" to floats."""
+    return series.str.replace('$', '', regex=False).str.replace(',', '', regex=False).astype(float)
+
+
+def clean(df: pd.DataFrame, schema: Dict[str, str]) -> pd.DataFrame:
+    """Parse the date and currency columns of a freshly read table."""
+    parsed = {}
+    for column, dtype in schema.items():
+        if dtype == DATETIME:
+            parsed[column] = pd.to_datetime(df[column])
+        elif dtype == CURRENCY:
+            parsed[column] = parse_currency(df[column])
+    return df.assign(**parsed)
+
+
+def downcast(df: pd.DataFrame, schema: Dict[str, str]) -> pd.DataFrame:
+    """Cast numeric and boolean columns to their schema dtype.
+
+    Integer and boolean columns that contain missing values keep the dtype
+    pandas inferred, since numpy cannot represent the gaps.
+    """
+    casts = {}
+    for column, dtype in schema.items():
+        if dtype in TEXT_DTYPES or column not in df:
+            continue
+        needs_complete = dtype == "bool" or dtype.startswith("int")
+        if needs_complete and df[column].isna().any():
+            continue
+        casts[column] = dtype
+    return df.astype(casts)
@@ -0,0 +1,225 @@
+"""Mergeable quantile sketches with a relative error bound.
+
+QuantileSketch is a DDSketch-style histogram over logarithmic buckets: a value
+x > 0 falls in bucket ceil(log(x) / log(gamma)) with
+gamma = (1 + relative_accuracy) / (1 - relative_accuracy), negative values in
+a mirrored store and zeros in their own counter. Every value in a bucket is
+within `relative_accuracy` of the bucket's representative value, so
+
+    quantile(q) is within relative_accuracy of the order statistic of rank
+    floor(q * (n - 1)) of the values added (the lower of the two values that
+    linear interpolation, numpy's default, blends).
+
+The minimum and maximum are exact. Building a sketch is one vectorized pass
+(log + bincount) without sorting, and two sketches merge by adding their
+bucket counts, so sketches can be built per partition or per category and
+combined for any selection.
+
+ECOMMERCE_QUANTILES picks where the dashboard uses sketches:
+"exact" never, "sketch" always, "auto" (default) only for inputs of more
+than EXACT_LIMIT values that cannot be counted exactly (see src/rfm.py).
+"""
+import math
+import os
+from typing import Dict, Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+QUANTILE_MODE = os.environ.get("ECOMMERCE_QUANTILES", "auto")
+QUANTILE_MODES = ("auto", "exact", "sketch")
+
+# Inputs up to this many values are always answered exactly in "auto" mode
+EXACT_LIMIT = 1_000_000
+
+DEFAULT_RELATIVE_ACCURACY = 0.005
+
+# Values added per partial sketch when sketching a large array
+CHUNK_SIZE = 1 << 20
+
+
+def quantile_mode(mode: Optional[str] = None) -> str:
+    """The given quantile mode, or the configured one."""
+    mode = mode or QUANTILE_MODE
+    if mode not in QUANTILE_MODES:
+        raise ValueError(f"Unknown quantile mode {mode!r}, expected one of {QUANTILE_MODES}")
+    return mode
+
+
+def use_sketch(size: int, mode: Optional[str] = None) -> bool:
+    """Whether quantiles over `size` values are taken from a sketch."""
+    mode = quantile_mode(mode)
+    return mode == "sketch" or (mode == "auto" and size > EXACT_LIMIT)
+
+
+class BucketStore:
+    """Counts of consecutive bucket indexes, grown as needed."""
+
+    def __init__(self, offset: int = 0, counts: Optional[np.ndarray] = None):
+        self.offset = offset
+        self.counts = np.zeros(0, dtype=np.int64) if counts is None else counts
+
+    def add(self, indexes: np.ndarray, counts: Optional[np.ndarray] = None) -> None:
+        """Count one value, or `counts` values, in each of the given buckets."""
+        if len(indexes) == 0:
+            return
+        low, high = int(indexes.min()), int(indexes.max())
+        added = np.bincount(indexes - low, weights=counts, minlength=high - low + 1)
+        self.add_counts(low, added.astype(np.int64, copy=False))
+
+    def add_counts(self, offset: int, counts: np.ndarray) -> None:
+        """Add the counts of buckets offset, offset + 1, ..."""
+        if len(counts) == 0:
+            return
+        if len(self.counts) == 0:
+            self.offset, self.counts = offset, counts.astype(np.int64)
+            return
+        low = min(self.offset, offset)
+        high = max(self.offset + len(self.counts), offset + len(counts))
+        merged = np.zeros(high - low, dtype=np.int64)
+        merged[self.offset - low:self.offset - low + len(self.counts)] += self.counts
+        merged[offset - low:offset - low + len(counts)] += counts
+        self.offset, self.counts = low, merged
+
+    def copy(self) -> "BucketStore":
+        return BucketStore(self.offset, self.counts.copy())
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch; see the module docstring for the error bound."""
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive = BucketStore()
+        self.negative = BucketStore()
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    @classmethod
+    def from_values(cls, values: Iterable, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY) -> "QuantileSketch":
+        """Sketch of an array, built from partial sketches of CHUNK_SIZE values each."""
+        values = np.asarray(values, dtype=np.float64)
+        sketches = [cls(relative_accuracy).add(values[start:start + CHUNK_SIZE])
+                    for start in range(0, len(values), CHUNK_SIZE)]
+        return merge_sketches(sketches) if sketches else cls(relative_accuracy)
+
+    def add(self, values: Iterable, counts: Optional[Iterable] = None) -> "QuantileSketch":
+        """Add values (missing ones are ignored), each `counts` times if given, and return the sketch."""
+        values = np.asarray(values, dtype=np.float64)
+        present = ~np.isnan(values)
+        weights = None
+        if counts is not None:
+            weights = np.asarray(counts, dtype=np.float64)
+            present &= weights > 0
+            weights = weights[present]
+        values = values[present]
+        if len(values) == 0:
+            return self
+        for store, selected, magnitudes in ((self.positive, values > 0, values), (self.negative, values < 0, -values)):
+            store.add(self._indexes(magnitudes[selected]), None if weights is None else weights[selected])
+        if weights is None:
+            self.zero_count += int(np.count_nonzero(values == 0))
+            self.count += len(values)
+            self.sum += float(values.sum())
+        else:
+            self.zero_count += int(weights[values == 0].sum())
+            self.count += int(weights.sum())
+            self.sum += float(values @ weights)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """A new sketch of the values of both sketches."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Only sketches with the same relative accuracy can be merged")
+        merged = QuantileSketch(self.relative_accuracy)
+        merged.positive = self.positive.copy()
+        merged.positive.add_counts(other.positive.offset, other.positive.counts)
+        merged.negative = self.negative.copy()
+        merged.negative.add_counts(other.negative.offset, other.negative.counts)
+        merged.zero_count = self.zero_count + other.zero_count
+        merged.count = self.count + other.count
+        merged.sum = self.sum + other.sum
+        merged.min = min(self.min, other.min)
+        merged.max = max(self.max, other.max)
+        return merged
+
+    def quantiles(self, qs: Sequence[float]) -> np.ndarray:
+        """Estimated quantiles for qs in [0, 1]; NaN for an empty sketch."""
+        qs = np.asarray(qs, dtype=np.float64)
+        if self.count == 0:
+            return np.full(len(qs), np.nan)
+        values, counts = self._sorted_buckets()
+        ranks = np.floor(qs * (self.count - 1))
+        estimates = values[np.searchsorted(np.cumsum(counts), ranks, side='right')]
+        # The extremes are tracked exactly
+        estimates = np.clip(estimates, self.min, self.max)
+        estimates[qs <= 0] = self.min
+        estimates[qs >= 1] = self.max
+        return estimates
+
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else math.nan
+
+    def _indexes(self, values: np.ndarray) -> np.ndarray:
+        return np.ceil(np.log(values) / self._log_gamma).astype(np.int64)
+
+    def _values(self, store: BucketStore) -> np.ndarray:
+        indexes = np.arange(store.offset, store.offset + len(store.counts), dtype=np.float64)
+        return 2 * np.power(self.gamma, indexes) / (self.gamma + 1)
+
+    def _sorted_buckets(self):
+        """Representative values and counts of the non-empty buckets in ascending order."""
+        values = np.concatenate([-self._values(self.negative)[::-1], [0.0], self._values(self.positive)])
+        counts = np.concatenate([self.negative.counts[::-1], [self.zero_count], self.positive.counts])
+        present = counts > 0
+        return values[present], counts[present]
+
+
+def merge_sketches(sketches: Sequence[QuantileSketch]) -> QuantileSketch:
+    """Merge any number of sketches with the same relative accuracy."""
+    merged = sketches[0]
+    for sketch in sketches[1:]:
+        merged = merged.merge(sketch)
+    return merged
+
+
+def sketches_by(df: pd.DataFrame, by: str, column: str,
+                relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY) -> Dict[str, QuantileSketch]:
+    """One sketch of `column` per value of `by`, in order of first appearance."""
+    return {key: QuantileSketch(relative_accuracy).add(group[column].to_numpy())
+            for key, group in df.groupby(by, observed=True, sort=False)}
+
+
+def box_stats(sketch: QuantileSketch) -> Dict[str, float]:
+    """Box-plot statistics: quartiles, mean, and whiskers at 1.5 IQR clipped to the data range.
+
+    The quartiles are estimates within the sketch's relative accuracy, and
+    the fences derived from them are not snapped to a data point as in an
+    exact box plot, so charts drawn from these statistics should say so
+    (see approximation_note).
+    """
+    q1, median, q3 = sketch.quantiles([0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    return {
+        'q1': q1,
+        'median': median,
+        'q3': q3,
+        'mean': sketch.mean(),
+        'lowerfence': max(sketch.min, q1 - 1.5 * iqr),
+        'upperfence': min(sketch.max, q3 + 1.5 * iqr),
+    }
+
+
+def approximation_note(relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY) -> str:
+    """Caption of a box plot drawn from box_stats."""
+    return (f"Approximate: quartiles within ±{relative_accuracy:.1%} of the exact values, "
+            f"whiskers at 1.5 IQR from them")
@@ -0,0 +1,329 @@
+"""Columnar snapshot store for the Keboola input tables.
+
+Every input CSV is converted to a Parquet snapshot the first time it is seen.
+Later loads read the snapshot instead of re-parsing the CSV text, as long as
+the source file still matches the fingerprint stored next to the snapshot.
+
+The pipeline appends new rows to some tables several times a day. When the
+source only grew at the end, the appended tail is parsed on its own and
+stored as an extra snapshot part, and the manifest keeps a high-water mark of
+the table's sort key (see SORT_KEYS in src/schema.py). Tail rows older than
+the mark, or too many parts, fold everything back into a single part. A
+full rebuild from the CSV only happens when the schema changed or earlier
+rows were rewritten.
+
+Source fingerprints hash every byte of the CSV, chained per appended
+segment, so that an append only hashes the new bytes and the end of the
+previous content (see appended_offset for what that trusts).
+"""
+import glob
+import hashlib
+import io
+import json
+import os
+import time
+from tempfile import gettempdir
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from src.schema import SORT_KEYS, combine, read_csv, schema_version
+
+TABLES_DIR = os.environ.get("ECOMMERCE_TABLES_DIR", "/data/in/tables")
+SNAPSHOT_DIR = os.environ.get("ECOMMERCE_SNAPSHOT_DIR", os.path.join(gettempdir(), "ecommerce_snapshots"))
+
+# Bump when the snapshot layout changes so that old snapshots are rebuilt
+SNAPSHOT_FORMAT_VERSION = 2
+
+# Appended parts kept before they are compacted into one
+MAX_SNAPSHOT_PARTS = 8
+
+# Bytes read per step when hashing a CSV
+HASH_CHUNK_BYTES = 8 << 20
+
+# Bytes before the end of the previously seen content that are re-hashed when a source grew
+TAIL_CHECK_BYTES = 1 << 20
+
+# Timing of the most recent load per table, used for cold/warm reporting
+LOAD_STATS: Dict[str, dict] = {}
+
+
+def csv_path(table: str, tables_dir: Optional[str] = None) -> str:
+    """Path of the input CSV for a table."""
+    return os.path.join(tables_dir or TABLES_DIR, f"{table}.csv")
+
+
+def snapshot_paths(table: str, snapshot_dir: Optional[str] = None):
+    """Paths of the Parquet snapshot and its manifest for a table."""
+    base = os.path.join(snapshot_dir or SNAPSHOT_DIR, table)
+    return base + ".parquet", base + ".json"
+
+
+def part_path(table: str, part: int, snapshot_dir: Optional[str] = None) -> str:
+    """Path of an appended snapshot part; part 0 is the base snapshot."""
+    parquet_path, _ = snapshot_paths(table, snapshot_dir)
+    return parquet_path if part == 0 else parquet_path[:-len(".parquet")] + f".{part}.parquet"
+
+
+def chained_hash(previous: Optional[str], path: str, start: int, end: int) -> str:
+    """Hash of bytes start..end of a file, chained onto the hash of the bytes before them.
+
+    The bytes are read in chunks of HASH_CHUNK_BYTES.
+    """
+    digest = hashlib.sha1()
+    if previous is not None:
+        digest.update(previous.encode())
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            chunk = f.read(min(remaining, HASH_CHUNK_BYTES))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest.hexdigest()
+
+
+def content_hash(path: str, segments: List[int]) -> str:
+    """Hash of a file's first segments[-1] bytes, chained segment by segment."""
+    digest, start = None, 0
+    for end in segments:
+        digest, start = chained_hash(digest, path, start, end), end
+    return digest or chained_hash(None, path, 0, 0)
+
+
+def tail_hash(path: str, size: int) -> str:
+    """Hash of the last TAIL_CHECK_BYTES of a file's first `size` bytes."""
+    return chained_hash(None, path, max(size - TAIL_CHECK_BYTES, 0), size)
+
+
+def file_fingerprint(path: str) -> dict:
+    """Size, modification time and content hash of a source file.
+
+    The hash covers every byte, so a row rewritten anywhere changes it even
+    when the size stays the same. `segments` are the byte offsets the hash
+    is chained at (see appended_fingerprint) and `tail` the hash of the
+    last bytes, which appended_offset checks.
+    """
+    stat = os.stat(path)
+    return {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "hash": content_hash(path, [stat.st_size]),
+        "segments": [stat.st_size],
+        "tail": tail_hash(path, stat.st_size),
+    }
+
+
+def appended_fingerprint(source: dict, path: str) -> dict:
+    """Fingerprint of a source file that grew since `source` was taken, hashing only the new bytes.
+
+    The appended bytes are a new segment whose hash is chained onto the
+    previous one, so the result equals content_hash over all segments.
+    """
+    stat = os.stat(path)
+    return {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "hash": chained_hash(source["hash"], path, source["size"], stat.st_size),
+        "segments": source_segments(source) + [stat.st_size],
+        "tail": tail_hash(path, stat.st_size),
+    }
+
+
+def source_segments(source: dict) -> List[int]:
+    """Segment offsets of a fingerprint; older fingerprints hashed the file as one segment."""
+    return list(source.get("segments") or [source.get("size", 0)])
+
+
+def source_version(table: str, tables_dir: Optional[str] = None) -> str:
+    """Cheap version token of a table's source CSV (size and modification time)."""
+    stat = os.stat(csv_path(table, tables_dir))
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def read_manifest(manifest_path: str) -> Optional[dict]:
+    """Read a snapshot manifest, returning None if it is missing or corrupt."""
+    try:
+        with open(manifest_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_snapshot_compatible(manifest: Optional[dict], table: str) -> bool:
+    """Check that a manifest was written with the current layout and schema."""
+    if not manifest or manifest.get("format") != SNAPSHOT_FORMAT_VERSION:
+        return False
+    return manifest.get("schema") == schema_version(table)
+
+
+def is_snapshot_valid(manifest: Optional[dict], path: str, table: str) -> bool:
+    """Check that a manifest still describes the current source file and schema."""
+    if not is_snapshot_compatible(manifest, table):
+        return False
+    return is_source_unchanged(manifest.get("source", {}), path)
+
+
+def is_source_unchanged(source: dict, path: str) -> bool:
+    """Check a recorded file fingerprint against the current source file."""
+    stat = os.stat(path)
+    if source.get("size") != stat.st_size:
+        return False
+    if source.get("mtime_ns") == stat.st_mtime_ns:
+        return True
+    # Same size but touched: only trust the snapshot if the content is unchanged
+    return source.get("hash") == content_hash(path, source_segments(source))
+
+
+def appended_offset(source: dict, path: str) -> Optional[int]:
+    """Byte offset where new rows start if the file only grew since `source` was taken.
+
+    Returns None when the file shrank, was not changed, or the last
+    TAIL_CHECK_BYTES it had no longer match (rows rewritten or truncated and
+    re-appended). Only those bytes are re-hashed, so checking an append
+    costs O(tail) and not O(file): rows rewritten further back *and* an
+    append in the same change are trusted to be append-only. The full hash
+    still catches such a rewrite the next time the file is compared at an
+    unchanged size (see is_source_unchanged).
+    """
+    size = source.get("size")
+    if not size or os.stat(path).st_size <= size:
+        return None
+    if tail_hash(path, size) != source.get("tail"):
+        return None
+    # The previous content must end on a row boundary
+    with open(path, "rb") as f:
+        f.seek(size - 1)
+        if f.read(1) != b"\n":
+            return None
+    return size
+
+
+def read_tail(path: str, table: str, start: int, end: int) -> pd.DataFrame:
+    """Parse the rows between two byte offsets of a CSV with the table's schema."""
+    with open(path, "rb") as f:
+        header = f.readline()
+        f.seek(start)
+        tail = f.read(end - start)
+    return read_csv(io.BytesIO(header + tail), table)
+
+
+def watermark(df: pd.DataFrame, table: str) -> Optional[int]:
+    """Largest value of the table's sort key in nanoseconds, or None."""
+    sort_key = SORT_KEYS.get(table)
+    if sort_key not in df or df[sort_key].isna().all():
+        return None
+    return int(df[sort_key].max().value)
+
+
+def write_manifest(manifest_path: str, manifest: dict) -> None:
+    """Replace a manifest atomically."""
+    tmp_manifest = f"{manifest_path}.{os.getpid()}.tmp"
+    with open(tmp_manifest, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_manifest, manifest_path)
+
+
+def write_snapshot(table: str, df: pd.DataFrame, fingerprint: dict, snapshot_dir: Optional[str] = None) -> None:
+    """Write a single-part Parquet snapshot and its manifest atomically."""
+    parquet_path, manifest_path = snapshot_paths(table, snapshot_dir)
+    os.makedirs(os.path.dirname(parquet_path), exist_ok=True)
+    tmp_parquet = f"{parquet_path}.{os.getpid()}.tmp"
+    df.to_parquet(tmp_parquet, index=False)
+    os.replace(tmp_parquet, parquet_path)
+    write_manifest(manifest_path, {
+        "format": SNAPSHOT_FORMAT_VERSION,
+        "schema": schema_version(table),
+        "table": table,
+        "rows": len(df),
+        "parts": 1,
+        "watermark": watermark(df, table),
+        "source": fingerprint,
+    })
+    # Appended parts of the previous snapshot are now folded into part 0
+    for path in glob.glob(glob.escape(parquet_path[:-len(".parquet")]) + ".*.parquet"):
+        os.remove(path)
+
+
+def append_snapshot(table: str, manifest: dict, path: str, offset: int, snapshot_dir: Optional[str] = None) -> None:
+    """Add the rows appended to a CSV since `manifest` was written to its snapshot."""
+    fingerprint = appended_fingerprint(manifest["source"], path)
+    # Only parse up to the fingerprinted size so rows appended meanwhile are picked up next time
+    tail = read_tail(path, table, offset, fingerprint["size"])
+    previous_mark = manifest.get("watermark")
+    tail_mark = watermark(tail, table)
+    sort_key = SORT_KEYS.get(table)
+    late = previous_mark is not None and tail_mark is not None and tail[sort_key].min().value < previous_mark
+
+    if late or manifest["parts"] >= MAX_SNAPSHOT_PARTS:
+        write_snapshot(table, combine([read_snapshot(table, manifest, snapshot_dir), tail], table),
+                       fingerprint, snapshot_dir)
+        return
+
+    parts = manifest["parts"]
+    if len(tail):
+        tail.to_parquet(part_path(table, parts, snapshot_dir), index=False)
+        parts += 1
+    marks = [mark for mark in (previous_mark, tail_mark) if mark is not None]
+    write_manifest(snapshot_paths(table, snapshot_dir)[1], dict(
+        manifest,
+        rows=manifest["rows"] + len(tail),
+        parts=parts,
+        watermark=max(marks) if marks else None,
+        source=fingerprint,
+    ))
+
+
+def read_snapshot(table: str, manifest: dict, snapshot_dir: Optional[str] = None,
+                  columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Read every part of a snapshot into one frame."""
+    return combine([pd.read_parquet(part_path(table, part, snapshot_dir), columns=columns)
+                    for part in range(manifest["parts"])], table)
+
+
+def load_table(table: str, tables_dir: Optional[str] = None, snapshot_dir: Optional[str] = None,
+               columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Load an input table from its snapshot, falling back to the CSV.
+
+    A source that only had rows appended has just the new rows parsed and
+    added to the snapshot. A missing, stale or unreadable snapshot is rebuilt
+    from the CSV. If the snapshot cannot be written (e.g. read-only disk) the
+    CSV data is still returned. The table schema from src/schema.py is applied
+    while parsing, so snapshots hold typed, categorical columns. Snapshots
+    always hold every schema column; `columns` only limits what is read back.
+    """
+    path = csv_path(table, tables_dir)
+    _, manifest_path = snapshot_paths(table, snapshot_dir)
+    started = time.perf_counter()
+    manifest = read_manifest(manifest_path)
+
+    source = "snapshot"
+    if is_snapshot_compatible(manifest, table) and not is_source_unchanged(manifest.get("source", {}), path):
+        offset = appended_offset(manifest.get("source", {}), path)
+        if offset is not None:
+            try:
+                append_snapshot(table, manifest, path, offset, snapshot_dir)
+                manifest = read_manifest(manifest_path)
+                source = "append"
+            except Exception:
+                manifest = None
+
+    if is_snapshot_valid(manifest, path, table):
+        try:
+            df = read_snapshot(table, manifest, snapshot_dir, columns)
+            LOAD_STATS[table] = {"source": source, "seconds": time.perf_counter() - started, "rows": len(df)}
+            return df
+        except Exception:
+            pass
+
+    df = read_csv(path, table)
+    try:
+        write_snapshot(table, df, file_fingerprint(path), snapshot_dir)
+    except Exception:
+        pass
+    if columns is not None:
+        df = df[columns]
+    LOAD_STATS[table] = {"source": "csv", "seconds": time.perf_counter() - started, "rows": len(df)}
+    return df
@@ -0,0 +1,47 @@
+"""Server-side search, sort and paging for large dashboard tables.
+
+Only one page of rows is sent to the browser. `search_and_sort` is the
+expensive step (a pass over every row plus a sort) and is meant to be
+memoized on its arguments; `page_slice` then cuts a page out of its result.
+"""
+import math
+from typing import Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def matches(column: pd.Series, text: str) -> np.ndarray:
+    """Rows whose value contains the text, ignoring case; categoricals are matched on their categories."""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        hits = column.cat.categories.astype(str).str.contains(text, case=False, regex=False)
+        return np.asarray(column.cat.codes.isin(np.flatnonzero(hits)))
+    return column.astype('string').str.contains(text, case=False, regex=False).to_numpy(dtype=bool, na_value=False)
+
+
+def search_and_sort(df: pd.DataFrame, search: str, search_columns: Sequence[str], sort_by: str,
+                    ascending: bool) -> pd.DataFrame:
+    """Rows containing `search` in any of the search columns, sorted by one column.
+
+    The sort is stable, so rows with equal values keep their order in `df`;
+    missing values sort last.
+    """
+    search = search.strip()
+    if search:
+        mask = np.zeros(len(df), dtype=bool)
+        for column in search_columns:
+            mask |= matches(df[column], search)
+        df = df[mask]
+    return df.sort_values(sort_by, ascending=ascending, kind='stable', na_position='last')
+
+
+def page_count(rows: int, page_size: int) -> int:
+    """Pages needed for the rows; an empty table still has one (empty) page."""
+    return max(1, math.ceil(rows / page_size))
+
+
+def page_slice(df: pd.DataFrame, page: int, page_size: int) -> Tuple[pd.DataFrame, int]:
+    """The rows of a 1-based page, clamped to the last page, and the first row's 0-based position."""
+    page = min(max(page, 1), page_count(len(df), page_size))
+    start = (page - 1) * page_size
+    return df.iloc[start:start + page_size], start
@@ -0,0 +1,107 @@
+"""Pre-aggregated daily, weekly and monthly traffic rollups over PAGE_PERFORMANCE.
+
+Each rollup holds VIEWS and UNIQUE_VISITORS per bucket plus the rates as
+numerator/denominator pairs: BOUNCES over BOUNCE_BASE (the VIEWS of rows
+with a bounce rate) and CONVERSIONS over CONVERSION_BASE (the
+UNIQUE_VISITORS of rows with a conversion rate). Sums of the pairs combine
+across pages and buckets, so rates read from any resolution are the weighted
+rates of the underlying rows rather than averages of averages.
+
+The rollups are built once per loaded PAGE_PERFORMANCE. A date range then
+takes whole buckets from the rollup of the chosen resolution and re-buckets
+only the days of the partial first and last bucket from the daily rollup.
+"""
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from src.date_index import date_slice
+
+# pd.Grouper frequency of each resolution; weeks end on Sunday and are labelled by it
+TRAFFIC_RESOLUTIONS = {"day": "D", "week": "W", "month": "MS"}
+
+# Longest date span (in days) charted at each resolution, finest first
+RESOLUTION_SPANS = {"day": 92, "week": 730}
+
+TRAFFIC_SUMS = ['VIEWS', 'UNIQUE_VISITORS', 'BOUNCES', 'BOUNCE_BASE', 'CONVERSIONS', 'CONVERSION_BASE']
+
+
+def bucket_bounds(dates: pd.Series, resolution: str):
+    """First and last day of the bucket holding each bucket label."""
+    if resolution == "week":
+        return dates - pd.Timedelta(days=6), dates
+    if resolution == "month":
+        return dates, dates + pd.offsets.MonthEnd(0)
+    return dates, dates
+
+
+def rollup(daily: pd.DataFrame, resolution: str) -> pd.DataFrame:
+    """Sums of a daily rollup per bucket of a resolution, with the bucket's first and last day."""
+    if resolution == "day":
+        buckets = daily.copy()
+    else:
+        buckets = daily.groupby(pd.Grouper(key='DATE', freq=TRAFFIC_RESOLUTIONS[resolution]))[TRAFFIC_SUMS].sum()
+        buckets = buckets.reset_index()
+    buckets['BUCKET_START'], buckets['BUCKET_END'] = bucket_bounds(buckets['DATE'], resolution)
+    return buckets
+
+
+def build_traffic_rollups(page_performance: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """Rollups of PAGE_PERFORMANCE per resolution of TRAFFIC_RESOLUTIONS."""
+    views = page_performance['VIEWS'].to_numpy(dtype=np.float64)
+    visitors = page_performance['UNIQUE_VISITORS'].to_numpy(dtype=np.float64)
+    bounce_rate = page_performance['BOUNCE_RATE'].to_numpy(dtype=np.float64)
+    conversion_rate = page_performance['CONVERSION_RATE'].to_numpy(dtype=np.float64)
+    # Rows without a rate count in neither side of its pair
+    rows = pd.DataFrame({
+        'DATE': page_performance['DATE'].dt.floor('D'),
+        'VIEWS': views,
+        'UNIQUE_VISITORS': visitors,
+        'BOUNCES': np.where(np.isnan(bounce_rate), 0, bounce_rate * views),
+        'BOUNCE_BASE': np.where(np.isnan(bounce_rate), 0, views),
+        'CONVERSIONS': np.where(np.isnan(conversion_rate), 0, conversion_rate * visitors),
+        'CONVERSION_BASE': np.where(np.isnan(conversion_rate), 0, visitors),
+    })
+    daily = rows.groupby('DATE')[TRAFFIC_SUMS].sum().reset_index()
+    return {resolution: rollup(daily, resolution) for resolution in TRAFFIC_RESOLUTIONS}
+
+
+def pick_resolution(start_date, end_date) -> str:
+    """Finest resolution whose span limit covers the date range."""
+    span = (pd.Timestamp(end_date) - pd.Timestamp(start_date)).days
+    for resolution, days in RESOLUTION_SPANS.items():
+        if span <= days:
+            return resolution
+    return "month"
+
+
+def with_rates(traffic: pd.DataFrame) -> pd.DataFrame:
+    """Add the weighted BOUNCE_RATE and CONVERSION_RATE of each bucket."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return traffic.assign(
+            BOUNCE_RATE=traffic['BOUNCES'] / traffic['BOUNCE_BASE'].where(traffic['BOUNCE_BASE'] > 0),
+            CONVERSION_RATE=traffic['CONVERSIONS'] / traffic['CONVERSION_BASE'].where(traffic['CONVERSION_BASE'] > 0),
+        )
+
+
+def traffic_series(rollups: Dict[str, pd.DataFrame], resolution: str, start_date, end_date) -> pd.DataFrame:
+    """Traffic per bucket of a resolution over days start_date..end_date, with weighted rates.
+
+    Buckets cut by the range only count its days, so the sums over the
+    series equal the totals of the range.
+    """
+    start, end = pd.Timestamp(start_date).floor('D'), pd.Timestamp(end_date).floor('D')
+    buckets = rollups[resolution]
+    inside = buckets[(buckets['BUCKET_START'] >= start) & (buckets['BUCKET_END'] <= end)]
+
+    daily = date_slice(rollups["day"], 'DATE', start, end)[['DATE'] + TRAFFIC_SUMS]
+    if len(inside):
+        # Days of the partial buckets before and after the whole ones, re-bucketed separately
+        # so that the grouper does not fill the whole buckets in between
+        parts = [rollup(daily[daily['DATE'] < inside['BUCKET_START'].iloc[0]], resolution), inside,
+                 rollup(daily[daily['DATE'] > inside['BUCKET_END'].iloc[-1]], resolution)]
+    else:
+        parts = [rollup(daily, resolution)]
+    traffic = pd.concat([part for part in parts if len(part)] or parts[:1], ignore_index=True)
+    return with_rates(traffic[['DATE'] + TRAFFIC_SUMS])
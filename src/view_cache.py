@@ -0,0 +1,102 @@
+"""Bounded LRU cache for filtered views, shared across Streamlit sessions.
+
+Views are keyed by the normalized sidebar filters plus the version of the
+tables they were cut from, so analysts using the same preset share one copy
+and a data refresh never serves a stale view. Entries are evicted least
+recently used first once their combined memory exceeds the budget.
+"""
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_BYTES = int(os.environ.get("ECOMMERCE_VIEW_CACHE_MB", "256")) << 20
+
+
+def size_of(value: Any) -> int:
+    """Approximate memory footprint in bytes of a cached value."""
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum()) if isinstance(usage, pd.Series) else int(usage)
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sum(size_of(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(size_of(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class ViewCache:
+    """Thread-safe LRU cache with a memory budget and hit/miss counters.
+
+    Cached values are shared between sessions and must not be modified in
+    place.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._locks: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        """Return the cached value for a key, building and storing it on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            build_lock = self._locks.setdefault(key, threading.Lock())
+        # Concurrent requests for the same key wait for a single build
+        with build_lock:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._entries[key][0]
+                self.misses += 1
+            value = build()
+            self._store(key, value, size_of(value))
+        with self._lock:
+            self._locks.pop(key, None)
+        return value
+
+    def _store(self, key: Hashable, value: Any, size: int) -> None:
+        """Insert an entry and evict the least recently used ones over budget."""
+        # A view larger than the whole budget is returned but not kept
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry; counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Hit, miss and eviction counters plus current size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from src.attribution import ATTRIBUTION_MODELS, HALF_LIFE_DAYS, LOOKBACK_DAYS, TouchpointIndex, model_attribution
+from src.compute import recorded_attribution
+from src.keys import DimensionKeys
+
+
+def naive_credit(campaign_event, order_fact, model):
+    """Credit of every (order, campaign) pair, one order at a time."""
+    touches = campaign_event.dropna(subset=['EVENT_DATE', 'CUSTOMER_ID', 'CAMPAIGN_ID'])
+    touches = touches.sort_values('EVENT_DATE', kind='stable')
+    rows = []
+    for order in order_fact.dropna(subset=['ORDER_DATE']).itertuples():
+        window = touches[(touches['CUSTOMER_ID'] == order.CUSTOMER_ID)
+                         & (touches['EVENT_DATE'] >= order.ORDER_DATE - pd.Timedelta(days=LOOKBACK_DAYS))
+                         & (touches['EVENT_DATE'] <= order.ORDER_DATE)]
+        if window.empty:
+            continue
+        if model == "first_touch":
+            credit = pd.Series(1.0, index=window.index[:1])
+        elif model == "last_touch":
+            credit = pd.Series(1.0, index=window.index[-1:])
+        elif model == "linear":
+            credit = pd.Series(1 / len(window), index=window.index)
+        else:
+            age_days = (order.ORDER_DATE - window['EVENT_DATE']).dt.total_seconds() / 86_400
+            credit = 0.5 ** (age_days / HALF_LIFE_DAYS)
+            credit /= credit.sum()
+        for campaign_id, contribution in credit.groupby(window.loc[credit.index, 'CAMPAIGN_ID']).sum().items():
+            rows.append((order.ORDER_ID, campaign_id, contribution))
+    return pd.DataFrame(rows, columns=['ORDER_ID', 'CAMPAIGN_ID', 'CONTRIBUTION_PERCENT'])
+
+
+def naive_attribution(campaign_event, order_fact, model):
+    """Per-campaign totals of the naive credits, in the model's column order."""
+    credit = naive_credit(campaign_event, order_fact, model)
+    amount = credit['ORDER_ID'].map(order_fact.set_index('ORDER_ID')['TOTAL_AMOUNT'])
+    return pd.DataFrame({
+        'CAMPAIGN_ID': credit['CAMPAIGN_ID'],
+        'ATTRIBUTED_REVENUE': amount * credit['CONTRIBUTION_PERCENT'],
+        'ORDER_ID': credit['ORDER_ID'],
+        'CONTRIBUTION_PERCENT': credit['CONTRIBUTION_PERCENT'],
+    }).groupby('CAMPAIGN_ID').agg({
+        'ATTRIBUTED_REVENUE': 'sum',
+        'ORDER_ID': 'nunique',
+        'CONTRIBUTION_PERCENT': 'mean',
+    }).reset_index()
+
+
+def boundary_tables():
+    day = pd.Timestamp('2024-03-01 12:00:00')
+    campaign_event = pd.DataFrame({
+        'CUSTOMER_ID': ['c1', 'c1', 'c1', 'c1', 'c1', 'c2', 'c2', 'c2', 'c3', None],
+        'CAMPAIGN_ID': ['k1', 'k2', 'k3', 'k1', 'k4', 'k2', 'k2', 'k3', 'k1', 'k4'],
+        'EVENT_DATE': [
+            day - pd.Timedelta(days=LOOKBACK_DAYS),                      # exactly at the lookback boundary
+            day - pd.Timedelta(days=LOOKBACK_DAYS, seconds=1),           # just outside it
+            day - pd.Timedelta(days=3),
+            day - pd.Timedelta(days=3),                                  # same time as the k3 touch
+            day + pd.Timedelta(seconds=1),                               # just after the order
+            day,                                                         # at the order's time
+            day - pd.Timedelta(days=10),
+            day + pd.Timedelta(days=1),                                  # after the order
+            day - pd.Timedelta(days=1),
+            day - pd.Timedelta(days=1),
+        ],
+    })
+    order_fact = pd.DataFrame({
+        'ORDER_ID': ['o1', 'o2', 'o3', 'o4', 'o5', 'o6'],
+        # c3's only touchpoint is after o3, c4 has none, o5 has no date and o6 comes before every touchpoint
+        'CUSTOMER_ID': ['c1', 'c2', 'c3', 'c4', 'c1', 'c1'],
+        'ORDER_DATE': [day, day, day - pd.Timedelta(days=2), day, pd.NaT, day - pd.Timedelta(days=90)],
+        'TOTAL_AMOUNT': [100.0, 80.0, 50.0, 20.0, 10.0, 5.0],
+    })
+    return campaign_event, order_fact
+
+
+def random_tables(seed=3, customers=40, touches=300, orders=120):
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp('2024-01-01')
+    # Whole-hour times so that some touchpoints fall exactly on a window edge
+    campaign_event = pd.DataFrame({
+        'CUSTOMER_ID': rng.integers(0, customers, touches).astype(str),
+        'CAMPAIGN_ID': np.char.add('k', rng.integers(0, 8, touches).astype(str)),
+        'EVENT_DATE': start + pd.to_timedelta(rng.integers(0, 120 * 24, touches), unit='h'),
+    })
+    order_fact = pd.DataFrame({
+        'ORDER_ID': np.char.add('o', np.arange(orders).astype(str)),
+        'CUSTOMER_ID': rng.integers(0, customers + 5, orders).astype(str),
+        'ORDER_DATE': start + pd.to_timedelta(rng.integers(-10 * 24, 130 * 24, orders), unit='h'),
+        'TOTAL_AMOUNT': rng.gamma(2.0, 40.0, orders).round(2),
+    })
+    return campaign_event, order_fact
+
+
+TABLES = {"boundaries": boundary_tables, "random": random_tables}
+
+
+@pytest.mark.parametrize("keyed", [False, True])
+@pytest.mark.parametrize("tables", list(TABLES))
+@pytest.mark.parametrize("model", ATTRIBUTION_MODELS)
+def test_model_matches_naive_loop(model, tables, keyed):
+    campaign_event, order_fact = TABLES[tables]()
+    if keyed:
+        keys = DimensionKeys()
+        campaign_event, order_fact = keys.add_keys(campaign_event), keys.add_keys(order_fact)
+
+    attribution = model_attribution(TouchpointIndex(campaign_event), order_fact, model)
+
+    assert_frame_equal(attribution, naive_attribution(campaign_event, order_fact, model), check_dtype=False)
+
+
+@pytest.mark.parametrize("model", ATTRIBUTION_MODELS)
+def test_model_matches_recorded_attribution_of_its_credits(model):
+    # Recording the model's credits as ORDER_CAMPAIGN_ATTRIBUTION gives the same per-campaign results
+    campaign_event, order_fact = random_tables()
+    order_campaign_attribution = naive_credit(campaign_event, order_fact, model)
+
+    recorded = recorded_attribution(order_campaign_attribution, order_fact)
+    attribution = model_attribution(TouchpointIndex(campaign_event), order_fact, model)
+
+    assert_frame_equal(attribution, recorded, check_dtype=False)
+
+
+def test_boundaries():
+    campaign_event, order_fact = boundary_tables()
+    touchpoints = TouchpointIndex(campaign_event)
+
+    first = model_attribution(touchpoints, order_fact, "first_touch").set_index('CAMPAIGN_ID')
+    last = model_attribution(touchpoints, order_fact, "last_touch").set_index('CAMPAIGN_ID')
+    linear = model_attribution(touchpoints, order_fact, "linear").set_index('CAMPAIGN_ID')
+
+    # o1's window starts exactly LOOKBACK_DAYS back and excludes the touch one second after it
+    assert first.loc['k1', 'ATTRIBUTED_REVENUE'] == 100
+    assert 'k4' not in linear.index
+    # Tied touchpoints keep their row order: k3 comes before k1
+    assert last.loc['k1', 'ATTRIBUTED_REVENUE'] == 100
+    # A touchpoint at the order's time counts; one after it does not
+    assert last.loc['k2', 'ATTRIBUTED_REVENUE'] == 80
+    assert 'k3' not in first.index
+    # Credit sums to 1 per attributed order, and only o1 and o2 have touchpoints in their window
+    assert linear['ATTRIBUTED_REVENUE'].sum() == pytest.approx(100 + 80)
+    assert linear['ORDER_ID'].sum() == 3
+    assert linear.loc['k2', 'CONTRIBUTION_PERCENT'] == pytest.approx(1)
+
+
+def test_unknown_model_is_rejected():
+    campaign_event, order_fact = boundary_tables()
+
+    with pytest.raises(ValueError):
+        model_attribution(TouchpointIndex(campaign_event), order_fact, "u_shaped")
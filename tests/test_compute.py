@@ -0,0 +1,46 @@
+import gc
+import weakref
+
+import pandas as pd
+
+from src.compute import Versioned, memoized
+from src.view_cache import ViewCache
+
+
+class Store:
+    """Stand-in for an event store or index: no content fingerprint."""
+
+    def __init__(self, total):
+        self.total = total
+
+    def count(self, scale):
+        return self.total * scale
+
+
+def count(store, scale):
+    return store.count(scale)
+
+
+def test_versioned_arguments_are_keyed_by_version_and_not_kept_alive():
+    cache = ViewCache()
+    store = Store(3)
+    alive = weakref.ref(store)
+
+    assert memoized(cache, count, Versioned(store, ("v1",)), 2) == 6
+    # A new object of the same version hits the cached result
+    assert memoized(cache, count, Versioned(Store(100), ("v1",)), 2) == 6
+    assert memoized(cache, count, Versioned(Store(100), ("v2",)), 2) == 200
+
+    del store
+    gc.collect()
+    assert alive() is None
+
+
+def test_frames_are_keyed_by_content():
+    cache = ViewCache()
+
+    first = memoized(cache, pd.DataFrame.sum, pd.DataFrame({'A': [1, 2]}))
+    again = memoized(cache, pd.DataFrame.sum, pd.DataFrame({'A': [1, 2]}))
+
+    assert again is first
+    assert memoized(cache, pd.DataFrame.sum, pd.DataFrame({'A': [1, 3]}))['A'] == 4
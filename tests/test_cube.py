@@ -0,0 +1,83 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.cube import build_sales_cube, slice_cube
+
+
+def raw_sales(order_fact, start_date, end_date, channel_ids, payment_method, order_status):
+    """The Sales tab's original filter and aggregation over raw orders."""
+    orders = order_fact[(order_fact['ORDER_DATE'] >= start_date) & (order_fact['ORDER_DATE'] <= end_date)]
+    if channel_ids is not None:
+        orders = orders[orders['CHANNEL_ID'].isin(channel_ids)]
+    if payment_method is not None:
+        orders = orders[orders['PAYMENT_METHOD'] == payment_method]
+    if order_status is not None:
+        orders = orders[orders['ORDER_STATUS'] == order_status]
+    daily = orders.groupby(pd.Grouper(key='ORDER_DATE', freq='D'))['TOTAL_AMOUNT'].agg(['count', 'sum'])
+    return len(orders), orders['TOTAL_AMOUNT'].sum(), daily
+
+
+def cube_sales(cube, start_date, end_date, channel_ids, payment_method, order_status):
+    """The same figures answered from the cube."""
+    view = slice_cube(cube, start_date, end_date, channel_ids, payment_method, order_status)
+    daily = view.groupby(pd.Grouper(key='ORDER_DATE', freq='D'))[['ORDER_COUNT', 'TOTAL_AMOUNT']].sum()
+    daily.columns = ['count', 'sum']
+    return int(view['ORDER_COUNT'].sum()), view['TOTAL_AMOUNT'].sum(), daily
+
+
+@pytest.fixture(params=['ns', 's'])
+def order_fact(request):
+    rng = np.random.default_rng(7)
+    orders = 2000
+    # Half the orders at midnight, the rest at random times of day
+    days = pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 60, orders), unit='D')
+    times = pd.to_timedelta(np.where(rng.random(orders) < 0.5, 0, rng.integers(1, 86_400, orders)), unit='s')
+    order_fact = pd.DataFrame({
+        'ORDER_ID': [f'o{i}' for i in range(orders)],
+        'ORDER_DATE': (days + times).as_unit(request.param),
+        'CHANNEL_ID': rng.choice(['CH1', 'CH2', None], orders),
+        'PAYMENT_METHOD': rng.choice(['Card', 'PayPal'], orders),
+        'ORDER_STATUS': rng.choice(['Delivered', 'Cancelled'], orders),
+        'ORDER_TYPE': rng.choice(['New', 'Repeat'], orders),
+        'TOTAL_AMOUNT': rng.gamma(2.0, 50.0, orders).round(2),
+    })
+    return order_fact.sort_values('ORDER_DATE', kind='stable').reset_index(drop=True)
+
+
+def test_cube_matches_raw_orders_for_every_filter(order_fact):
+    cube = build_sales_cube(order_fact)
+    ranges = [(pd.Timestamp('2024-01-01'), pd.Timestamp('2024-02-29')),
+              (pd.Timestamp('2024-01-10'), pd.Timestamp('2024-01-20')),
+              (pd.Timestamp('2024-02-01'), pd.Timestamp('2024-02-01'))]
+    channels = [None, ['CH1'], ['CH1', 'CH2']]
+    payments = [None, 'Card']
+    statuses = [None, 'Cancelled']
+
+    for (start_date, end_date), channel_ids, payment_method, order_status in itertools.product(
+            ranges, channels, payments, statuses):
+        filters = (start_date, end_date, channel_ids, payment_method, order_status)
+        raw = raw_sales(order_fact, *filters)
+        answered = cube_sales(cube, *filters)
+
+        assert raw[0] == answered[0], filters
+        assert np.isclose(raw[1], answered[1]), filters
+        pd.testing.assert_index_equal(raw[2].index, answered[2].index)
+        np.testing.assert_allclose(raw[2].to_numpy(dtype=float), answered[2].to_numpy(dtype=float))
+
+
+def test_range_ending_on_a_day_counts_only_its_midnight_orders():
+    order_fact = pd.DataFrame({
+        'ORDER_ID': ['o1', 'o2', 'o3'],
+        'ORDER_DATE': pd.to_datetime(['2024-03-01 00:00', '2024-03-02 00:00', '2024-03-02 15:30']),
+        'CHANNEL_ID': 'CH1', 'PAYMENT_METHOD': 'Card', 'ORDER_STATUS': 'Delivered', 'ORDER_TYPE': 'New',
+        'TOTAL_AMOUNT': [10.0, 20.0, 40.0],
+    })
+    cube = build_sales_cube(order_fact)
+
+    view = slice_cube(cube, pd.Timestamp('2024-03-01'), pd.Timestamp('2024-03-02'))
+    assert view['ORDER_COUNT'].sum() == 2
+    assert view['TOTAL_AMOUNT'].sum() == 30.0
+    assert slice_cube(cube, pd.Timestamp('2024-03-02'), pd.Timestamp('2024-03-03'))['ORDER_COUNT'].sum() == 2
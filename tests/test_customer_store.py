@@ -0,0 +1,69 @@
+import pandas as pd
+import pytest
+
+from src.customer_store import open_customer_store, orders_customer_metrics
+from src.date_index import date_slice
+from src.registry import TableRegistry
+
+HEADER = "ORDER_ID,CUSTOMER_ID,CHANNEL_ID,ORDER_DATE,ORDER_STATUS,PAYMENT_METHOD,ORDER_TYPE,TOTAL_AMOUNT\n"
+HISTORY = [
+    "o1,c1,CH1,2024-01-01 00:00:00,Delivered,Card,New,10.0\n",
+    "o2,c1,CH2,2024-01-01 09:00:00,Cancelled,PayPal,Repeat,20.0\n",
+    "o3,c2,CH1,2024-01-02 12:00:00,Delivered,Card,New,30.0\n",
+    "o4,c3,CH2,2024-01-03 00:00:00,Delivered,PayPal,New,40.0\n",
+]
+APPENDED = [
+    "o5,c2,CH2,2024-01-03 18:00:00,Delivered,Card,Repeat,50.0\n",
+    "o6,c4,CH1,2024-01-04 00:00:00,Pending,Card,New,60.0\n",
+]
+
+
+def raw_metrics(order_fact, start_date, end_date):
+    orders = order_fact[(order_fact['ORDER_DATE'] >= start_date) & (order_fact['ORDER_DATE'] <= end_date)]
+    return orders.groupby('CUSTOMER_ID').agg(
+        ORDER_COUNT=('ORDER_ID', 'count'),
+        TOTAL_SPENT=('TOTAL_AMOUNT', 'sum'),
+        FIRST_ORDER=('ORDER_DATE', 'min'),
+        LAST_ORDER=('ORDER_DATE', 'max')
+    ).reset_index()
+
+
+def assert_same_metrics(metrics, expected):
+    pd.testing.assert_frame_equal(metrics.reset_index(drop=True).astype({'CUSTOMER_ID': object}),
+                                  expected.astype({'CUSTOMER_ID': object}), check_dtype=False)
+
+
+@pytest.fixture
+def tables(tmp_path):
+    tables_dir = tmp_path / "tables"
+    tables_dir.mkdir()
+    (tables_dir / "ORDER_FACT.csv").write_text(HEADER + "".join(HISTORY))
+    return str(tables_dir), str(tmp_path / "snapshots")
+
+
+@pytest.mark.parametrize("start_date, end_date", [('2024-01-01', '2024-01-04'), ('2024-01-01', '2024-01-02'),
+                                                  ('2024-01-02', '2024-01-03')])
+def test_date_range_views_match_raw_orders_after_an_append(tables, start_date, end_date):
+    tables_dir, snapshot_dir = tables
+    open_customer_store(TableRegistry(tables_dir, snapshot_dir))
+    with open(f"{tables_dir}/ORDER_FACT.csv", "a") as f:
+        f.write("".join(APPENDED))
+
+    registry = TableRegistry(tables_dir, snapshot_dir)
+    store = open_customer_store(registry)
+    start_date, end_date = pd.Timestamp(start_date), pd.Timestamp(end_date)
+
+    assert list(store.partials.columns[:2]) == ['ORDER_DATE', 'CUSTOMER_ID']
+    assert_same_metrics(store.customer_metrics(start_date, end_date),
+                        raw_metrics(registry.get('ORDER_FACT'), start_date, end_date))
+
+
+def test_filtered_views_group_the_filtered_orders(tables):
+    tables_dir, snapshot_dir = tables
+    order_fact = TableRegistry(tables_dir, snapshot_dir).get('ORDER_FACT')
+    start_date, end_date = pd.Timestamp('2024-01-01'), pd.Timestamp('2024-01-03')
+    orders = date_slice(order_fact, 'ORDER_DATE', start_date, end_date)
+    orders = orders[orders['PAYMENT_METHOD'] == 'Card']
+
+    assert_same_metrics(orders_customer_metrics(orders),
+                        raw_metrics(order_fact[order_fact['PAYMENT_METHOD'] == 'Card'], start_date, end_date))
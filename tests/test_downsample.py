@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.downsample import aggregate_buckets, bucket_days, downsample_line, lttb
+
+
+def reference_lttb(x, y, budget):
+    """LTTB one point at a time, with buckets of (n - 2) / (budget - 2) points."""
+    n = len(x)
+    every = (n - 2) / (budget - 2)
+    kept = [0]
+    for bucket in range(budget - 2):
+        lo, hi = int(bucket * every) + 1, int((bucket + 1) * every) + 1
+        if bucket == budget - 3:
+            next_x, next_y = x[-1], y[-1]
+        else:
+            next_hi = min(int((bucket + 2) * every) + 1, n - 1)
+            next_x, next_y = np.mean(x[hi:next_hi]), np.mean(y[hi:next_hi])
+        previous = kept[-1]
+        areas = [abs((x[previous] - next_x) * (y[j] - y[previous]) - (x[previous] - x[j]) * (next_y - y[previous]))
+                 for j in range(lo, hi)]
+        kept.append(lo + int(np.argmax(areas)))
+    return kept + [n - 1]
+
+
+@pytest.mark.parametrize("n, budget", [(10, 3), (10, 9), (365, 50), (1000, 333), (3650, 500)])
+def test_lttb_keeps_first_and_last_and_fits_the_budget(n, budget):
+    rng = np.random.default_rng(n)
+    x = np.sort(rng.uniform(0, n, n))
+    y = np.cumsum(rng.normal(0, 1, n))
+
+    kept = lttb(x, y, budget)
+
+    assert len(kept) == budget
+    assert kept[0] == 0 and kept[-1] == n - 1
+    assert (np.diff(kept) > 0).all()
+    assert list(kept) == reference_lttb(x, y, budget)
+
+
+@pytest.mark.parametrize("n, budget", [(5, 5), (5, 10), (5, 2), (0, 10)])
+def test_lttb_keeps_everything_it_cannot_reduce(n, budget):
+    assert list(lttb(np.arange(n), np.zeros(n), budget)) == list(range(n))
+
+
+def test_lttb_keeps_peaks_and_dips():
+    y = np.zeros(1000)
+    y[123], y[777] = 50, -50
+
+    kept = lttb(np.arange(1000), y, 20)
+
+    assert 123 in kept and 777 in kept
+
+
+def test_downsample_line():
+    rng = np.random.default_rng(5)
+    daily = pd.DataFrame({'ORDER_DATE': pd.date_range('2015-01-01', periods=3000, freq='D'),
+                          'TOTAL_AMOUNT': rng.gamma(2.0, 500.0, 3000)})
+    daily.loc[10, 'TOTAL_AMOUNT'] = np.nan
+
+    line = downsample_line(daily, 'ORDER_DATE', 'TOTAL_AMOUNT', 400)
+
+    assert len(line) <= 400
+    assert line['ORDER_DATE'].iloc[0] == daily['ORDER_DATE'].iloc[0]
+    assert line['ORDER_DATE'].iloc[-1] == daily['ORDER_DATE'].iloc[-1]
+    assert line['ORDER_DATE'].is_monotonic_increasing
+    assert downsample_line(daily, 'ORDER_DATE', 'TOTAL_AMOUNT', None) is daily
+    assert downsample_line(daily, 'ORDER_DATE', 'TOTAL_AMOUNT', 3000) is daily
+
+
+def test_aggregate_buckets_keeps_totals_per_series():
+    rng = np.random.default_rng(9)
+    dates = pd.date_range('2020-01-01', periods=1000, freq='D')
+    status_time = pd.DataFrame({'ORDER_DATE': np.repeat(dates, 2),
+                                'ORDER_STATUS': np.tile(['Shipped', 'Pending'], 1000),
+                                'COUNT': rng.poisson(30, 2000)})
+
+    buckets = aggregate_buckets(status_time, 'ORDER_DATE', ['COUNT'], 'ORDER_STATUS', 300)
+
+    assert bucket_days(status_time['ORDER_DATE'], 300) == 4
+    assert buckets['ORDER_DATE'].nunique() == 250
+    assert (buckets['ORDER_DATE'].drop_duplicates().diff().dropna() == pd.Timedelta(days=4)).all()
+    assert buckets['ORDER_DATE'].iloc[0] == dates[0]
+    pd.testing.assert_series_equal(buckets.groupby('ORDER_STATUS')['COUNT'].sum(),
+                                   status_time.groupby('ORDER_STATUS')['COUNT'].sum())
+    assert aggregate_buckets(status_time, 'ORDER_DATE', ['COUNT'], 'ORDER_STATUS', 1000) is status_time
@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.event_store import hash_labels
+from src.funnel import journey_order
+
+
+@pytest.mark.parametrize("journeys", [
+    np.array([3, 1, 3, 0, 1, 3], dtype=np.int64),
+    np.random.default_rng(7).integers(0, 1 << 63, 50, dtype=np.int64)[np.random.default_rng(8).integers(0, 50, 500)],
+    # Different journeys with the same high 32 bits
+    np.array([(5 << 32) | 9, (5 << 32) | 2, 1 << 40, (5 << 32) | 9, (5 << 32) | 2, 7], dtype=np.int64),
+], ids=["codes", "hashes", "clashing-hashes"])
+def test_journey_order_is_a_stable_sort(journeys):
+    np.testing.assert_array_equal(journey_order(journeys), np.argsort(journeys, kind='stable'))
+
+
+def test_label_hashes_are_non_negative_and_missing_labels_are_minus_one():
+    codes = hash_labels(pd.Series(['s1', 's2', None, 's1']))
+
+    assert codes.dtype == np.int64
+    assert codes[0] == codes[3] != codes[1]
+    assert codes[2] == -1
+    assert (codes[[0, 1]] >= 0).all()
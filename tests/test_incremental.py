@@ -0,0 +1,97 @@
+import pandas as pd
+import pytest
+
+import src.event_store as event_store
+import src.snapshot as snapshot
+from src.customer_store import open_customer_store
+from src.registry import TableRegistry
+
+ORDER_HEADER = "ORDER_ID,CUSTOMER_ID,CHANNEL_ID,ORDER_DATE,ORDER_STATUS,PAYMENT_METHOD,ORDER_TYPE,TOTAL_AMOUNT\n"
+EVENT_HEADER = "EVENT_DATE,EVENT_TYPE,DEVICE_TYPE,SESSION_ID,CUSTOMER_ID\n"
+
+
+def order_rows(start, count):
+    return [f"o{i:07d},c{i % 97},CH1,2024-01-{1 + i % 28:02d} 10:00:00,Delivered,Card,New,{i % 500}.50\n"
+            for i in range(start, start + count)]
+
+
+def event_rows(start, count):
+    return [f"2024-01-{1 + i % 28:02d} 10:00:00,PAGE_VIEW,Mobile,s{i // 4},c{i % 97}\n"
+            for i in range(start, start + count)]
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    """Rows parsed and bytes hashed, recorded from the CSV readers and the fingerprint hash."""
+    recorded = {"rows": 0, "hashed": 0}
+    read_csv, read_csv_chunks, chained_hash = snapshot.read_csv, event_store.read_csv_chunks, snapshot.chained_hash
+
+    def counting_read_csv(source, table):
+        df = read_csv(source, table)
+        recorded["rows"] += len(df)
+        return df
+
+    def counting_read_csv_chunks(source, table, chunksize):
+        for chunk in read_csv_chunks(source, table, chunksize):
+            recorded["rows"] += len(chunk)
+            yield chunk
+
+    def counting_chained_hash(previous, path, start, end):
+        recorded["hashed"] += end - start
+        return chained_hash(previous, path, start, end)
+
+    monkeypatch.setattr(snapshot, "read_csv", counting_read_csv)
+    monkeypatch.setattr(event_store, "read_csv_chunks", counting_read_csv_chunks)
+    monkeypatch.setattr(snapshot, "chained_hash", counting_chained_hash)
+    return recorded
+
+
+@pytest.fixture
+def small_tail_check(monkeypatch):
+    monkeypatch.setattr(snapshot, "TAIL_CHECK_BYTES", 1024)
+
+
+def test_append_to_order_fact_parses_and_hashes_only_the_tail(tmp_path, reads, small_tail_check):
+    tables_dir, snapshot_dir = tmp_path / "tables", str(tmp_path / "snapshots")
+    tables_dir.mkdir()
+    path = tables_dir / "ORDER_FACT.csv"
+    path.write_text(ORDER_HEADER + "".join(order_rows(0, 20_000)))
+    open_customer_store(TableRegistry(str(tables_dir), snapshot_dir))
+    history_bytes = path.stat().st_size
+
+    tail = "".join(order_rows(20_000, 50))
+    with open(path, "a") as f:
+        f.write(tail)
+    reads.update(rows=0, hashed=0)
+    registry = TableRegistry(str(tables_dir), snapshot_dir)
+    order_fact = registry.get("ORDER_FACT")
+    store = open_customer_store(registry)
+
+    assert snapshot.LOAD_STATS["ORDER_FACT"]["source"] == "append"
+    assert len(order_fact) == 20_050
+    assert store.totals['ORDER_COUNT'].sum() == 20_050
+    # Snapshot and customer store each parse the 50 new rows and hash the new bytes plus the old and new ends
+    assert reads["rows"] == 2 * 50
+    assert reads["hashed"] <= 2 * (len(tail) + 2 * 1024)
+    assert reads["hashed"] < history_bytes
+
+
+def test_append_to_digital_event_parses_and_hashes_only_the_tail(tmp_path, reads, small_tail_check):
+    tables_dir, snapshot_dir = tmp_path / "tables", str(tmp_path / "snapshots")
+    tables_dir.mkdir()
+    path = tables_dir / "DIGITAL_EVENT.csv"
+    path.write_text(EVENT_HEADER + "".join(event_rows(0, 20_000)))
+    event_store.open_event_store(tables_dir=str(tables_dir), snapshot_dir=snapshot_dir)
+
+    tail = "".join(event_rows(20_000, 40))
+    with open(path, "a") as f:
+        f.write(tail)
+    reads.update(rows=0, hashed=0)
+    store = event_store.open_event_store(tables_dir=str(tables_dir), snapshot_dir=snapshot_dir)
+
+    assert store.manifest["generation"] == 1
+    assert store.count() == 20_040
+    assert store.count(pd.Timestamp('2024-01-01'), pd.Timestamp('2024-01-01 23:59')) == len(
+        [i for i in range(20_040) if i % 28 == 0])
+    assert reads["rows"] == 40
+    assert reads["hashed"] <= len(tail) + 2 * 1024
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.inventory import INVENTORY_STATUS_ORDER, MAX_PROJECTION_DAYS, inventory_engine, inventory_status
+
+
+@pytest.mark.parametrize("unit, stock", [("ns", 4_000), ("us", 100_000_000)])
+def test_slow_seller_with_high_stock_has_no_stockout_date(unit, stock):
+    product_variant = pd.DataFrame({'VARIANT_ID': ['slow', 'fast'], 'INVENTORY_QTY': [stock, 30]})
+    order_fact = pd.DataFrame({'ORDER_ID': ['o1', 'o2'],
+                               'ORDER_DATE': pd.to_datetime(['2024-05-01', '2024-05-01']).as_unit(unit)})
+    # One unit of the slow variant in 30 days, 30 units of the fast one
+    order_line = pd.DataFrame({'ORDER_ID': ['o1', 'o2'], 'VARIANT_ID': ['slow', 'fast'], 'QUANTITY': [1, 30]})
+
+    engine = inventory_engine(product_variant, order_line, order_fact).set_index('VARIANT_ID')
+
+    assert engine.loc['slow', 'DAYS_OF_COVER'] == stock * 30
+    assert engine.loc['slow', 'DAYS_OF_COVER'] > MAX_PROJECTION_DAYS
+    assert pd.isna(engine.loc['slow', 'STOCKOUT_DATE'])
+    assert engine.loc['fast', 'STOCKOUT_DATE'] == pd.Timestamp('2024-05-31')
+
+
+def test_variant_without_sales_has_no_cover():
+    product_variant = pd.DataFrame({'VARIANT_ID': ['idle'], 'INVENTORY_QTY': [10]})
+    order_fact = pd.DataFrame({'ORDER_ID': ['o1'], 'ORDER_DATE': pd.to_datetime(['2024-05-01'])})
+    order_line = pd.DataFrame({'ORDER_ID': ['o1'], 'VARIANT_ID': ['other'], 'QUANTITY': [1]})
+
+    engine = inventory_engine(product_variant, order_line, order_fact)
+
+    assert np.isnan(engine['DAYS_OF_COVER'].iloc[0])
+    assert pd.isna(engine['STOCKOUT_DATE'].iloc[0])
+
+
+@pytest.mark.parametrize("dates", [[], [None, None]])
+def test_orders_without_dates_give_zero_velocity_and_no_cover(dates):
+    product_variant = pd.DataFrame({'VARIANT_ID': ['v1', 'v2'], 'INVENTORY_QTY': [3, 80]})
+    order_fact = pd.DataFrame({'ORDER_ID': [f'o{i}' for i in range(len(dates))],
+                               'ORDER_DATE': pd.to_datetime(pd.Series(dates, dtype=object))})
+    order_line = pd.DataFrame({'ORDER_ID': order_fact['ORDER_ID'], 'VARIANT_ID': 'v1', 'QUANTITY': 1})
+
+    engine = inventory_engine(product_variant, order_line, order_fact)
+
+    assert (engine['VELOCITY_30D'] == 0).all()
+    assert engine['DAYS_OF_COVER'].isna().all()
+    assert engine['STOCKOUT_DATE'].isna().all()
+    assert list(engine['INVENTORY_STATUS']) == ['Critical (0-5)', 'High (50+)']
+
+
+def test_status_buckets_match_the_original_rule_including_missing_quantities():
+    def get_inventory_status(qty):
+        if qty <= 5:
+            return "Critical (0-5)"
+        elif qty <= 20:
+            return "Low (6-20)"
+        elif qty <= 50:
+            return "Medium (21-50)"
+        else:
+            return "High (50+)"
+
+    qty = pd.Series([-2, 0, 5, 5.5, 6, 20, 21, 50, 51, 1000, np.nan])
+
+    status = inventory_status(qty)
+
+    assert list(status.cat.categories) == INVENTORY_STATUS_ORDER
+    assert list(status.astype(str)) == list(qty.apply(get_inventory_status))
+
+
+def test_repeated_variant_and_order_ids_resolve_to_their_first_row():
+    product_variant = pd.DataFrame({'VARIANT_ID': ['v1', 'v2', 'v1'], 'INVENTORY_QTY': [30, 10, 99]})
+    order_fact = pd.DataFrame({'ORDER_ID': ['o1', 'o1', 'o2'],
+                               'ORDER_DATE': pd.to_datetime(['2024-05-01', '2023-01-01', '2024-05-01'])})
+    order_line = pd.DataFrame({'ORDER_ID': ['o1', 'o2', 'o3'], 'VARIANT_ID': ['v1', 'v2', 'v1'],
+                               'QUANTITY': [30, 3, 5]})
+
+    engine = inventory_engine(product_variant, order_line, order_fact)
+
+    assert list(engine['UNITS_30D']) == [30, 3, 0]
@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from src.keys import DimensionKeys, join, semi_join
+
+
+def keyed(*frames):
+    keys = DimensionKeys()
+    return [keys.add_keys(frame) for frame in frames]
+
+
+@pytest.fixture
+def tables():
+    # o4 has no order, o5 has no lines, and one line and one order have no ID
+    order_line = pd.DataFrame({'ORDER_ID': ['o1', 'o2', 'o2', 'o4', None, 'o3'],
+                               'VARIANT_ID': ['v1', 'v2', 'v3', 'v1', 'v2', 'v9'],
+                               'PRODUCT_ID': ['p1', 'p1', 'p2', 'p1', 'p1', 'p9'],
+                               'QUANTITY': [1, 2, 3, 4, 5, 6]},
+                              index=[10, 11, 12, 13, 14, 15])
+    order_fact = pd.DataFrame({'ORDER_ID': ['o3', 'o1', 'o2', 'o5', None],
+                               'ORDER_DATE': pd.to_datetime(['2024-01-03', '2024-01-01', '2024-01-02',
+                                                             '2024-01-05', '2024-01-06']),
+                               'ORDER_STATUS': ['Completed', 'Completed', 'Cancelled', 'Completed', 'Pending'],
+                               'TOTAL_AMOUNT': [30, 10, 20, 50, 60]})
+    product_variant = pd.DataFrame({'VARIANT_ID': ['v1', 'v2', 'v3', 'v9'],
+                                    'PRODUCT_ID': ['p1', 'p1', 'p2', 'p8'],
+                                    'VARIANT_NAME': ['S', 'M', 'L', 'XL'],
+                                    'INVENTORY_QTY': [5, np.nan, 7, 1]})
+    return keyed(order_line, order_fact, product_variant)
+
+
+@pytest.mark.parametrize("how", ["inner", "left"])
+def test_join_matches_merge(tables, how):
+    order_line, order_fact, _ = tables
+    columns = ['ORDER_DATE', 'ORDER_STATUS', 'TOTAL_AMOUNT']
+
+    expected = order_line.merge(order_fact[['ORDER_ID'] + columns], on='ORDER_ID', how=how)
+
+    assert_frame_equal(join(order_line, order_fact, 'ORDER_ID', columns, how=how), expected)
+
+
+@pytest.mark.parametrize("how", ["inner", "left"])
+def test_join_on_several_ids_matches_merge(tables, how):
+    # v9 exists but under another product, so it must not match
+    order_line, _, product_variant = tables
+    on = ['VARIANT_ID', 'PRODUCT_ID']
+    columns = ['VARIANT_NAME', 'INVENTORY_QTY']
+
+    expected = order_line.merge(product_variant[on + columns], on=on, how=how)
+
+    assert_frame_equal(join(order_line, product_variant, on, columns, how=how), expected)
+
+
+@pytest.mark.parametrize("how", ["inner", "left"])
+def test_join_with_repeated_right_keys_matches_merge(tables, how):
+    order_line, order_fact, _ = tables
+    repeated = pd.concat([order_fact, order_fact.iloc[[1]].assign(TOTAL_AMOUNT=99)], ignore_index=True)
+
+    expected = order_line.merge(repeated[['ORDER_ID', 'TOTAL_AMOUNT']], on='ORDER_ID', how=how)
+
+    assert_frame_equal(join(order_line, repeated, 'ORDER_ID', ['TOTAL_AMOUNT'], how=how), expected)
+
+
+def test_join_without_key_columns_matches_merge(tables):
+    order_line, order_fact, _ = tables
+    plain = order_fact.drop(columns='ORDER_KEY')
+
+    expected = order_line.merge(plain[['ORDER_ID', 'TOTAL_AMOUNT']], on='ORDER_ID', how='left')
+
+    assert_frame_equal(join(order_line, plain, 'ORDER_ID', ['TOTAL_AMOUNT'], how='left'), expected)
+
+
+def test_join_of_empty_frames_matches_merge(tables):
+    order_line, order_fact, _ = tables
+
+    for left, right in [(order_line.iloc[:0], order_fact), (order_line, order_fact.iloc[:0])]:
+        expected = left.merge(right[['ORDER_ID', 'TOTAL_AMOUNT']], on='ORDER_ID', how='left')
+        assert_frame_equal(join(left, right, 'ORDER_ID', ['TOTAL_AMOUNT'], how='left'), expected)
+
+
+@pytest.mark.parametrize("left, right", [(0, 1), (1, 0), (2, 0)])
+def test_semi_join_matches_isin(tables, left, right):
+    left, right = tables[left], tables[right]
+    on = 'ORDER_ID' if 'ORDER_ID' in left.columns and 'ORDER_ID' in right.columns else 'VARIANT_ID'
+
+    expected = left[left[on].isin(right[on].values)]
+
+    assert_frame_equal(semi_join(left, right, on), expected)
+
+
+def test_semi_join_keeps_keys_encoded_after_the_right_side():
+    # IDs first seen in a later table get codes beyond every code on the right
+    keys = DimensionKeys()
+    order_fact = keys.add_keys(pd.DataFrame({'ORDER_ID': ['o1', 'o2']}))
+    order_line = keys.add_keys(pd.DataFrame({'ORDER_ID': ['o3', 'o1', 'o4', 'o2']}))
+
+    assert_frame_equal(semi_join(order_line, order_fact, 'ORDER_ID'), order_line.iloc[[1, 3]])
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.rfm import rfm_scores, segment_counts, segments
+
+
+# The Customer tab's original binning and segmentation, as they were in Dashboard.py
+def get_quartile_labels(series, labels):
+    """Create quartile labels handling cases with duplicate values and skewed data"""
+    unique_values = series.unique()
+    n_unique = len(unique_values)
+
+    if n_unique == 1:
+        return pd.Series(labels[0], index=series.index)
+    elif n_unique < 4:
+        bins = np.sort(unique_values)
+        return pd.cut(series, bins=bins, labels=labels[:len(bins)-1], include_lowest=True)
+    else:
+        try:
+            percentiles = np.percentile(series.unique(), [0, 25, 50, 75, 100])
+            percentiles = np.unique(percentiles)
+            if len(percentiles) < 2:
+                return pd.Series(labels[0], index=series.index)
+            n_intervals = len(percentiles) - 1
+            return pd.cut(series, bins=percentiles, labels=labels[:n_intervals], include_lowest=True)
+        except Exception:
+            return pd.Series(labels[0], index=series.index)
+
+
+def get_segment(rfm_score):
+    score = int(rfm_score[0]) + int(rfm_score[1]) + int(rfm_score[2])
+    if score >= 11:
+        return 'Champions'
+    elif score >= 9:
+        return 'Loyal Customers'
+    elif score >= 7:
+        return 'Potential Loyalists'
+    elif score >= 5:
+        return 'At Risk'
+    else:
+        return 'Lost Customers'
+
+
+def original(metrics):
+    metrics = metrics.copy()
+    metrics['R'] = pd.qcut(metrics['DAYS_SINCE_LAST_ORDER'], q=4, labels=range(4, 0, -1))
+    metrics['F'] = get_quartile_labels(metrics['ORDER_COUNT'], range(1, 5))
+    metrics['M'] = get_quartile_labels(metrics['TOTAL_SPENT'], range(1, 5))
+    metrics[['R', 'F', 'M']] = metrics[['R', 'F', 'M']].fillna(1)
+    metrics['RFM_SCORE'] = metrics['R'].astype(str) + metrics['F'].astype(str) + metrics['M'].astype(str)
+    metrics['SEGMENT'] = metrics['RFM_SCORE'].apply(get_segment)
+    return metrics
+
+
+def customers(days, orders, spent):
+    return pd.DataFrame({'DAYS_SINCE_LAST_ORDER': days, 'ORDER_COUNT': orders, 'TOTAL_SPENT': spent})
+
+
+rng = np.random.default_rng(7)
+CASES = {
+    # Values sitting exactly on the quartile edges of 0..8 and of the distinct values
+    "edges": customers(np.arange(9), np.arange(1, 10), np.arange(9) * 25.0),
+    # Heavy ties: few distinct recencies and counts, spend with repeats
+    "ties": customers(rng.choice([0, 1, 3, 3, 10, 30, 30, 90], 400), rng.choice([1, 1, 1, 2, 5], 400),
+                      rng.choice([9.99, 9.99, 20.0, 55.5, 120.0, 999.0], 400)),
+    "one_distinct_value": customers(rng.integers(0, 100, 50), np.full(50, 2), np.full(50, 10.0)),
+    "two_distinct_values": customers(rng.integers(0, 100, 50), rng.choice([1, 4], 50), rng.choice([5.0, 7.5], 50)),
+    "three_distinct_values": customers(rng.integers(0, 100, 50), rng.choice([1, 2, 3], 50),
+                                       rng.choice([1.0, 2.0, 3.0], 50)),
+    # Customers without orders have no recency; counts and totals are never missing
+    "missing_recency": customers(np.append(rng.integers(0, 365, 99).astype(float), np.nan),
+                                 rng.geometric(0.4, 100), rng.gamma(2.0, 50.0, 100)),
+    "random": customers(rng.integers(0, 1100, 2000), rng.geometric(0.3, 2000), rng.gamma(2.0, 60.0, 2000).round(2)),
+}
+
+
+@pytest.mark.parametrize("name", list(CASES))
+def test_vectorized_scores_and_segments_match_the_original(name):
+    metrics = CASES[name]
+    expected = original(metrics)
+
+    r, f, m = rfm_scores(metrics['DAYS_SINCE_LAST_ORDER'].to_numpy(), metrics['ORDER_COUNT'].to_numpy(),
+                         metrics['TOTAL_SPENT'].to_numpy(), mode="exact")
+    segment = segments(r, f, m)
+
+    np.testing.assert_array_equal(r, expected['R'].astype(int))
+    np.testing.assert_array_equal(f, expected['F'].astype(int))
+    np.testing.assert_array_equal(m, expected['M'].astype(int))
+    assert list(segment.astype(str)) == list(expected['SEGMENT'])
+    counts = segment_counts(segment)
+    original_counts = expected['SEGMENT'].value_counts()
+    assert list(counts['Segment']) == list(original_counts.index)
+    assert list(counts['Count']) == list(original_counts)
+
+
+def test_repeated_recency_edges_are_collapsed():
+    # pd.qcut raises on these; the engine drops the repeated edge like duplicates='drop'
+    days = pd.Series(rng.choice([0, 3, 3, 3, 10, 30, 90], 400))
+    with pytest.raises(ValueError):
+        pd.qcut(days, q=4, labels=range(4, 0, -1))
+    expected = 4 - pd.qcut(days, q=4, labels=False, duplicates='drop')
+
+    r, _, _ = rfm_scores(days.to_numpy(), np.ones(len(days)), np.ones(len(days)), mode="exact")
+
+    np.testing.assert_array_equal(r, expected)
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from src.rfm import last_order_counts, recency_scores, recency_sketch
+from src.sketch import QuantileSketch, box_stats
+
+QS = [0, 0.1, 0.25, 0.5, 0.75, 0.9, 1]
+
+
+def test_weighted_values_sketch_like_repeated_ones():
+    values = np.array([-3.5, 0.0, 1.25, 7.0, np.nan, 40.0])
+    counts = np.array([2, 3, 1, 4, 9, 0])
+
+    weighted = QuantileSketch().add(values, counts)
+    repeated = QuantileSketch().add(np.repeat(values, counts))
+
+    assert (weighted.count, weighted.zero_count, weighted.min, weighted.max) == (10, 3, -3.5, 7.0)
+    assert weighted.sum == repeated.sum
+    np.testing.assert_array_equal(weighted.quantiles(QS), repeated.quantiles(QS))
+
+
+def test_recency_sketch_merged_per_day_matches_a_sketch_of_every_customer():
+    rng = np.random.default_rng(7)
+    customers = 5000
+    last_order = pd.Series(pd.Timestamp('2023-01-01')
+                           + pd.to_timedelta(rng.integers(0, 500 * 86_400, customers), unit='s'))
+    # One customer exactly at midnight, whose recency is a whole number of days
+    last_order.iloc[0] = pd.Timestamp('2023-06-01')
+    as_of = pd.Timestamp('2024-06-01')
+    days = (as_of - last_order).dt.days.to_numpy()
+
+    merged = recency_sketch(last_order_counts(last_order), as_of)
+
+    np.testing.assert_array_equal(merged.quantiles(QS), QuantileSketch().add(days).quantiles(QS))
+    np.testing.assert_array_equal(recency_scores(days, "sketch", merged), recency_scores(days, "sketch"))
+
+
+def test_box_fences_stay_within_the_data():
+    stats = box_stats(QuantileSketch().add([10.0, 11.0, 12.0, 13.0, 500.0]))
+
+    assert 10.0 <= stats['lowerfence'] <= stats['q1'] <= stats['median'] <= stats['q3'] <= stats['upperfence']
+    assert stats['upperfence'] < 500.0
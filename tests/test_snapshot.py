@@ -0,0 +1,65 @@
+import os
+
+from src.snapshot import appended_fingerprint, appended_offset, file_fingerprint, is_source_unchanged
+
+ROW_BYTES = len("o0000000,00010.00\n")
+
+
+def write_rows(path, rows):
+    with open(path, "w") as f:
+        f.write("ORDER_ID,TOTAL_AMOUNT\n")
+        f.writelines(f"o{i:07d},{amount:08.2f}\n" for i, amount in enumerate(rows))
+
+
+def append_rows(path, count):
+    with open(path, "a") as f:
+        f.writelines(f"o{9_000_000 + i:07d},00001.00\n" for i in range(count))
+
+
+def rewrite_row_at(path, offset, mtime_ns):
+    """Change the amount of the row starting after `offset`, keeping the size, and touch the file."""
+    with open(path, "r+b") as f:
+        f.seek(offset)
+        f.readline()
+        f.seek(f.tell() + len("o0000000,"))
+        f.write(b"99999.99")
+    os.utime(path, ns=(mtime_ns + 1_000_000_000,) * 2)
+
+
+def test_row_rewritten_mid_file_is_detected(tmp_path):
+    path = str(tmp_path / "ORDER_FACT.csv")
+    # Several MiB, so the changed row is far from both ends of the file
+    write_rows(path, [10.0] * 300_000)
+    fingerprint = file_fingerprint(path)
+
+    rewrite_row_at(path, fingerprint["size"] // 2, fingerprint["mtime_ns"])
+
+    assert os.path.getsize(path) == fingerprint["size"]
+    assert not is_source_unchanged(fingerprint, path)
+
+
+def test_appended_fingerprint_chains_onto_the_previous_one(tmp_path):
+    path = str(tmp_path / "ORDER_FACT.csv")
+    write_rows(path, [10.0] * 300_000)
+    fingerprint = file_fingerprint(path)
+    append_rows(path, 10)
+    appended = appended_fingerprint(fingerprint, path)
+
+    assert appended["segments"] == [fingerprint["size"], fingerprint["size"] + 10 * ROW_BYTES]
+    assert is_source_unchanged(appended, path)
+
+    # The chained hash still covers the bytes before the append
+    rewrite_row_at(path, fingerprint["size"] // 2, appended["mtime_ns"])
+    assert not is_source_unchanged(appended, path)
+
+
+def test_append_after_rewriting_the_last_rows_is_not_incremental(tmp_path):
+    path = str(tmp_path / "ORDER_FACT.csv")
+    write_rows(path, [10.0] * 300_000)
+    fingerprint = file_fingerprint(path)
+    append_rows(path, 1)
+    assert appended_offset(fingerprint, path) == fingerprint["size"]
+
+    rewrite_row_at(path, fingerprint["size"] - 3 * ROW_BYTES, fingerprint["mtime_ns"])
+
+    assert appended_offset(fingerprint, path) is None
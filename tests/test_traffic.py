@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.traffic import TRAFFIC_RESOLUTIONS, build_traffic_rollups, pick_resolution, traffic_series
+
+
+@pytest.fixture(scope="module")
+def page_performance():
+    # Three pages a day, a gap of days without rows and a few rows without rates
+    rng = np.random.default_rng(11)
+    dates = pd.date_range('2024-01-01', '2024-06-30', freq='D')
+    dates = dates[(dates < '2024-03-10') | (dates > '2024-03-20')]
+    n = 3 * len(dates)
+    bounce_rate = rng.uniform(0.1, 0.9, n)
+    bounce_rate[rng.random(n) < 0.05] = np.nan
+    conversion_rate = rng.uniform(0.0, 0.2, n)
+    conversion_rate[rng.random(n) < 0.05] = np.nan
+    views = rng.integers(1, 1000, n)
+    return pd.DataFrame({
+        'DATE': np.repeat(dates, 3),
+        'PAGE_ID': np.tile(['home', 'product', 'checkout'], len(dates)),
+        'VIEWS': views,
+        'UNIQUE_VISITORS': (views * rng.uniform(0.2, 1.0, n)).astype(np.int64),
+        'BOUNCE_RATE': bounce_rate,
+        'CONVERSION_RATE': conversion_rate,
+    })
+
+
+def resampled(page_performance, resolution, start, end):
+    """Raw rows of the range grouped per bucket, with the rates weighted row by row."""
+    rows = page_performance[page_performance['DATE'].between(start, end)]
+    bounced = rows['BOUNCE_RATE'].notna()
+    converted = rows['CONVERSION_RATE'].notna()
+    grouped = rows.assign(
+        BOUNCES=(rows['BOUNCE_RATE'] * rows['VIEWS']).where(bounced, 0),
+        BOUNCE_BASE=rows['VIEWS'].where(bounced, 0),
+        CONVERSIONS=(rows['CONVERSION_RATE'] * rows['UNIQUE_VISITORS']).where(converted, 0),
+        CONVERSION_BASE=rows['UNIQUE_VISITORS'].where(converted, 0),
+    ).groupby(pd.Grouper(key='DATE', freq=TRAFFIC_RESOLUTIONS[resolution]))
+    traffic = grouped[['VIEWS', 'UNIQUE_VISITORS', 'BOUNCES', 'BOUNCE_BASE', 'CONVERSIONS', 'CONVERSION_BASE']].sum()
+    if resolution == "day":
+        traffic = traffic[grouped.size() > 0]
+    return traffic.assign(BOUNCE_RATE=traffic['BOUNCES'] / traffic['BOUNCE_BASE'],
+                          CONVERSION_RATE=traffic['CONVERSIONS'] / traffic['CONVERSION_BASE']).reset_index()
+
+
+@pytest.mark.parametrize("resolution", list(TRAFFIC_RESOLUTIONS))
+@pytest.mark.parametrize("start, end", [
+    ('2024-01-01', '2024-06-30'),  # the whole table, starting on a Monday and ending on a Sunday
+    ('2024-01-17', '2024-05-14'),  # partial first and last week and month
+    ('2024-02-29', '2024-03-01'),  # across a month and inside one week
+    ('2024-03-05', '2024-03-25'),  # around the days without rows
+    ('2024-04-10', '2024-04-12'),  # inside one week and one month
+    ('2024-06-30', '2024-06-30'),  # a single day, the last of a week and of a month
+])
+def test_series_matches_resampled_raw_rows(page_performance, resolution, start, end):
+    rollups = build_traffic_rollups(page_performance)
+
+    traffic = traffic_series(rollups, resolution, start, end)
+    expected = resampled(page_performance, resolution, pd.Timestamp(start), pd.Timestamp(end))
+
+    assert list(traffic['DATE']) == list(expected['DATE'])
+    for column in ['VIEWS', 'UNIQUE_VISITORS', 'BOUNCE_RATE', 'CONVERSION_RATE']:
+        np.testing.assert_allclose(traffic[column], expected[column], err_msg=column)
+
+
+def test_partial_edge_buckets_only_count_days_in_range(page_performance):
+    rollups = build_traffic_rollups(page_performance)
+    start, end = pd.Timestamp('2024-01-17'), pd.Timestamp('2024-05-14')
+    in_range = page_performance[page_performance['DATE'].between(start, end)]
+
+    for resolution in TRAFFIC_RESOLUTIONS:
+        traffic = traffic_series(rollups, resolution, start, end)
+        assert traffic['VIEWS'].sum() == in_range['VIEWS'].sum()
+        assert traffic['DATE'].is_unique and traffic['DATE'].is_monotonic_increasing
+
+    weekly = traffic_series(rollups, "week", start, end)
+    # Weeks are labelled by their Sunday: Wednesday 17 January falls in the week of the 21st
+    assert weekly['DATE'].iloc[0] == pd.Timestamp('2024-01-21')
+    first_week = in_range['DATE'] <= '2024-01-21'
+    assert weekly['VIEWS'].iloc[0] == in_range.loc[first_week, 'VIEWS'].sum()
+    monthly = traffic_series(rollups, "month", start, end)
+    assert list(monthly['DATE']) == list(pd.date_range('2024-01-01', '2024-05-01', freq='MS'))
+    assert monthly['VIEWS'].iloc[-1] == in_range.loc[in_range['DATE'] >= '2024-05-01', 'VIEWS'].sum()
+
+
+def test_rates_are_weighted_not_averaged():
+    page_performance = pd.DataFrame({
+        'DATE': pd.to_datetime(['2024-01-01', '2024-01-01', '2024-01-02', '2024-01-02']),
+        'VIEWS': [100, 900, 1000, 50],
+        'UNIQUE_VISITORS': [100, 400, 500, 10],
+        'BOUNCE_RATE': [0.5, 0.1, np.nan, 0.2],
+        'CONVERSION_RATE': [0.1, 0.05, 0.02, np.nan],
+    })
+    rollups = build_traffic_rollups(page_performance)
+
+    daily = traffic_series(rollups, "day", '2024-01-01', '2024-01-02')
+    weekly = traffic_series(rollups, "week", '2024-01-01', '2024-01-02')
+
+    assert daily['BOUNCE_RATE'].iloc[0] == pytest.approx((50 + 90) / 1000)
+    assert daily['CONVERSION_RATE'].iloc[0] == pytest.approx((10 + 20) / 500)
+    # Rows without a rate count on neither side of it
+    assert daily['BOUNCE_RATE'].iloc[1] == pytest.approx(0.2)
+    assert daily['CONVERSION_RATE'].iloc[1] == pytest.approx(0.02)
+    # The week combines the numerators and denominators, not the daily rates
+    assert weekly['VIEWS'].iloc[0] == 2050
+    assert weekly['BOUNCE_RATE'].iloc[0] == pytest.approx((50 + 90 + 10) / 1050)
+    assert weekly['CONVERSION_RATE'].iloc[0] == pytest.approx((10 + 20 + 10) / 1000)
+
+
+def test_bucket_without_rates_has_no_rate():
+    page_performance = pd.DataFrame({'DATE': pd.to_datetime(['2024-01-01']), 'VIEWS': [10], 'UNIQUE_VISITORS': [5],
+                                     'BOUNCE_RATE': [np.nan], 'CONVERSION_RATE': [np.nan]})
+
+    traffic = traffic_series(build_traffic_rollups(page_performance), "day", '2024-01-01', '2024-01-01')
+
+    assert traffic['VIEWS'].iloc[0] == 10
+    assert traffic[['BOUNCE_RATE', 'CONVERSION_RATE']].isna().all(axis=None)
+
+
+@pytest.mark.parametrize("start, end, resolution", [
+    ('2024-01-01', '2024-01-01', "day"),
+    ('2024-01-01', '2024-04-02', "day"),
+    ('2024-01-01', '2024-04-03', "week"),
+    ('2024-01-01', '2025-12-31', "week"),
+    ('2024-01-01', '2026-01-01', "month"),
+])
+def test_pick_resolution(start, end, resolution):
+    assert pick_resolution(start, end) == resolution